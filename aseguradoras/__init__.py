@@ -5,75 +5,148 @@ Contiene implementaciones específicas para cada aseguradora
 """
 
 import os
+import sys
+import json
+import logging
 import importlib
+import threading
 from typing import Dict, List, Optional
 
+logger = logging.getLogger(__name__)
+
 # Información del paquete principal
 __version__ = "1.0.0"
 __author__ = "Sistema de Automatización"
 __description__ = "Paquete principal para manejo de múltiples aseguradoras"
 
+# Cada aseguradora declara en este archivo su nombre, código y módulo de plugin;
+# leerlo no importa el paquete ni su configuración
+ARCHIVO_MANIFIESTO = 'manifest.json'
+
+
 class GestorAseguradoras:
-    """Gestor principal para manejar múltiples aseguradoras"""
+    """Gestor principal para manejar múltiples aseguradoras
+
+    El descubrimiento solo lee el ``manifest.json`` de cada carpeta. El paquete
+    de una aseguradora se importa la primera vez que se usa y queda en caché
+    hasta ``recargar()``.
+    """
     
-    def __init__(self):
-        self.aseguradoras_disponibles = {}
-        self.cargar_aseguradoras()
+    def __init__(self, directorio: Optional[str] = None):
+        self.directorio = directorio or os.path.dirname(os.path.abspath(__file__))
+        self._manifiestos: Optional[Dict[str, Dict]] = None
+        self._cargadas: Dict[str, Dict] = {}
+        self.errores: Dict[str, str] = {}
+        self._por_recargar = set()
+        self._lock = threading.RLock()
     
-    def cargar_aseguradoras(self):
-        """Carga dinámicamente todas las aseguradoras disponibles"""
+    def importar(self, modulo: str):
+        """Importa un módulo, o lo reimporta si se pidió ``recargar()`` después de usarlo"""
+        with self._lock:
+            if modulo in self._por_recargar and modulo in sys.modules:
+                self._por_recargar.discard(modulo)
+                return importlib.reload(sys.modules[modulo])
+            return importlib.import_module(modulo)
+    
+    def _leer_manifiesto(self, carpeta: str) -> Optional[Dict]:
+        ruta = os.path.join(self.directorio, carpeta, ARCHIVO_MANIFIESTO)
+        if not os.path.isfile(ruta):
+            return None
         try:
-            # Obtener la ruta del directorio actual
-            directorio_actual = os.path.dirname(os.path.abspath(__file__))
-            
-            # Buscar carpetas de aseguradoras
-            for item in os.listdir(directorio_actual):
-                ruta_completa = os.path.join(directorio_actual, item)
-                
-                # Verificar que sea un directorio y tenga __init__.py
-                if (os.path.isdir(ruta_completa) and 
-                    os.path.exists(os.path.join(ruta_completa, '__init__.py'))):
-                    
-                    try:
-                        # Intentar importar el módulo
-                        modulo = importlib.import_module(f"aseguradoras.{item}")
-                        
-                        # Verificar si tiene la información necesaria
-                        if hasattr(modulo, 'get_aseguradora_info'):
-                            info = modulo.get_aseguradora_info()
-                            self.aseguradoras_disponibles[item] = {
-                                'modulo': modulo,
-                                'info': info,
-                                'ruta': ruta_completa
-                            }
-                            print(f"✅ Aseguradora cargada: {info.get('nombre', item)}")
-                        
-                    except Exception as e:
-                        print(f"⚠️  Error cargando aseguradora {item}: {e}")
-            
-            print(f"📊 Total aseguradoras cargadas: {len(self.aseguradoras_disponibles)}")
-            
-        except Exception as e:
-            print(f"❌ Error cargando aseguradoras: {e}")
+            with open(ruta, encoding='utf-8') as archivo:
+                manifiesto = json.load(archivo)
+        except (OSError, ValueError) as e:
+            self.errores[carpeta] = f"Manifiesto inválido: {e}"
+            logger.warning(f"⚠️  Manifiesto inválido en {carpeta}: {e}")
+            return None
+        manifiesto.setdefault('nombre', carpeta)
+        manifiesto['ruta'] = os.path.join(self.directorio, carpeta)
+        return manifiesto
+    
+    @property
+    def manifiestos(self) -> Dict[str, Dict]:
+        """Manifiestos por carpeta (código) de aseguradora, leídos una sola vez"""
+        with self._lock:
+            if self._manifiestos is None:
+                manifiestos = {}
+                for item in sorted(os.listdir(self.directorio)):
+                    if os.path.isdir(os.path.join(self.directorio, item)):
+                        manifiesto = self._leer_manifiesto(item)
+                        if manifiesto:
+                            manifiestos[item] = manifiesto
+                self._manifiestos = manifiestos
+                logger.debug(f"📊 Manifiestos de aseguradoras: {len(manifiestos)}")
+            return self._manifiestos
+    
+    @property
+    def aseguradoras_disponibles(self) -> Dict[str, Dict]:
+        """Aseguradoras ya importadas (codigo -> modulo, info, ruta)"""
+        return dict(self._cargadas)
+    
+    def marcar_para_recargar(self, modulo: str):
+        """El próximo ``importar(modulo)`` lo reimporta en lugar de usar el de sys.modules"""
+        with self._lock:
+            self._por_recargar.add(modulo)
+    
+    def recargar(self):
+        """Vuelve a leer los manifiestos y reimporta los paquetes ya usados en su próximo uso"""
+        with self._lock:
+            for aseguradora in self._cargadas.values():
+                self.marcar_para_recargar(aseguradora['modulo'].__name__)
+            self._cargadas = {}
+            self._manifiestos = None
+            self.errores = {}
+        logger.info("🔄 Manifiestos de aseguradoras recargados")
+    
+    def cargar_aseguradoras(self):
+        """Importa todas las aseguradoras disponibles (descubrimiento completo, no se usa al arrancar)"""
+        for codigo in self.manifiestos:
+            self.obtener_aseguradora(codigo)
+        return self.aseguradoras_disponibles
+    
+    def modulo_plugin(self, nombre: str) -> Optional[str]:
+        """Módulo del plugin del worker para una aseguradora por su nombre completo"""
+        for manifiesto in self.manifiestos.values():
+            if manifiesto.get('nombre') == nombre:
+                return manifiesto.get('plugin')
+        return None
     
     def listar_aseguradoras(self) -> List[Dict]:
-        """Lista todas las aseguradoras disponibles"""
+        """Lista todas las aseguradoras disponibles (sin importarlas)"""
         return [
             {
                 'codigo': codigo,
-                'nombre': info['info'].get('nombre', codigo),
-                'pais': info['info'].get('pais', 'N/A'),
-                'activa': info['info'].get('activa', False),
-                'ruta': info['ruta']
+                'nombre': manifiesto.get('nombre', codigo),
+                'pais': manifiesto.get('pais', 'N/A'),
+                'activa': manifiesto.get('activa', False),
+                'ruta': manifiesto['ruta']
             }
-            for codigo, info in self.aseguradoras_disponibles.items()
+            for codigo, manifiesto in self.manifiestos.items()
         ]
     
     def obtener_aseguradora(self, codigo: str) -> Optional[Dict]:
-        """Obtiene una aseguradora específica por código"""
-        if codigo in self.aseguradoras_disponibles:
-            return self.aseguradoras_disponibles[codigo]
-        return None
+        """Obtiene una aseguradora específica por código, importándola en el primer uso"""
+        with self._lock:
+            if codigo in self._cargadas:
+                return self._cargadas[codigo]
+            manifiesto = self.manifiestos.get(codigo)
+            if not manifiesto:
+                return None
+            try:
+                modulo = self.importar(f"aseguradoras.{codigo}")
+            except Exception as e:
+                # Un paquete roto no impide usar el resto de aseguradoras
+                self.errores[codigo] = str(e)
+                logger.warning(f"⚠️  Error cargando aseguradora {codigo}: {e}")
+                return None
+            info = modulo.get_aseguradora_info() if hasattr(modulo, 'get_aseguradora_info') else manifiesto
+            self._cargadas[codigo] = {
+                'modulo': modulo,
+                'info': info,
+                'ruta': manifiesto['ruta']
+            }
+            logger.info(f"✅ Aseguradora cargada: {info.get('nombre', codigo)}")
+            return self._cargadas[codigo]
     
     def crear_procesador(self, codigo: str):
         """Crea un procesador para una aseguradora específica"""
@@ -100,7 +173,7 @@ class GestorAseguradoras:
             return aseguradora['modulo'].get_config_completa()
         return None
 
-# Instancia global del gestor
+# Instancia global del gestor (no lee nada hasta el primer uso)
 gestor = GestorAseguradoras()
 
 # Funciones de conveniencia
@@ -124,6 +197,10 @@ def obtener_configuracion(codigo: str):
     """Obtiene la configuración de una aseguradora"""
     return gestor.obtener_configuracion(codigo)
 
+def recargar():
+    """Vuelve a descubrir las aseguradoras"""
+    gestor.recargar()
+
 # Exportar funciones principales
 __all__ = [
     'GestorAseguradoras',
@@ -132,7 +209,8 @@ __all__ = [
     'obtener_aseguradora',
     'crear_procesador',
     'validar_aseguradora',
-    'obtener_configuracion'
+    'obtener_configuracion',
+    'recargar'
 ]
 
 if __name__ == "__main__":
@@ -4,7 +4,8 @@ Configuración específica para PAN AMERICAN LIFE DE ECUADOR
 
 IMPORTANTE: Todas las configuraciones se obtienen del archivo .env principal del proyecto.
 No hay valores hardcodeados en este archivo. Si una variable no está definida en .env,
-el sistema fallará con un error claro indicando qué variable falta.
+queda en None y validar_configuracion() indica con un error claro qué variable falta
+(importar el paquete no falla, para que el registro de plugins pueda cargarlo).
 
 Variables requeridas:
 - PALE_EC_LOGIN_URL: URL de login de la aseguradora
@@ -20,6 +21,12 @@ Ver archivo env.example para todas las variables disponibles.
 
 import os
 
+
+def _entero(nombre, defecto=None):
+    """Lee una variable entera; None si no está definida (la reporta validar_configuracion)"""
+    valor = os.getenv(nombre, defecto)
+    return int(valor) if valor not in (None, '') else None
+
 # Información básica de la aseguradora
 ASEGURADORA_INFO = {
     'nombre': 'PAN AMERICAN LIFE DE ECUADOR',
@@ -63,29 +70,35 @@ ACCIONES_POST_LOGIN = [
         'tipo': 'click',
         'selector': os.getenv('PALE_EC_LOGIN_BUTTON_SELECTOR'),
         'descripcion': 'Botón de inicio de sesión',
-        'espera_despues': int(os.getenv('PALE_EC_LOGIN_BUTTON_WAIT', '2')),
+        'espera_despues': _entero('PALE_EC_LOGIN_BUTTON_WAIT', '2'),
         'orden': 1
     }
 ]
 
 # Configuración de Selenium específica para esta aseguradora
 SELENIUM_CONFIG = {
-    'timeout_pagina': int(os.getenv('PALE_EC_SELENIUM_TIMEOUT_PAGINA')),
-    'timeout_elementos': int(os.getenv('PALE_EC_SELENIUM_TIMEOUT_ELEMENTOS')),
-    'espera_post_login': int(os.getenv('PALE_EC_SELENIUM_ESPERA_POST_LOGIN')),
+    'navegador': os.getenv('PALE_EC_SELENIUM_NAVEGADOR', 'edge'),
+    'timeout_pagina': _entero('PALE_EC_SELENIUM_TIMEOUT_PAGINA'),
+    'timeout_elementos': _entero('PALE_EC_SELENIUM_TIMEOUT_ELEMENTOS'),
+    'espera_post_login': _entero('PALE_EC_SELENIUM_ESPERA_POST_LOGIN'),
     'user_agent': os.getenv('PALE_EC_SELENIUM_USER_AGENT'),
     'window_size': os.getenv('PALE_EC_SELENIUM_WINDOW_SIZE'),
     'headless': os.getenv('PALE_EC_SELENIUM_HEADLESS', 'true').lower() == 'true',
-    'opciones_especiales': os.getenv('PALE_EC_SELENIUM_OPCIONES_ESPECIALES', '').split(',') if os.getenv('PALE_EC_SELENIUM_OPCIONES_ESPECIALES') else []
+    'opciones_especiales': os.getenv('PALE_EC_SELENIUM_OPCIONES_ESPECIALES', '').split(',') if os.getenv('PALE_EC_SELENIUM_OPCIONES_ESPECIALES') else [],
+    # Bloqueo de recursos y estrategia de carga (None = valores globales SELENIUM_*)
+    'page_load_strategy': os.getenv('PALE_EC_SELENIUM_PAGE_LOAD_STRATEGY'),
+    'bloquear_recursos': os.getenv('PALE_EC_SELENIUM_BLOQUEAR_RECURSOS').split(',') if os.getenv('PALE_EC_SELENIUM_BLOQUEAR_RECURSOS') else None,
+    'recursos_permitidos': os.getenv('PALE_EC_SELENIUM_RECURSOS_PERMITIDOS', '').split(',') if os.getenv('PALE_EC_SELENIUM_RECURSOS_PERMITIDOS') else [],
+    'patrones_bloqueados': os.getenv('PALE_EC_SELENIUM_PATRONES_BLOQUEADOS', '').split(',') if os.getenv('PALE_EC_SELENIUM_PATRONES_BLOQUEADOS') else []
 }
 
 # Configuración de esperas y timeouts
 TIMEOUTS = {
-    'carga_pagina': int(os.getenv('PALE_EC_TIMEOUT_CARGA_PAGINA')),
-    'elemento_visible': int(os.getenv('PALE_EC_TIMEOUT_ELEMENTO_VISIBLE')),
-    'elemento_clicable': int(os.getenv('PALE_EC_TIMEOUT_ELEMENTO_CLICABLE')),
-    'procesamiento_login': int(os.getenv('PALE_EC_TIMEOUT_PROCESAMIENTO_LOGIN')),
-    'navegacion': int(os.getenv('PALE_EC_TIMEOUT_NAVEGACION'))
+    'carga_pagina': _entero('PALE_EC_TIMEOUT_CARGA_PAGINA'),
+    'elemento_visible': _entero('PALE_EC_TIMEOUT_ELEMENTO_VISIBLE'),
+    'elemento_clicable': _entero('PALE_EC_TIMEOUT_ELEMENTO_CLICABLE'),
+    'procesamiento_login': _entero('PALE_EC_TIMEOUT_PROCESAMIENTO_LOGIN'),
+    'navegacion': _entero('PALE_EC_TIMEOUT_NAVEGACION')
 }
 
 # Validaciones post-login
@@ -99,8 +112,8 @@ VALIDACIONES = {
 # Manejo de errores específicos
 MANEJO_ERRORES = {
     'errores_conocidos': os.getenv('PALE_EC_ERRORES_CONOCIDOS', '').split(',') if os.getenv('PALE_EC_ERRORES_CONOCIDOS') else [],
-    'reintentos': int(os.getenv('PALE_EC_ERRORES_REINTENTOS', '3')),
-    'espera_entre_reintentos': int(os.getenv('PALE_EC_ERRORES_ESPERA_ENTRE_REINTENTOS', '5')),
+    'reintentos': _entero('PALE_EC_ERRORES_REINTENTOS', '3'),
+    'espera_entre_reintentos': _entero('PALE_EC_ERRORES_ESPERA_ENTRE_REINTENTOS', '5'),
     'acciones_error': os.getenv('PALE_EC_ERRORES_ACCIONES', '').split(',') if os.getenv('PALE_EC_ERRORES_ACCIONES') else []
 }
 
@@ -116,20 +129,20 @@ LOGGING = {
 # Configuración de caché
 CACHE = {
     'habilitado': os.getenv('PALE_EC_CACHE_HABILITADO', 'true').lower() == 'true',
-    'tiempo_vida': int(os.getenv('PALE_EC_CACHE_TIEMPO_VIDA', '3600')),
-    'max_elementos': int(os.getenv('PALE_EC_CACHE_MAX_ELEMENTOS', '100')),
+    'tiempo_vida': _entero('PALE_EC_CACHE_TIEMPO_VIDA', '3600'),
+    'max_elementos': _entero('PALE_EC_CACHE_MAX_ELEMENTOS', '100'),
     'limpiar_automatico': os.getenv('PALE_EC_CACHE_LIMPIAR_AUTOMATICO', 'true').lower() == 'true'
 }
 
 # Configuración de monitoreo
 MONITOREO = {
     'habilitado': os.getenv('PALE_EC_MONITOREO_HABILITADO', 'true').lower() == 'true',
-    'intervalo_verificacion': int(os.getenv('PALE_EC_MONITOREO_INTERVALO', '300')),
+    'intervalo_verificacion': _entero('PALE_EC_MONITOREO_INTERVALO', '300'),
     'metricas': os.getenv('PALE_EC_MONITOREO_METRICAS', '').split(',') if os.getenv('PALE_EC_MONITOREO_METRICAS') else [],
     'alertas': {
-        'tiempo_login_max': int(os.getenv('PALE_EC_MONITOREO_TIEMPO_MAX', '30')),
+        'tiempo_login_max': _entero('PALE_EC_MONITOREO_TIEMPO_MAX', '30'),
         'tasa_exito_min': float(os.getenv('PALE_EC_MONITOREO_TASA_EXITO_MIN', '0.95')),
-        'errores_consecutivos_max': int(os.getenv('PALE_EC_MONITOREO_ERRORES_MAX', '5'))
+        'errores_consecutivos_max': _entero('PALE_EC_MONITOREO_ERRORES_MAX', '5')
     }
 }
 
@@ -138,8 +151,8 @@ SEGURIDAD = {
     'encriptar_credenciales': os.getenv('PALE_EC_SEGURIDAD_ENCRIPTAR', 'true').lower() == 'true',
     'log_credenciales': os.getenv('PALE_EC_SEGURIDAD_LOG_CREDENCIALES', 'false').lower() == 'true',
     'validar_ssl': os.getenv('PALE_EC_SEGURIDAD_VALIDAR_SSL', 'true').lower() == 'true',
-    'timeout_conexion': int(os.getenv('PALE_EC_SEGURIDAD_TIMEOUT_CONEXION', '30')),
-    'max_intentos_conexion': int(os.getenv('PALE_EC_SEGURIDAD_MAX_INTENTOS', '3'))
+    'timeout_conexion': _entero('PALE_EC_SEGURIDAD_TIMEOUT_CONEXION', '30'),
+    'max_intentos_conexion': _entero('PALE_EC_SEGURIDAD_MAX_INTENTOS', '3')
 }
 
 # Configuración de notificaciones
@@ -154,7 +167,7 @@ NOTIFICACIONES = {
 BACKUP = {
     'habilitado': os.getenv('PALE_EC_BACKUP_HABILITADO', 'true').lower() == 'true',
     'frecuencia': os.getenv('PALE_EC_BACKUP_FRECUENCIA'),
-    'retener_dias': int(os.getenv('PALE_EC_BACKUP_RETENER_DIAS', '30')),
+    'retener_dias': _entero('PALE_EC_BACKUP_RETENER_DIAS', '30'),
     'comprimir': os.getenv('PALE_EC_BACKUP_COMPRIMIR', 'true').lower() == 'true',
     'ubicacion': os.getenv('PALE_EC_BACKUP_UBICACION')
 }
@@ -0,0 +1,773 @@
+#!/usr/bin/env python3
+"""
+Plugin de PAN AMERICAN LIFE DE ECUADOR para el worker de producción
+
+Reúne los pasos propios del portal de beneficios (esperas de la redirección
+OAuth2, navegación a MisPolizasPVR.aspx y búsqueda del asegurado). El login
+por campos/acciones de BD y la lectura de la tabla de resultados los aporta
+el worker.
+"""
+
+import time
+import logging
+from urllib.parse import urlparse
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+from src.config import Config
+from src.metrics import metricas
+from src.logging_config import Muestreador
+from src.insurer_plugins import InsurerPlugin, registro_aseguradoras
+from src.deadline import PlazoAgotado, acotar, esperar
+
+logger = logging.getLogger(__name__)
+
+muestreo_logs = Muestreador(Config.LOG_MUESTREO)
+
+# Alternativas al BotonEnvio configurado (ver src/selector_resolver.py)
+SELECTORES_BOTON_BUSQUEDA = [
+    'button[type="submit"]',
+    'input[type="submit"]',
+    '.btn-primary',
+    '.btn-buscar',
+    'button:contains("Buscar")',
+    'button:contains("Consultar")'
+]
+
+
+@registro_aseguradoras.registrar
+class PluginPanAmericanLifeEcuador(InsurerPlugin):
+    """Login OAuth2 en PALIG y búsqueda del asegurado en MisPolizasPVR.aspx"""
+
+    nombre = 'PAN AMERICAN LIFE DE ECUADOR'
+    codigo = 'PALE_EC'
+    max_concurrencia = Config.PALE_EC_MAX_CONCURRENCIA
+    ttl_sesion_segundos = Config.PALE_EC_TTL_SESION_SEGUNDOS
+    plazo_segundos = Config.PALE_EC_PLAZO_SEGUNDOS
+
+    def __init__(self, procesador):
+        super().__init__(procesador)
+        # Portal de beneficios (configurable para el portal local de pruebas)
+        self.url_busqueda = Config.PALE_EC_BUSQUEDA_URL
+        self.host_beneficios = urlparse(self.url_busqueda).netloc
+
+    def post_login(self, url_info):
+        """Espera a que termine la redirección OAuth2 y reintenta el login si el portal vuelve a pedirlo"""
+        driver = self.procesador.driver
+        # Variable para controlar reintentos de login
+        intentos_login = 0
+        max_intentos_login = 2
+
+        logger.info("🇪🇨 Esperando redirección completa para PAN AMERICAN LIFE DE ECUADOR...")
+
+        # Variable para rastrear cambios de URL
+        url_anterior = driver.current_url
+        logger.info(f"📍 URL inicial: {url_anterior}")
+
+        # Variables para control de timeout
+        timeout_authorization_ping = 30  # 30 segundos máximo en authorization.ping
+        tiempo_inicio_ping = None
+
+        # Esperar hasta que llegue a la página final (máximo 120 segundos)
+        for intento in range(1, 41):  # 40 intentos * 3 segundos = 120 segundos
+            esperar(3)
+
+            url_actual = driver.current_url
+            titulo_actual = driver.title
+
+            # Verificar si la URL cambió
+            if url_actual != url_anterior:
+                logger.info(f"🔄 CAMBIO DE URL DETECTADO en intento {intento}/40")
+                logger.info(f"   📍 URL anterior: {url_anterior}")
+                logger.info(f"   📍 URL actual: {url_actual}")
+                logger.info(f"   📄 Título: {titulo_actual}")
+                url_anterior = url_actual
+            elif logger.isEnabledFor(logging.DEBUG) and muestreo_logs.permitir('espera_redireccion'):
+                logger.debug(f"   ⏳ Intento {intento}/40 - URL: {url_actual[:80]}... - Título: {titulo_actual}")
+
+            # 🔍 DETECTAR PÁGINA DE AUTORIZACIÓN.PING Y MANEJARLA
+            if "authorization.ping" in url_actual:
+                # Iniciar timer si es la primera vez que detectamos esta página
+                if tiempo_inicio_ping is None:
+                    tiempo_inicio_ping = time.time()
+                    logger.info(f"🔄 ESTADO INTERMEDIO OAUTH2 DETECTADO en intento {intento}")
+                    logger.info(f"   📍 Página de autorización.ping: {url_actual}")
+                    logger.info(f"   📄 Título de la página: {titulo_actual}")
+                    logger.info(f"   ⏳ Esperando continuación del flujo OAuth2...")
+                else:
+                    # Verificar timeout
+                    tiempo_transcurrido = time.time() - tiempo_inicio_ping
+                    if tiempo_transcurrido > timeout_authorization_ping:
+                        logger.warning(f"⚠️ TIMEOUT en página authorization.ping después de {timeout_authorization_ping} segundos")
+                        registro_aseguradoras.senalar_congestion(self, 'authorization_ping')
+                        logger.warning(f"   🔄 Recargando página para forzar continuación...")
+
+                        try:
+                            driver.refresh()
+                            esperar(5)
+                            tiempo_inicio_ping = None  # Resetear timer
+                            continue
+                        except Exception as e:
+                            logger.error(f"❌ Error recargando página: {e}")
+                            break
+
+                # Buscar elementos para continuar el flujo
+                logger.info(f"   🔍 Buscando elementos para continuar el flujo...")
+                try:
+                    # Buscar botones o enlaces para continuar
+                    elementos_continuar = driver.find_elements(By.CSS_SELECTOR, 
+                        'input[type="submit"], button, a, input[value*="continuar"], input[value*="siguiente"]')
+
+                    if elementos_continuar:
+                        logger.info(f"   ✅ Encontrados {len(elementos_continuar)} elementos para continuar")
+                        for i, elem in enumerate(elementos_continuar):
+                            try:
+                                if logger.isEnabledFor(logging.DEBUG):
+                                    texto = elem.text or elem.get_attribute('value') or elem.get_attribute('title') or 'sin-texto'
+                                    logger.debug(f"      {i+1}. {elem.tag_name} - Texto: '{texto}'")
+
+                                # Intentar hacer clic en el primer elemento clickeable
+                                if elem.is_enabled() and elem.is_displayed():
+                                    logger.info(f"   🎯 Haciendo clic en elemento {i+1} para continuar...")
+                                    elem.click()
+                                    logger.info(f"   ✅ Click ejecutado, esperando continuación...")
+                                    esperar(2)
+                                    tiempo_inicio_ping = None  # Resetear timer después del click
+                                    break
+                            except Exception as e:
+                                logger.warning(f"   ⚠️ No se pudo hacer clic en elemento {i+1}: {e}")
+                    else:
+                        logger.info(f"   ℹ️ No se encontraron elementos clickeables en la página de autorización.ping")
+
+                except Exception as e:
+                    logger.warning(f"   ⚠️ Error buscando elementos de continuación: {e}")
+
+                # Continuar esperando
+                continue
+
+            # 🔍 DETECTAR SI VOLVIMOS AL LOGIN Y REINTENTAR
+            if "authorization.oauth2" in url_actual and intentos_login < max_intentos_login:
+                intentos_login += 1
+                logger.warning(f"🔄 ¡VOLVIMOS AL LOGIN! (Intento {intentos_login}/{max_intentos_login})")
+                logger.info("🔄 Reintentando login automáticamente...")
+
+                try:
+                    # Esperar a que se recargue la página
+                    esperar(2)
+
+                    # Reintentar campos de login
+                    logger.info("🔐 Reintentando login - llenando campos...")
+                    if url_info.get('campos_login'):
+                        for campo in url_info['campos_login']:
+                            selector = campo['selector_html']
+                            valor = campo['valor_dinamico']
+
+                            if not valor:
+                                continue
+
+                            try:
+                                elemento = WebDriverWait(driver, acotar(10)).until(
+                                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+                                )
+                                elemento.clear()
+                                elemento.send_keys(valor)
+                                logger.info(f"✅ Campo {selector} completado (reintento)")
+                            except Exception as e:
+                                logger.warning(f"⚠️ Error en reintento de campo {selector}: {e}")
+
+                    # Reintentar acciones post-login
+                    logger.info("🎯 Reintentando acciones post-login...")
+                    if url_info.get('acciones_post_login'):
+                        for accion in url_info['acciones_post_login']:
+                            tipo = accion['tipo_accion']
+                            selector = accion['selector_html']
+
+                            try:
+                                elemento = WebDriverWait(driver, acotar(10)).until(
+                                    EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
+                                )
+
+                                if tipo.lower() == 'click':
+                                    elemento.click()
+                                    logger.info(f"✅ Click ejecutado (reintento) en: {selector}")
+                                elif tipo.lower() == 'submit':
+                                    elemento.submit()
+                                    logger.info(f"✅ Submit ejecutado (reintento) en: {selector}")
+
+                                esperar(2)
+
+                            except Exception as e:
+                                logger.warning(f"⚠️ Error en reintento de acción {tipo}: {e}")
+
+                    logger.info("✅ Reintento de login completado, continuando...")
+
+                except Exception as e:
+                    logger.error(f"❌ Error en reintento de login: {e}")
+                    if intentos_login >= max_intentos_login:
+                        logger.error("❌ Máximo de reintentos de login alcanzado")
+                        break
+
+                # Continuar con el siguiente intento
+                continue
+
+            # Verificar si llegamos a la página final de beneficios
+            if self.host_beneficios in url_actual:
+                logger.info(f"✅ ¡Primera redirección detectada en intento {intento}!")
+                logger.info(f"   🎯 Página intermedia alcanzada: {url_actual}")
+
+                # Esperar más tiempo para que se complete la segunda redirección
+                logger.info("⏳ Esperando segunda redirección a MisPolizasPVR.aspx...")
+
+                # Variable para rastrear cambios de URL en la segunda redirección
+                url_anterior2 = driver.current_url
+                logger.info(f"      📍 URL inicial segunda redirección: {url_anterior2}")
+
+                for intento2 in range(1, 21):  # Esperar 60 segundos más
+                    esperar(3)
+                    url_actual2 = driver.current_url
+                    titulo_actual2 = driver.title
+
+                    # Verificar si la URL cambió en la segunda redirección
+                    if url_actual2 != url_anterior2:
+                        logger.info(f"      🔄 CAMBIO DE URL en segunda redirección - intento 2.{intento2}/20")
+                        logger.info(f"         📍 URL anterior: {url_anterior2}")
+                        logger.info(f"         📍 URL actual: {url_actual2}")
+                        logger.info(f"         📄 Título: {titulo_actual2}")
+                        url_anterior2 = url_actual2
+                    else:
+                        logger.info(f"      ⏳ Intento 2.{intento2}/20 - URL: {url_actual2[:80]}...")
+                        logger.info(f"         📄 Título: {titulo_actual2}")
+
+                    # Verificar si llegamos a la página final
+                    if "MisPolizasPVR.aspx" in url_actual2:
+                        logger.info(f"🎯 ¡Redirección OAuth2 COMPLETAMENTE terminada en intento 2.{intento2}!")
+                        logger.info(f"   🎯 Página final alcanzada: {url_actual2}")
+                        break
+
+                break
+
+            # Verificar si estamos en la página de autorización.ping (estado intermedio)
+            if "authorization.ping" in url_actual:
+                logger.info(f"🔄 ESTADO INTERMEDIO OAUTH2 DETECTADO en intento {intento}")
+                logger.info(f"   📍 Página de autorización.ping: {url_actual}")
+                logger.info(f"   📄 Título de la página: {titulo_actual}")
+                logger.info("   ⏳ Esperando continuación del flujo OAuth2...")
+                logger.info("   🔍 Buscando elementos para continuar el flujo...")
+
+                # Verificar si hay algún botón o enlace para continuar
+                try:
+                    # Buscar botones o enlaces que puedan continuar el flujo
+                    botones_continuar = driver.find_elements(By.CSS_SELECTOR, 
+                        'button, input[type="submit"], a, [role="button"], .btn, .button')
+
+                    if botones_continuar:
+                        logger.info(f"🔍 Encontrados {len(botones_continuar)} elementos clickeables")
+                        for i, boton in enumerate(botones_continuar[:3]):  # Mostrar solo los primeros 3
+                            texto = boton.text.strip() or boton.get_attribute('value') or 'sin-texto'
+                            logger.info(f"   {i+1}. {boton.tag_name} - Texto: '{texto}'")
+
+                        # Intentar hacer clic en el primer botón visible
+                        for boton in botones_continuar:
+                            try:
+                                if boton.is_displayed() and boton.is_enabled():
+                                    logger.info(f"🎯 Intentando hacer clic en botón: {boton.tag_name} - '{boton.text.strip()}'")
+                                    boton.click()
+                                    logger.info("✅ Clic ejecutado, esperando redirección...")
+                                    esperar(3)  # Esperar a que se procese
+                                    break
+                            except Exception as e:
+                                logger.info(f"⚠️ No se pudo hacer clic en botón: {e}")
+                                continue
+                    else:
+                        logger.info("ℹ️ No se encontraron elementos clickeables en la página de autorización.ping")
+
+                except Exception as e:
+                    logger.info(f"ℹ️ Error buscando elementos clickeables: {e}")
+
+                # Continuar esperando, no salir del bucle
+
+            # Verificar si hay algún error
+            try:
+                errores = driver.find_elements(By.CSS_SELECTOR, '.error, .alert, .message, [class*="error"], [class*="alert"]')
+                if errores:
+                    for error in errores[:2]:
+                        texto = error.text.strip()
+                        if texto:
+                            logger.warning(f"⚠️ Error detectado: {texto}")
+
+                            # Si hay error de autenticación, considerar reintento
+                            if any(palabra in texto.lower() for palabra in ['invalid', 'incorrect', 'failed', 'error', 'incorrecto', 'invalido', 'fallido']):
+                                logger.warning("⚠️ Error de autenticación detectado - considerando reintento")
+            except:
+                pass
+
+        # Verificar URL final
+        url_final = driver.current_url
+        titulo_final = driver.title
+
+        logger.info(f"✅ REDIRECCIÓN OAUTH2 COMPLETADA!")
+        logger.info(f"   📍 URL final: {url_final}")
+        logger.info(f"   📄 Título final: {titulo_final}")
+        logger.info(f"📊 Resumen de reintentos de login: {intentos_login}/{max_intentos_login}")
+
+        # Verificar si llegamos a la página correcta
+        if self.host_beneficios in url_final:
+            logger.info("🎯 ¡Página de beneficios alcanzada correctamente!")
+
+            # Verificar si estamos en la página principal en lugar de la de búsqueda
+            if "MisPolizasPVR.aspx" not in url_final:
+                logger.info("⚠️ DETECTADA PÁGINA PRINCIPAL - redirigiendo a página de búsqueda...")
+                logger.info(f"   📍 URL actual (página principal): {url_final}")
+                logger.info(f"   📄 Título de página principal: {titulo_final}")
+
+                # Esperar un poco más para que se complete cualquier redirección pendiente
+                esperar(3)
+
+                # Verificar si ya se redirigió automáticamente
+                url_actualizada = driver.current_url
+                if "MisPolizasPVR.aspx" in url_actualizada:
+                    logger.info("✅ Redirección automática completada")
+                else:
+                    logger.info("🔄 Forzando navegación a página de búsqueda...")
+
+                    # Intentar navegar a la página específica de búsqueda
+                    try:
+                        url_busqueda = self.url_busqueda
+                        logger.info(f"🌐 NAVEGACIÓN MANUAL A PÁGINA DE BÚSQUEDA")
+                        logger.info(f"   📍 URL objetivo: {url_busqueda}")
+                        logger.info(f"   📍 URL antes de navegación: {driver.current_url}")
+
+                        driver.get(url_busqueda)
+                        esperar(5)  # Esperar a que cargue
+
+                        # Verificar que la navegación fue exitosa
+                        url_despues_navegacion = driver.current_url
+                        titulo_despues_navegacion = driver.title
+
+                        logger.info(f"   📍 URL después de navegación: {url_despues_navegacion}")
+                        logger.info(f"   📄 Título después de navegación: {titulo_despues_navegacion}")
+
+                        if "MisPolizasPVR.aspx" in url_despues_navegacion:
+                            logger.info("✅ PÁGINA DE BÚSQUEDA ALCANZADA EXITOSAMENTE")
+                            logger.info(f"   📍 URL final: {url_despues_navegacion}")
+                            logger.info(f"   📄 Título: {titulo_despues_navegacion}")
+                        else:
+                            logger.warning("⚠️ NAVEGACIÓN NO COMPLETADA - intentando alternativas...")
+                            logger.info(f"   📍 URL actual (no es la esperada): {url_despues_navegacion}")
+
+                            # Intentar con URL alternativa o buscar enlaces en la página principal
+                            try:
+                                logger.info("🔍 ESTRATEGIA ALTERNATIVA: Buscando enlaces en la página actual...")
+                                logger.info(f"   📍 URL actual antes de buscar enlaces: {driver.current_url}")
+
+                                # Buscar enlaces que puedan llevar a la página de búsqueda
+                                enlaces_busqueda = driver.find_elements(By.CSS_SELECTOR, 
+                                    'a[href*="MisPolizas"], a[href*="InfoAsegurado"]')
+
+                                if enlaces_busqueda:
+                                    logger.info(f"🔍 Encontrados {len(enlaces_busqueda)} enlaces potenciales")
+                                    for i, enlace in enumerate(enlaces_busqueda[:3]):
+                                        texto = enlace.text.strip()
+                                        href = enlace.get_attribute('href')
+                                        logger.info(f"   {i+1}. '{texto}' -> {href}")
+
+                                    # Intentar hacer clic en el primer enlace relevante
+                                    for enlace in enlaces_busqueda:
+                                        try:
+                                            if enlace.is_displayed() and enlace.is_enabled():
+                                                logger.info(f"🎯 Intentando clic en enlace: '{enlace.text.strip()}'")
+                                                logger.info(f"   📍 URL antes del clic: {driver.current_url}")
+
+                                                enlace.click()
+                                                esperar(5)
+
+                                                url_despues_clic = driver.current_url
+                                                logger.info(f"   📍 URL después del clic: {url_despues_clic}")
+
+                                                if "MisPolizasPVR.aspx" in url_despues_clic:
+                                                    logger.info("✅ NAVEGACIÓN POR ENLACE EXITOSA")
+                                                    logger.info(f"   📍 URL final: {url_despues_clic}")
+                                                    break
+                                                else:
+                                                    logger.info(f"⚠️ Clic ejecutado pero no llegó a la página esperada")
+                                        except Exception as e:
+                                            logger.info(f"⚠️ No se pudo hacer clic en enlace: {e}")
+                                            continue
+
+                                # Si no hay enlaces o no funcionaron, intentar navegación directa
+                                if "MisPolizasPVR.aspx" not in driver.current_url:
+                                    logger.info("🔄 ÚLTIMO INTENTO: Navegación directa...")
+                                    logger.info(f"   📍 URL actual antes de navegación directa: {driver.current_url}")
+
+                                    driver.get(url_busqueda)
+                                    esperar(5)
+
+                                    url_despues_directa = driver.current_url
+                                    logger.info(f"   📍 URL después de navegación directa: {url_despues_directa}")
+
+                                    if "MisPolizasPVR.aspx" in url_despues_directa:
+                                        logger.info("✅ NAVEGACIÓN DIRECTA EXITOSA")
+                                        logger.info(f"   📍 URL final: {url_despues_directa}")
+                                    else:
+                                        logger.error("❌ NO SE PUDO ALCANZAR LA PÁGINA DE BÚSQUEDA")
+                                        logger.error(f"   📍 URL final (no es la esperada): {url_despues_directa}")
+
+                            except Exception as e:
+                                logger.error(f"❌ Error en navegación alternativa: {e}")
+
+                    except Exception as e:
+                        logger.error(f"❌ Error en navegación manual: {e}")
+            else:
+                logger.info("✅ Ya estamos en la página de búsqueda correcta")
+
+        else:
+            logger.warning("⚠️ No se llegó a la página de beneficios esperada")
+            logger.info("🔄 Intentando navegación manual completa...")
+
+            # Intentar navegar manualmente si no llegamos automáticamente
+            try:
+                url_beneficios = self.url_busqueda
+                logger.info(f"🌐 NAVEGACIÓN MANUAL COMPLETA")
+                logger.info(f"   📍 URL objetivo: {url_beneficios}")
+                logger.info(f"   📍 URL actual antes de navegación manual: {driver.current_url}")
+
+                driver.get(url_beneficios)
+                esperar(5)  # Esperar a que cargue
+
+                url_actual_manual = driver.current_url
+                titulo_actual_manual = driver.title
+                logger.info(f"✅ NAVEGACIÓN MANUAL COMPLETADA")
+                logger.info(f"   📍 URL después de navegación manual: {url_actual_manual}")
+                logger.info(f"   📄 Título después de navegación manual: {titulo_actual_manual}")
+
+                if "MisPolizasPVR.aspx" in url_actual_manual:
+                    logger.info("🎯 ¡PÁGINA DE BENEFICIOS ALCANZADA MANUALMENTE!")
+                    logger.info(f"   📍 URL final: {url_actual_manual}")
+                else:
+                    logger.warning("⚠️ NO SE PUDO ALCANZAR LA PÁGINA DE BENEFICIOS")
+                    logger.warning(f"   📍 URL final (no es la esperada): {url_actual_manual}")
+
+            except Exception as e:
+                logger.error(f"❌ Error en navegación manual: {e}")
+
+    def navegar_busqueda(self, url_info):
+        """Verifica que estamos en MisPolizasPVR.aspx y, si no, navega hasta ella"""
+        driver = self.procesador.driver
+        try:
+            # Verificar si ya estamos en la página correcta
+            url_actual = driver.current_url
+            titulo_actual = driver.title
+
+            logger.info(f"📍 VERIFICACIÓN POST-LOGIN:")
+            logger.info(f"   📍 URL actual: {url_actual}")
+            logger.info(f"   📄 Título actual: {titulo_actual}")
+
+            if "MisPolizasPVR.aspx" in url_actual:
+                logger.info("✅ YA ESTAMOS EN LA PÁGINA DE BÚSQUEDA CORRECTA")
+                logger.info(f"   📍 URL confirmada: {url_actual}")
+            elif self.host_beneficios in url_actual:
+                logger.info("⚠️ DETECTADA PÁGINA PRINCIPAL DE BENEFICIOS - redirigiendo a búsqueda...")
+                logger.info(f"   📍 URL de página principal: {url_actual}")
+                logger.info(f"   📄 Título de página principal: {titulo_actual}")
+
+                # Intentar múltiples estrategias para llegar a la página de búsqueda
+                estrategias_exitosas = False
+
+                # Estrategia 1: Navegación directa
+                try:
+                    url_busqueda = self.url_busqueda
+                    logger.info(f"🔄 ESTRATEGIA 1: Navegación directa")
+                    logger.info(f"   📍 URL objetivo: {url_busqueda}")
+                    logger.info(f"   📍 URL actual antes de estrategia 1: {driver.current_url}")
+
+                    driver.get(url_busqueda)
+                    esperar(5)
+
+                    url_despues_estrategia1 = driver.current_url
+                    logger.info(f"   📍 URL después de estrategia 1: {url_despues_estrategia1}")
+
+                    if "MisPolizasPVR.aspx" in url_despues_estrategia1:
+                        logger.info("✅ ESTRATEGIA 1 EXITOSA - Página de búsqueda alcanzada")
+                        logger.info(f"   📍 URL final: {url_despues_estrategia1}")
+                        estrategias_exitosas = True
+                    else:
+                        logger.warning("⚠️ ESTRATEGIA 1 FALLÓ")
+                        logger.warning(f"   📍 URL final (no es la esperada): {url_despues_estrategia1}")
+                except Exception as e:
+                    logger.warning(f"⚠️ Error en estrategia 1: {e}")
+
+                # Estrategia 2: Buscar enlaces en la página principal
+                if not estrategias_exitosas:
+                    try:
+                        logger.info("🔄 ESTRATEGIA 2: Buscando enlaces en la página principal...")
+                        logger.info(f"   📍 URL actual antes de estrategia 2: {driver.current_url}")
+
+                        # Buscar enlaces que puedan llevar a la página de búsqueda
+                        enlaces_potenciales = driver.find_elements(By.CSS_SELECTOR, 
+                            'a[href*="MisPolizas"], a[href*="InfoAsegurado"], a[href*="Contenido"], a[href*="Inicio"]')
+
+                        if enlaces_potenciales:
+                            logger.info(f"🔍 Encontrados {len(enlaces_potenciales)} enlaces potenciales")
+
+                            for i, enlace in enumerate(enlaces_potenciales[:5]):
+                                texto = enlace.text.strip()
+                                href = enlace.get_attribute('href')
+                                logger.info(f"   {i+1}. '{texto}' -> {href}")
+
+                            # Intentar hacer clic en enlaces relevantes
+                            for enlace in enlaces_potenciales:
+                                try:
+                                    if enlace.is_displayed() and enlace.is_enabled():
+                                        texto_enlace = enlace.text.strip().lower()
+                                        href_enlace = enlace.get_attribute('href')
+
+                                        # Verificar si el enlace parece relevante
+                                        if any(palabra in texto_enlace for palabra in ['póliza', 'poliza', 'asegurado', 'beneficios', 'información']):
+                                            logger.info(f"🎯 Intentando clic en enlace relevante: '{enlace.text.strip()}'")
+                                            logger.info(f"   📍 URL antes del clic: {driver.current_url}")
+
+                                            enlace.click()
+                                            esperar(5)
+
+                                            url_despues_clic = driver.current_url
+                                            logger.info(f"   📍 URL después del clic: {url_despues_clic}")
+
+                                            if "MisPolizasPVR.aspx" in url_despues_clic:
+                                                logger.info("✅ ESTRATEGIA 2 EXITOSA - Navegación por enlace")
+                                                logger.info(f"   📍 URL final: {url_despues_clic}")
+                                                estrategias_exitosas = True
+                                                break
+                                            else:
+                                                logger.info("⚠️ Enlace no llevó a la página correcta, continuando...")
+                                                logger.info(f"   📍 URL actual (no es la esperada): {url_despues_clic}")
+                                    else:
+                                        logger.info(f"ℹ️ Enlace no disponible: '{enlace.text.strip()}'")
+                                except Exception as e:
+                                    logger.info(f"⚠️ Error haciendo clic en enlace: {e}")
+                                    continue
+                        else:
+                            logger.info("ℹ️ No se encontraron enlaces potenciales")
+                    except Exception as e:
+                        logger.warning(f"⚠️ Error en estrategia 2: {e}")
+
+                # Estrategia 3: Último intento con navegación forzada
+                if not estrategias_exitosas:
+                    try:
+                        logger.info("🔄 ESTRATEGIA 3: Último intento con navegación forzada...")
+                        logger.info(f"   📍 URL actual antes de estrategia 3: {driver.current_url}")
+
+                        # Intentar con diferentes variaciones de la URL
+                        urls_alternativas = [
+                            self.url_busqueda,
+                            self.url_busqueda.rsplit('/', 1)[0] + '/',
+                            self.url_busqueda.rsplit('/', 2)[0] + '/'
+                        ]
+
+                        for i, url_alt in enumerate(urls_alternativas, 1):
+                            try:
+                                logger.info(f"   🔄 Probando URL alternativa {i}/3: {url_alt}")
+                                logger.info(f"      📍 URL antes de probar alternativa {i}: {driver.current_url}")
+
+                                driver.get(url_alt)
+                                esperar(5)
+
+                                url_despues_alternativa = driver.current_url
+                                logger.info(f"      📍 URL después de alternativa {i}: {url_despues_alternativa}")
+
+                                if "MisPolizasPVR.aspx" in url_despues_alternativa:
+                                    logger.info(f"✅ ESTRATEGIA 3 EXITOSA con URL alternativa {i}: {url_alt}")
+                                    logger.info(f"   📍 URL final: {url_despues_alternativa}")
+                                    estrategias_exitosas = True
+                                    break
+                                else:
+                                    logger.info(f"   ⚠️ URL alternativa {i} no llevó a la página esperada")
+                            except Exception as e:
+                                logger.warning(f"⚠️ Error con URL alternativa {i} ({url_alt}): {e}")
+                                continue
+                    except Exception as e:
+                        logger.warning(f"⚠️ Error en estrategia 3: {e}")
+
+                # Verificar resultado final
+                if estrategias_exitosas:
+                    url_final = driver.current_url
+                    titulo_final = driver.title
+                    logger.info("🎯 ¡PÁGINA DE BÚSQUEDA ALCANZADA EXITOSAMENTE!")
+                    logger.info(f"   📍 URL final: {url_final}")
+                    logger.info(f"   📄 Título final: {titulo_final}")
+                else:
+                    url_final_fallida = driver.current_url
+                    titulo_final_fallida = driver.title
+                    logger.error("❌ NO SE PUDO ALCANZAR LA PÁGINA DE BÚSQUEDA CON NINGUNA ESTRATEGIA")
+                    logger.error(f"   📍 URL final (fallida): {url_final_fallida}")
+                    logger.error(f"   📄 Título final (fallido): {titulo_final_fallida}")
+                    logger.info("🔄 Continuando con la página actual...")
+
+        except PlazoAgotado:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Error en navegación a página de búsqueda: {e}")
+            logger.info("🔄 Continuando con la página actual...")
+
+    def buscar(self, id_url, datos_mensaje=None):
+        """Captura específica para PAN AMERICAN LIFE DE ECUADOR usando campos_captura"""
+        driver = self.procesador.driver
+        medicion = None
+        try:
+            logger.info("🇪🇨 Captura específica para PAN AMERICAN LIFE DE ECUADOR")
+            logger.info("=" * 60)
+
+            # Obtener configuración de campos a capturar
+            campos_query = """
+                SELECT NombreCampo, TipoCampo, SelectorCSS, Orden, Obligatorio, BotonEnvio
+                FROM informacion_capturada 
+                WHERE IdUrl = :id_url AND Activo = 1
+                ORDER BY Orden
+            """
+
+            campos_captura = self.procesador.db_manager.execute_query(campos_query, {'id_url': id_url})
+
+            if not campos_captura:
+                logger.info("ℹ️ No hay campos configurados para capturar")
+                return True
+
+            logger.info(f"🎯 Campos a capturar: {len(campos_captura)}")
+            for campo in campos_captura:
+                logger.info(f"   • {campo['NombreCampo']}: {campo['SelectorCSS']} (Botón: {campo.get('BotonEnvio', 'default')})")
+
+            # Obtener NumDocIdentidad del mensaje
+            num_doc_identidad = datos_mensaje.get('NumDocIdentidad') if datos_mensaje else None
+            if not num_doc_identidad:
+                logger.warning("⚠️ No se encontró NumDocIdentidad en el mensaje")
+                logger.info(f"📋 Datos del mensaje disponibles: {list(datos_mensaje.keys()) if datos_mensaje else 'None'}")
+                return False
+
+            # 🆔 CONSTRUIR NOMBRE COMPLETO DEL CLIENTE
+            nombre_completo = self.procesador._construir_nombre_completo(datos_mensaje)
+            if nombre_completo:
+                logger.info(f"👤 Nombre completo del cliente: {nombre_completo}")
+            else:
+                logger.warning("⚠️ No se pudo construir el nombre completo del cliente")
+
+            logger.info(f"🆔 Número de documento a buscar: {num_doc_identidad}")
+            logger.info(f"🌐 URL actual: {driver.current_url}")
+            logger.info("=" * 60)
+
+            # Llenado del formulario y envío de la búsqueda
+            medicion = metricas.iniciar('busqueda')
+
+            # Procesar cada campo
+            for campo in campos_captura:
+                nombre_campo = campo['NombreCampo']
+                tipo_campo = campo['TipoCampo']
+                selector_css = campo['SelectorCSS']
+                orden = campo['Orden']
+                obligatorio = campo['Obligatorio']
+                boton_envio = campo.get('BotonEnvio', 'button[type="submit"]')
+
+                try:
+                    logger.info(f"🔍 Procesando campo: {nombre_campo} ({tipo_campo})")
+                    logger.info(f"   📍 Selector CSS: {selector_css}")
+                    logger.info(f"   🎯 Botón de envío: {boton_envio}")
+
+                    if tipo_campo.lower() == 'input':
+                        # Buscar el campo de entrada
+                        logger.info(f"🔍 Buscando elemento con selector: {selector_css}")
+                        elemento = self.procesador._buscar_elemento_con_reintento(selector_css, f"Campo {selector_css}")
+
+                        # Mostrar información del elemento encontrado
+                        logger.info(f"✅ Elemento encontrado: {elemento.tag_name}")
+                        logger.info(f"   📝 Atributos: id='{elemento.get_attribute('id')}', name='{elemento.get_attribute('name')}', class='{elemento.get_attribute('class')}'")
+
+                        # Limpiar y llenar con NumDocIdentidad
+                        elemento.clear()
+                        elemento.send_keys(num_doc_identidad)
+                        logger.info(f"✅ Campo {nombre_campo} llenado con: {num_doc_identidad}")
+
+                        # Verificar que se llenó correctamente
+                        valor_actual = elemento.get_attribute('value')
+                        logger.info(f"✅ Valor actual del campo: '{valor_actual}'")
+
+                        # Hacer clic en el botón de envío
+                        logger.info(f"🎯 Buscando botón de envío con selector: {boton_envio}")
+                        logger.info(f"   📍 URL actual antes de buscar botón: {driver.current_url}")
+
+                        try:
+                            # El botón configurado y los alternativos se sondean juntos; los alternativos
+                            # solo valen con la página cargada y sin el configurado
+                            boton = registro_aseguradoras.resolutor(self).resolver(
+                                driver, 'boton_busqueda', [boton_envio], timeout=10,
+                                alternativos=SELECTORES_BOTON_BUSQUEDA)
+                            logger.info(f"✅ Botón encontrado: {boton.tag_name} - Texto: '{boton.text}'")
+                            logger.info(f"   📍 URL antes del clic en botón: {driver.current_url}")
+
+                            boton.click()
+                            logger.info(f"🎯 Botón de envío clickeado exitosamente")
+
+                            # Esperar a que se procese la búsqueda
+                            logger.info("⏳ Esperando procesamiento de la búsqueda...")
+                            esperar(5)  # Aumentar tiempo de espera
+
+                            # Verificar que la página se haya actualizado
+                            logger.info("🔍 Verificando que la búsqueda se haya procesado...")
+                            logger.info(f"   📍 URL después del clic en botón: {driver.current_url}")
+
+                            try:
+                                # Esperar a que aparezca algún elemento que indique que la búsqueda se procesó
+                                WebDriverWait(driver, acotar(15)).until(
+                                    lambda driver: driver.execute_script("return document.readyState") == "complete"
+                                )
+                                logger.info("✅ Página completamente cargada después de la búsqueda")
+                                logger.info(f"   📍 URL final después de búsqueda: {driver.current_url}")
+                            except:
+                                logger.info("ℹ️ Página cargada (timeout de readyState)")
+                                logger.info(f"   📍 URL actual (timeout): {driver.current_url}")
+
+                        except PlazoAgotado:
+                            raise
+                        except Exception as e:
+                            logger.warning(f"⚠️ No se pudo hacer clic en el botón de búsqueda: {e}")
+                            if isinstance(e, TimeoutException) and not self.procesador._verificar_respuesta_portal():
+                                self.procesador._senalar_congestion('timeout')
+
+                        medicion.terminar()
+
+                        # Capturar la tabla de resultados
+                        logger.info("📊 Iniciando captura de tabla de resultados...")
+                        return self.extraer(nombre_completo, datos_mensaje)
+
+                    else:
+                        logger.info(f"ℹ️ Campo {nombre_campo} no es de tipo input, saltando...")
+
+                except TimeoutException:
+                    if obligatorio:
+                        logger.error(f"❌ Campo obligatorio {nombre_campo} no encontrado: {selector_css}")
+                        logger.info(f"🔍 Elementos disponibles en la página:")
+                        try:
+                            elementos_input = driver.find_elements(By.CSS_SELECTOR, 'input')
+                            logger.info(f"   📝 Inputs encontrados: {len(elementos_input)}")
+                            for i, elem in enumerate(elementos_input[:5]):  # Mostrar solo los primeros 5
+                                logger.info(f"      {i+1}. id='{elem.get_attribute('id')}', name='{elem.get_attribute('name')}', placeholder='{elem.get_attribute('placeholder')}'")
+                        except:
+                            pass
+                        return False
+                    else:
+                        logger.warning(f"⚠️ Campo opcional {nombre_campo} no encontrado: {selector_css}")
+                except Exception as e:
+                    logger.error(f"❌ Error procesando campo {nombre_campo}: {e}")
+                    if obligatorio:
+                        return False
+
+            return True
+
+        except PlazoAgotado:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error en captura específica PALE_EC: {e}")
+            return False
+        finally:
+            if medicion:
+                medicion.terminar('error')
+
+    def extraer(self, nombre_completo, datos_mensaje=None):
+        return self.procesador._capturar_tabla_resultados(nombre_completo, datos_mensaje)
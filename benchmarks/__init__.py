@@ -0,0 +1,10 @@
+"""
+Herramientas de benchmark sin conexión para el worker de producción.
+
+- ``portal_palig``: portal local que imita el flujo OAuth2 y la búsqueda de
+  pólizas de PAN AMERICAN LIFE DE ECUADOR.
+- ``throughput``: benchmark de extremo a extremo del worker con reporte
+  p50/p95/p99 por etapa comparable entre commits.
+- ``micro_tabla``: microbenchmarks de extracción de la tabla de resultados y
+  de la búsqueda del cliente.
+"""
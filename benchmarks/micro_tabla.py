@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Microbenchmarks del bucle interno de cada búsqueda de cliente.
+
+Mide, sobre tablas ``GridViewStylePV`` sintéticas (nombres con tildes y
+espacios sobrantes, el cliente buscado en la última fila):
+
+- extracción de la tabla con cada estrategia de ``src.tabla_resultados``
+  (``lxml`` siempre; ``webdriver`` y ``js`` solo si se puede abrir un navegador),
+- ``_construir_nombre_completo`` y ``_es_cliente_buscado`` del worker, frente a
+  ``buscar_fila_por_nombre`` (nombre buscado normalizado una sola vez).
+
+    python -m benchmarks.micro_tabla --filas 10,100,1000,10000 --repeticiones 5
+    python -m benchmarks.micro_tabla --sin-navegador --salida micro.json
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import argparse
+import tempfile
+import statistics
+from typing import Callable, Dict, List
+
+from src.tabla_resultados import ESTRATEGIAS, SELECTOR_TABLA, buscar_fila_por_nombre, extraer_tabla, extraer_tabla_html
+
+logger = logging.getLogger(__name__)
+
+ENCABEZADOS = ['Póliza', 'Certificado', 'No. Dependiente', 'Nombre del Paciente', 'Relacion', 'Tipo de Póliza', 'Status']
+
+_NOMBRES = ['MARÍA', 'JOSÉ', 'ÁNGEL', 'INÉS', 'RAÚL', 'ÑUSTA', 'SOFÍA', 'JOAQUÍN', 'BELÉN', 'TOMÁS']
+_APELLIDOS = ['PÉREZ', 'LÓPEZ', 'NÚÑEZ', 'GÓMEZ', 'MUÑOZ', 'ÁLVAREZ', 'SÁNCHEZ', 'RODRÍGUEZ', 'YÁNEZ', 'CHÁVEZ']
+
+CLIENTE_BUSCADO = {
+    'PersonaPrimerNombre': 'maría ',
+    'PersonaSegundoNombre': ' josé',
+    'PersonaPrimerApellido': 'NÚÑEZ',
+    'PersonaSegundoApellido': 'de la  TORRE '
+}
+NOMBRE_EN_TABLA = '  MARÍA   JOSÉ\n NÚÑEZ DE LA TORRE '
+
+
+def generar_html_tabla(filas: int, semilla: int = 0) -> str:
+    """Página con una tabla GridViewStylePV de ``filas`` filas; el cliente buscado va al final"""
+    rng = random.Random(semilla)
+    cabecera = ''.join(f'<th scope="col">{encabezado}</th>' for encabezado in ENCABEZADOS)
+    cuerpo = []
+    for numero in range(filas):
+        if numero == filas - 1:
+            nombre = NOMBRE_EN_TABLA
+        else:
+            # Espacios y saltos de línea sobrantes como los que deja ASP.NET
+            nombre = '  '.join([rng.choice(_NOMBRES), rng.choice(_NOMBRES)]) + ' \n ' + ' '.join(
+                [rng.choice(_APELLIDOS), rng.choice(_APELLIDOS)])
+        valores = [str(rng.randint(100000, 999999)), str(rng.randint(1000, 9999)), str(numero), nombre,
+                   rng.choice(['Titular', 'Cónyuge', 'Hijo(a)']), 'Salud Colectivo',
+                   'Activo' if numero == filas - 1 or rng.random() < 0.8 else 'Inactivo']
+        cuerpo.append('<tr>' + ''.join(f'<td>\n  {valor}  \n</td>' for valor in valores) + '</tr>')
+    return (f'<!DOCTYPE html><html><head><meta charset="utf-8"><title>Mis Pólizas</title></head><body>'
+            f'<table class="GridViewStylePV" cellspacing="0"><tr>{cabecera}</tr>{"".join(cuerpo)}</table>'
+            f'</body></html>')
+
+
+def cronometrar(funcion: Callable, repeticiones: int) -> Dict[str, float]:
+    """Ejecuta ``funcion`` varias veces y retorna mínimo, mediana y máximo (segundos)"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return {
+        'minimo': round(min(tiempos), 6),
+        'mediana': round(statistics.median(tiempos), 6),
+        'maximo': round(max(tiempos), 6)
+    }
+
+
+def _procesador_sin_conexiones():
+    """AseguradoraProcessor sin __init__ (sin BD ni navegador) para medir sus métodos puros"""
+    from benchmarks.throughput import _preparar_entorno
+    _preparar_entorno()
+    from run_production_worker import AseguradoraProcessor
+    return AseguradoraProcessor.__new__(AseguradoraProcessor)
+
+
+def _abrir_navegador():
+    try:
+        from src.browser_factory import fabrica_navegadores, config_desde_entorno
+        return fabrica_navegadores.crear_driver(config_desde_entorno())
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudo abrir el navegador, se omiten las estrategias webdriver/js: {e}")
+        return None
+
+
+def medir_extraccion(filas: int, repeticiones: int, driver=None) -> Dict[str, Dict[str, float]]:
+    """Tiempo de extracción completa de la tabla por estrategia"""
+    html = generar_html_tabla(filas)
+    resultados = {'lxml_html': cronometrar(lambda: extraer_tabla_html(html), repeticiones)}
+
+    if driver is None:
+        return resultados
+
+    with tempfile.NamedTemporaryFile('w', suffix='.html', delete=False, encoding='utf-8') as archivo:
+        archivo.write(html)
+        ruta = archivo.name
+    try:
+        driver.get(f"file://{ruta}")
+        for estrategia in ESTRATEGIAS:
+            # list() fuerza la lectura completa también en la estrategia webdriver (generador)
+            resultados[estrategia] = cronometrar(
+                lambda: list(extraer_tabla(driver, estrategia, SELECTOR_TABLA).filas),
+                1 if estrategia == 'webdriver' and filas > 1000 else repeticiones
+            )
+    finally:
+        os.unlink(ruta)
+    return resultados
+
+
+def medir_coincidencia(filas: int, repeticiones: int, procesador=None) -> Dict[str, Dict[str, float]]:
+    """Tiempo de búsqueda del cliente sobre las filas ya extraídas"""
+    tabla = extraer_tabla_html(generar_html_tabla(filas))
+    datos = tabla.filas
+    resultados = {
+        'buscar_fila_por_nombre': cronometrar(
+            lambda: buscar_fila_por_nombre(datos, ' '.join(CLIENTE_BUSCADO.values())), repeticiones
+        )
+    }
+
+    if procesador is not None:
+        def recorrido_worker():
+            nombre = procesador._construir_nombre_completo(CLIENTE_BUSCADO)
+            for fila in datos:
+                if procesador._es_cliente_buscado(fila, nombre):
+                    return fila
+            return None
+
+        resultados['_es_cliente_buscado'] = cronometrar(recorrido_worker, repeticiones)
+        resultados['_construir_nombre_completo'] = cronometrar(
+            lambda: procesador._construir_nombre_completo(CLIENTE_BUSCADO), repeticiones
+        )
+    return resultados
+
+
+def _lista_enteros(valor: str) -> List[int]:
+    return [int(item) for item in valor.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmarks de extracción de tabla y búsqueda de cliente")
+    parser.add_argument('--filas', type=_lista_enteros, default=[10, 100, 1000, 10000])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--sin-navegador', action='store_true', help="Medir solo las estrategias sin navegador")
+    parser.add_argument('--con-logs', action='store_true', help="Mantener los logs INFO del worker en la medición")
+    parser.add_argument('--salida', default=None, help="Reporte JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    try:
+        procesador = _procesador_sin_conexiones()
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudo importar el worker, se omiten sus métodos: {e}")
+        procesador = None
+    if not args.con_logs:
+        logging.getLogger('run_production_worker').setLevel(logging.WARNING)
+
+    driver = None if args.sin_navegador else _abrir_navegador()
+
+    reporte = {'repeticiones': args.repeticiones, 'resultados': []}
+    try:
+        for filas in args.filas:
+            extraccion = medir_extraccion(filas, args.repeticiones, driver)
+            coincidencia = medir_coincidencia(filas, args.repeticiones, procesador)
+            reporte['resultados'].append({'filas': filas, 'extraccion': extraccion, 'coincidencia': coincidencia})
+
+            logger.info(f"📊 {filas} filas")
+            for grupo, mediciones in (('extracción', extraccion), ('coincidencia', coincidencia)):
+                for nombre, tiempos in mediciones.items():
+                    logger.info(f"   {grupo:<12} {nombre:<28} mediana {tiempos['mediana'] * 1000:10.3f} ms")
+    finally:
+        if driver:
+            driver.quit()
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as archivo:
+            json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+        logger.info(f"📄 Reporte JSON: {args.salida}")
+
+
+if __name__ == "__main__":
+    main()
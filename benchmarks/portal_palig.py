@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+Portal local que imita a attest.palig.com / benefitsdirect.palig.com.
+
+Reproduce el flujo que recorre el worker para PAN AMERICAN LIFE DE ECUADOR:
+
+1. ``/as/authorization.oauth2``: formulario de login (``#username``,
+   ``#password`` y el enlace ``a[title="Inicio de sesión"]``).
+2. ``/as/authorization.ping``: página intermedia que espera unos segundos antes
+   de redirigir y que, con cierta probabilidad, se queda atascada hasta que se
+   recarga (como ocurre con el portal real).
+3. ``/Inicio/Login.aspx``: crea la sesión ASP.NET y redirige a la búsqueda.
+4. ``/Inicio/Contenido/InfoAsegurado/MisPolizasPVR.aspx``: formulario de
+   búsqueda por identificación y tabla ``table.GridViewStylePV`` de tamaño
+   configurable.
+
+El login y el portal de beneficios se sirven en puertos distintos (y con
+nombres de host distintos, ``localhost`` y ``127.0.0.1``) para que el worker
+distinga ambos dominios igual que en producción. La latencia y la tasa de
+fallos se pueden inyectar para medir el rendimiento de extremo a extremo sin
+depender de los servidores reales.
+
+Uso:
+    python -m benchmarks.portal_palig --filas 200 --latencia-ms 150 --asegurado "0102158896:MARIA JOSE PEREZ LOPEZ"
+"""
+
+import html
+import time
+import uuid
+import random
+import logging
+import argparse
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+logger = logging.getLogger(__name__)
+
+RUTA_LOGIN = '/as/authorization.oauth2'
+RUTA_PING = '/as/authorization.ping'
+RUTA_LOGIN_BENEFICIOS = '/Inicio/Login.aspx'
+RUTA_BUSQUEDA = '/Inicio/Contenido/InfoAsegurado/MisPolizasPVR.aspx'
+
+# Selectores que usa el worker (mismos ids que el portal real)
+ID_IDENTIFICACION = 'ContenidoPrincipal_CtrlBuscaAseguradoProv_txtIdentificacionAseg'
+ID_BOTON_BUSCAR = 'ContenidoPrincipal_CtrlBuscaAseguradoProv_btnBuscar'
+SELECTOR_IDENTIFICACION = f"#{ID_IDENTIFICACION}"
+SELECTOR_BOTON_BUSCAR = f"#{ID_BOTON_BUSCAR}"
+
+ENCABEZADOS = ['Póliza', 'Certificado', 'No. Dependiente', 'Nombre del Paciente', 'Relacion', 'Tipo de Póliza', 'Status']
+
+POSICIONES_CLIENTE = ('inicio', 'medio', 'final', 'aleatoria')
+
+_NOMBRES = ['MARIA', 'JOSE', 'LUIS', 'ANA', 'CARLOS', 'SOFIA', 'PEDRO', 'LUCIA', 'JORGE', 'VALERIA', 'DIEGO', 'CAMILA']
+_APELLIDOS = ['PEREZ', 'LOPEZ', 'GARCIA', 'TORRES', 'VERA', 'MORALES', 'CEVALLOS', 'ZAMBRANO', 'ANDRADE', 'SALAZAR']
+_RELACIONES = ['Titular', 'Cónyuge', 'Hijo(a)']
+
+
+class PortalPalig:
+    """Portal PALIG local con latencia, fallos y tamaño de tabla configurables.
+
+    Los asegurados que deben aparecer en los resultados se registran con
+    ``registrar_asegurado``; el resto de filas de la tabla se generan de forma
+    determinista a partir de la identificación buscada y la semilla.
+    """
+
+    def __init__(self, filas: int = 20, latencia_ms: float = 0, jitter_ms: float = 0,
+                 tasa_fallos: float = 0.0, espera_ping: float = 1.0,
+                 prob_ping_atascado: float = 0.0, prob_reintento_login: float = 0.0,
+                 posicion_cliente: str = 'final', ttl_sesion: float = 1800,
+                 usuario: str = 'benchmark@mediglobal.local', password: str = 'benchmark',
+                 puerto_auth: int = 0, puerto_beneficios: int = 0,
+                 semilla: Optional[int] = None):
+        if posicion_cliente not in POSICIONES_CLIENTE:
+            raise ValueError(f"posicion_cliente debe ser una de: {', '.join(POSICIONES_CLIENTE)}")
+
+        self.filas = max(0, filas)
+        self.latencia_ms = latencia_ms
+        self.jitter_ms = jitter_ms
+        self.tasa_fallos = tasa_fallos
+        self.espera_ping = espera_ping
+        self.prob_ping_atascado = prob_ping_atascado
+        self.prob_reintento_login = prob_reintento_login
+        self.posicion_cliente = posicion_cliente
+        self.ttl_sesion = ttl_sesion
+        self.usuario = usuario
+        self.password = password
+        self.semilla = semilla
+
+        self._puertos = {'auth': puerto_auth, 'beneficios': puerto_beneficios}
+        self._servidores = {}
+        self._hilos = []
+        self._lock = threading.Lock()
+        self._random = random.Random(semilla)
+        self._codigos = set()
+        self._sesiones: Dict[str, float] = {}
+        self.asegurados: Dict[str, Dict] = {}
+        self.contadores = Counter()
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def iniciar(self) -> 'PortalPalig':
+        """Arranca los servidores de login y de beneficios en hilos daemon"""
+        for rol in ('auth', 'beneficios'):
+            manejador = type(f"Manejador_{rol}", (_ManejadorPortal,), {'portal': self, 'rol': rol})
+            servidor = ThreadingHTTPServer(('127.0.0.1', self._puertos[rol]), manejador)
+            servidor.daemon_threads = True
+            self._servidores[rol] = servidor
+            hilo = threading.Thread(target=servidor.serve_forever, name=f"portal-palig-{rol}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+        logger.info(f"🧪 Portal PALIG local iniciado: login {self.url_login} | búsqueda {self.url_busqueda}")
+        return self
+
+    def detener(self):
+        """Detiene ambos servidores"""
+        for servidor in self._servidores.values():
+            servidor.shutdown()
+            servidor.server_close()
+        for hilo in self._hilos:
+            hilo.join(timeout=5)
+        self._servidores = {}
+        self._hilos = []
+        logger.info("🧪 Portal PALIG local detenido")
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.detener()
+
+    def _puerto(self, rol: str) -> int:
+        servidor = self._servidores.get(rol)
+        return servidor.server_address[1] if servidor else self._puertos[rol]
+
+    @property
+    def url_base_auth(self) -> str:
+        return f"http://localhost:{self._puerto('auth')}"
+
+    @property
+    def url_base_beneficios(self) -> str:
+        return f"http://127.0.0.1:{self._puerto('beneficios')}"
+
+    @property
+    def url_login(self) -> str:
+        """URL de login equivalente a la registrada en urls_automatizacion"""
+        parametros = urlencode({
+            'client_id': 'benchmark',
+            'redirect_uri': f"{self.url_base_beneficios}{RUTA_LOGIN_BENEFICIOS}",
+            'response_type': 'code id_token',
+            'scope': 'openid profile email phone'
+        })
+        return f"{self.url_base_auth}{RUTA_LOGIN}?{parametros}"
+
+    @property
+    def url_busqueda(self) -> str:
+        """Valor para PALE_EC_BUSQUEDA_URL"""
+        return f"{self.url_base_beneficios}{RUTA_BUSQUEDA}"
+
+    # ------------------------------------------------------------------
+    # Datos
+    # ------------------------------------------------------------------
+
+    def registrar_asegurado(self, num_doc: str, nombre: str, status: str = 'Activo',
+                            dependientes: Optional[List[str]] = None):
+        """Registra un asegurado (y sus dependientes) para que aparezca en la búsqueda"""
+        self.asegurados[str(num_doc)] = {
+            'nombre': nombre.upper(),
+            'status': status,
+            'dependientes': [dependiente.upper() for dependiente in (dependientes or [])]
+        }
+
+    def generar_filas(self, num_doc: str) -> List[Dict[str, str]]:
+        """Genera las filas de resultados para una identificación"""
+        rng = random.Random(f"{self.semilla}-{num_doc}")
+        poliza = str(rng.randint(100000, 999999))
+        certificado = str(rng.randint(1000, 9999))
+
+        def fila(numero, nombre, relacion, status):
+            return dict(zip(ENCABEZADOS, [poliza, certificado, str(numero), nombre, relacion, 'Salud Colectivo', status]))
+
+        asegurado = self.asegurados.get(str(num_doc))
+        propias = []
+        if asegurado:
+            propias.append(fila(0, asegurado['nombre'], 'Titular', asegurado['status']))
+            for numero, dependiente in enumerate(asegurado['dependientes'], 1):
+                propias.append(fila(numero, dependiente, _RELACIONES[1 + numero % 2], 'Activo'))
+
+        relleno = []
+        for numero in range(max(0, self.filas - len(propias))):
+            nombre = ' '.join([rng.choice(_NOMBRES), rng.choice(_NOMBRES), rng.choice(_APELLIDOS), rng.choice(_APELLIDOS)])
+            status = 'Activo' if rng.random() < 0.8 else 'Inactivo'
+            relleno.append(fila(len(propias) + numero, nombre, rng.choice(_RELACIONES), status))
+
+        if self.posicion_cliente == 'inicio':
+            indice = 0
+        elif self.posicion_cliente == 'medio':
+            indice = len(relleno) // 2
+        elif self.posicion_cliente == 'final':
+            indice = len(relleno)
+        else:
+            indice = rng.randint(0, len(relleno))
+        return relleno[:indice] + propias + relleno[indice:]
+
+    # ------------------------------------------------------------------
+    # Estado compartido entre los dos servidores
+    # ------------------------------------------------------------------
+
+    def _sortear(self, probabilidad: float) -> bool:
+        with self._lock:
+            return probabilidad > 0 and self._random.random() < probabilidad
+
+    def _emitir_codigo(self) -> str:
+        codigo = uuid.uuid4().hex
+        with self._lock:
+            self._codigos.add(codigo)
+        return codigo
+
+    def _canjear_codigo(self, codigo: str) -> Optional[str]:
+        with self._lock:
+            if codigo not in self._codigos:
+                return None
+            self._codigos.discard(codigo)
+            sesion = uuid.uuid4().hex
+            self._sesiones[sesion] = time.monotonic()
+            self.contadores['logins'] += 1
+            return sesion
+
+    def _sesion_valida(self, sesion: Optional[str]) -> bool:
+        with self._lock:
+            inicio = self._sesiones.get(sesion)
+            if inicio is None:
+                return False
+            if self.ttl_sesion and time.monotonic() - inicio > self.ttl_sesion:
+                del self._sesiones[sesion]
+                return False
+            return True
+
+    def expirar_sesiones(self):
+        """Invalida todas las sesiones (simula un reinicio del portal)"""
+        with self._lock:
+            self._sesiones.clear()
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.contadores)
+
+
+class _ManejadorPortal(BaseHTTPRequestHandler):
+    """Manejador HTTP; ``portal`` y ``rol`` se asignan al crear el servidor"""
+
+    portal: PortalPalig = None
+    rol: str = 'auth'
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, formato, *args):
+        logger.debug(f"[{self.rol}] {formato % args}")
+
+    # --- Utilidades -----------------------------------------------------
+
+    def _simular_red(self) -> bool:
+        """Aplica la latencia configurada; retorna False si se inyecta un fallo"""
+        portal = self.portal
+        ruta = urlparse(self.path).path
+        with portal._lock:
+            portal.contadores[f"{self.command} {ruta}"] += 1
+            demora = portal.latencia_ms + (portal._random.uniform(0, portal.jitter_ms) if portal.jitter_ms else 0)
+        if demora > 0:
+            time.sleep(demora / 1000.0)
+
+        if portal._sortear(portal.tasa_fallos):
+            with portal._lock:
+                portal.contadores['fallos_inyectados'] += 1
+            self._responder(503, '<html><head><title>Service Unavailable</title></head>'
+                                 '<body><h1>Service Unavailable</h1></body></html>')
+            return False
+        return True
+
+    def _leer_formulario(self) -> Dict[str, str]:
+        longitud = int(self.headers.get('Content-Length') or 0)
+        cuerpo = self.rfile.read(longitud).decode('utf-8', errors='replace') if longitud else ''
+        return {clave: valores[0] for clave, valores in parse_qs(cuerpo).items()}
+
+    def _cookie(self, nombre: str) -> Optional[str]:
+        for parte in (self.headers.get('Cookie') or '').split(';'):
+            clave, _, valor = parte.strip().partition('=')
+            if clave == nombre:
+                return valor
+        return None
+
+    def _responder(self, codigo: int, cuerpo: str, cabeceras: Optional[Dict[str, str]] = None):
+        datos = cuerpo.encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(datos)))
+        self.send_header('Cache-Control', 'no-store')
+        for clave, valor in (cabeceras or {}).items():
+            self.send_header(clave, valor)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(datos)
+
+    def _redirigir(self, destino: str, cabeceras: Optional[Dict[str, str]] = None):
+        self.send_response(302)
+        self.send_header('Location', destino)
+        self.send_header('Content-Length', '0')
+        for clave, valor in (cabeceras or {}).items():
+            self.send_header(clave, valor)
+        self.end_headers()
+
+    # --- Rutas ----------------------------------------------------------
+
+    def do_GET(self):
+        if not self._simular_red():
+            return
+        url = urlparse(self.path)
+        parametros = {clave: valores[0] for clave, valores in parse_qs(url.query).items()}
+
+        if self.rol == 'auth' and url.path == RUTA_LOGIN:
+            return self._responder(200, self._pagina_login(url.query))
+        if self.rol == 'auth' and url.path == RUTA_PING:
+            return self._pagina_ping(parametros.get('codigo', ''))
+        if self.rol == 'beneficios' and url.path == RUTA_LOGIN_BENEFICIOS:
+            return self._login_beneficios(parametros.get('code', ''))
+        if self.rol == 'beneficios' and url.path == RUTA_BUSQUEDA:
+            if not self.portal._sesion_valida(self._cookie('ASP.NET_SessionId')):
+                return self._redirigir(self.portal.url_login)
+            return self._responder(200, self._pagina_busqueda())
+        self._responder(404, '<html><body><h1>404</h1></body></html>')
+
+    def do_POST(self):
+        if not self._simular_red():
+            return
+        url = urlparse(self.path)
+        formulario = self._leer_formulario()
+
+        if self.rol == 'auth' and url.path == RUTA_LOGIN:
+            if formulario.get('pf.username') != self.portal.usuario or formulario.get('pf.pass') != self.portal.password:
+                return self._responder(200, self._pagina_login(url.query, error='Usuario o contraseña incorrecto'))
+            if self.portal._sortear(self.portal.prob_reintento_login):
+                # El portal real a veces devuelve al formulario de login sin error
+                return self._responder(200, self._pagina_login(url.query))
+            return self._redirigir(f"{RUTA_PING}?codigo={self.portal._emitir_codigo()}")
+
+        if self.rol == 'beneficios' and url.path == RUTA_BUSQUEDA:
+            if not self.portal._sesion_valida(self._cookie('ASP.NET_SessionId')):
+                return self._redirigir(self.portal.url_login)
+            num_doc = formulario.get(ID_IDENTIFICACION, '').strip()
+            with self.portal._lock:
+                self.portal.contadores['busquedas'] += 1
+            return self._responder(200, self._pagina_busqueda(num_doc))
+        self._responder(404, '<html><body><h1>404</h1></body></html>')
+
+    def _pagina_login(self, query: str, error: str = '') -> str:
+        bloque_error = f'<div class="error">{html.escape(error)}</div>' if error else ''
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Inicio de sesión</title></head>
+<body>
+<form id="loginForm" method="post" action="{RUTA_LOGIN}?{html.escape(query)}">
+  {bloque_error}
+  <input id="username" name="pf.username" type="text" placeholder="Usuario">
+  <input id="password" name="pf.pass" type="password" placeholder="Contraseña">
+  <a href="#" title="Inicio de sesión" onclick="document.getElementById('loginForm').submit(); return false;">Iniciar sesión</a>
+</form>
+</body></html>"""
+
+    def _pagina_ping(self, codigo: str):
+        if codigo not in self.portal._codigos:
+            return self._redirigir(self.portal.url_login)
+
+        if self.portal._sortear(self.portal.prob_ping_atascado):
+            # Página sin redirección: solo avanza si el cliente recarga
+            with self.portal._lock:
+                self.portal.contadores['pings_atascados'] += 1
+            return self._responder(200, '<!DOCTYPE html><html><head><title>Autorizando...</title></head>'
+                                        '<body><p>Procesando autorización...</p></body></html>')
+
+        destino = f"{self.portal.url_base_beneficios}{RUTA_LOGIN_BENEFICIOS}?code={codigo}"
+        self._responder(200, f"""<!DOCTYPE html>
+<html><head><title>Autorizando...</title>
+<meta http-equiv="refresh" content="{self.portal.espera_ping};url={html.escape(destino)}">
+</head><body><p>Procesando autorización...</p></body></html>""")
+
+    def _login_beneficios(self, codigo: str):
+        sesion = self.portal._canjear_codigo(codigo)
+        if not sesion:
+            return self._redirigir(self.portal.url_login)
+        self._redirigir(RUTA_BUSQUEDA, {'Set-Cookie': f"ASP.NET_SessionId={sesion}; Path=/; HttpOnly"})
+
+    def _pagina_busqueda(self, num_doc: Optional[str] = None) -> str:
+        resultados = ''
+        if num_doc is not None:
+            filas = self.portal.generar_filas(num_doc) if num_doc else []
+            if filas:
+                cabecera = ''.join(f'<th scope="col">{html.escape(encabezado)}</th>' for encabezado in ENCABEZADOS)
+                cuerpo = ''.join(
+                    '<tr>' + ''.join(f'<td>{html.escape(fila[encabezado])}</td>' for encabezado in ENCABEZADOS) + '</tr>'
+                    for fila in filas
+                )
+                resultados = (f'<table class="GridViewStylePV" id="ContenidoPrincipal_gvPolizas" cellspacing="0">'
+                              f'<tr>{cabecera}</tr>{cuerpo}</table>')
+            else:
+                resultados = '<span id="ContenidoPrincipal_lblMensaje">No se encontraron pólizas</span>'
+
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Mis Pólizas</title></head>
+<body>
+<h1 class="info-asegurado-titulo">Información del Asegurado</h1>
+<form method="post" action="{RUTA_BUSQUEDA}">
+  <input placeholder="Nombre" name="nombre" type="text">
+  <input placeholder="Apellido" name="apellido" type="text">
+  <input id="{ID_IDENTIFICACION}" name="{ID_IDENTIFICACION}" type="text" value="{html.escape(num_doc or '')}">
+  <input placeholder="Póliza" name="poliza" type="text">
+  <input placeholder="Certificado" name="certificado" type="text">
+  <button id="{ID_BOTON_BUSCAR}" type="submit">BUSCAR PÓLIZAS</button>
+</form>
+{resultados}
+</body></html>"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portal PALIG local para benchmarks sin conexión")
+    parser.add_argument('--filas', type=int, default=20, help="Filas de la tabla de resultados")
+    parser.add_argument('--latencia-ms', type=float, default=0, help="Latencia fija por petición")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="Latencia aleatoria adicional (0..jitter)")
+    parser.add_argument('--tasa-fallos', type=float, default=0.0, help="Probabilidad de responder 503")
+    parser.add_argument('--espera-ping', type=float, default=1.0, help="Segundos en authorization.ping")
+    parser.add_argument('--prob-ping-atascado', type=float, default=0.0, help="Probabilidad de que authorization.ping no avance")
+    parser.add_argument('--prob-reintento-login', type=float, default=0.0, help="Probabilidad de volver al formulario de login")
+    parser.add_argument('--posicion-cliente', choices=POSICIONES_CLIENTE, default='final')
+    parser.add_argument('--puerto-auth', type=int, default=8701)
+    parser.add_argument('--puerto-beneficios', type=int, default=8702)
+    parser.add_argument('--semilla', type=int, default=None)
+    parser.add_argument('--asegurado', action='append', default=[], metavar='DOC:NOMBRE',
+                        help="Asegurado a incluir en los resultados (repetible)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    portal = PortalPalig(
+        filas=args.filas, latencia_ms=args.latencia_ms, jitter_ms=args.jitter_ms,
+        tasa_fallos=args.tasa_fallos, espera_ping=args.espera_ping,
+        prob_ping_atascado=args.prob_ping_atascado, prob_reintento_login=args.prob_reintento_login,
+        posicion_cliente=args.posicion_cliente, puerto_auth=args.puerto_auth,
+        puerto_beneficios=args.puerto_beneficios, semilla=args.semilla
+    )
+    for entrada in args.asegurado:
+        num_doc, _, nombre = entrada.partition(':')
+        portal.registrar_asegurado(num_doc, nombre)
+
+    portal.iniciar()
+    print(f"PALE_EC_BUSQUEDA_URL={portal.url_busqueda}")
+    print(f"URL de login: {portal.url_login}")
+    print(f"Credenciales: {portal.usuario} / {portal.password}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        portal.detener()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Benchmark de extremo a extremo del worker de producción.
+
+Ejecuta ``AseguradoraProcessor`` real (con navegador real) contra:
+
+- el portal PALIG local (``benchmarks.portal_palig``),
+- una base de datos simulada en memoria con latencia configurable,
+- un canal RabbitMQ simulado que solo registra ack/nack.
+
+Recorre combinaciones de concurrencia (procesadores en paralelo, cada uno con
+su navegador), tamaño de lote (clientes por mensaje) y tamaño de tabla, y
+genera un reporte JSON/CSV con p50/p95/p99 por etapa. El reporte incluye el
+commit de git para poder compararlo entre versiones:
+
+    python -m benchmarks.throughput --concurrencia 1,2 --lote 1,5 --filas 20,500 --salida reporte.json
+    python -m benchmarks.throughput --salida nuevo.json --comparar reporte.json --tolerancia 0.15
+"""
+
+import os
+import csv
+import sys
+import json
+import time
+import queue
+import logging
+import argparse
+import platform
+import threading
+import subprocess
+from datetime import datetime
+from itertools import product
+from typing import Callable, Dict, List, Optional
+
+from .portal_palig import PortalPalig, SELECTOR_IDENTIFICACION, SELECTOR_BOTON_BUSCAR
+
+logger = logging.getLogger(__name__)
+
+NOMBRE_ASEGURADORA = 'PAN AMERICAN LIFE DE ECUADOR'
+
+VERSION_REPORTE = 1
+
+# Métodos del procesador que se cronometran (etapa -> método)
+ETAPAS = {
+    'mensaje': 'process_message',
+    'login': 'execute_login',
+    'busqueda_cliente': 'capturar_informacion_pantalla',
+    'tabla': '_capturar_tabla_resultados',
+    'guardado_bd': '_guardar_cliente_en_bd'
+}
+
+# Variables mínimas para poder importar src.config sin archivo .env
+# (el benchmark no se conecta a SQL Server ni a RabbitMQ)
+_ENTORNO_MINIMO = {
+    'SQL_SERVER_HOST': 'localhost', 'SQL_SERVER_DATABASE': 'benchmark',
+    'RABBITMQ_HOST': 'localhost', 'RABBITMQ_PORT': '5672',
+    'RABBITMQ_USERNAME': 'benchmark', 'RABBITMQ_PASSWORD': 'benchmark',
+    'RABBITMQ_QUEUE': 'benchmark', 'RABBITMQ_EXCHANGE': 'benchmark',
+    'LOG_LEVEL': 'WARNING', 'SCRAPING_DELAY': '0', 'MAX_RETRIES': '1',
+    # Se mide el trabajo contra el portal: sin limitador por aseguradora (los
+    # procesadores comparten proceso), sin respuestas desde el caché de resultados
+    # y sin diferir mensajes por el circuito del portal
+    'PALE_EC_MAX_CONCURRENCIA': '0', 'RESULTADOS_CACHE_TTL_SEGUNDOS': '0',
+    'RESULTADOS_CACHE_NEGATIVO_TTL_SEGUNDOS': '0', 'CIRCUITO_UMBRAL_FALLOS': '0'
+}
+
+
+# ----------------------------------------------------------------------
+# Estadísticas
+# ----------------------------------------------------------------------
+
+def percentil(valores: List[float], p: float) -> Optional[float]:
+    """Percentil por interpolación lineal (p entre 0 y 100)"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100.0
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    fraccion = posicion - inferior
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * fraccion
+
+
+def resumir(valores: List[float]) -> Dict[str, Optional[float]]:
+    """Resumen de una serie de duraciones (segundos)"""
+    if not valores:
+        return {'n': 0, 'p50': None, 'p95': None, 'p99': None, 'promedio': None, 'maximo': None}
+    return {
+        'n': len(valores),
+        'p50': round(percentil(valores, 50), 4),
+        'p95': round(percentil(valores, 95), 4),
+        'p99': round(percentil(valores, 99), 4),
+        'promedio': round(sum(valores) / len(valores), 4),
+        'maximo': round(max(valores), 4)
+    }
+
+
+def clave_escenario(escenario: Dict) -> str:
+    return f"c{escenario['concurrencia']}-l{escenario['lote']}-f{escenario['filas']}"
+
+
+def comparar_reportes(base: Dict, actual: Dict, tolerancia: float = 0.15) -> List[str]:
+    """Compara dos reportes y retorna las regresiones encontradas.
+
+    Una regresión es un p95 de etapa que crece más que ``tolerancia`` (fracción)
+    o un throughput de clientes por minuto que cae más que ``tolerancia``.
+    Solo se comparan los escenarios presentes en ambos reportes.
+    """
+    regresiones = []
+    escenarios_base = {clave_escenario(escenario): escenario for escenario in base.get('escenarios', [])}
+
+    for escenario in actual.get('escenarios', []):
+        clave = clave_escenario(escenario)
+        anterior = escenarios_base.get(clave)
+        if not anterior:
+            continue
+
+        for etapa, resumen in escenario.get('etapas', {}).items():
+            p95_base = anterior.get('etapas', {}).get(etapa, {}).get('p95')
+            p95_actual = resumen.get('p95')
+            if p95_base and p95_actual and p95_actual > p95_base * (1 + tolerancia):
+                regresiones.append(
+                    f"{clave} {etapa}: p95 {p95_base:.3f}s -> {p95_actual:.3f}s "
+                    f"(+{(p95_actual / p95_base - 1) * 100:.0f}%)"
+                )
+
+        tasa_base = anterior.get('clientes_por_minuto')
+        tasa_actual = escenario.get('clientes_por_minuto')
+        if tasa_base and tasa_actual is not None and tasa_actual < tasa_base * (1 - tolerancia):
+            regresiones.append(
+                f"{clave} throughput: {tasa_base:.1f} -> {tasa_actual:.1f} clientes/min "
+                f"({(tasa_actual / tasa_base - 1) * 100:.0f}%)"
+            )
+
+    return regresiones
+
+
+# ----------------------------------------------------------------------
+# Servicios simulados
+# ----------------------------------------------------------------------
+
+class BaseDatosSimulada:
+    """Sustituto en memoria de DatabaseManager para el flujo de PALE_EC.
+
+    Responde a las consultas de configuración (urls_automatizacion,
+    campos_login, acciones_post_login, informacion_capturada) con los datos
+    del portal local y registra las escrituras en FacturaCliente. Igual que
+    DatabaseManager, las consultas que no devuelven filas retornan [].
+    """
+
+    def __init__(self, portal: PortalPalig, latencia_ms: float = 0):
+        self.portal = portal
+        self.latencia_ms = latencia_ms
+        self._lock = threading.Lock()
+        self.consultas = 0
+        self.escrituras: List[Dict] = []
+
+    def execute_query(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
+        if self.latencia_ms:
+            time.sleep(self.latencia_ms / 1000.0)
+        with self._lock:
+            self.consultas += 1
+
+        consulta = ' '.join(query.split())
+        if 'FROM urls_automatizacion' in consulta:
+            return [{
+                'id': 1,
+                'nombre': NOMBRE_ASEGURADORA,
+                'url_login': self.portal.url_login,
+                'url_destino': self.portal.url_busqueda,
+                'descripcion': 'Portal PALIG local (benchmark)',
+                'fecha_creacion': None
+            }]
+        if 'FROM campos_login' in consulta:
+            return [
+                {'selector_html': '#password', 'valor_dinamico': self.portal.password},
+                {'selector_html': '#username', 'valor_dinamico': self.portal.usuario}
+            ]
+        if 'FROM acciones_post_login' in consulta:
+            return [{'tipo_accion': 'click', 'selector_html': 'a[title="Inicio de sesión"]', 'valor_dinamico': None}]
+        if 'FROM informacion_capturada' in consulta:
+            return [{
+                'NombreCampo': 'Identificación del Titular',
+                'TipoCampo': 'input',
+                'SelectorCSS': SELECTOR_IDENTIFICACION,
+                'Orden': 1,
+                'Obligatorio': True,
+                'BotonEnvio': SELECTOR_BOTON_BUSCAR
+            }]
+        if consulta.startswith(('INSERT', 'UPDATE')):
+            with self._lock:
+                self.escrituras.append(dict(params or {}))
+        return []
+
+    def test_connection(self) -> bool:
+        return True
+
+    def close(self):
+        pass
+
+
+class MetodoSimulado:
+    """Equivalente mínimo de pika.spec.Basic.Deliver"""
+
+    def __init__(self, delivery_tag: int):
+        self.delivery_tag = delivery_tag
+
+
+class CanalSimulado:
+    """Canal RabbitMQ que solo registra ack/nack"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.acks = 0
+        self.nacks = 0
+
+    def basic_ack(self, delivery_tag=None):
+        with self._lock:
+            self.acks += 1
+
+    def basic_nack(self, delivery_tag=None, requeue=True):
+        with self._lock:
+            self.nacks += 1
+
+
+# ----------------------------------------------------------------------
+# Ejecución de escenarios
+# ----------------------------------------------------------------------
+
+_NOMBRES = ['ANDREA', 'BRUNO', 'CLARA', 'DAVID', 'ELENA', 'FELIPE', 'GABRIELA', 'HUGO']
+_APELLIDOS = ['ALVAREZ', 'BRAVO', 'CASTRO', 'DUARTE', 'ESPINOZA', 'FLORES', 'GUZMAN', 'HERRERA']
+
+
+def generar_clientes(cantidad: int) -> List[Dict]:
+    """Genera clientes deterministas con el formato de los mensajes de RabbitMQ"""
+    clientes = []
+    for i in range(cantidad):
+        clientes.append({
+            'NombreCompleto': NOMBRE_ASEGURADORA,
+            'NumDocIdentidad': f"{1700000000 + i:010d}",
+            'PersonaPrimerNombre': _NOMBRES[i % len(_NOMBRES)],
+            'PersonaSegundoNombre': _NOMBRES[(i // len(_NOMBRES)) % len(_NOMBRES)],
+            'PersonaPrimerApellido': _APELLIDOS[i % len(_APELLIDOS)],
+            'PersonaSegundoApellido': _APELLIDOS[(i * 3) % len(_APELLIDOS)],
+            'IdFactura': 100000 + i,
+            'IdAseguradora': 1
+        })
+    return clientes
+
+
+def construir_mensajes(clientes: List[Dict], lote: int) -> List[bytes]:
+    """Agrupa los clientes en mensajes: individuales si lote=1, lista 'Clientes' si no"""
+    mensajes = []
+    for inicio in range(0, len(clientes), lote):
+        grupo = clientes[inicio:inicio + lote]
+        cuerpo = grupo[0] if lote == 1 else {'Clientes': grupo, 'TotalClientes': len(grupo)}
+        mensajes.append(json.dumps(cuerpo).encode('utf-8'))
+    return mensajes
+
+
+class Cronometro:
+    """Acumula duraciones por etapa de forma segura entre hilos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.duraciones: Dict[str, List[float]] = {etapa: [] for etapa in ETAPAS}
+
+    def envolver(self, etapa: str, funcion: Callable) -> Callable:
+        def cronometrada(*args, **kwargs):
+            inicio = time.perf_counter()
+            try:
+                return funcion(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.duraciones[etapa].append(time.perf_counter() - inicio)
+        return cronometrada
+
+    def instrumentar(self, procesador):
+        """Reemplaza los métodos de ETAPAS en la instancia por versiones cronometradas"""
+        for etapa, metodo in ETAPAS.items():
+            setattr(procesador, metodo, self.envolver(etapa, getattr(procesador, metodo)))
+
+
+def _preparar_entorno():
+    for variable, valor in _ENTORNO_MINIMO.items():
+        os.environ.setdefault(variable, valor)
+
+
+def ejecutar_escenario(concurrencia: int, lote: int, filas: int, mensajes: int,
+                       opciones_portal: Optional[Dict] = None, latencia_bd_ms: float = 0) -> Dict:
+    """Procesa ``mensajes`` mensajes con ``concurrencia`` procesadores en paralelo"""
+    _preparar_entorno()
+    from src.config import Config
+    import run_production_worker
+
+    clientes = generar_clientes(mensajes * lote)
+    cuerpos = construir_mensajes(clientes, lote)
+    cronometro = Cronometro()
+    canal = CanalSimulado()
+
+    with PortalPalig(filas=filas, semilla=0, **(opciones_portal or {})) as portal:
+        for cliente in clientes:
+            nombre = ' '.join([
+                cliente['PersonaPrimerNombre'], cliente['PersonaSegundoNombre'],
+                cliente['PersonaPrimerApellido'], cliente['PersonaSegundoApellido']
+            ])
+            portal.registrar_asegurado(cliente['NumDocIdentidad'], nombre)
+
+        Config.PALE_EC_BUSQUEDA_URL = portal.url_busqueda
+        base_datos = BaseDatosSimulada(portal, latencia_ms=latencia_bd_ms)
+
+        cola = queue.Queue()
+        for etiqueta, cuerpo in enumerate(cuerpos, 1):
+            cola.put((etiqueta, cuerpo))
+
+        procesadores = []
+        for _ in range(concurrencia):
+            procesador = run_production_worker.AseguradoraProcessor(db_manager=base_datos)
+            cronometro.instrumentar(procesador)
+            procesadores.append(procesador)
+
+        def consumir(procesador):
+            while True:
+                try:
+                    etiqueta, cuerpo = cola.get_nowait()
+                except queue.Empty:
+                    return
+                procesador.process_message(canal, MetodoSimulado(etiqueta), None, cuerpo)
+
+        inicio = time.perf_counter()
+        hilos = [
+            threading.Thread(target=consumir, args=(procesador,), name=f"benchmark-{i}", daemon=True)
+            for i, procesador in enumerate(procesadores)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        duracion = time.perf_counter() - inicio
+
+        for procesador in procesadores:
+            if procesador.driver:
+                try:
+                    procesador.driver.quit()
+                except Exception:
+                    pass
+
+        estadisticas_portal = portal.estadisticas()
+
+    guardados = len(base_datos.escrituras)
+    return {
+        'concurrencia': concurrencia,
+        'lote': lote,
+        'filas': filas,
+        'mensajes': len(cuerpos),
+        'clientes': len(clientes),
+        'duracion_s': round(duracion, 3),
+        'mensajes_por_minuto': round(len(cuerpos) / duracion * 60, 2) if duracion else None,
+        'clientes_por_minuto': round(guardados / duracion * 60, 2) if duracion else None,
+        'clientes_guardados': guardados,
+        'acks': canal.acks,
+        'nacks': canal.nacks,
+        'consultas_bd': base_datos.consultas,
+        'portal': estadisticas_portal,
+        'etapas': {etapa: resumir(valores) for etapa, valores in cronometro.duraciones.items()}
+    }
+
+
+# ----------------------------------------------------------------------
+# Reporte
+# ----------------------------------------------------------------------
+
+def commit_actual() -> Optional[str]:
+    """Commit de git del árbol actual (con sufijo -dirty si hay cambios)"""
+    try:
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=raiz,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        cambios = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=raiz,
+                                 capture_output=True, text=True, check=True).stdout.strip()
+        return f"{commit}-dirty" if cambios else commit
+    except Exception:
+        return None
+
+
+def escribir_csv(reporte: Dict, ruta: str):
+    """Una fila por escenario y etapa"""
+    columnas = ['commit', 'concurrencia', 'lote', 'filas', 'mensajes', 'duracion_s',
+                'mensajes_por_minuto', 'clientes_por_minuto', 'etapa', 'n', 'p50', 'p95', 'p99', 'promedio', 'maximo']
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=columnas, extrasaction='ignore')
+        escritor.writeheader()
+        for escenario in reporte['escenarios']:
+            for etapa, resumen in escenario['etapas'].items():
+                escritor.writerow({**escenario, **resumen, 'commit': reporte['commit'], 'etapa': etapa})
+
+
+def _lista_enteros(valor: str) -> List[int]:
+    return [int(item) for item in valor.split(',') if item.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de extremo a extremo del worker de producción")
+    parser.add_argument('--concurrencia', type=_lista_enteros, default=[1], help="Procesadores en paralelo (ej. 1,2,4)")
+    parser.add_argument('--lote', type=_lista_enteros, default=[1], help="Clientes por mensaje (ej. 1,5)")
+    parser.add_argument('--filas', type=_lista_enteros, default=[20], help="Filas de la tabla de resultados (ej. 20,500)")
+    parser.add_argument('--mensajes', type=int, default=10, help="Mensajes por escenario")
+    parser.add_argument('--latencia-ms', type=float, default=0, help="Latencia del portal por petición")
+    parser.add_argument('--jitter-ms', type=float, default=0, help="Latencia aleatoria adicional del portal")
+    parser.add_argument('--tasa-fallos', type=float, default=0.0, help="Probabilidad de 503 en el portal")
+    parser.add_argument('--espera-ping', type=float, default=1.0, help="Segundos en authorization.ping")
+    parser.add_argument('--latencia-bd-ms', type=float, default=0, help="Latencia por consulta de la BD simulada")
+    parser.add_argument('--salida', default='benchmark_throughput.json', help="Reporte JSON")
+    parser.add_argument('--csv', default=None, help="Reporte CSV adicional")
+    parser.add_argument('--comparar', default=None, help="Reporte JSON base para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=0.15, help="Variación permitida frente a la base (fracción)")
+    parser.add_argument('--verbose', action='store_true', help="Mantener los logs INFO del worker")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    _preparar_entorno()
+    if not args.verbose:
+        # Los logs por fila del worker distorsionan las mediciones
+        for nombre in ('run_production_worker', 'src', 'benchmarks.portal_palig'):
+            logging.getLogger(nombre).setLevel(logging.WARNING)
+
+    opciones_portal = {
+        'latencia_ms': args.latencia_ms,
+        'jitter_ms': args.jitter_ms,
+        'tasa_fallos': args.tasa_fallos,
+        'espera_ping': args.espera_ping
+    }
+
+    reporte = {
+        'version': VERSION_REPORTE,
+        'commit': commit_actual(),
+        'fecha': datetime.now().isoformat(),
+        'entorno': {
+            'python': platform.python_version(),
+            'plataforma': platform.platform(),
+            'navegador': os.getenv('SELENIUM_NAVEGADOR', 'edge')
+        },
+        'parametros': {**opciones_portal, 'mensajes': args.mensajes, 'latencia_bd_ms': args.latencia_bd_ms},
+        'escenarios': []
+    }
+
+    for concurrencia, lote, filas in product(args.concurrencia, args.lote, args.filas):
+        logger.info(f"🏁 Escenario: concurrencia={concurrencia} lote={lote} filas={filas}")
+        escenario = ejecutar_escenario(concurrencia, lote, filas, args.mensajes, opciones_portal, args.latencia_bd_ms)
+        reporte['escenarios'].append(escenario)
+        etapas = escenario['etapas']
+        logger.info(
+            f"   ⏱️ {escenario['duracion_s']}s | {escenario['clientes_por_minuto']} clientes/min | "
+            f"login p95 {etapas['login']['p95']}s | búsqueda p95 {etapas['busqueda_cliente']['p95']}s | "
+            f"errores {escenario['nacks']}"
+        )
+
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump(reporte, archivo, indent=2, ensure_ascii=False)
+    logger.info(f"📄 Reporte JSON: {args.salida}")
+    if args.csv:
+        escribir_csv(reporte, args.csv)
+        logger.info(f"📄 Reporte CSV: {args.csv}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar_reportes(base, reporte, args.tolerancia)
+        if regresiones:
+            logger.error(f"❌ Regresiones frente a {base.get('commit')} (tolerancia {args.tolerancia:.0%}):")
+            for regresion in regresiones:
+                logger.error(f"   • {regresion}")
+            sys.exit(1)
+        logger.info(f"✅ Sin regresiones frente a {base.get('commit')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""
+Reloj manual compartido por los scripts de prueba (plazos, circuito,
+caché, limitador, captura de campos y autoescalado)
+"""
+
+
+class RelojFalso:
+    """Reloj manual: solo avanza cuando la prueba lo mueve, con ``dormir()`` o en ``paso`` por lectura"""
+
+    def __init__(self, ahora: float = 1000.0, paso: float = 0.0):
+        self.ahora = ahora
+        self.paso = paso
+        self.pausas = []
+
+    def __call__(self):
+        self.ahora += self.paso
+        return self.ahora
+
+    def dormir(self, segundos):
+        self.pausas.append(round(segundos, 3))
+        self.ahora += segundos
@@ -3,48 +3,129 @@
 Worker de producción para procesar mensajes de aseguradoras continuamente
 """
 
-import time
+import os
 import logging
+import tempfile
 import signal
 import sys
 import json
+import argparse
 import pika
+from urllib.parse import urlparse
 from datetime import datetime
 from src.config import Config
 from src.database import DatabaseManager
-from selenium import webdriver
+from src.browser_profile import BrowserProfile
+from src.browser_factory import fabrica_navegadores, config_desde_entorno
+from src.browser_recycling import RecyclingPolicy, exportar_cookies, restaurar_cookies
+from src.tabla_resultados import extraer_tabla, normalizar_nombre
+from src.captura_campos import COLUMNAS_VALORES, TABLA_VALORES, capturar_campos
+from src.metrics import metricas, contexto_metricas
+from src.metrics_server import MetricsServer
+from src.logging_config import Muestreador, configurar_logging
+from src.profiling import ProfilerMensajes
+from src.insurer_plugins import registro_aseguradoras
+from src.concurrency import codigo_http_en_pagina
+from src.result_cache import INACTIVO, NO_ENCONTRADO, SIN_RESULTADOS, SONDEO_BUSQUEDA_EN_CURSO_SEGUNDOS, ResultCache
+from src.circuit_breaker import VALOR_ESTADO, CircuitoAbierto
+from src.deadline import CABECERA as CABECERA_PLAZO, PlazoAgotado, acotar, agotar, esperar, plazo, segundos_hasta, verificar
+from src.deadline import restante as plazo_restante
+from src.supervisor import WorkerSupervisor
+from src.autoscaler import QueueAutoscaler
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
 from selenium.common.exceptions import TimeoutException, WebDriverException
 
-# Configurar logging más detallado para producción
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('production_worker.log', encoding='utf-8')
-    ]
-)
+# Logging de producción: nivel LOG_LEVEL, JSON por defecto y escritura en un hilo aparte
+configurar_logging(Config.LOG_LEVEL, archivo=Config.LOG_FILE or None, formato=Config.LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
+# Los logs por fila o por iteración de espera van a DEBUG y solo se emite 1 de cada LOG_MUESTREO
+muestreo_logs = Muestreador(Config.LOG_MUESTREO)
+
 class AseguradoraProcessor:
-    def __init__(self):
-        self.db_manager = DatabaseManager()
+    def __init__(self, db_manager=None):
+        # db_manager permite inyectar otra base de datos (p.ej. en benchmarks)
+        self.db_manager = db_manager or DatabaseManager()
         self.rabbitmq_connection = None
         self.rabbitmq_channel = None
         # Cache para URLs de aseguradoras (nombre -> url_info)
         self.url_cache = {}
         # Driver de Selenium para login automático
         self.driver = None
+        self.aseguradora_driver = None
+        
+        # Plugins por aseguradora (nombre -> InsurerPlugin), creados al primer mensaje
+        self.plugins = {}
+        self.recarga_plugins_pendiente = False  # SIGHUP: recargar antes del próximo mensaje
+        self.detencion_pendiente = False  # SIGTERM/SIGINT: dejar de consumir tras el mensaje en curso
+        
+        # Concurrencia adaptativa por portal: SCRAPING_DELAY es la separación mínima entre mensajes
+        registro_aseguradoras.configurar_limitadores(
+            espera_minima=Config.SCRAPING_DELAY or 0,
+            espera_maxima=Config.CONCURRENCIA_ESPERA_MAXIMA,
+            latencia_objetivo=Config.CONCURRENCIA_LATENCIA_OBJETIVO
+        )
+        # Circuito por portal: tras fallos seguidos los mensajes se difieren sin tocar el navegador
+        registro_aseguradoras.configurar_circuitos(
+            umbral_fallos=Config.CIRCUITO_UMBRAL_FALLOS,
+            segundos_abierto=Config.CIRCUITO_SEGUNDOS_ABIERTO
+        )
+        # Última señal de congestión del portal en el mensaje en curso (timeout, http_5xx, ...)
+        self.senal_portal = None
+        
+        # Resultados de búsquedas recientes (aseguradora + NumDocIdentidad -> filas de la familia)
+        self.cache_resultados = ResultCache(
+            ttl_segundos=Config.RESULTADOS_CACHE_TTL_SEGUNDOS,
+            max_entradas=Config.RESULTADOS_CACHE_MAX_ENTRADAS,
+            ruta_sqlite=Config.RESULTADOS_CACHE_SQLITE or None,
+            ttl_negativo_segundos=Config.RESULTADOS_CACHE_NEGATIVO_TTL_SEGUNDOS
+        )
+        # La tabla de valores de la captura genérica se verifica una vez por procesador
+        self.tabla_valores_verificada = False
+        
+        # Política de reciclaje para acotar el crecimiento de memoria del navegador
+        self.politica_reciclaje = RecyclingPolicy(
+            max_paginas=Config.BROWSER_RECICLAR_PAGINAS,
+            max_minutos=Config.BROWSER_RECICLAR_MINUTOS,
+            max_rss_mb=Config.BROWSER_RECICLAR_RSS_MB
+        )
         
         # Gestor de sesiones por aseguradora
         self.sesiones_aseguradoras = {}
         self.aseguradoras_activas = set()
         
+        # Contadores de mensajes consumidos (los tiempos por etapa viven en src.metrics)
+        self.mensajes_procesados = 0
+        self.mensajes_fallidos = 0
+        self.mensajes_en_curso = 0
+        # Última lectura de la cola (se refresca con call_later en el hilo de pika)
+        self.profundidad_cola = None
+        self.consumidores_cola = None
+        # Segundos de servicio acumulados y, en modo supervisor, el Array compartido con el supervisor
+        # ((estadisticas, indice): [2*indice] mensajes y [2*indice+1] segundos de este worker)
+        self.segundos_servicio = 0.0
+        self.servicio_compartido = None
+        # Workers y navegadores recomendados según la cola (gauges scraping_autoescalado_*)
+        self.autoescalado = QueueAutoscaler(
+            minimo=Config.AUTOESCALADO_MIN_PROCESOS,
+            maximo=Config.AUTOESCALADO_MAX_PROCESOS or None,
+            objetivo_drenado_segundos=Config.AUTOESCALADO_OBJETIVO_DRENADO_SEGUNDOS,
+            utilizacion_objetivo=Config.AUTOESCALADO_UTILIZACION_OBJETIVO,
+            enfriamiento_segundos=Config.AUTOESCALADO_ENFRIAMIENTO_SEGUNDOS
+        )
+        
+        # Perfilado opcional por mensaje (PROFILING_MENSAJES o cabecera x-profile)
+        self.profiler = ProfilerMensajes(
+            modo=Config.PROFILING_MODO,
+            mensajes=Config.PROFILING_MENSAJES,
+            directorio=Config.PROFILING_DIRECTORIO,
+            max_archivos=Config.PROFILING_MAX_ARCHIVOS,
+            intervalo_ms=Config.PROFILING_INTERVALO_MS
+        )
+        
         logger.info("🚀 Procesador inicializado con caché de URLs y Selenium")
         logger.info("   • Gestión de sesiones por aseguradora habilitada")
     
@@ -77,6 +158,18 @@ class AseguradoraProcessor:
                 routing_key=Config.RABBITMQ_ROUTING_KEY
             )
             
+            # Cola de reintentos: los mensajes diferidos (circuito abierto) vuelven al
+            # exchange principal cuando vence su TTL
+            self.rabbitmq_channel.queue_declare(
+                queue=Config.RABBITMQ_COLA_REINTENTOS,
+                durable=True,
+                arguments={
+                    'x-message-ttl': int(Config.CIRCUITO_REINTENTO_SEGUNDOS * 1000),
+                    'x-dead-letter-exchange': Config.RABBITMQ_EXCHANGE,
+                    'x-dead-letter-routing-key': Config.RABBITMQ_ROUTING_KEY
+                }
+            )
+            
             logger.info("✅ Conectado a RabbitMQ exitosamente")
             return True
             
@@ -84,7 +177,7 @@ class AseguradoraProcessor:
             logger.error(f"❌ Error conectando a RabbitMQ: {e}")
             return False
     
-    def setup_selenium_driver(self):
+    def setup_selenium_driver(self, nombre_aseguradora=None):
         """Configura el driver de Selenium para login automático"""
         try:
             if self.driver:
@@ -92,24 +185,10 @@ class AseguradoraProcessor:
                 
             logger.info("🔧 Configurando driver de Selenium...")
             
-            # Opciones de Edge para modo headless
-            edge_options = Options()
-            # edge_options.add_argument("--headless")  # Ejecutar sin interfaz gráfica
-            edge_options.add_argument("--no-sandbox")
-            edge_options.add_argument("--disable-dev-shm-usage")
-            edge_options.add_argument("--disable-gpu")
-            edge_options.add_argument("--window-size=1920,1080")
-            edge_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0")
-            
-            # Reducir logs de Edge
-            edge_options.add_argument("--log-level=3")  # Solo errores críticos
-            edge_options.add_argument("--silent")
-            edge_options.add_argument("--disable-logging")
-            edge_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-            
-            # Crear driver de Edge
-            self.driver = webdriver.Edge(options=edge_options)
-            self.driver.set_page_load_timeout(30)
+            # Crear driver desde la configuración de la aseguradora (headless por defecto)
+            self.driver = fabrica_navegadores.crear_driver(self._config_selenium(nombre_aseguradora))
+            self.aseguradora_driver = nombre_aseguradora
+            self.politica_reciclaje.reiniciar()
             
             # Configurar logging de Selenium para reducir ruido
             import logging
@@ -120,500 +199,165 @@ class AseguradoraProcessor:
             urllib3_logger = logging.getLogger('urllib3')
             urllib3_logger.setLevel(logging.WARNING)
             
-            logger.info("✅ Driver de Edge configurado correctamente")
+            logger.info("✅ Driver de Selenium configurado correctamente")
             return True
             
         except Exception as e:
             logger.error(f"❌ Error configurando Selenium: {e}")
             return False
     
-    def execute_login(self, url_info, datos_mensaje=None):
-        """Ejecuta el login automático en la página web"""
+    def recargar_plugins(self):
+        """Relee los manifiestos de aseguradoras y descarta los plugins ya creados"""
+        self.recarga_plugins_pendiente = False
+        registro_aseguradoras.recargar()
+        self.plugins = {}
+    
+    def plugin_para(self, nombre_aseguradora):
+        """Plugin de la aseguradora (o el genérico si no tiene uno registrado)"""
+        plugin = self.plugins.get(nombre_aseguradora)
+        if plugin is None:
+            plugin = self.plugins[nombre_aseguradora] = registro_aseguradoras.crear(nombre_aseguradora, self)
+        return plugin
+    
+    def _senalar_congestion(self, motivo, nombre_aseguradora=None):
+        """Informa al limitador de la aseguradora que su portal está limitando o lento"""
+        nombre = nombre_aseguradora or self.aseguradora_driver
+        self.senal_portal = motivo
+        if nombre:
+            registro_aseguradoras.senalar_congestion(self.plugin_para(nombre), motivo)
+    
+    def _verificar_respuesta_portal(self, nombre_aseguradora=None):
+        """Detecta páginas de error 429/5xx del portal y las cuenta como congestión"""
         try:
-            if not self.setup_selenium_driver():
+            codigo = codigo_http_en_pagina(self.driver.title)
+        except Exception:
+            return None
+        if codigo:
+            logger.warning(f"⚠️ El portal respondió con una página de error HTTP {codigo}")
+            self._senalar_congestion(f"http_{codigo}", nombre_aseguradora)
+        return codigo
+    
+    def _config_selenium(self, nombre_aseguradora=None):
+        """Obtiene la configuración del navegador para una aseguradora (SELENIUM_* / {CODIGO}_SELENIUM_*)"""
+        return config_desde_entorno(self.plugin_para(nombre_aseguradora).codigo)
+    
+    def _ejecutar_login_configurado(self, url_info):
+        """Llena los campos de login y ejecuta las acciones post-login configurados en BD"""
+        # Ejecutar campos de login
+        if url_info.get('campos_login'):
+            logger.info("🔐 Ejecutando campos de login...")
+
+            for campo in url_info['campos_login']:
+                selector = campo['selector_html']
+                valor = campo['valor_dinamico']
+
+                if not valor:
+                    logger.warning(f"⚠️  Campo {selector} sin valor, saltando...")
+                    continue
+
+                try:
+                    # Buscar el elemento con reintento de recarga
+                    elemento = self._buscar_elemento_con_reintento(selector, f"Campo {selector}")
+
+                    # Limpiar y escribir valor
+                    elemento.clear()
+                    elemento.send_keys(valor)
+
+                    logger.info(f"✅ Campo {selector} completado con: {valor}")
+
+                except TimeoutException:
+                    logger.error(f"❌ No se encontró el campo {selector}")
+                    return False
+                except PlazoAgotado:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Error en campo {selector}: {e}")
+                    return False
+
+        # Ejecutar acciones post-login
+        if url_info.get('acciones_post_login'):
+            logger.info("🎯 Ejecutando acciones post-login...")
+
+            for accion in url_info['acciones_post_login']:
+                tipo = accion['tipo_accion']
+                selector = accion['selector_html']
+
+                try:
+                    # Buscar el elemento con reintento
+                    elemento = self._buscar_boton_con_reintento(selector, f"Acción {selector}")
+
+                    if tipo.lower() == 'click':
+                        elemento.click()
+                        logger.info(f"✅ Click ejecutado en: {selector}")
+                    elif tipo.lower() == 'submit':
+                        elemento.submit()
+                        logger.info(f"✅ Submit ejecutado en: {selector}")
+                    else:
+                        logger.warning(f"⚠️  Tipo de acción no reconocido: {tipo}")
+
+                    # Pequeña pausa para que la acción se procese
+                    esperar(2)
+
+                except TimeoutException:
+                    logger.error(f"❌ No se pudo ejecutar acción {tipo} en {selector}")
+                    return False
+                except PlazoAgotado:
+                    raise
+                except Exception as e:
+                    logger.error(f"❌ Error ejecutando acción {tipo}: {e}")
+                    return False
+        
+        return True
+    
+    def execute_login(self, url_info, datos_mensaje=None, reintento=False):
+        """Ejecuta el login automático en la página web (``reintento``: ya tras recrear la sesión)"""
+        medicion = metricas.iniciar('login')
+        try:
+            if not self.setup_selenium_driver(url_info.get('nombre')):
                 logger.error("❌ No se pudo configurar Selenium")
                 return False
             
+            # Aplicar la lista de recursos permitidos de esta aseguradora
+            self._aplicar_perfil_navegador(url_info.get('nombre'))
+            self.politica_reciclaje.registrar_pagina()
+            
             url_login = url_info['url_login']
             logger.info(f"🌐 Navegando a: {url_login}")
             
-            # Navegar a la página de login
-            self.driver.get(url_login)
-            
-            # Esperar a que la página cargue
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.TAG_NAME, "body"))
-            )
-            
-            logger.info("✅ Página cargada correctamente")
-            
-            # Ejecutar campos de login
-            if url_info.get('campos_login'):
-                logger.info("🔐 Ejecutando campos de login...")
-                
-                for campo in url_info['campos_login']:
-                    selector = campo['selector_html']
-                    valor = campo['valor_dinamico']
-                    
-                    if not valor:
-                        logger.warning(f"⚠️  Campo {selector} sin valor, saltando...")
-                        continue
-                    
-                    try:
-                        # Buscar el elemento con reintento de recarga
-                        elemento = self._buscar_elemento_con_reintento(selector, f"Campo {selector}")
-                        
-                        # Limpiar y escribir valor
-                        elemento.clear()
-                        elemento.send_keys(valor)
-                        
-                        logger.info(f"✅ Campo {selector} completado con: {valor}")
-                        
-                    except TimeoutException:
-                        logger.error(f"❌ No se encontró el campo {selector}")
-                        return False
-                    except Exception as e:
-                        logger.error(f"❌ Error en campo {selector}: {e}")
-                        return False
-            
-            # Ejecutar acciones post-login
-            if url_info.get('acciones_post_login'):
-                logger.info("🎯 Ejecutando acciones post-login...")
-                
-                # Variable para controlar reintentos de login
-                intentos_login = 0
-                max_intentos_login = 2
+            # El login (incluidas las esperas OAuth2 del plugin) tiene su propio presupuesto
+            with plazo(Config.PLAZO_LOGIN_SEGUNDOS, 'login'):
+                # Navegar a la página de login
+                self.driver.get(url_login)
                 
-                for accion in url_info['acciones_post_login']:
-                    tipo = accion['tipo_accion']
-                    selector = accion['selector_html']
-                    
-                    try:
-                        # Buscar el elemento con reintento
-                        elemento = self._buscar_boton_con_reintento(selector, f"Acción {selector}")
-                        
-                        if tipo.lower() == 'click':
-                            elemento.click()
-                            logger.info(f"✅ Click ejecutado en: {selector}")
-                        elif tipo.lower() == 'submit':
-                            elemento.submit()
-                            logger.info(f"✅ Submit ejecutado en: {selector}")
-                        else:
-                            logger.warning(f"⚠️  Tipo de acción no reconocido: {tipo}")
-                        
-                        # Pequeña pausa para que la acción se procese
-                        time.sleep(2)
-                        
-                    except TimeoutException:
-                        logger.error(f"❌ No se pudo ejecutar acción {tipo} en {selector}")
-                        return False
-                    except Exception as e:
-                        logger.error(f"❌ Error ejecutando acción {tipo}: {e}")
-                        return False
-            
-            # Verificar si el login fue exitoso
-            logger.info("🔍 Verificando resultado del login...")
-            
-            # 🚀 ESPERAR A QUE SE COMPLETE TODA LA REDIRECCIÓN OAUTH2
-            logger.info("⏳ Esperando a que se complete la redirección OAuth2...")
-            
-            # Para PAN AMERICAN LIFE DE ECUADOR, esperar a que llegue a la página final
-            if url_info.get('nombre') == 'PAN AMERICAN LIFE DE ECUADOR':
-                logger.info("🇪🇨 Esperando redirección completa para PAN AMERICAN LIFE DE ECUADOR...")
-                
-                # Variable para rastrear cambios de URL
-                url_anterior = self.driver.current_url
-                logger.info(f"📍 URL inicial: {url_anterior}")
+                # Esperar a que la página cargue
+                WebDriverWait(self.driver, acotar(10)).until(
+                    EC.presence_of_element_located((By.TAG_NAME, "body"))
+                )
                 
-                # Variables para control de timeout
-                timeout_authorization_ping = 30  # 30 segundos máximo en authorization.ping
-                tiempo_inicio_ping = None
+                logger.info("✅ Página cargada correctamente")
+                self._verificar_respuesta_portal(url_info.get('nombre'))
                 
-                # Esperar hasta que llegue a la página final (máximo 120 segundos)
-                for intento in range(1, 41):  # 40 intentos * 3 segundos = 120 segundos
-                    time.sleep(3)
-                    
-                    url_actual = self.driver.current_url
-                    titulo_actual = self.driver.title
-                    
-                    # Verificar si la URL cambió
-                    if url_actual != url_anterior:
-                        logger.info(f"🔄 CAMBIO DE URL DETECTADO en intento {intento}/40")
-                        logger.info(f"   📍 URL anterior: {url_anterior}")
-                        logger.info(f"   📍 URL actual: {url_actual}")
-                        logger.info(f"   📄 Título: {titulo_actual}")
-                        url_anterior = url_actual
-                    else:
-                        logger.info(f"   ⏳ Intento {intento}/40 - URL: {url_actual[:80]}...")
-                        logger.info(f"      Título: {titulo_actual}")
-                    
-                    # 🔍 DETECTAR PÁGINA DE AUTORIZACIÓN.PING Y MANEJARLA
-                    if "authorization.ping" in url_actual:
-                        # Iniciar timer si es la primera vez que detectamos esta página
-                        if tiempo_inicio_ping is None:
-                            tiempo_inicio_ping = time.time()
-                            logger.info(f"🔄 ESTADO INTERMEDIO OAUTH2 DETECTADO en intento {intento}")
-                            logger.info(f"   📍 Página de autorización.ping: {url_actual}")
-                            logger.info(f"   📄 Título de la página: {titulo_actual}")
-                            logger.info(f"   ⏳ Esperando continuación del flujo OAuth2...")
-                        else:
-                            # Verificar timeout
-                            tiempo_transcurrido = time.time() - tiempo_inicio_ping
-                            if tiempo_transcurrido > timeout_authorization_ping:
-                                logger.warning(f"⚠️ TIMEOUT en página authorization.ping después de {timeout_authorization_ping} segundos")
-                                logger.warning(f"   🔄 Recargando página para forzar continuación...")
-                                
-                                try:
-                                    self.driver.refresh()
-                                    time.sleep(5)
-                                    tiempo_inicio_ping = None  # Resetear timer
-                                    continue
-                                except Exception as e:
-                                    logger.error(f"❌ Error recargando página: {e}")
-                                    break
-                        
-                        # Buscar elementos para continuar el flujo
-                        logger.info(f"   🔍 Buscando elementos para continuar el flujo...")
-                        try:
-                            # Buscar botones o enlaces para continuar
-                            elementos_continuar = self.driver.find_elements(By.CSS_SELECTOR, 
-                                'input[type="submit"], button, a, input[value*="continuar"], input[value*="siguiente"]')
-                            
-                            if elementos_continuar:
-                                logger.info(f"   ✅ Encontrados {len(elementos_continuar)} elementos para continuar")
-                                for i, elem in enumerate(elementos_continuar):
-                                    try:
-                                        texto = elem.text or elem.get_attribute('value') or elem.get_attribute('title') or 'sin-texto'
-                                        logger.info(f"      {i+1}. {elem.tag_name} - Texto: '{texto}'")
-                                        
-                                        # Intentar hacer clic en el primer elemento clickeable
-                                        if elem.is_enabled() and elem.is_displayed():
-                                            logger.info(f"   🎯 Haciendo clic en elemento {i+1} para continuar...")
-                                            elem.click()
-                                            logger.info(f"   ✅ Click ejecutado, esperando continuación...")
-                                            time.sleep(2)
-                                            tiempo_inicio_ping = None  # Resetear timer después del click
-                                            break
-                                    except Exception as e:
-                                        logger.warning(f"   ⚠️ No se pudo hacer clic en elemento {i+1}: {e}")
-                            else:
-                                logger.info(f"   ℹ️ No se encontraron elementos clickeables en la página de autorización.ping")
-                                
-                        except Exception as e:
-                            logger.warning(f"   ⚠️ Error buscando elementos de continuación: {e}")
-                        
-                        # Continuar esperando
-                        continue
-                    
-                    # 🔍 DETECTAR SI VOLVIMOS AL LOGIN Y REINTENTAR
-                    if "authorization.oauth2" in url_actual and intentos_login < max_intentos_login:
-                        intentos_login += 1
-                        logger.warning(f"🔄 ¡VOLVIMOS AL LOGIN! (Intento {intentos_login}/{max_intentos_login})")
-                        logger.info("🔄 Reintentando login automáticamente...")
-                        
-                        try:
-                            # Esperar a que se recargue la página
-                            time.sleep(2)
-                            
-                            # Reintentar campos de login
-                            logger.info("🔐 Reintentando login - llenando campos...")
-                            if url_info.get('campos_login'):
-                                for campo in url_info['campos_login']:
-                                    selector = campo['selector_html']
-                                    valor = campo['valor_dinamico']
-                                    
-                                    if not valor:
-                                        continue
-                                    
-                                    try:
-                                        elemento = WebDriverWait(self.driver, 10).until(
-                                            EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                                        )
-                                        elemento.clear()
-                                        elemento.send_keys(valor)
-                                        logger.info(f"✅ Campo {selector} completado (reintento)")
-                                    except Exception as e:
-                                        logger.warning(f"⚠️ Error en reintento de campo {selector}: {e}")
-                            
-                            # Reintentar acciones post-login
-                            logger.info("🎯 Reintentando acciones post-login...")
-                            if url_info.get('acciones_post_login'):
-                                for accion in url_info['acciones_post_login']:
-                                    tipo = accion['tipo_accion']
-                                    selector = accion['selector_html']
-                                    
-                                    try:
-                                        elemento = WebDriverWait(self.driver, 10).until(
-                                            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                                        )
-                                        
-                                        if tipo.lower() == 'click':
-                                            elemento.click()
-                                            logger.info(f"✅ Click ejecutado (reintento) en: {selector}")
-                                        elif tipo.lower() == 'submit':
-                                            elemento.submit()
-                                            logger.info(f"✅ Submit ejecutado (reintento) en: {selector}")
-                                        
-                                        time.sleep(2)
-                                        
-                                    except Exception as e:
-                                        logger.warning(f"⚠️ Error en reintento de acción {tipo}: {e}")
-                            
-                            logger.info("✅ Reintento de login completado, continuando...")
-                            
-                        except Exception as e:
-                            logger.error(f"❌ Error en reintento de login: {e}")
-                            if intentos_login >= max_intentos_login:
-                                logger.error("❌ Máximo de reintentos de login alcanzado")
-                                break
-                        
-                        # Continuar con el siguiente intento
-                        continue
-                    
-                    # Verificar si llegamos a la página final de beneficios
-                    if "benefitsdirect.palig.com" in url_actual:
-                        logger.info(f"✅ ¡Primera redirección detectada en intento {intento}!")
-                        logger.info(f"   🎯 Página intermedia alcanzada: {url_actual}")
-                        
-                        # Esperar más tiempo para que se complete la segunda redirección
-                        logger.info("⏳ Esperando segunda redirección a MisPolizasPVR.aspx...")
-                        
-                        # Variable para rastrear cambios de URL en la segunda redirección
-                        url_anterior2 = self.driver.current_url
-                        logger.info(f"      📍 URL inicial segunda redirección: {url_anterior2}")
-                        
-                        for intento2 in range(1, 21):  # Esperar 60 segundos más
-                            time.sleep(3)
-                            url_actual2 = self.driver.current_url
-                            titulo_actual2 = self.driver.title
-                            
-                            # Verificar si la URL cambió en la segunda redirección
-                            if url_actual2 != url_anterior2:
-                                logger.info(f"      🔄 CAMBIO DE URL en segunda redirección - intento 2.{intento2}/20")
-                                logger.info(f"         📍 URL anterior: {url_anterior2}")
-                                logger.info(f"         📍 URL actual: {url_actual2}")
-                                logger.info(f"         📄 Título: {titulo_actual2}")
-                                url_anterior2 = url_actual2
-                            else:
-                                logger.info(f"      ⏳ Intento 2.{intento2}/20 - URL: {url_actual2[:80]}...")
-                                logger.info(f"         📄 Título: {titulo_actual2}")
-                            
-                            # Verificar si llegamos a la página final
-                            if "MisPolizasPVR.aspx" in url_actual2:
-                                logger.info(f"🎯 ¡Redirección OAuth2 COMPLETAMENTE terminada en intento 2.{intento2}!")
-                                logger.info(f"   🎯 Página final alcanzada: {url_actual2}")
-                                break
-                        
-                        break
-                    
-                    # Verificar si estamos en la página de autorización.ping (estado intermedio)
-                    if "authorization.ping" in url_actual:
-                        logger.info(f"🔄 ESTADO INTERMEDIO OAUTH2 DETECTADO en intento {intento}")
-                        logger.info(f"   📍 Página de autorización.ping: {url_actual}")
-                        logger.info(f"   📄 Título de la página: {titulo_actual}")
-                        logger.info("   ⏳ Esperando continuación del flujo OAuth2...")
-                        logger.info("   🔍 Buscando elementos para continuar el flujo...")
-                        
-                        # Verificar si hay algún botón o enlace para continuar
-                        try:
-                            # Buscar botones o enlaces que puedan continuar el flujo
-                            botones_continuar = self.driver.find_elements(By.CSS_SELECTOR, 
-                                'button, input[type="submit"], a, [role="button"], .btn, .button')
-                            
-                            if botones_continuar:
-                                logger.info(f"🔍 Encontrados {len(botones_continuar)} elementos clickeables")
-                                for i, boton in enumerate(botones_continuar[:3]):  # Mostrar solo los primeros 3
-                                    texto = boton.text.strip() or boton.get_attribute('value') or 'sin-texto'
-                                    logger.info(f"   {i+1}. {boton.tag_name} - Texto: '{texto}'")
-                                
-                                # Intentar hacer clic en el primer botón visible
-                                for boton in botones_continuar:
-                                    try:
-                                        if boton.is_displayed() and boton.is_enabled():
-                                            logger.info(f"🎯 Intentando hacer clic en botón: {boton.tag_name} - '{boton.text.strip()}'")
-                                            boton.click()
-                                            logger.info("✅ Clic ejecutado, esperando redirección...")
-                                            time.sleep(3)  # Esperar a que se procese
-                                            break
-                                    except Exception as e:
-                                        logger.info(f"⚠️ No se pudo hacer clic en botón: {e}")
-                                        continue
-                            else:
-                                logger.info("ℹ️ No se encontraron elementos clickeables en la página de autorización.ping")
-                                
-                        except Exception as e:
-                            logger.info(f"ℹ️ Error buscando elementos clickeables: {e}")
-                        
-                        # Continuar esperando, no salir del bucle
-                    
-                    # Verificar si hay algún error
-                    try:
-                        errores = self.driver.find_elements(By.CSS_SELECTOR, '.error, .alert, .message, [class*="error"], [class*="alert"]')
-                        if errores:
-                            for error in errores[:2]:
-                                texto = error.text.strip()
-                                if texto:
-                                    logger.warning(f"⚠️ Error detectado: {texto}")
-                                    
-                                    # Si hay error de autenticación, considerar reintento
-                                    if any(palabra in texto.lower() for palabra in ['invalid', 'incorrect', 'failed', 'error', 'incorrecto', 'invalido', 'fallido']):
-                                        logger.warning("⚠️ Error de autenticación detectado - considerando reintento")
-                    except:
-                        pass
+                # Login propio de la aseguradora (por defecto: campos y acciones configurados en BD)
+                plugin = self.plugin_para(url_info.get('nombre'))
+                if not plugin.login(url_info, datos_mensaje):
+                    return False
                 
-                # Verificar URL final
-                url_final = self.driver.current_url
-                titulo_final = self.driver.title
+                # Verificar si el login fue exitoso
+                logger.info("🔍 Verificando resultado del login...")
                 
-                logger.info(f"✅ REDIRECCIÓN OAUTH2 COMPLETADA!")
-                logger.info(f"   📍 URL final: {url_final}")
-                logger.info(f"   📄 Título final: {titulo_final}")
-                logger.info(f"📊 Resumen de reintentos de login: {intentos_login}/{max_intentos_login}")
+                # 🚀 ESPERAR A QUE SE COMPLETE TODA LA REDIRECCIÓN OAUTH2
+                logger.info("⏳ Esperando a que se complete la redirección OAuth2...")
                 
-                # Verificar si llegamos a la página correcta
-                if "benefitsdirect.palig.com" in url_final:
-                    logger.info("🎯 ¡Página de beneficios alcanzada correctamente!")
-                    
-                    # Verificar si estamos en la página principal en lugar de la de búsqueda
-                    if "MisPolizasPVR.aspx" not in url_final:
-                        logger.info("⚠️ DETECTADA PÁGINA PRINCIPAL - redirigiendo a página de búsqueda...")
-                        logger.info(f"   📍 URL actual (página principal): {url_final}")
-                        logger.info(f"   📄 Título de página principal: {titulo_final}")
-                        
-                        # Esperar un poco más para que se complete cualquier redirección pendiente
-                        time.sleep(3)
-                        
-                        # Verificar si ya se redirigió automáticamente
-                        url_actualizada = self.driver.current_url
-                        if "MisPolizasPVR.aspx" in url_actualizada:
-                            logger.info("✅ Redirección automática completada")
-                        else:
-                            logger.info("🔄 Forzando navegación a página de búsqueda...")
-                            
-                            # Intentar navegar a la página específica de búsqueda
-                            try:
-                                url_busqueda = "https://benefitsdirect.palig.com/Inicio/Contenido/InfoAsegurado/MisPolizasPVR.aspx"
-                                logger.info(f"🌐 NAVEGACIÓN MANUAL A PÁGINA DE BÚSQUEDA")
-                                logger.info(f"   📍 URL objetivo: {url_busqueda}")
-                                logger.info(f"   📍 URL antes de navegación: {self.driver.current_url}")
-                                
-                                self.driver.get(url_busqueda)
-                                time.sleep(5)  # Esperar a que cargue
-                                
-                                # Verificar que la navegación fue exitosa
-                                url_despues_navegacion = self.driver.current_url
-                                titulo_despues_navegacion = self.driver.title
-                                
-                                logger.info(f"   📍 URL después de navegación: {url_despues_navegacion}")
-                                logger.info(f"   📄 Título después de navegación: {titulo_despues_navegacion}")
-                                
-                                if "MisPolizasPVR.aspx" in url_despues_navegacion:
-                                    logger.info("✅ PÁGINA DE BÚSQUEDA ALCANZADA EXITOSAMENTE")
-                                    logger.info(f"   📍 URL final: {url_despues_navegacion}")
-                                    logger.info(f"   📄 Título: {titulo_despues_navegacion}")
-                                else:
-                                    logger.warning("⚠️ NAVEGACIÓN NO COMPLETADA - intentando alternativas...")
-                                    logger.info(f"   📍 URL actual (no es la esperada): {url_despues_navegacion}")
-                                    
-                                    # Intentar con URL alternativa o buscar enlaces en la página principal
-                                    try:
-                                        logger.info("🔍 ESTRATEGIA ALTERNATIVA: Buscando enlaces en la página actual...")
-                                        logger.info(f"   📍 URL actual antes de buscar enlaces: {self.driver.current_url}")
-                                        
-                                        # Buscar enlaces que puedan llevar a la página de búsqueda
-                                        enlaces_busqueda = self.driver.find_elements(By.CSS_SELECTOR, 
-                                            'a[href*="MisPolizas"], a[href*="InfoAsegurado"]')
-                                        
-                                        if enlaces_busqueda:
-                                            logger.info(f"🔍 Encontrados {len(enlaces_busqueda)} enlaces potenciales")
-                                            for i, enlace in enumerate(enlaces_busqueda[:3]):
-                                                texto = enlace.text.strip()
-                                                href = enlace.get_attribute('href')
-                                                logger.info(f"   {i+1}. '{texto}' -> {href}")
-                                            
-                                            # Intentar hacer clic en el primer enlace relevante
-                                            for enlace in enlaces_busqueda:
-                                                try:
-                                                    if enlace.is_displayed() and enlace.is_enabled():
-                                                        logger.info(f"🎯 Intentando clic en enlace: '{enlace.text.strip()}'")
-                                                        logger.info(f"   📍 URL antes del clic: {self.driver.current_url}")
-                                                        
-                                                        enlace.click()
-                                                        time.sleep(5)
-                                                        
-                                                        url_despues_clic = self.driver.current_url
-                                                        logger.info(f"   📍 URL después del clic: {url_despues_clic}")
-                                                        
-                                                        if "MisPolizasPVR.aspx" in url_despues_clic:
-                                                            logger.info("✅ NAVEGACIÓN POR ENLACE EXITOSA")
-                                                            logger.info(f"   📍 URL final: {url_despues_clic}")
-                                                            break
-                                                        else:
-                                                            logger.info(f"⚠️ Clic ejecutado pero no llegó a la página esperada")
-                                                except Exception as e:
-                                                    logger.info(f"⚠️ No se pudo hacer clic en enlace: {e}")
-                                                    continue
-                                        
-                                        # Si no hay enlaces o no funcionaron, intentar navegación directa
-                                        if "MisPolizasPVR.aspx" not in self.driver.current_url:
-                                            logger.info("🔄 ÚLTIMO INTENTO: Navegación directa...")
-                                            logger.info(f"   📍 URL actual antes de navegación directa: {self.driver.current_url}")
-                                            
-                                            self.driver.get(url_busqueda)
-                                            time.sleep(5)
-                                            
-                                            url_despues_directa = self.driver.current_url
-                                            logger.info(f"   📍 URL después de navegación directa: {url_despues_directa}")
-                                            
-                                            if "MisPolizasPVR.aspx" in url_despues_directa:
-                                                logger.info("✅ NAVEGACIÓN DIRECTA EXITOSA")
-                                                logger.info(f"   📍 URL final: {url_despues_directa}")
-                                            else:
-                                                logger.error("❌ NO SE PUDO ALCANZAR LA PÁGINA DE BÚSQUEDA")
-                                                logger.error(f"   📍 URL final (no es la esperada): {url_despues_directa}")
-                                                
-                                    except Exception as e:
-                                        logger.error(f"❌ Error en navegación alternativa: {e}")
-                                        
-                            except Exception as e:
-                                logger.error(f"❌ Error en navegación manual: {e}")
-                    else:
-                        logger.info("✅ Ya estamos en la página de búsqueda correcta")
-                        
-                else:
-                    logger.warning("⚠️ No se llegó a la página de beneficios esperada")
-                    logger.info("🔄 Intentando navegación manual completa...")
-                    
-                    # Intentar navegar manualmente si no llegamos automáticamente
-                    try:
-                        url_beneficios = "https://benefitsdirect.palig.com/Inicio/Contenido/InfoAsegurado/MisPolizasPVR.aspx"
-                        logger.info(f"🌐 NAVEGACIÓN MANUAL COMPLETA")
-                        logger.info(f"   📍 URL objetivo: {url_beneficios}")
-                        logger.info(f"   📍 URL actual antes de navegación manual: {self.driver.current_url}")
-                        
-                        self.driver.get(url_beneficios)
-                        time.sleep(5)  # Esperar a que cargue
-                        
-                        url_actual_manual = self.driver.current_url
-                        titulo_actual_manual = self.driver.title
-                        logger.info(f"✅ NAVEGACIÓN MANUAL COMPLETADA")
-                        logger.info(f"   📍 URL después de navegación manual: {url_actual_manual}")
-                        logger.info(f"   📄 Título después de navegación manual: {titulo_actual_manual}")
-                        
-                        if "MisPolizasPVR.aspx" in url_actual_manual:
-                            logger.info("🎯 ¡PÁGINA DE BENEFICIOS ALCANZADA MANUALMENTE!")
-                            logger.info(f"   📍 URL final: {url_actual_manual}")
-                        else:
-                            logger.warning("⚠️ NO SE PUDO ALCANZAR LA PÁGINA DE BENEFICIOS")
-                            logger.warning(f"   📍 URL final (no es la esperada): {url_actual_manual}")
-                            
-                    except Exception as e:
-                        logger.error(f"❌ Error en navegación manual: {e}")
+                # Esperas propias del portal (p.ej. redirecciones OAuth2 de PAN AMERICAN LIFE DE ECUADOR)
+                plugin.post_login(url_info)
             
             # Obtener la URL actual para verificar si cambió
             url_actual = self.driver.current_url
             titulo_pagina = self.driver.title
             
+            medicion.terminar()
+            medicion = metricas.iniciar('navegacion')
+            
             logger.info(f"✅ Login completado exitosamente!")
             logger.info(f"   📍 URL actual: {url_actual}")
             logger.info(f"   📄 Título de la página: {titulo_pagina}")
@@ -621,160 +365,12 @@ class AseguradoraProcessor:
             # 🚀 NAVEGAR A LA PÁGINA DE BÚSQUEDA DESPUÉS DEL LOGIN
             logger.info("🔄 VERIFICANDO ESTADO DE LA PÁGINA DE BÚSQUEDA DESPUÉS DEL LOGIN...")
             
-            # Para PAN AMERICAN LIFE DE ECUADOR, verificar y navegar a la página específica
-            if url_info.get('nombre') == 'PAN AMERICAN LIFE DE ECUADOR':
-                try:
-                    # Verificar si ya estamos en la página correcta
-                    url_actual = self.driver.current_url
-                    titulo_actual = self.driver.title
-                    
-                    logger.info(f"📍 VERIFICACIÓN POST-LOGIN:")
-                    logger.info(f"   📍 URL actual: {url_actual}")
-                    logger.info(f"   📄 Título actual: {titulo_actual}")
-                    
-                    if "MisPolizasPVR.aspx" in url_actual:
-                        logger.info("✅ YA ESTAMOS EN LA PÁGINA DE BÚSQUEDA CORRECTA")
-                        logger.info(f"   📍 URL confirmada: {url_actual}")
-                    elif "benefitsdirect.palig.com" in url_actual:
-                        logger.info("⚠️ DETECTADA PÁGINA PRINCIPAL DE BENEFICIOS - redirigiendo a búsqueda...")
-                        logger.info(f"   📍 URL de página principal: {url_actual}")
-                        logger.info(f"   📄 Título de página principal: {titulo_actual}")
-                        
-                        # Intentar múltiples estrategias para llegar a la página de búsqueda
-                        estrategias_exitosas = False
-                        
-                        # Estrategia 1: Navegación directa
-                        try:
-                            url_busqueda = "https://benefitsdirect.palig.com/Inicio/Contenido/InfoAsegurado/MisPolizasPVR.aspx"
-                            logger.info(f"🔄 ESTRATEGIA 1: Navegación directa")
-                            logger.info(f"   📍 URL objetivo: {url_busqueda}")
-                            logger.info(f"   📍 URL actual antes de estrategia 1: {self.driver.current_url}")
-                            
-                            self.driver.get(url_busqueda)
-                            time.sleep(5)
-                            
-                            url_despues_estrategia1 = self.driver.current_url
-                            logger.info(f"   📍 URL después de estrategia 1: {url_despues_estrategia1}")
-                            
-                            if "MisPolizasPVR.aspx" in url_despues_estrategia1:
-                                logger.info("✅ ESTRATEGIA 1 EXITOSA - Página de búsqueda alcanzada")
-                                logger.info(f"   📍 URL final: {url_despues_estrategia1}")
-                                estrategias_exitosas = True
-                            else:
-                                logger.warning("⚠️ ESTRATEGIA 1 FALLÓ")
-                                logger.warning(f"   📍 URL final (no es la esperada): {url_despues_estrategia1}")
-                        except Exception as e:
-                            logger.warning(f"⚠️ Error en estrategia 1: {e}")
-                        
-                        # Estrategia 2: Buscar enlaces en la página principal
-                        if not estrategias_exitosas:
-                            try:
-                                logger.info("🔄 ESTRATEGIA 2: Buscando enlaces en la página principal...")
-                                logger.info(f"   📍 URL actual antes de estrategia 2: {self.driver.current_url}")
-                                
-                                # Buscar enlaces que puedan llevar a la página de búsqueda
-                                enlaces_potenciales = self.driver.find_elements(By.CSS_SELECTOR, 
-                                    'a[href*="MisPolizas"], a[href*="InfoAsegurado"], a[href*="Contenido"], a[href*="Inicio"]')
-                                
-                                if enlaces_potenciales:
-                                    logger.info(f"🔍 Encontrados {len(enlaces_potenciales)} enlaces potenciales")
-                                    
-                                    for i, enlace in enumerate(enlaces_potenciales[:5]):
-                                        texto = enlace.text.strip()
-                                        href = enlace.get_attribute('href')
-                                        logger.info(f"   {i+1}. '{texto}' -> {href}")
-                                    
-                                    # Intentar hacer clic en enlaces relevantes
-                                    for enlace in enlaces_potenciales:
-                                        try:
-                                            if enlace.is_displayed() and enlace.is_enabled():
-                                                texto_enlace = enlace.text.strip().lower()
-                                                href_enlace = enlace.get_attribute('href')
-                                                
-                                                # Verificar si el enlace parece relevante
-                                                if any(palabra in texto_enlace for palabra in ['póliza', 'poliza', 'asegurado', 'beneficios', 'información']):
-                                                    logger.info(f"🎯 Intentando clic en enlace relevante: '{enlace.text.strip()}'")
-                                                    logger.info(f"   📍 URL antes del clic: {self.driver.current_url}")
-                                                    
-                                                    enlace.click()
-                                                    time.sleep(5)
-                                                    
-                                                    url_despues_clic = self.driver.current_url
-                                                    logger.info(f"   📍 URL después del clic: {url_despues_clic}")
-                                                    
-                                                    if "MisPolizasPVR.aspx" in url_despues_clic:
-                                                        logger.info("✅ ESTRATEGIA 2 EXITOSA - Navegación por enlace")
-                                                        logger.info(f"   📍 URL final: {url_despues_clic}")
-                                                        estrategias_exitosas = True
-                                                        break
-                                                    else:
-                                                        logger.info("⚠️ Enlace no llevó a la página correcta, continuando...")
-                                                        logger.info(f"   📍 URL actual (no es la esperada): {url_despues_clic}")
-                                            else:
-                                                logger.info(f"ℹ️ Enlace no disponible: '{enlace.text.strip()}'")
-                                        except Exception as e:
-                                            logger.info(f"⚠️ Error haciendo clic en enlace: {e}")
-                                            continue
-                                else:
-                                    logger.info("ℹ️ No se encontraron enlaces potenciales")
-                            except Exception as e:
-                                logger.warning(f"⚠️ Error en estrategia 2: {e}")
-                        
-                        # Estrategia 3: Último intento con navegación forzada
-                        if not estrategias_exitosas:
-                            try:
-                                logger.info("🔄 ESTRATEGIA 3: Último intento con navegación forzada...")
-                                logger.info(f"   📍 URL actual antes de estrategia 3: {self.driver.current_url}")
-                                
-                                # Intentar con diferentes variaciones de la URL
-                                urls_alternativas = [
-                                    "https://benefitsdirect.palig.com/Inicio/Contenido/InfoAsegurado/MisPolizasPVR.aspx",
-                                    "https://benefitsdirect.palig.com/Inicio/Contenido/InfoAsegurado/",
-                                    "https://benefitsdirect.palig.com/Inicio/Contenido/"
-                                ]
-                                
-                                for i, url_alt in enumerate(urls_alternativas, 1):
-                                    try:
-                                        logger.info(f"   🔄 Probando URL alternativa {i}/3: {url_alt}")
-                                        logger.info(f"      📍 URL antes de probar alternativa {i}: {self.driver.current_url}")
-                                        
-                                        self.driver.get(url_alt)
-                                        time.sleep(5)
-                                        
-                                        url_despues_alternativa = self.driver.current_url
-                                        logger.info(f"      📍 URL después de alternativa {i}: {url_despues_alternativa}")
-                                        
-                                        if "MisPolizasPVR.aspx" in url_despues_alternativa:
-                                            logger.info(f"✅ ESTRATEGIA 3 EXITOSA con URL alternativa {i}: {url_alt}")
-                                            logger.info(f"   📍 URL final: {url_despues_alternativa}")
-                                            estrategias_exitosas = True
-                                            break
-                                        else:
-                                            logger.info(f"   ⚠️ URL alternativa {i} no llevó a la página esperada")
-                                    except Exception as e:
-                                        logger.warning(f"⚠️ Error con URL alternativa {i} ({url_alt}): {e}")
-                                        continue
-                            except Exception as e:
-                                logger.warning(f"⚠️ Error en estrategia 3: {e}")
-                        
-                        # Verificar resultado final
-                        if estrategias_exitosas:
-                            url_final = self.driver.current_url
-                            titulo_final = self.driver.title
-                            logger.info("🎯 ¡PÁGINA DE BÚSQUEDA ALCANZADA EXITOSAMENTE!")
-                            logger.info(f"   📍 URL final: {url_final}")
-                            logger.info(f"   📄 Título final: {titulo_final}")
-                        else:
-                            url_final_fallida = self.driver.current_url
-                            titulo_final_fallida = self.driver.title
-                            logger.error("❌ NO SE PUDO ALCANZAR LA PÁGINA DE BÚSQUEDA CON NINGUNA ESTRATEGIA")
-                            logger.error(f"   📍 URL final (fallida): {url_final_fallida}")
-                            logger.error(f"   📄 Título final (fallido): {titulo_final_fallida}")
-                            logger.info("🔄 Continuando con la página actual...")
-                    
-                except Exception as e:
-                    logger.warning(f"⚠️ Error en navegación a página de búsqueda: {e}")
-                    logger.info("🔄 Continuando con la página actual...")
+            # Cada plugin sabe cómo llegar a su página de búsqueda
+            with plazo(Config.PLAZO_BUSQUEDA_SEGUNDOS, 'navegacion'):
+                plugin.navegar_busqueda(url_info)
+                self._verificar_respuesta_portal(url_info.get('nombre'))
+            
+            medicion.terminar()
             
             # 🚀 CAPTURAR INFORMACIÓN DE LA PANTALLA POST-LOGIN
             logger.info("📸 Capturando información de la pantalla post-login...")
@@ -785,6 +381,8 @@ class AseguradoraProcessor:
             
             return True
             
+        except PlazoAgotado:
+            raise
         except Exception as e:
             error_msg = str(e)
             logger.error(f"❌ Error ejecutando login: {e}")
@@ -792,13 +390,16 @@ class AseguradoraProcessor:
             # Detectar errores de sesión desconectada
             if "target frame detached" in error_msg or "invalid session id" in error_msg or "session deleted" in error_msg:
                 logger.warning("🔄 Error de sesión desconectada detectado")
+                if reintento:
+                    logger.error("❌ La sesión recreada también se desconectó - no se reintenta de nuevo")
+                    return False
                 
                 # Intentar recrear la sesión del navegador
                 if self._recrear_sesion_navegador():
                     logger.info("🔄 Sesión recreada - Reintentando login...")
                     # Reintentar el login una vez más
                     try:
-                        return self._ejecutar_login_aseguradora(url_info, nombre_aseguradora)
+                        return self.execute_login(url_info, datos_mensaje, reintento=True)
                     except Exception as e2:
                         logger.error(f"❌ Error en reintento de login: {e2}")
                         return False
@@ -807,187 +408,27 @@ class AseguradoraProcessor:
                     return False
             else:
                 return False
+        finally:
+            # Los retornos anticipados (campo o acción no encontrados) cuentan como error
+            medicion.terminar('error')
     
     def capturar_informacion_pantalla(self, id_url, nombre_aseguradora=None, datos_mensaje=None):
         """Captura información de la pantalla post-login y la almacena en la base de datos"""
         try:
             logger.info("📸 Iniciando captura de información de la pantalla...")
+            self.politica_reciclaje.registrar_pagina()
             
-            # Lógica específica para PAN AMERICAN LIFE DE ECUADOR
-            if nombre_aseguradora == 'PAN AMERICAN LIFE DE ECUADOR':
-                return self._capturar_informacion_pale_ec(id_url, datos_mensaje)
-            
-            # Lógica genérica para otras aseguradoras
-            return self._capturar_informacion_generica(id_url)
+            # Búsqueda propia del plugin (el genérico usa _capturar_informacion_generica)
+            with plazo(Config.PLAZO_BUSQUEDA_SEGUNDOS, 'busqueda'):
+                return self.plugin_para(nombre_aseguradora).buscar(id_url, datos_mensaje)
             
+        except PlazoAgotado:
+            raise
         except Exception as e:
             logger.error(f"❌ Error en captura de información: {e}")
             return False
     
-    def _capturar_informacion_pale_ec(self, id_url, datos_mensaje):
-        """Captura información específica para PAN AMERICAN LIFE DE ECUADOR"""
-        try:
-            logger.info("🇪🇨 Captura específica para PAN AMERICAN LIFE DE ECUADOR")
-            logger.info("=" * 60)
-            
-            # Obtener configuración de campos a capturar
-            campos_query = """
-                SELECT NombreCampo, TipoCampo, SelectorCSS, Orden, Obligatorio, BotonEnvio
-                FROM informacion_capturada 
-                WHERE IdUrl = :id_url AND Activo = 1
-                ORDER BY Orden
-            """
-            
-            campos_captura = self.db_manager.execute_query(campos_query, {'id_url': id_url})
-            
-            if not campos_captura:
-                logger.info("ℹ️ No hay campos configurados para capturar")
-                return True
-            
-            logger.info(f"🎯 Campos a capturar: {len(campos_captura)}")
-            for campo in campos_captura:
-                logger.info(f"   • {campo['NombreCampo']}: {campo['SelectorCSS']} (Botón: {campo.get('BotonEnvio', 'default')})")
-            
-            # Obtener NumDocIdentidad del mensaje
-            num_doc_identidad = datos_mensaje.get('NumDocIdentidad') if datos_mensaje else None
-            if not num_doc_identidad:
-                logger.warning("⚠️ No se encontró NumDocIdentidad en el mensaje")
-                logger.info(f"📋 Datos del mensaje disponibles: {list(datos_mensaje.keys()) if datos_mensaje else 'None'}")
-                return False
-            
-            # 🆔 CONSTRUIR NOMBRE COMPLETO DEL CLIENTE
-            nombre_completo = self._construir_nombre_completo(datos_mensaje)
-            if nombre_completo:
-                logger.info(f"👤 Nombre completo del cliente: {nombre_completo}")
-            else:
-                logger.warning("⚠️ No se pudo construir el nombre completo del cliente")
-            
-            logger.info(f"🆔 Número de documento a buscar: {num_doc_identidad}")
-            logger.info(f"🌐 URL actual: {self.driver.current_url}")
-            logger.info("=" * 60)
-            
-            # Procesar cada campo
-            for campo in campos_captura:
-                nombre_campo = campo['NombreCampo']
-                tipo_campo = campo['TipoCampo']
-                selector_css = campo['SelectorCSS']
-                orden = campo['Orden']
-                obligatorio = campo['Obligatorio']
-                boton_envio = campo.get('BotonEnvio', 'button[type="submit"]')
-                
-                try:
-                    logger.info(f"🔍 Procesando campo: {nombre_campo} ({tipo_campo})")
-                    logger.info(f"   📍 Selector CSS: {selector_css}")
-                    logger.info(f"   🎯 Botón de envío: {boton_envio}")
-                    
-                    if tipo_campo.lower() == 'input':
-                        # Buscar el campo de entrada
-                        logger.info(f"🔍 Buscando elemento con selector: {selector_css}")
-                        elemento = self._buscar_elemento_con_reintento(selector_css, f"Campo {selector_css}")
-                        
-                        # Mostrar información del elemento encontrado
-                        logger.info(f"✅ Elemento encontrado: {elemento.tag_name}")
-                        logger.info(f"   📝 Atributos: id='{elemento.get_attribute('id')}', name='{elemento.get_attribute('name')}', class='{elemento.get_attribute('class')}'")
-                        
-                        # Limpiar y llenar con NumDocIdentidad
-                        elemento.clear()
-                        elemento.send_keys(num_doc_identidad)
-                        logger.info(f"✅ Campo {nombre_campo} llenado con: {num_doc_identidad}")
-                        
-                        # Verificar que se llenó correctamente
-                        valor_actual = elemento.get_attribute('value')
-                        logger.info(f"✅ Valor actual del campo: '{valor_actual}'")
-                        
-                        # Hacer clic en el botón de envío
-                        logger.info(f"🎯 Buscando botón de envío con selector: {boton_envio}")
-                        logger.info(f"   📍 URL actual antes de buscar botón: {self.driver.current_url}")
-                        
-                        try:
-                            boton = self._buscar_boton_con_reintento(boton_envio, f"Botón {boton_envio}")
-                            logger.info(f"✅ Botón encontrado: {boton.tag_name} - Texto: '{boton.text}'")
-                            logger.info(f"   📍 URL antes del clic en botón: {self.driver.current_url}")
-                            
-                            boton.click()
-                            logger.info(f"🎯 Botón de envío clickeado exitosamente")
-                            
-                            # Esperar a que se procese la búsqueda
-                            logger.info("⏳ Esperando procesamiento de la búsqueda...")
-                            time.sleep(5)  # Aumentar tiempo de espera
-                            
-                            # Verificar que la página se haya actualizado
-                            logger.info("🔍 Verificando que la búsqueda se haya procesado...")
-                            logger.info(f"   📍 URL después del clic en botón: {self.driver.current_url}")
-                            
-                            try:
-                                # Esperar a que aparezca algún elemento que indique que la búsqueda se procesó
-                                WebDriverWait(self.driver, 15).until(
-                                    lambda driver: driver.execute_script("return document.readyState") == "complete"
-                                )
-                                logger.info("✅ Página completamente cargada después de la búsqueda")
-                                logger.info(f"   📍 URL final después de búsqueda: {self.driver.current_url}")
-                            except:
-                                logger.info("ℹ️ Página cargada (timeout de readyState)")
-                                logger.info(f"   📍 URL actual (timeout): {self.driver.current_url}")
-                            
-                        except Exception as e:
-                            logger.warning(f"⚠️ No se pudo hacer clic en el botón: {e}")
-                            logger.info("🔄 Intentando con selectores alternativos...")
-                            
-                            # Intentar con selectores alternativos
-                            selectores_alternativos = [
-                                'button[type="submit"]',
-                                'input[type="submit"]',
-                                '.btn-primary',
-                                '.btn-buscar',
-                                'button:contains("Buscar")',
-                                'button:contains("Consultar")'
-                            ]
-                            
-                            for selector_alt in selectores_alternativos:
-                                try:
-                                    boton_alt = WebDriverWait(self.driver, 5).until(
-                                        EC.element_to_be_clickable((By.CSS_SELECTOR, selector_alt))
-                                    )
-                                    boton_alt.click()
-                                    logger.info(f"✅ Botón alternativo clickeado: {selector_alt}")
-                                    time.sleep(5)  # Aumentar tiempo de espera
-                                    break
-                                except:
-                                    continue
-                        
-                        # Capturar la tabla de resultados
-                        logger.info("📊 Iniciando captura de tabla de resultados...")
-                        return self._capturar_tabla_resultados_pale_ec(nombre_completo, datos_mensaje)
-                        
-                    else:
-                        logger.info(f"ℹ️ Campo {nombre_campo} no es de tipo input, saltando...")
-                        
-                except TimeoutException:
-                    if obligatorio:
-                        logger.error(f"❌ Campo obligatorio {nombre_campo} no encontrado: {selector_css}")
-                        logger.info(f"🔍 Elementos disponibles en la página:")
-                        try:
-                            elementos_input = self.driver.find_elements(By.CSS_SELECTOR, 'input')
-                            logger.info(f"   📝 Inputs encontrados: {len(elementos_input)}")
-                            for i, elem in enumerate(elementos_input[:5]):  # Mostrar solo los primeros 5
-                                logger.info(f"      {i+1}. id='{elem.get_attribute('id')}', name='{elem.get_attribute('name')}', placeholder='{elem.get_attribute('placeholder')}'")
-                        except:
-                            pass
-                        return False
-                    else:
-                        logger.warning(f"⚠️ Campo opcional {nombre_campo} no encontrado: {selector_css}")
-                except Exception as e:
-                    logger.error(f"❌ Error procesando campo {nombre_campo}: {e}")
-                    if obligatorio:
-                        return False
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"❌ Error en captura específica PALE_EC: {e}")
-            return False
-    
-    def _construir_nombre_completo(self, datos_mensaje):
+    def _construir_nombre_completo(self, datos_mensaje, registrar=True):
         """Construye el nombre completo del cliente concatenando las columnas del mensaje RabbitMQ"""
         try:
             # Obtener las columnas de nombre del mensaje RabbitMQ
@@ -999,7 +440,9 @@ class AseguradoraProcessor:
             # Construir nombre completo con espacios entre columnas
             nombre_completo = f"{primer_nombre} {segundo_nombre} {primer_apellido} {segundo_apellido}".strip()
             
-            if nombre_completo:
+            if nombre_completo and not registrar:
+                return nombre_completo
+            elif nombre_completo:
                 logger.info(f"🔍 Construyendo nombre completo desde RabbitMQ:")
                 logger.info(f"   • PersonaPrimerNombre: '{primer_nombre}'")
                 logger.info(f"   • PersonaSegundoNombre: '{segundo_nombre}'")
@@ -1015,8 +458,9 @@ class AseguradoraProcessor:
             logger.error(f"❌ Error construyendo nombre completo: {e}")
             return None
     
-    def _capturar_tabla_resultados_pale_ec(self, nombre_completo_cliente=None, datos_mensaje=None):
+    def _capturar_tabla_resultados(self, nombre_completo_cliente=None, datos_mensaje=None):
         """Captura la tabla de resultados con clase GridViewStylePV y busca el cliente específico"""
+        medicion = None
         try:
             logger.info("📊 Capturando tabla de resultados...")
             logger.info("=" * 60)
@@ -1027,90 +471,109 @@ class AseguradoraProcessor:
             
             # Buscar la tabla con clase GridViewStylePV
             logger.info("🔍 Buscando tabla con clase 'GridViewStylePV'...")
-            tabla = WebDriverWait(self.driver, 10).until(
+            tabla = WebDriverWait(self.driver, acotar(10)).until(
                 EC.presence_of_element_located((By.CSS_SELECTOR, 'table.GridViewStylePV'))
             )
             
             logger.info("✅ Tabla GridViewStylePV encontrada")
             logger.info(f"   📍 Ubicación de la tabla en la página")
             
-            # Obtener todas las filas de la tabla
-            filas = tabla.find_elements(By.CSS_SELECTOR, 'tr')
-            logger.info(f"📋 Total de filas encontradas: {len(filas)}")
+            medicion = metricas.iniciar('extraccion_tabla')
+            
+            # Extraer encabezados y filas con la estrategia configurada (webdriver, js o lxml)
+            resultados = extraer_tabla(self.driver, Config.TABLA_RESULTADOS_ESTRATEGIA, tabla=tabla)
+            logger.info(f"📋 Total de filas encontradas: {resultados.total_filas} (estrategia: {Config.TABLA_RESULTADOS_ESTRATEGIA})")
             
-            if len(filas) <= 1:  # Solo header o tabla vacía
+            if resultados.total_filas <= 1:  # Solo header o tabla vacía
                 logger.info("ℹ️ Tabla sin resultados o solo con encabezados")
                 logger.info(f"   📍 URL confirmada: {self.driver.current_url}")
+                medicion.terminar('vacia')
+                self._recordar_negativo(nombre_completo_cliente, datos_mensaje, SIN_RESULTADOS)
                 return True
             
-            # Obtener encabezados (primera fila)
-            encabezados = []
-            if filas:
-                celdas_header = filas[0].find_elements(By.CSS_SELECTOR, 'th, td')
-                encabezados = [celda.text.strip() for celda in celdas_header if celda.text.strip()]
-                logger.info(f"📝 Encabezados de la tabla ({len(encabezados)} columnas):")
-                for i, encabezado in enumerate(encabezados, 1):
-                    logger.info(f"   {i}. {encabezado}")
+            # Encabezados (primera fila)
+            encabezados = resultados.encabezados
+            logger.info(f"📝 Encabezados de la tabla ({len(encabezados)} columnas): {', '.join(encabezados)}")
             
             logger.info("=" * 60)
             
             # Procesar filas de datos (excluyendo la primera si es header)
             cliente_encontrado = None
+            cliente_inactivo = False
             logger.info("📄 Procesando filas de datos para buscar cliente específico...")
             
-            for i, fila in enumerate(filas[1:], 1):
-                celdas = fila.find_elements(By.CSS_SELECTOR, 'td')
-                if celdas:
-                    fila_data = {}
-                    
-                    # Construir datos de la fila
-                    for j, celda in enumerate(celdas):
-                        if j < len(encabezados):
-                            encabezado = encabezados[j]
-                            valor = celda.text.strip()
-                            fila_data[encabezado] = valor
+            # Con el caché de resultados activo se leen todas las filas (titular y dependientes)
+            # para responder sin otra búsqueda a los mensajes de la familia con el mismo documento
+            leer_todas = bool(self.cache_resultados.activo and datos_mensaje)
+            filas_busqueda = []
+            
+            for i, fila_data in enumerate(resultados.filas, 1):
+                if fila_data:
+                    filas_busqueda.append(fila_data)
                     
-                    if fila_data:
-                        # 🔍 BUSCAR CLIENTE ESPECÍFICO SI SE PROPORCIONA NOMBRE
-                        if nombre_completo_cliente and self._es_cliente_buscado(fila_data, nombre_completo_cliente):
-                            if self._validar_cliente_activo(fila_data):
-                                cliente_encontrado = fila_data
-                                logger.info(f"🎯 ¡CLIENTE ENCONTRADO Y VALIDADO en fila {i}!")
-                                logger.info(f"   ✅ Nombre: '{fila_data.get('Nombre del Paciente', 'N/A')}'")
-                                logger.info(f"   ✅ Status: '{fila_data.get('Status', 'N/A')}'")
-                                logger.info(f"   📋 Datos del cliente:")
-                                logger.info(f"      • Póliza: {fila_data.get('Póliza', 'N/A')}")
-                                logger.info(f"      • Certificado: {fila_data.get('Certificado', 'N/A')}")
-                                logger.info(f"      • No. Dependiente: {fila_data.get('No. Dependiente', 'N/A')}")
-                                logger.info(f"      • Relación: {fila_data.get('Relacion', 'N/A')}")
-                                logger.info(f"      • Tipo de Póliza: {fila_data.get('Tipo de Póliza', 'N/A')}")
-                                
-                                # 🚀 GUARDAR INFORMACIÓN EN BASE DE DATOS INMEDIATAMENTE
-                                if datos_mensaje:
-                                    logger.info("💾 Guardando información del cliente en base de datos...")
-                                    if self._guardar_cliente_en_bd(fila_data, datos_mensaje):
-                                        logger.info("✅ Cliente guardado exitosamente en base de datos")
-                                    else:
-                                        logger.error("❌ Error guardando cliente en base de datos")
-                                else:
-                                    logger.warning("⚠️ No hay datos del mensaje para guardar en BD")
-                                
-                                # Una vez encontrado el cliente, no necesitamos seguir procesando
+                    # 🔍 BUSCAR CLIENTE ESPECÍFICO SI SE PROPORCIONA NOMBRE
+                    if cliente_encontrado:
+                        continue
+                    if nombre_completo_cliente and self._es_cliente_buscado(fila_data, nombre_completo_cliente):
+                        if self._validar_cliente_activo(fila_data):
+                            cliente_encontrado = fila_data
+                            logger.info(f"🎯 ¡CLIENTE ENCONTRADO Y VALIDADO en fila {i}!")
+                            logger.info(f"   ✅ Nombre: '{fila_data.get('Nombre del Paciente', 'N/A')}'")
+                            logger.info(f"   ✅ Status: '{fila_data.get('Status', 'N/A')}'")
+                            logger.info(f"   📋 Datos del cliente:")
+                            logger.info(f"      • Póliza: {fila_data.get('Póliza', 'N/A')}")
+                            logger.info(f"      • Certificado: {fila_data.get('Certificado', 'N/A')}")
+                            logger.info(f"      • No. Dependiente: {fila_data.get('No. Dependiente', 'N/A')}")
+                            logger.info(f"      • Relación: {fila_data.get('Relacion', 'N/A')}")
+                            logger.info(f"      • Tipo de Póliza: {fila_data.get('Tipo de Póliza', 'N/A')}")
+                            
+                            # Una vez encontrado el cliente, no necesitamos seguir procesando
+                            if not leer_todas:
                                 logger.info("✅ Cliente encontrado - deteniendo búsqueda")
                                 break
-                            else:
-                                logger.warning(f"⚠️ Cliente encontrado pero NO está activo en fila {i}")
-                                logger.warning(f"   ❌ Status: '{fila_data.get('Status', 'N/A')}'")
-                                # Continuar buscando en caso de que haya otro cliente con el mismo nombre
                         else:
-                            # Solo mostrar información si no estamos buscando un cliente específico
-                            if not nombre_completo_cliente:
-                                logger.info(f"📄 Fila {i}: {fila_data.get('Nombre del Paciente', 'N/A')}")
-                    
-                    # Si encontramos el cliente, salir del bucle
-                    if cliente_encontrado:
-                        break
-            
+                            logger.warning(f"⚠️ Cliente encontrado pero NO está activo en fila {i}")
+                            logger.warning(f"   ❌ Status: '{fila_data.get('Status', 'N/A')}'")
+                            cliente_inactivo = True
+                            # Continuar buscando en caso de que haya otro cliente con el mismo nombre
+                    else:
+                        # Solo mostrar información si no estamos buscando un cliente específico
+                        if not nombre_completo_cliente and logger.isEnabledFor(logging.DEBUG) and muestreo_logs.permitir('fila_tabla'):
+                            logger.debug(f"📄 Fila {i}: {fila_data.get('Nombre del Paciente', 'N/A')}")
+                
+                # Si encontramos el cliente, salir del bucle
+                if cliente_encontrado and not leer_todas:
+                    break
+            
+            # La extracción se mide aparte del guardado para no mezclar latencia del portal y de la BD
+            medicion.terminar('encontrado' if cliente_encontrado else 'no_encontrado')
+            
+            if leer_todas:
+                self.cache_resultados.guardar(datos_mensaje.get('NombreCompleto'),
+                                              datos_mensaje.get('NumDocIdentidad'), filas_busqueda)
+                logger.info(f"🗃️ {len(filas_busqueda)} filas de la búsqueda guardadas en el caché de resultados")
+            
+            # Los reintentos y reentregas del mismo paciente no encontrado no repiten la búsqueda
+            if cliente_encontrado and datos_mensaje:
+                self.cache_resultados.descartar_negativo(datos_mensaje.get('NombreCompleto'),
+                                                         datos_mensaje.get('NumDocIdentidad'), nombre_completo_cliente)
+            elif not cliente_encontrado:
+                self._recordar_negativo(nombre_completo_cliente, datos_mensaje,
+                                        INACTIVO if cliente_inactivo else NO_ENCONTRADO)
+            
+            # 🚀 GUARDAR INFORMACIÓN EN BASE DE DATOS
+            if cliente_encontrado:
+                if datos_mensaje:
+                    logger.info("💾 Guardando información del cliente en base de datos...")
+                    with metricas.medir('guardado_bd') as medicion_bd:
+                        if self._guardar_cliente_en_bd(cliente_encontrado, datos_mensaje):
+                            logger.info("✅ Cliente guardado exitosamente en base de datos")
+                        else:
+                            medicion_bd.etiquetas['resultado'] = 'error'
+                            logger.error("❌ Error guardando cliente en base de datos")
+                else:
+                    logger.warning("⚠️ No hay datos del mensaje para guardar en BD")
+        
             logger.info("=" * 60)
             logger.info(f"🎯 RESUMEN DE CAPTURA:")
             logger.info(f"   📝 Columnas capturadas: {len(encabezados)}")
@@ -1157,9 +620,14 @@ class AseguradoraProcessor:
             except:
                 return True
                 
+        except PlazoAgotado:
+            raise
         except Exception as e:
             logger.error(f"❌ Error capturando tabla: {e}")
             return False
+        finally:
+            if medicion:
+                medicion.terminar('error')
     
     def _es_cliente_buscado(self, fila_data, nombre_completo_cliente):
         """Verifica si la fila corresponde al cliente buscado"""
@@ -1169,8 +637,8 @@ class AseguradoraProcessor:
                 return False
             
             # Comparar nombres (ignorar mayúsculas/minúsculas y espacios extra)
-            nombre_paciente_normalizado = ' '.join(nombre_paciente.split()).upper()
-            nombre_buscado_normalizado = ' '.join(nombre_completo_cliente.split()).upper()
+            nombre_paciente_normalizado = normalizar_nombre(nombre_paciente)
+            nombre_buscado_normalizado = normalizar_nombre(nombre_completo_cliente)
             
             es_cliente = nombre_paciente_normalizado == nombre_buscado_normalizado
             
@@ -1178,10 +646,8 @@ class AseguradoraProcessor:
                 logger.info(f"🎯 ¡COINCIDENCIA DE NOMBRE ENCONTRADA!")
                 logger.info(f"   🔍 Buscado: '{nombre_completo_cliente}'")
                 logger.info(f"   ✅ Encontrado: '{nombre_paciente}'")
-            else:
-                logger.info(f"ℹ️ No es el cliente buscado:")
-                logger.info(f"   🔍 Buscado: '{nombre_completo_cliente}'")
-                logger.info(f"   ❌ Encontrado: '{nombre_paciente}'")
+            elif logger.isEnabledFor(logging.DEBUG) and muestreo_logs.permitir('fila_no_coincide'):
+                logger.debug(f"ℹ️ No es el cliente buscado: '{nombre_paciente}' (buscado: '{nombre_completo_cliente}')")
             
             return es_cliente
             
@@ -1298,6 +764,8 @@ class AseguradoraProcessor:
                 logger.info("⚠️ No se proporcionaron IdFactura o IdAseguradora - Procediendo con INSERT...")
                 return self._insertar_nuevo_cliente(fila_data, datos_mensaje)
                 
+        except PlazoAgotado:
+            raise
         except Exception as e:
             logger.error(f"❌ Error en proceso de actualización/inserción: {e}")
             logger.error(f"   📍 Error tipo: {type(e).__name__}")
@@ -1311,7 +779,7 @@ class AseguradoraProcessor:
                 logger.info(f"   📍 Selector: {selector}")
                 
                 # Intentar encontrar el elemento
-                elemento = WebDriverWait(self.driver, 10).until(
+                elemento = WebDriverWait(self.driver, acotar(10)).until(
                     EC.presence_of_element_located((By.CSS_SELECTOR, selector))
                 )
                 
@@ -1328,11 +796,13 @@ class AseguradoraProcessor:
                     
                     # Recargar la página
                     self.driver.refresh()
-                    time.sleep(3)  # Esperar a que se recargue
+                    esperar(3)  # Esperar a que se recargue
                     
                     logger.info(f"✅ Página recargada - URL: {self.driver.current_url}")
                 else:
                     logger.error(f"❌ Elemento '{nombre_campo}' no encontrado después de {max_reintentos} intentos")
+                    if isinstance(e, TimeoutException) and not self._verificar_respuesta_portal():
+                        self._senalar_congestion('timeout')
                     raise e
         
         return None
@@ -1345,7 +815,7 @@ class AseguradoraProcessor:
                 logger.info(f"   📍 Selector: {selector}")
                 
                 # Intentar encontrar el botón
-                boton = WebDriverWait(self.driver, 10).until(
+                boton = WebDriverWait(self.driver, acotar(10)).until(
                     EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
                 )
                 
@@ -1362,15 +832,80 @@ class AseguradoraProcessor:
                     
                     # Recargar la página
                     self.driver.refresh()
-                    time.sleep(3)  # Esperar a que se recargue
+                    esperar(3)  # Esperar a que se recargue
                     
                     logger.info(f"✅ Página recargada - URL: {self.driver.current_url}")
                 else:
                     logger.error(f"❌ Botón para '{nombre_campo}' no encontrado después de {max_reintentos} intentos")
+                    if isinstance(e, TimeoutException) and not self._verificar_respuesta_portal():
+                        self._senalar_congestion('timeout')
                     raise e
         
         return None
     
+    def reciclar_navegador_si_corresponde(self):
+        """Reinicia el navegador entre mensajes y restaura la sesión desde las cookies"""
+        if not self.driver:
+            return False
+        
+        motivo = self.politica_reciclaje.motivo_reciclaje(self.driver)
+        if not motivo:
+            return False
+        
+        logger.info(f"♻️ Reciclando navegador: {motivo}")
+        
+        # Guardar la sesión antes de cerrar el navegador
+        try:
+            url_previa = self.driver.current_url
+            cookies = exportar_cookies(self.driver)
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo guardar la sesión antes de reciclar: {e}")
+            url_previa, cookies = None, []
+        
+        try:
+            self.driver.quit()
+        except Exception as e:
+            logger.warning(f"⚠️ Error cerrando navegador a reciclar: {e}")
+        self.driver = None
+        
+        if not self.setup_selenium_driver(self.aseguradora_driver):
+            logger.error("❌ No se pudo crear el navegador de reemplazo")
+            self._limpiar_sesiones()
+            return False
+        
+        self.politica_reciclaje.reciclajes += 1
+        
+        # Restaurar cookies y volver a la última página para conservar la sesión
+        try:
+            restauradas = restaurar_cookies(self.driver, cookies, url_previa)
+            logger.info(f"🍪 Cookies restauradas: {restauradas}/{len(cookies)}")
+            
+            if url_previa and url_previa.startswith('http'):
+                self.driver.get(url_previa)
+                if urlparse(self.driver.current_url).netloc != urlparse(url_previa).netloc:
+                    logger.warning("⚠️ La sesión no se pudo restaurar - se hará login en el próximo mensaje")
+                    self._limpiar_sesiones()
+                    return True
+        except Exception as e:
+            logger.warning(f"⚠️ Error restaurando la sesión tras reciclar: {e}")
+            self._limpiar_sesiones()
+            return True
+        
+        logger.info("✅ Navegador reciclado con sesión restaurada")
+        return True
+    
+    def _limpiar_sesiones(self):
+        """Marca todas las sesiones como inactivas para forzar un nuevo login"""
+        self.aseguradoras_activas.clear()
+        self.sesiones_aseguradoras.clear()
+    
+    def _aplicar_perfil_navegador(self, nombre_aseguradora):
+        """Aplica al driver el bloqueo de recursos configurado para la aseguradora"""
+        if not self.driver:
+            return False
+        perfil = BrowserProfile.desde_entorno(self.plugin_para(nombre_aseguradora).codigo)
+        return perfil.aplicar_a_driver(self.driver)
+    
     def _recrear_sesion_navegador(self):
         """Recrea la sesión del navegador cuando se detecta desconexión"""
         try:
@@ -1384,19 +919,12 @@ class AseguradoraProcessor:
                 except:
                     pass
             
-            # Crear nuevo driver
-            logger.info("🔧 Creando nuevo driver de Edge...")
-            edge_options = Options()
-            edge_options.add_argument("--no-sandbox")
-            edge_options.add_argument("--disable-dev-shm-usage")
-            edge_options.add_argument("--window-size=1920,1080")
-            edge_options.add_argument("--disable-blink-features=AutomationControlled")
-            edge_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-            edge_options.add_experimental_option('useAutomationExtension', False)
-            
-            self.driver = webdriver.Edge(options=edge_options)
-            self.driver.set_page_load_timeout(30)
-            self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            # Crear nuevo driver ocultando las marcas de automatización
+            logger.info("🔧 Creando nuevo driver de Selenium...")
+            config = self._config_selenium(self.aseguradora_driver)
+            config['ocultar_webdriver'] = True
+            self.driver = fabrica_navegadores.crear_driver(config)
+            self.politica_reciclaje.reiniciar()
             
             logger.info("✅ Nueva sesión del navegador creada exitosamente")
             return True
@@ -1433,9 +961,7 @@ class AseguradoraProcessor:
             }
             
             # Mostrar datos que se van a insertar
-            logger.info("📋 Datos a insertar en FacturaCliente:")
-            for campo, valor in datos_insercion.items():
-                logger.info(f"   • {campo}: '{valor}'")
+            logger.debug(f"📋 Datos a insertar en FacturaCliente: {datos_insercion}")
             
             # Query de inserción
             insert_query = """
@@ -1497,7 +1023,7 @@ class AseguradoraProcessor:
             logger.error(f"❌ Error capturando tabla: {e}")
             return False
     
-    def _capturar_informacion_generica(self, id_url):
+    def _capturar_informacion_generica(self, id_url, datos_mensaje=None):
         """Captura información genérica para otras aseguradoras"""
         try:
             logger.info("📸 Captura genérica de información...")
@@ -1518,67 +1044,69 @@ class AseguradoraProcessor:
             
             logger.info(f"🎯 Campos a capturar: {len(campos_captura)}")
             
-            # Capturar información de cada campo
+            # Todos los campos en una sola llamada al navegador (un único timeout para todos)
+            with metricas.medir('extraccion_campos'):
+                valores = capturar_campos(self.driver, campos_captura, timeout=10)
+            
             for campo in campos_captura:
                 nombre_campo = campo['NombreCampo']
-                tipo_campo = campo['TipoCampo']
-                selector_css = campo['SelectorCSS']
-                orden = campo['Orden']
-                obligatorio = campo['Obligatorio']
-                
-                try:
-                    logger.info(f"🔍 Capturando campo: {nombre_campo} ({tipo_campo})")
-                    
-                    # Buscar el elemento en la página
-                    elemento = WebDriverWait(self.driver, 10).until(
-                        EC.presence_of_element_located((By.CSS_SELECTOR, selector_css))
-                    )
-                    
-                    # Obtener el valor según el tipo de campo
-                    if tipo_campo.lower() == 'input':
-                        valor_capturado = elemento.get_attribute('value') or elemento.get_attribute('placeholder') or ''
-                    elif tipo_campo.lower() == 'text':
-                        valor_capturado = elemento.text or ''
-                    elif tipo_campo.lower() == 'select':
-                        # Para select, obtener la opción seleccionada
-                        from selenium.webdriver.support.ui import Select
-                        select_element = Select(elemento)
-                        valor_capturado = select_element.first_selected_option.text if select_element.first_selected_option else ''
-                    else:
-                        valor_capturado = elemento.text or elemento.get_attribute('value') or ''
-                    
-                    # Limpiar el valor capturado
-                    if valor_capturado:
-                        valor_capturado = valor_capturado.strip()
-                    
+                valor_capturado = valores.get(nombre_campo)
+                if valor_capturado is not None:
                     logger.info(f"✅ Campo {nombre_campo} capturado: {valor_capturado[:50]}...")
-                    
-                except TimeoutException:
-                    if obligatorio:
-                        logger.error(f"❌ Campo obligatorio {nombre_campo} no encontrado: {selector_css}")
-                        return False
-                    else:
-                        logger.warning(f"⚠️ Campo opcional {nombre_campo} no encontrado: {selector_css}")
-                except Exception as e:
-                    logger.error(f"❌ Error capturando campo {nombre_campo}: {e}")
-                    if obligatorio:
-                        return False
+                elif campo['Obligatorio']:
+                    logger.error(f"❌ Campo obligatorio {nombre_campo} no encontrado: {campo['SelectorCSS']}")
+                    return False
+                else:
+                    logger.warning(f"⚠️ Campo opcional {nombre_campo} no encontrado: {campo['SelectorCSS']}")
+            
+            self._guardar_valores_capturados(id_url, valores, datos_mensaje)
             
             logger.info("✅ Captura de información genérica completada")
             return True
             
+        except PlazoAgotado:
+            raise
         except Exception as e:
             logger.error(f"❌ Error en captura genérica: {e}")
             return False
     
+    def _guardar_valores_capturados(self, id_url, valores, datos_mensaje=None):
+        """Guarda los valores capturados en un solo INSERT (no bloquea la captura si falla)"""
+        filas = [{
+            'IdUrl': str(id_url),
+            'NumDocIdentidad': (datos_mensaje or {}).get('NumDocIdentidad'),
+            'NombreCampo': nombre_campo,
+            'ValorCampo': valor
+        } for nombre_campo, valor in valores.items() if valor is not None]
+        if not filas:
+            return
+        try:
+            if not self.tabla_valores_verificada:
+                self.db_manager.create_table_if_not_exists(TABLA_VALORES, COLUMNAS_VALORES)
+                self.tabla_valores_verificada = True
+            with metricas.medir('guardado_bd'):
+                if not self.db_manager.insert_many(TABLA_VALORES, filas):
+                    logger.error(f"❌ No se pudieron guardar los {len(filas)} valores capturados")
+        except PlazoAgotado:
+            raise
+        except Exception as e:
+            logger.error(f"❌ Error guardando valores capturados: {e}")
+    
     def get_url_by_aseguradora_name(self, nombre_aseguradora):
         """Busca la URL y campos de login de una aseguradora por su nombre en la base de datos o caché"""
+        medicion = metricas.iniciar('configuracion', aseguradora=nombre_aseguradora)
         try:
             # Primero verificar si ya está en caché
             if nombre_aseguradora in self.url_cache:
                 logger.info(f"📋 Información encontrada en caché para: {nombre_aseguradora}")
+                medicion.terminar('cache')
+                metricas.incrementar('scraping_cache_url_total', descripcion='Consultas al caché de URLs de aseguradoras',
+                                     resultado='acierto')
                 return self.url_cache[nombre_aseguradora]
             
+            metricas.incrementar('scraping_cache_url_total', descripcion='Consultas al caché de URLs de aseguradoras',
+                                 resultado='fallo')
+            
             # Si no está en caché, buscar en la base de datos
             logger.info(f"🔍 Buscando información en base de datos para: {nombre_aseguradora}")
             
@@ -1633,17 +1161,133 @@ class AseguradoraProcessor:
                 logger.info(f"   📝 Campos de login: {len(campos_results)}")
                 logger.info(f"   🎯 Acciones post-login: {len(acciones_results)}")
                 
+                medicion.terminar('bd')
                 return url_info
             else:
                 logger.warning(f"⚠️  No se encontró URL para {nombre_aseguradora}")
+                medicion.terminar('no_encontrado')
                 return None
                     
+        except PlazoAgotado:
+            medicion.terminar('error')
+            raise
         except Exception as e:
             logger.error(f"❌ Error buscando información para {nombre_aseguradora}: {e}")
+            medicion.terminar('error')
             return None
     
-    def process_aseguradora_message(self, message_data):
-        """Procesa un mensaje de aseguradora"""
+    def _recordar_negativo(self, nombre_completo_cliente, datos_mensaje, motivo):
+        """Guarda en el caché negativo que la búsqueda no encontró activo al cliente"""
+        if not nombre_completo_cliente or not datos_mensaje:
+            return
+        self.cache_resultados.guardar_negativo(datos_mensaje.get('NombreCompleto'),
+                                               datos_mensaje.get('NumDocIdentidad'), nombre_completo_cliente, motivo)
+    
+    @staticmethod
+    def _forzar_busqueda(datos_mensaje):
+        """True si el mensaje pide ignorar el caché de resultados (ForzarBusqueda)"""
+        valor = datos_mensaje.get('ForzarBusqueda')
+        if isinstance(valor, str):
+            return valor.strip().lower() in ('1', 'true', 'si', 'sí', 'yes')
+        return bool(valor)
+    
+    def _atender_desde_cache(self, nombre_aseguradora, datos_mensaje):
+        """Aplica en BD el resultado cacheado del cliente; False si hay que buscarlo en el portal"""
+        documento = datos_mensaje.get('NumDocIdentidad')
+        if self._forzar_busqueda(datos_mensaje):
+            logger.info(f"🔄 ForzarBusqueda: {nombre_aseguradora} / {documento} se busca en el portal")
+            return False
+        
+        nombre_completo = self._construir_nombre_completo(datos_mensaje, registrar=False)
+        motivo = self.cache_resultados.obtener_negativo(nombre_aseguradora, documento, nombre_completo)
+        if motivo:
+            logger.warning(f"⚠️ {nombre_completo} ({documento}) sin resultado reciente en {nombre_aseguradora} "
+                           f"({motivo}) - no se repite la búsqueda")
+            return True
+        
+        filas = self.cache_resultados.obtener(nombre_aseguradora, documento, nombre_completo)
+        # Misma regla que la tabla del portal: la primera fila activa del paciente
+        fila = next((fila for fila in filas or [] if self._validar_cliente_activo(fila)), None)
+        if fila is None:
+            return False
+        
+        logger.info(f"⚡ Resultado en caché para {nombre_aseguradora} / {documento} - sin búsqueda en el portal")
+        self._guardar_fila_sin_portal(fila, datos_mensaje, 'caché')
+        return True
+    
+    def _guardar_fila_sin_portal(self, fila, datos_mensaje, origen):
+        """Guarda en BD una fila obtenida sin buscar en el portal (caché o búsqueda compartida)"""
+        logger.info(f"   📋 Póliza: {fila.get('Póliza', 'N/A')} - Dependiente: {fila.get('No. Dependiente', 'N/A')}")
+        with metricas.medir('guardado_bd') as medicion_bd:
+            if not self._guardar_cliente_en_bd(fila, datos_mensaje):
+                medicion_bd.etiquetas['resultado'] = 'error'
+                logger.error(f"❌ Error guardando cliente (desde {origen}) en base de datos")
+    
+    def _buscar_en_portal(self, plugin, nombre_aseguradora, datos_mensaje):
+        """Sesión, búsqueda y captura bajo el turno del limitador; False si falló
+
+        Con el circuito del portal abierto lanza ``CircuitoAbierto`` sin tocar el navegador.
+        """
+        circuito = registro_aseguradoras.circuito(plugin)
+        if circuito:
+            circuito.permitir()
+        self.senal_portal = None
+        en_portal = exito = False
+        try:
+            # La espera del turno tampoco puede pasar del plazo del mensaje
+            with registro_aseguradoras.limite(plugin, timeout=plazo_restante()) as permiso:
+                en_portal = True
+                # 🚀 GESTIONAR SESIÓN DE LA ASEGURADORA
+                if not self.gestionar_sesion_aseguradora(nombre_aseguradora, datos_mensaje):
+                    logger.error(f"❌ No se pudo gestionar la sesión para {nombre_aseguradora}")
+                    permiso.resultado = 'error'
+                    return False
+            exito = True
+            return True
+        except TimeoutError:
+            if not en_portal:
+                agotar('turno_portal')
+            self.senal_portal = self.senal_portal or 'plazo'
+            raise
+        finally:
+            # Un timeout o una página 429/5xx cuenta como fallo aunque el mensaje se haya resuelto
+            if circuito and exito and not self.senal_portal:
+                circuito.registrar_exito()
+            elif circuito and en_portal:
+                circuito.registrar_fallo(self.senal_portal or 'error')
+    
+    def _buscar_una_vez(self, plugin, nombre_aseguradora, datos_mensaje):
+        """Búsqueda en el portal sin repetir la idéntica que otro worker tenga en curso; False si falló
+
+        Mientras otro worker busca la misma aseguradora y NumDocIdentidad se espera a que
+        termine y se vuelve a consultar el caché de resultados, que ya tiene su respuesta.
+        """
+        documento = datos_mensaje.get('NumDocIdentidad')
+        compartida = False
+        while not self.cache_resultados.reservar_busqueda(
+                nombre_aseguradora, documento, plazo_restante() or Config.PLAZO_MENSAJE_SEGUNDOS):
+            if not compartida:
+                logger.info(f"🔗 Búsqueda {nombre_aseguradora} / {documento} ya en curso en otro worker - "
+                            f"esperando su resultado")
+                compartida = True
+            # Despierta en cuanto se libere la reserva en este proceso; la de otro proceso se sondea
+            self.cache_resultados.esperar_busqueda(nombre_aseguradora, documento,
+                                                   acotar(SONDEO_BUSQUEDA_EN_CURSO_SEGUNDOS))
+            verificar()
+        
+        try:
+            if compartida and self._atender_desde_cache(nombre_aseguradora, datos_mensaje):
+                metricas.incrementar('scraping_busquedas_compartidas_total',
+                                     descripcion='Mensajes resueltos con la búsqueda en curso de otro mensaje idéntico',
+                                     aseguradora=nombre_aseguradora)
+                return True
+            # Sin resultado aprovechable (búsqueda fallida o de otro paciente): búsqueda propia
+            return self._buscar_en_portal(plugin, nombre_aseguradora, datos_mensaje)
+        finally:
+            self.cache_resultados.liberar_busqueda(nombre_aseguradora, documento)
+    
+    def process_aseguradora_message(self, message_data, vence_en=None):
+        """Procesa un mensaje de aseguradora dentro de su plazo (``vence_en``: cabecera x-deadline)"""
         try:
             nombre_aseguradora = message_data.get('NombreCompleto')
             if not nombre_aseguradora:
@@ -1652,13 +1296,33 @@ class AseguradoraProcessor:
             
             logger.info(f"🔍 Procesando aseguradora: {nombre_aseguradora}")
             
-            # 🚀 GESTIONAR SESIÓN DE LA ASEGURADORA
-            if not self.gestionar_sesion_aseguradora(nombre_aseguradora, message_data):
-                logger.error(f"❌ No se pudo gestionar la sesión para {nombre_aseguradora}")
+            # La recarga se aplica entre mensajes para no mezclar plugins dentro de uno
+            if self.recarga_plugins_pendiente:
+                self.recargar_plugins()
+            
+            # Todas las etapas medidas dentro del bloque se etiquetan con la aseguradora;
+            # el limitador adaptativo del portal decide cuándo puede empezar el mensaje
+            plugin = self.plugin_para(nombre_aseguradora)
+            
+            # Plazo del mensaje: el que fijó el productor o el por defecto de la aseguradora
+            segundos = segundos_hasta(vence_en) if vence_en is not None else None
+            if segundos is None:
+                segundos = plugin.plazo_segundos or Config.PLAZO_MENSAJE_SEGUNDOS
+            elif segundos <= 0:
+                logger.warning(f"⌛ Mensaje de {nombre_aseguradora} con el plazo vencido hace {-segundos:.0f}s - se descarta")
+                metricas.incrementar('scraping_plazos_agotados_total', descripcion='Mensajes cortados por agotar su plazo',
+                                     etapa='cola')
                 return None
             
-            # Buscar URL en la base de datos (si no está en cache)
-            url_info = self.get_url_by_aseguradora_name(nombre_aseguradora)
+            with contexto_metricas(aseguradora=nombre_aseguradora), plazo(segundos, 'mensaje'):
+                # 🚀 RESPONDER DESDE EL CACHÉ DE RESULTADOS (sin navegador ni turno del portal)
+                if not self._atender_desde_cache(nombre_aseguradora, message_data):
+                    # Los mensajes idénticos en curso en otros workers comparten una sola búsqueda
+                    if not self._buscar_una_vez(plugin, nombre_aseguradora, message_data):
+                        return None
+                
+                # Buscar URL en la base de datos (si no está en cache)
+                url_info = self.get_url_by_aseguradora_name(nombre_aseguradora)
             
             if url_info:
                 # Crear resultado combinado
@@ -1703,12 +1367,27 @@ class AseguradoraProcessor:
                 logger.warning(f"⚠️  No se encontró URL para {nombre_aseguradora}")
                 return None
                 
+        except PlazoAgotado as e:
+            logger.warning(f"⌛ {e} - se cancela el mensaje de {message_data.get('NombreCompleto')}")
+            return None
+        except CircuitoAbierto:
+            # process_message difiere el mensaje a la cola de reintentos
+            raise
         except Exception as e:
             logger.error(f"❌ Error procesando mensaje: {e}")
             return None
     
+    def _procesar_aseguradora_perfilado(self, message_data, properties, method, modo_perfil):
+        """process_aseguradora_message bajo el profiler si el mensaje debe perfilarse"""
+        id_mensaje = getattr(properties, 'message_id', None) or method.delivery_tag
+        vence_en = (getattr(properties, 'headers', None) or {}).get(CABECERA_PLAZO)
+        with self.profiler.perfilar(id_mensaje, message_data.get('NombreCompleto'), modo_perfil):
+            return self.process_aseguradora_message(message_data, vence_en)
+    
     def process_message(self, ch, method, properties, body):
         """Callback para procesar mensajes de RabbitMQ"""
+        medicion_mensaje = metricas.iniciar('mensaje')
+        self.mensajes_en_curso += 1
         try:
             # Decodificar el mensaje
             message_text = body.decode('utf-8')
@@ -1716,37 +1395,72 @@ class AseguradoraProcessor:
             
             # Parsear JSON
             try:
-                message_data = json.loads(message_text)
+                with metricas.medir('decodificacion'):
+                    message_data = json.loads(message_text)
+                
+                modo_perfil = self.profiler.modo_para(getattr(properties, 'headers', None))
                 
                 # Verificar si es un mensaje de aseguradora
                 if 'NombreCompleto' in message_data:
+                    medicion_mensaje.etiquetas['aseguradora'] = message_data.get('NombreCompleto') or 'ninguna'
                     # Procesar mensaje individual
-                    result = self.process_aseguradora_message(message_data)
-                    if result:
-                        logger.info("✅ Mensaje procesado exitosamente")
-                        # Aquí podrías guardar el resultado en otra tabla o hacer algo más
+                    try:
+                        result = self._procesar_aseguradora_perfilado(message_data, properties, method, modo_perfil)
+                    except CircuitoAbierto as e:
+                        self._diferir_mensaje(ch, body, properties, e)
+                        medicion_mensaje.etiquetas['resultado'] = 'diferido'
+                    else:
+                        if result:
+                            logger.info("✅ Mensaje procesado exitosamente")
+                            # Aquí podrías guardar el resultado en otra tabla o hacer algo más
+                        else:
+                            medicion_mensaje.etiquetas['resultado'] = 'sin_procesar'
                 elif 'Clientes' in message_data and isinstance(message_data['Clientes'], list):
+                    medicion_mensaje.etiquetas['aseguradora'] = 'lote'
                     # Procesar lista de clientes
                     logger.info(f"📋 Procesando lista de {len(message_data['Clientes'])} clientes")
                     
+                    pendientes, circuito_abierto = [], None
                     for i, cliente in enumerate(message_data['Clientes']):
                         logger.info(f"  🔍 Procesando cliente {i+1}/{len(message_data['Clientes'])}")
-                        result = self.process_aseguradora_message(cliente)
+                        try:
+                            result = self._procesar_aseguradora_perfilado(cliente, properties, method, modo_perfil)
+                        except CircuitoAbierto as e:
+                            pendientes.append(cliente)
+                            circuito_abierto = e
+                            continue
                         if result:
                             logger.info(f"    ✅ Cliente {i+1} procesado")
                         else:
                             logger.warning(f"    ⚠️  Cliente {i+1} sin procesar")
                     
+                    # Los clientes de portales con el circuito abierto vuelven como un lote más pequeño
+                    if pendientes:
+                        lote = json.dumps({**message_data, 'Clientes': pendientes}, ensure_ascii=False)
+                        self._diferir_mensaje(ch, lote.encode('utf-8'), properties, circuito_abierto)
+                        medicion_mensaje.etiquetas['resultado'] = 'diferido'
+                    
                     # Mostrar mensaje de espera después de procesar lista completa
                     logger.info("⏳ Lista de clientes procesada - Esperando siguiente mensaje...")
                 else:
                     logger.warning("⚠️  Formato de mensaje no reconocido")
+                    medicion_mensaje.etiquetas['resultado'] = 'formato_invalido'
                 
             except json.JSONDecodeError as e:
                 logger.error(f"❌ Error parseando JSON: {e}")
+                medicion_mensaje.etiquetas['resultado'] = 'json_invalido'
             
             # Acknowledge el mensaje
-            ch.basic_ack(delivery_tag=method.delivery_tag)
+            with metricas.medir('ack'):
+                ch.basic_ack(delivery_tag=method.delivery_tag)
+            
+            medicion_mensaje.terminar()
+            self.mensajes_procesados += 1
+            metricas.incrementar('scraping_mensajes_total', descripcion='Mensajes consumidos de la cola',
+                                 resultado=medicion_mensaje.etiquetas.get('resultado', 'ok'))
+            
+            # Reciclar el navegador entre mensajes si la política lo indica
+            self.reciclar_navegador_si_corresponde()
             
             # Mostrar mensaje de espera después de procesar
             logger.info("⏳ Mensaje procesado - Esperando siguiente mensaje...")
@@ -1754,6 +1468,50 @@ class AseguradoraProcessor:
         except Exception as e:
             logger.error(f"❌ Error procesando mensaje: {e}")
             ch.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            medicion_mensaje.terminar('error')
+            self.mensajes_fallidos += 1
+            metricas.incrementar('scraping_mensajes_total', descripcion='Mensajes consumidos de la cola',
+                                 resultado='error')
+        finally:
+            self.mensajes_en_curso -= 1
+            if medicion_mensaje.terminada:
+                self._registrar_servicio(medicion_mensaje.duracion)
+    
+    def _registrar_servicio(self, segundos):
+        """Acumula el tiempo de servicio del mensaje (y lo comparte con el supervisor si lo hay)"""
+        self.segundos_servicio += segundos
+        if self.servicio_compartido:
+            estadisticas, indice = self.servicio_compartido
+            with estadisticas.get_lock():
+                estadisticas[2 * indice] += 1
+                estadisticas[2 * indice + 1] += segundos
+    
+    def _diferir_mensaje(self, ch, cuerpo, properties, error):
+        """Publica el mensaje en la cola de reintentos; vuelve a la cola principal al vencer su TTL"""
+        cabeceras = dict(getattr(properties, 'headers', None) or {})
+        reintentos = int(cabeceras.get('x-reintentos', 0)) + 1
+        if Config.CIRCUITO_MAX_REINTENTOS and reintentos > Config.CIRCUITO_MAX_REINTENTOS:
+            logger.error(f"❌ Mensaje descartado tras {reintentos - 1} reintentos: {error}")
+            metricas.incrementar('scraping_mensajes_diferidos_total', descripcion='Mensajes enviados a la cola de reintentos',
+                                 aseguradora=error.nombre, resultado='descartado')
+            return False
+        cabeceras['x-reintentos'] = reintentos
+        ch.basic_publish(
+            exchange='',
+            routing_key=Config.RABBITMQ_COLA_REINTENTOS,
+            body=cuerpo,
+            properties=pika.BasicProperties(
+                delivery_mode=2,
+                content_type='application/json',
+                message_id=getattr(properties, 'message_id', None),
+                headers=cabeceras
+            )
+        )
+        metricas.incrementar('scraping_mensajes_diferidos_total', descripcion='Mensajes enviados a la cola de reintentos',
+                             aseguradora=error.nombre, resultado='diferido')
+        logger.warning(f"⏸️ {error} - mensaje diferido {Config.CIRCUITO_REINTENTO_SEGUNDOS:.0f}s en "
+                       f"{Config.RABBITMQ_COLA_REINTENTOS} (reintento {reintentos})")
+        return True
     
     def start_consuming(self):
         """Inicia el consumo de mensajes - SIEMPRE ACTIVO"""
@@ -1769,6 +1527,8 @@ class AseguradoraProcessor:
             )
             message_count = queue_info.method.message_count
             consumer_count = queue_info.method.consumer_count
+            self.profundidad_cola = message_count
+            self.consumidores_cola = consumer_count
             
             logger.info(f"📊 Cola: {Config.RABBITMQ_QUEUE}")
             logger.info(f"📊 Exchange: {Config.RABBITMQ_EXCHANGE}")
@@ -1799,6 +1559,14 @@ class AseguradoraProcessor:
                 if message_count == 0:
                     logger.info("⏳ No hay mensajes en cola - Esperando nuevos mensajes...")
                 
+                # Muestreo periódico de la cola para el endpoint de métricas
+                self._programar_muestreo_cola()
+                
+                # Una señal recibida mientras se conectaba ya pidió la parada
+                if self.detencion_pendiente:
+                    logger.info("⏹️  Parada pedida antes de empezar a consumir")
+                    return
+                
                 # Usar start_consuming() que mantiene el worker activo
                 self.rabbitmq_channel.start_consuming()
                         
@@ -1811,6 +1579,103 @@ class AseguradoraProcessor:
         finally:
             self.cleanup()
     
+    def detener_consumo(self):
+        """Pide dejar de consumir al terminar el mensaje en curso (se puede llamar desde un manejador de señal)"""
+        self.detencion_pendiente = True
+        conexion = self.rabbitmq_connection
+        if conexion and conexion.is_open:
+            # stop_consuming corre en el hilo de pika, después del ack del mensaje en curso
+            conexion.add_callback_threadsafe(self._detener_consumo)
+    
+    def _detener_consumo(self):
+        """Cancela el consumidor: start_consuming() vuelve y el worker hace la limpieza"""
+        if self.rabbitmq_channel and self.rabbitmq_channel.is_open:
+            logger.info("⏹️  Deteniendo consumo de mensajes...")
+            self.rabbitmq_channel.stop_consuming()
+    
+    def _programar_muestreo_cola(self):
+        """Agenda la próxima lectura de la cola en el hilo de la conexión (pika no es thread-safe)"""
+        if Config.METRICS_PORT and Config.METRICS_INTERVALO_COLA > 0 and self.rabbitmq_connection:
+            self.rabbitmq_connection.call_later(Config.METRICS_INTERVALO_COLA, self._muestrear_cola)
+    
+    def _muestrear_cola(self):
+        """Actualiza profundidad y consumidores de la cola con queue_declare(passive=True)"""
+        try:
+            if not self.rabbitmq_channel or self.rabbitmq_channel.is_closed:
+                return
+            queue_info = self.rabbitmq_channel.queue_declare(queue=Config.RABBITMQ_QUEUE, durable=True, passive=True)
+            self.profundidad_cola = queue_info.method.message_count
+            self.consumidores_cola = queue_info.method.consumer_count
+        except Exception as e:
+            logger.debug(f"No se pudo leer la profundidad de la cola: {e}")
+            return
+        # Solo se conocen los mensajes de este proceso: se extrapola al resto de consumidores
+        self.autoescalado.muestrear(self.profundidad_cola, self.mensajes_procesados + self.mensajes_fallidos,
+                                    self.segundos_servicio, factor_consumidores=self.consumidores_cola or 1)
+        self._programar_muestreo_cola()
+    
+    def recolectar_metricas(self):
+        """Gauges instantáneos para el endpoint de métricas (solo lee estado ya calculado)"""
+        aciertos = metricas.valor_contador('scraping_cache_url_total', resultado='acierto')
+        consultas = metricas.valor_contador('scraping_cache_url_total')
+        navegadores = 1 if self.driver else 0
+        ocupados = min(self.mensajes_en_curso, navegadores)
+        reciclaje = self.politica_reciclaje.estadisticas()
+        arranques = fabrica_navegadores.estadisticas()
+        
+        gauges = [
+            ('scraping_mensajes_procesados', 'Mensajes procesados desde el inicio', self.mensajes_procesados, {}),
+            ('scraping_mensajes_fallidos', 'Mensajes rechazados por error desde el inicio', self.mensajes_fallidos, {}),
+            ('scraping_mensajes_en_curso', 'Mensajes en procesamiento', self.mensajes_en_curso, {}),
+            ('scraping_cola_mensajes', 'Mensajes en la cola según la última lectura', self.profundidad_cola,
+             {'cola': Config.RABBITMQ_QUEUE}),
+            ('scraping_cola_consumidores', 'Consumidores de la cola según la última lectura', self.consumidores_cola,
+             {'cola': Config.RABBITMQ_QUEUE}),
+            ('scraping_cache_url_entradas', 'Aseguradoras en el caché de URLs', len(self.url_cache), {}),
+            ('scraping_cache_resultados_entradas', 'Búsquedas en memoria en el caché de resultados',
+             len(self.cache_resultados), {}),
+            ('scraping_busquedas_en_vuelo', 'Búsquedas en el portal reservadas en el caché de resultados',
+             self.cache_resultados.busquedas_en_curso(), {}),
+            ('scraping_cache_url_ratio_aciertos', 'Proporción de aciertos del caché de URLs',
+             aciertos / consultas if consultas else None, {}),
+            ('scraping_sesiones_activas', 'Aseguradoras con sesión activa', len(self.aseguradoras_activas), {}),
+            ('scraping_navegadores_abiertos', 'Navegadores abiertos', navegadores, {}),
+            ('scraping_navegadores_ocupados', 'Navegadores procesando un mensaje', ocupados, {}),
+            ('scraping_navegadores_utilizacion_ratio', 'Navegadores ocupados sobre abiertos',
+             ocupados / navegadores if navegadores else None, {}),
+            ('scraping_navegador_paginas', 'Páginas cargadas por el navegador actual', reciclaje['paginas'], {}),
+            ('scraping_navegador_edad_segundos', 'Edad del navegador actual', reciclaje['edad_minutos'] * 60, {}),
+            ('scraping_navegador_rss_bytes', 'RSS del árbol de procesos del navegador',
+             reciclaje['rss_mb'] * 1024 * 1024 if reciclaje['rss_mb'] else None, {}),
+            ('scraping_navegador_reciclajes', 'Reciclajes del navegador desde el inicio', reciclaje['reciclajes'], {}),
+            ('scraping_navegador_arranques', 'Lanzamientos de navegador desde el inicio', arranques['arranques'], {}),
+            ('scraping_navegador_arranques_fallidos', 'Lanzamientos de navegador fallidos', arranques['fallidos'], {}),
+        ]
+        gauges.extend(self.autoescalado.gauges())
+        
+        for nombre, estado in registro_aseguradoras.estados().items():
+            etiquetas = {'aseguradora': nombre}
+            gauges.extend([
+                ('scraping_concurrencia_limite', 'Mensajes simultáneos permitidos por el limitador adaptativo',
+                 estado['limite'], etiquetas),
+                ('scraping_concurrencia_maxima', 'Techo de concurrencia del plugin', estado['maximo'], etiquetas),
+                ('scraping_concurrencia_espera_segundos', 'Separación mínima entre mensajes al portal',
+                 estado['espera'], etiquetas),
+                ('scraping_concurrencia_en_curso', 'Mensajes con turno del limitador', estado['en_curso'], etiquetas),
+                ('scraping_concurrencia_tasa_errores', 'Tasa de errores (media móvil) vista por el limitador',
+                 estado['tasa_errores'], etiquetas),
+            ])
+        
+        for nombre, circuito in registro_aseguradoras.circuitos().items():
+            resumen = circuito.resumen()
+            gauges.append(('scraping_circuito_estado', 'Circuito del portal (0 cerrado, 1 semiabierto, 2 abierto)',
+                           VALOR_ESTADO[resumen['estado']], {'aseguradora': nombre}))
+        
+        estadisticas_pool = getattr(self.db_manager, 'estadisticas_pool', None)
+        for nombre, valor in (estadisticas_pool() if estadisticas_pool else {}).items():
+            gauges.append(('scraping_bd_pool_conexiones', 'Conexiones del pool de SQLAlchemy', valor, {'estado': nombre}))
+        return gauges
+    
     def get_cache_stats(self):
         """Retorna estadísticas del caché"""
         return {
@@ -1842,12 +1707,28 @@ class AseguradoraProcessor:
                 logger.info(f"      • {aseguradora}: {estado} (Login: {fecha_login})")
         else:
             logger.info("   No hay sesiones activas")
+        
+        # Tiempos de lanzamiento del navegador
+        arranques = fabrica_navegadores.estadisticas()
+        logger.info(f"🚀 Lanzamientos de navegador: {arranques['arranques']} (fallidos: {arranques['fallidos']})")
+        if arranques.get('promedio') is not None:
+            logger.info(f"   Tiempo de arranque: promedio {arranques['promedio']}s, p95 {arranques['p95']}s, máximo {arranques['maximo']}s")
+        
+        # Reciclaje del navegador
+        reciclaje = self.politica_reciclaje.estadisticas()
+        logger.info(f"♻️ Navegador actual: {reciclaje['paginas']} páginas, {reciclaje['edad_minutos']} min, RSS {reciclaje['rss_mb'] or 'N/A'} MB (reciclajes: {reciclaje['reciclajes']})")
+        
+        # Tiempos por etapa
+        etapas = metricas.resumen_etapas()
+        logger.info(f"⏱️ Mensajes procesados: {self.mensajes_procesados} (fallidos: {self.mensajes_fallidos})")
+        for etapa, resumen in etapas.items():
+            logger.info(f"   {etapa}: n={resumen['n']}, promedio {resumen['promedio']}s, p50 {resumen['p50']}s, p95 {resumen['p95']}s")
     
     def gestionar_sesion_aseguradora(self, nombre_aseguradora, datos_mensaje=None):
         """Gestiona la sesión de una aseguradora específica"""
         try:
-            # Verificar si es PAN AMERICAN LIFE DE ECUADOR
-            if nombre_aseguradora == 'PAN AMERICAN LIFE DE ECUADOR':
+            # Solo las aseguradoras cuyo plugin declara login automático mantienen sesión
+            if self.plugin_para(nombre_aseguradora).requiere_login:
                 # Obtener configuración de la aseguradora
                 url_info = self.get_url_by_aseguradora_name(nombre_aseguradora)
                 if not url_info:
@@ -1855,7 +1736,11 @@ class AseguradoraProcessor:
                     return False
                 
                 # Verificar si ya tenemos una sesión activa
-                if nombre_aseguradora in self.aseguradoras_activas:
+                with metricas.medir('verificacion_sesion') as medicion:
+                    sesion_activa = self.verificar_sesion_activa(nombre_aseguradora)
+                    medicion.etiquetas['resultado'] = 'activa' if sesion_activa else 'inactiva'
+                
+                if sesion_activa:
                     logger.info(f"✅ Sesión activa encontrada para {nombre_aseguradora}")
                     logger.info(f"🔄 Ejecutando captura de información con NumDocIdentidad...")
                     
@@ -1870,7 +1755,16 @@ class AseguradoraProcessor:
                 # Si no hay sesión activa, hacer login completo
                 logger.info(f"🔐 Iniciando login para {nombre_aseguradora}")
                 
-                if self.execute_login(url_info, datos_mensaje):
+                login_exitoso = self.execute_login(url_info, datos_mensaje)
+                # Un login completo tarda mucho más que una búsqueda: no cuenta como latencia del portal
+                limitador = registro_aseguradoras.limitador(self.plugin_para(nombre_aseguradora))
+                if limitador:
+                    limitador.omitir_latencia()
+                metricas.incrementar('scraping_logins_total', descripcion='Logins completos ejecutados',
+                                     aseguradora=nombre_aseguradora,
+                                     resultado='ok' if login_exitoso else 'error')
+                
+                if login_exitoso:
                     # Marcar como activa
                     self.aseguradoras_activas.add(nombre_aseguradora)
                     self.sesiones_aseguradoras[nombre_aseguradora] = {
@@ -1884,13 +1778,40 @@ class AseguradoraProcessor:
                     logger.error(f"❌ Login fallido para {nombre_aseguradora}")
                     return False
             else:
-                logger.info(f"ℹ️ {nombre_aseguradora} no requiere login automático")
-                return True
+                url_info = self.get_url_by_aseguradora_name(nombre_aseguradora)
+                if not url_info:
+                    logger.error(f"❌ No se pudo obtener configuración para {nombre_aseguradora}")
+                    return False
                 
+                logger.info(f"ℹ️ {nombre_aseguradora} no requiere login automático - captura directa de su página")
+                return self._capturar_sin_login(url_info, datos_mensaje)
+                
+        except PlazoAgotado:
+            raise
         except Exception as e:
             logger.error(f"❌ Error gestionando sesión para {nombre_aseguradora}: {e}")
             return False
     
+    def _capturar_sin_login(self, url_info, datos_mensaje=None):
+        """Abre la página de una aseguradora sin login automático y ejecuta la búsqueda de su plugin"""
+        nombre_aseguradora = url_info.get('nombre')
+        if not self.setup_selenium_driver(nombre_aseguradora):
+            logger.error("❌ No se pudo configurar Selenium")
+            return False
+        self._aplicar_perfil_navegador(nombre_aseguradora)
+        
+        url = url_info.get('url_destino') or url_info['url_login']
+        with metricas.medir('navegacion'), plazo(Config.PLAZO_BUSQUEDA_SEGUNDOS, 'navegacion'):
+            logger.info(f"🌐 Navegando a: {url}")
+            self.driver.get(url)
+            WebDriverWait(self.driver, acotar(10)).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+            self._verificar_respuesta_portal(nombre_aseguradora)
+        
+        # El plugin genérico captura los campos de informacion_capturada y los guarda en un solo INSERT
+        return self.capturar_informacion_pantalla(url_info['id'], nombre_aseguradora, datos_mensaje)
+    
     def verificar_sesion_activa(self, nombre_aseguradora):
         """Verifica si una aseguradora tiene sesión activa y válida"""
         if nombre_aseguradora not in self.aseguradoras_activas:
@@ -1904,12 +1825,12 @@ class AseguradoraProcessor:
                 del self.sesiones_aseguradoras[nombre_aseguradora]
             return False
         
-        # Verificar que la sesión no sea muy antigua (opcional - puedes ajustar el tiempo)
+        # Verificar que la sesión no supere el TTL del plugin (ttl_sesion_segundos)
         sesion_info = self.sesiones_aseguradoras.get(nombre_aseguradora, {})
+        plugin = self.plugin_para(nombre_aseguradora)
         if 'fecha_login' in sesion_info:
-            tiempo_sesion = datetime.now() - sesion_info['fecha_login']
-            if tiempo_sesion.total_seconds() > 3600:  # 1 hora
-                logger.warning(f"⚠️ Sesión de {nombre_aseguradora} expirada (más de 1 hora) - Limpiando")
+            if plugin.sesion_expirada(sesion_info['fecha_login']):
+                logger.warning(f"⚠️ Sesión de {nombre_aseguradora} expirada (más de {plugin.ttl_sesion_segundos:.0f}s) - Limpiando")
                 self.aseguradoras_activas.discard(nombre_aseguradora)
                 if nombre_aseguradora in self.sesiones_aseguradoras:
                     del self.sesiones_aseguradoras[nombre_aseguradora]
@@ -1938,6 +1859,9 @@ class AseguradoraProcessor:
                     logger.info("🔌 Driver de Selenium cerrado")
                 except Exception as e:
                     logger.error(f"❌ Error cerrando Selenium: {e}")
+                self.driver = None
+            
+            self.cache_resultados.cerrar()
             
             if self.rabbitmq_channel and not self.rabbitmq_channel.is_closed:
                 self.rabbitmq_channel.close()
@@ -1951,20 +1875,39 @@ class AseguradoraProcessor:
             logger.error(f"❌ Error cerrando conexiones: {e}")
 
 class ProductionWorker:
-    def __init__(self):
+    def __init__(self, servicio_compartido=None):
         self.processor = None
+        self.servicio_compartido = servicio_compartido  # (Array del supervisor, índice) en modo --processes
         self.running = False
         self.start_time = None
-        self.message_count = 0
+        self.servidor_metricas = None
         
         # Configurar señales para shutdown graceful
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self.recargar_handler)
+    
+    @property
+    def message_count(self):
+        """Mensajes procesados por el procesador actual"""
+        return self.processor.mensajes_procesados if self.processor else 0
     
     def signal_handler(self, signum, frame):
-        """Maneja señales de interrupción"""
+        """SIGTERM/SIGINT: termina el mensaje en curso y deja de consumir; startup() hace la limpieza"""
         logger.info(f"📡 Señal recibida: {signum}")
-        self.shutdown()
+        if not self.processor:
+            self.shutdown()  # aún no hay procesador ni mensaje en curso
+        if self.running:
+            self.running = False
+            logger.info("⏳ Se detendrá el consumo al terminar el mensaje en curso")
+            self.processor.detener_consumo()
+    
+    def recargar_handler(self, signum, frame):
+        """SIGHUP: recarga los plugins de aseguradoras sin reiniciar el worker"""
+        logger.info("📡 SIGHUP recibido - se recargarán los plugins de aseguradoras")
+        if self.processor:
+            self.processor.recarga_plugins_pendiente = True
     
     def startup(self):
         """Inicia el worker"""
@@ -1984,6 +1927,12 @@ class ProductionWorker:
             
             # Crear procesador
             self.processor = AseguradoraProcessor()
+            self.processor.servicio_compartido = self.servicio_compartido
+            
+            # Endpoint de métricas Prometheus en un hilo aparte
+            if Config.METRICS_PORT:
+                self.servidor_metricas = MetricsServer(Config.METRICS_PORT, self.recolectar_metricas, host=Config.METRICS_HOST)
+                self.servidor_metricas.iniciar()
             
             # Mostrar estadísticas iniciales
             self.show_status()
@@ -1993,12 +1942,22 @@ class ProductionWorker:
             logger.info("💡 Presiona Ctrl+C para detener")
             logger.info("=" * 60)
             
-            # Iniciar consumo de mensajes (SIEMPRE ACTIVO)
+            # Iniciar consumo de mensajes (SIEMPRE ACTIVO); vuelve tras SIGTERM/SIGINT
             self.processor.start_consuming()
             
         except Exception as e:
             logger.error(f"❌ Error en startup: {e}")
-            self.shutdown()
+        self.shutdown()
+    
+    def recolectar_metricas(self):
+        """Gauges del worker y de su procesador para el endpoint de métricas"""
+        gauges = []
+        if self.start_time:
+            gauges.append(('scraping_worker_tiempo_activo_segundos', 'Tiempo desde el arranque del worker',
+                           (datetime.now() - self.start_time).total_seconds(), {}))
+        if self.processor:
+            gauges.extend(self.processor.recolectar_metricas())
+        return gauges
     
     def show_status(self):
         """Muestra el estado actual del worker"""
@@ -2020,12 +1979,15 @@ class ProductionWorker:
             except Exception as e:
                 logger.error(f"❌ Error en cleanup: {e}")
         
+        if self.servidor_metricas:
+            self.servidor_metricas.detener()
+        
         logger.info("🔌 Worker detenido correctamente")
         sys.exit(0)
 
-def main():
-    """Función principal"""
-    worker = ProductionWorker()
+def ejecutar_worker(servicio_compartido=None):
+    """Un ProductionWorker: un procesador, un navegador y una conexión a RabbitMQ"""
+    worker = ProductionWorker(servicio_compartido)
     
     try:
         worker.startup()
@@ -2036,5 +1998,90 @@ def main():
         logger.error(f"❌ Error fatal: {e}")
         worker.shutdown()
 
+def ejecutar_worker_hijo(indice, puerto_metricas, estadisticas):
+    """Proceso hijo del supervisor (--processes): worker con su propio puerto de métricas"""
+    # Ctrl+C llega solo al supervisor, que coordina la parada de todos los hijos. En Windows
+    # no hay grupos POSIX: el hijo recibe también Ctrl+C y termina su mensaje como con SIGTERM
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+    Config.METRICS_PORT = puerto_metricas
+    logger.info(f"👷 Worker {indice} (pid {os.getpid()}) arrancando")
+    ejecutar_worker((estadisticas, indice))
+
+def leer_profundidad_cola():
+    """Mensajes en espera en la cola principal (conexión corta, para el autoescalado del supervisor)"""
+    credentials = pika.PlainCredentials(Config.RABBITMQ_USERNAME, Config.RABBITMQ_PASSWORD)
+    conexion = pika.BlockingConnection(
+        pika.ConnectionParameters(host=Config.RABBITMQ_HOST, port=Config.RABBITMQ_PORT, credentials=credentials)
+    )
+    try:
+        cola = conexion.channel().queue_declare(queue=Config.RABBITMQ_QUEUE, durable=True, passive=True)
+        return cola.method.message_count
+    finally:
+        conexion.close()
+
+def main():
+    """Función principal"""
+    parser = argparse.ArgumentParser(description="Worker de producción de aseguradoras")
+    parser.add_argument('--processes', type=int, default=Config.WORKER_PROCESOS,
+                        help="Procesos worker supervisados (1 = un solo worker en este proceso)")
+    args = parser.parse_args()
+    
+    # Con AUTOESCALADO_MAX_PROCESOS el supervisor ajusta los workers a la cola entre el mínimo y el máximo
+    autoescalado = None
+    procesos = args.processes
+    if Config.AUTOESCALADO_MAX_PROCESOS > 1:
+        autoescalado = QueueAutoscaler(
+            minimo=Config.AUTOESCALADO_MIN_PROCESOS,
+            maximo=Config.AUTOESCALADO_MAX_PROCESOS,
+            objetivo_drenado_segundos=Config.AUTOESCALADO_OBJETIVO_DRENADO_SEGUNDOS,
+            utilizacion_objetivo=Config.AUTOESCALADO_UTILIZACION_OBJETIVO,
+            enfriamiento_segundos=Config.AUTOESCALADO_ENFRIAMIENTO_SEGUNDOS
+        )
+        procesos = max(autoescalado.minimo, min(procesos, autoescalado.maximo))
+        autoescalado.recomendados = procesos
+    
+    cache_sin_sqlite = Config.RESULTADOS_CACHE_TTL_SEGUNDOS > 0 and not Config.RESULTADOS_CACHE_SQLITE
+    if procesos <= 1 and not autoescalado:
+        if cache_sin_sqlite:
+            logger.warning("⚠️ Sin RESULTADOS_CACHE_SQLITE este worker no comparte el caché de resultados ni sus "
+                           "búsquedas en curso con otros procesos: las búsquedas idénticas no se agrupan")
+        ejecutar_worker()
+        return
+    
+    # Los workers solo agrupan búsquedas idénticas si comparten el SQLite del caché: sin uno
+    # configurado el supervisor crea uno temporal (los hijos heredan el entorno al arrancar)
+    ruta_compartida = None
+    if cache_sin_sqlite:
+        ruta_compartida = os.path.join(tempfile.gettempdir(), f"scraping_web_resultados_{os.getpid()}.sqlite")
+        os.environ['RESULTADOS_CACHE_SQLITE'] = Config.RESULTADOS_CACHE_SQLITE = ruta_compartida
+        logger.info(f"🔗 Caché de resultados compartido por los workers en {ruta_compartida}")
+    
+    # Limitador y circuito de cada aseguradora viven en cada worker, no en el supervisor
+    maximo = autoescalado.maximo if autoescalado else procesos
+    logger.warning(f"⚠️ Límites de concurrencia y circuitos por aseguradora son por worker: con hasta {maximo} "
+                   f"workers cada portal puede recibir {maximo} veces su max_concurrencia")
+    
+    supervisor = WorkerSupervisor(
+        procesos, ejecutar_worker_hijo,
+        escalonado_segundos=Config.SUPERVISOR_ESCALONADO_SEGUNDOS,
+        gracia_segundos=Config.SUPERVISOR_GRACIA_SEGUNDOS,
+        espera_maxima_reinicio=Config.SUPERVISOR_ESPERA_MAXIMA_REINICIO,
+        puerto_metricas_base=Config.METRICS_PORT,
+        autoescalado=autoescalado,
+        leer_cola=leer_profundidad_cola,
+        intervalo_autoescalado=Config.AUTOESCALADO_INTERVALO_SEGUNDOS
+    )
+    supervisor.instalar_senales()
+    try:
+        supervisor.ejecutar()
+    finally:
+        if ruta_compartida:
+            for sufijo in ('', '-wal', '-shm'):
+                try:
+                    os.remove(ruta_compartida + sufijo)
+                except OSError:
+                    pass
+
 if __name__ == "__main__":
     main()
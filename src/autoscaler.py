@@ -0,0 +1,121 @@
+"""
+Recomendación de workers a partir de la profundidad de la cola.
+
+``QueueAutoscaler`` recibe muestras periódicas de la cola (mensajes en espera)
+y de los totales de mensajes atendidos y segundos de servicio. Con ellas
+estima:
+
+- la tasa de llegada: lo que creció la cola más lo que se atendió, por segundo;
+- el tiempo de servicio por mensaje: segundos de servicio / mensajes atendidos;
+
+y recomienda los workers necesarios para atender las llegadas y además vaciar
+la cola acumulada en ``objetivo_drenado_segundos``, sin pasar de una
+utilización de ``utilizacion_objetivo`` por worker (ley de Little). Las
+estimaciones se suavizan con una media móvil exponencial.
+
+``objetivo`` aplica la histéresis al escalar: sube en cuanto la recomendación
+supera a los workers actuales y solo baja cuando lleva
+``enfriamiento_segundos`` por debajo.
+"""
+
+import math
+import time
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class QueueAutoscaler:
+    """Estima llegada y servicio de la cola y recomienda cuántos workers (y navegadores) usar"""
+
+    def __init__(self, minimo: int = 1, maximo: Optional[int] = None, objetivo_drenado_segundos: float = 300.0,
+                 utilizacion_objetivo: float = 0.8, navegadores_por_worker: int = 1,
+                 enfriamiento_segundos: float = 300.0, suavizado: float = 0.3, reloj=time.monotonic):
+        self.minimo = max(1, minimo)
+        self.maximo = maximo if maximo and maximo > 0 else None
+        self.objetivo_drenado_segundos = objetivo_drenado_segundos
+        self.utilizacion_objetivo = utilizacion_objetivo
+        self.navegadores_por_worker = navegadores_por_worker
+        self.enfriamiento_segundos = enfriamiento_segundos
+        self.suavizado = suavizado
+        self._reloj = reloj
+
+        self.profundidad: Optional[int] = None
+        self.tasa_llegada: Optional[float] = None  # mensajes por segundo
+        self.tiempo_servicio: Optional[float] = None  # segundos por mensaje
+        self.recomendados = self.minimo
+        self._anterior: Optional[Tuple[float, int, float, float]] = None  # (instante, profundidad, atendidos, servicio)
+        self._bajar_desde: Optional[float] = None
+
+    @property
+    def navegadores_recomendados(self) -> int:
+        return self.recomendados * self.navegadores_por_worker
+
+    def _suavizar(self, actual: Optional[float], nuevo: float) -> float:
+        return nuevo if actual is None else actual + self.suavizado * (nuevo - actual)
+
+    def muestrear(self, profundidad: int, atendidos_total: float, servicio_total_segundos: float,
+                  factor_consumidores: float = 1) -> int:
+        """Actualiza las estimaciones y retorna los workers recomendados.
+
+        ``atendidos_total`` y ``servicio_total_segundos`` son acumulados
+        crecientes. Si solo cubren a este proceso, ``factor_consumidores`` (los
+        consumidores de la cola) extrapola su ritmo al resto, suponiéndolos
+        igual de rápidos.
+        """
+        ahora = self._reloj()
+        self.profundidad = profundidad
+        anterior, self._anterior = self._anterior, (ahora, profundidad, atendidos_total, servicio_total_segundos)
+        if anterior is None:
+            return self.recomendados
+
+        instante, profundidad_previa, atendidos_previos, servicio_previo = anterior
+        transcurrido = ahora - instante
+        if transcurrido <= 0:
+            return self.recomendados
+
+        atendidos = max(0.0, atendidos_total - atendidos_previos)
+        if atendidos:
+            self.tiempo_servicio = self._suavizar(
+                self.tiempo_servicio, max(0.0, servicio_total_segundos - servicio_previo) / atendidos)
+        llegadas = max(0.0, profundidad - profundidad_previa + atendidos * max(1, factor_consumidores))
+        self.tasa_llegada = self._suavizar(self.tasa_llegada, llegadas / transcurrido)
+
+        self.recomendados = self._calcular()
+        return self.recomendados
+
+    def _calcular(self) -> int:
+        if self.tiempo_servicio is None:
+            # Sin mensajes atendidos todavía no hay con qué estimar
+            return self.recomendados
+        demanda = (self.tasa_llegada or 0.0) + (self.profundidad or 0) / self.objetivo_drenado_segundos
+        workers = math.ceil(demanda * self.tiempo_servicio / self.utilizacion_objetivo)
+        workers = max(self.minimo, workers)
+        return min(self.maximo, workers) if self.maximo else workers
+
+    def objetivo(self, actuales: int) -> int:
+        """Workers a los que escalar desde ``actuales``: sube ya, baja tras el enfriamiento"""
+        if self.recomendados >= actuales:
+            self._bajar_desde = None
+            return self.recomendados
+        ahora = self._reloj()
+        if self._bajar_desde is None:
+            self._bajar_desde = ahora
+        if ahora - self._bajar_desde >= self.enfriamiento_segundos:
+            self._bajar_desde = None
+            return self.recomendados
+        return actuales
+
+    def gauges(self) -> List[Tuple[str, str, Optional[float], dict]]:
+        """Gauges para ``recolectar_metricas`` del worker"""
+        return [
+            ('scraping_autoescalado_workers_recomendados', 'Workers recomendados según la cola',
+             self.recomendados, {}),
+            ('scraping_autoescalado_navegadores_recomendados', 'Navegadores recomendados según la cola',
+             self.navegadores_recomendados, {}),
+            ('scraping_autoescalado_tasa_llegada', 'Mensajes por segundo que llegan a la cola (estimado)',
+             self.tasa_llegada, {}),
+            ('scraping_autoescalado_tiempo_servicio_segundos', 'Segundos de servicio por mensaje (estimado)',
+             self.tiempo_servicio, {}),
+        ]
@@ -0,0 +1,325 @@
+import os
+import time
+import shutil
+import tempfile
+import logging
+import threading
+import weakref
+from collections import deque
+from typing import Any, Dict, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+from .browser_profile import BrowserProfile
+
+logger = logging.getLogger(__name__)
+
+NAVEGADORES = ('chrome', 'edge', 'firefox')
+
+USER_AGENT_POR_DEFECTO = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36 Edg/120.0.0.0'
+)
+
+# Archivo que marca una plantilla de perfil completa: solo existe en la versión ya publicada con os.replace
+MARCA_PLANTILLA = '.plantilla_lista'
+
+# Valores por defecto, con las mismas claves que SELENIUM_CONFIG de cada aseguradora
+CONFIG_POR_DEFECTO = {
+    'navegador': 'edge',
+    'headless': True,
+    'window_size': '1920,1080',
+    'user_agent': USER_AGENT_POR_DEFECTO,
+    'opciones_especiales': [],
+    'timeout_pagina': 30,
+    'ocultar_webdriver': False,
+    'plantilla_perfil': True
+}
+
+
+def _bool_entorno(nombre: str, defecto: Optional[bool]) -> Optional[bool]:
+    valor = os.getenv(nombre)
+    if valor is None or valor == '':
+        return defecto
+    return valor.strip().lower() in ('1', 'true', 'yes', 'si')
+
+
+def config_desde_entorno(prefijo: Optional[str] = None, navegador: Optional[str] = None) -> Dict[str, Any]:
+    """Construye la configuración del navegador desde variables de entorno.
+
+    Lee las variables globales ``SELENIUM_*`` y, si se indica un prefijo de
+    aseguradora (p.ej. ``PALE_EC``), las ``{prefijo}_SELENIUM_*`` que las
+    sobrescriben; son las mismas variables que usa ``SELENIUM_CONFIG``. Un
+    ``navegador`` explícito prevalece sobre ``SELENIUM_NAVEGADOR``.
+    """
+    config = dict(CONFIG_POR_DEFECTO)
+
+    prefijos = ['SELENIUM'] + ([f"{prefijo}_SELENIUM"] if prefijo else [])
+    for base in prefijos:
+        if os.getenv(f"{base}_NAVEGADOR"):
+            config['navegador'] = os.getenv(f"{base}_NAVEGADOR").strip().lower()
+        config['headless'] = _bool_entorno(f"{base}_HEADLESS", config['headless'])
+        config['ocultar_webdriver'] = _bool_entorno(f"{base}_OCULTAR_WEBDRIVER", config['ocultar_webdriver'])
+        config['plantilla_perfil'] = _bool_entorno(f"{base}_PLANTILLA_PERFIL", config['plantilla_perfil'])
+        if os.getenv(f"{base}_WINDOW_SIZE"):
+            config['window_size'] = os.getenv(f"{base}_WINDOW_SIZE")
+        if os.getenv(f"{base}_USER_AGENT"):
+            config['user_agent'] = os.getenv(f"{base}_USER_AGENT")
+        if os.getenv(f"{base}_OPCIONES_ESPECIALES"):
+            config['opciones_especiales'] = [
+                opcion.strip() for opcion in os.getenv(f"{base}_OPCIONES_ESPECIALES").split(',') if opcion.strip()
+            ]
+        if os.getenv(f"{base}_TIMEOUT_PAGINA"):
+            config['timeout_pagina'] = int(os.getenv(f"{base}_TIMEOUT_PAGINA"))
+
+    if navegador:
+        config['navegador'] = navegador
+
+    config.update(BrowserProfile.desde_entorno(prefijo).to_dict())
+    return config
+
+
+class BrowserFactory:
+    """Fábrica única de drivers Selenium (Chrome, Edge o Firefox).
+
+    Construye las opciones a partir de la configuración de la aseguradora
+    (headless, tamaño de ventana, user agent, opciones especiales, bloqueo de
+    recursos), reutiliza una plantilla de ``user-data-dir`` para no crear el
+    perfil del navegador desde cero en cada arranque y mide el tiempo de
+    lanzamiento de cada navegador.
+    """
+
+    def __init__(self, directorio_plantillas: Optional[str] = None):
+        self.directorio_plantillas = directorio_plantillas or os.getenv(
+            'SELENIUM_DIRECTORIO_PLANTILLAS',
+            os.path.join(tempfile.gettempdir(), 'scraping_web_perfiles')
+        )
+        self._lock = threading.Lock()
+        self._plantillas_listas = {}
+        # Un lock por navegador para crear su plantilla sin retener self._lock
+        self._locks_plantilla: Dict[str, threading.Lock] = {}
+        self._tiempos_arranque = deque(maxlen=200)
+        self.total_arranques = 0
+        self.arranques_fallidos = 0
+
+    def crear_driver(self, config: Optional[Dict[str, Any]] = None):
+        """Crea un driver a partir de la configuración (se completa con los valores por defecto)"""
+        config = self._normalizar_config(config)
+        navegador = config['navegador']
+        perfil = BrowserProfile.desde_config(config)
+
+        opciones = self._construir_opciones(navegador, config)
+        perfil.aplicar_a_opciones(opciones)
+
+        directorio_perfil = None
+        if config.get('plantilla_perfil'):
+            directorio_perfil = self._copiar_plantilla(navegador, config)
+            if directorio_perfil:
+                self._asignar_directorio_perfil(navegador, opciones, directorio_perfil)
+
+        inicio = time.monotonic()
+        try:
+            driver = self._lanzar(navegador, opciones)
+        except Exception:
+            with self._lock:
+                self.arranques_fallidos += 1
+            if directorio_perfil:
+                shutil.rmtree(directorio_perfil, ignore_errors=True)
+            raise
+        duracion = time.monotonic() - inicio
+
+        if directorio_perfil:
+            # Borrar la copia del perfil cuando el driver deje de existir
+            weakref.finalize(driver, shutil.rmtree, directorio_perfil, True)
+
+        driver.set_page_load_timeout(config['timeout_pagina'])
+        perfil.aplicar_a_driver(driver)
+        if config.get('ocultar_webdriver'):
+            try:
+                driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo ocultar navigator.webdriver: {e}")
+
+        with self._lock:
+            self._tiempos_arranque.append(duracion)
+            self.total_arranques += 1
+        logger.info(f"🚀 Navegador {navegador} iniciado en {duracion:.2f}s (headless={config['headless']})")
+        return driver
+
+    def _normalizar_config(self, config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        normalizada = dict(CONFIG_POR_DEFECTO)
+        for clave, valor in (config or {}).items():
+            # SELENIUM_CONFIG deja en None lo que no está definido en .env
+            if valor is not None and valor != '':
+                normalizada[clave] = valor
+
+        navegador = str(normalizada['navegador']).lower()
+        if navegador not in NAVEGADORES:
+            raise ValueError(f"Navegador no soportado: {navegador} (opciones: {', '.join(NAVEGADORES)})")
+        normalizada['navegador'] = navegador
+        return normalizada
+
+    def _construir_opciones(self, navegador: str, config: Dict[str, Any]):
+        """Construye las opciones de arranque comunes a todos los puntos de entrada"""
+        ancho, _, alto = str(config['window_size']).replace('x', ',').partition(',')
+
+        if navegador == 'firefox':
+            opciones = FirefoxOptions()
+            if config['headless']:
+                opciones.add_argument('-headless')
+            opciones.add_argument(f"--width={ancho}")
+            opciones.add_argument(f"--height={alto or ancho}")
+            if config.get('user_agent'):
+                opciones.set_preference('general.useragent.override', config['user_agent'])
+            if config.get('ocultar_webdriver'):
+                opciones.set_preference('dom.webdriver.enabled', False)
+        else:
+            opciones = EdgeOptions() if navegador == 'edge' else ChromeOptions()
+            if config['headless']:
+                opciones.add_argument('--headless=new')
+            opciones.add_argument('--no-sandbox')
+            opciones.add_argument('--disable-dev-shm-usage')
+            opciones.add_argument('--disable-gpu')
+            opciones.add_argument(f"--window-size={ancho},{alto or ancho}")
+            if config.get('user_agent'):
+                opciones.add_argument(f"--user-agent={config['user_agent']}")
+
+            # Reducir logs del navegador
+            opciones.add_argument('--log-level=3')
+            opciones.add_argument('--silent')
+            opciones.add_argument('--disable-logging')
+
+            excluir = ['enable-logging']
+            if config.get('ocultar_webdriver'):
+                opciones.add_argument('--disable-blink-features=AutomationControlled')
+                opciones.add_experimental_option('useAutomationExtension', False)
+                excluir.append('enable-automation')
+            opciones.add_experimental_option('excludeSwitches', excluir)
+
+        for opcion in config.get('opciones_especiales') or []:
+            opcion = opcion.strip()
+            if opcion and opcion not in opciones.arguments:
+                opciones.add_argument(opcion)
+
+        return opciones
+
+    def _lanzar(self, navegador: str, opciones):
+        if navegador == 'edge':
+            return webdriver.Edge(options=opciones)
+        if navegador == 'firefox':
+            return webdriver.Firefox(options=opciones)
+        return webdriver.Chrome(options=opciones)
+
+    def _asignar_directorio_perfil(self, navegador: str, opciones, directorio: str):
+        if navegador == 'firefox':
+            opciones.add_argument('-profile')
+            opciones.add_argument(directorio)
+        else:
+            opciones.add_argument(f"--user-data-dir={directorio}")
+
+    def _ruta_plantilla(self, navegador: str) -> str:
+        return os.path.join(self.directorio_plantillas, f"plantilla_{navegador}")
+
+    def _plantilla_lista(self, ruta: str) -> bool:
+        return os.path.isfile(os.path.join(ruta, MARCA_PLANTILLA))
+
+    def _asegurar_plantilla(self, navegador: str, config: Dict[str, Any]) -> Optional[str]:
+        """Crea (una sola vez) el perfil plantilla lanzando el navegador sobre él
+
+        La plantilla se construye en un directorio temporal y se publica en
+        ``ruta`` con ``os.replace``: otros procesos (``--processes``) solo ven la
+        plantilla completa, con su marca, y una construcción interrumpida nunca
+        se toma por lista.
+        """
+        ruta = self._ruta_plantilla(navegador)
+        with self._lock:
+            if self._plantillas_listas.get(navegador):
+                return ruta
+            lock_plantilla = self._locks_plantilla.setdefault(navegador, threading.Lock())
+
+        # Lanzar el navegador plantilla lleva segundos: solo esperan los drivers del mismo navegador
+        with lock_plantilla:
+            with self._lock:
+                if self._plantillas_listas.get(navegador):
+                    return ruta
+            if self._plantilla_lista(ruta):
+                with self._lock:
+                    self._plantillas_listas[navegador] = True
+                return ruta
+
+            temporal = None
+            try:
+                os.makedirs(self.directorio_plantillas, exist_ok=True)
+                temporal = tempfile.mkdtemp(prefix=f"plantilla_{navegador}_", dir=self.directorio_plantillas)
+                opciones = self._construir_opciones(navegador, config)
+                self._asignar_directorio_perfil(navegador, opciones, temporal)
+                inicio = time.monotonic()
+                driver = self._lanzar(navegador, opciones)
+                driver.quit()
+                with open(os.path.join(temporal, MARCA_PLANTILLA), 'w'):
+                    pass
+                self._publicar_plantilla(temporal, ruta)
+                temporal = None
+                with self._lock:
+                    self._plantillas_listas[navegador] = True
+                logger.info(f"📁 Plantilla de perfil {navegador} creada en {time.monotonic() - inicio:.2f}s: {ruta}")
+                return ruta
+            except Exception as e:
+                logger.warning(f"⚠️ No se pudo crear la plantilla de perfil para {navegador}: {e}")
+                return None
+            finally:
+                if temporal:
+                    shutil.rmtree(temporal, ignore_errors=True)
+
+    def _publicar_plantilla(self, temporal: str, ruta: str):
+        """Mueve la plantilla terminada a ``ruta``; si otro proceso publicó antes se usa la suya"""
+        if os.path.isdir(ruta) and not self._plantilla_lista(ruta):
+            # Restos sin marca (construcción de una versión anterior interrumpida)
+            shutil.rmtree(ruta, ignore_errors=True)
+        try:
+            os.replace(temporal, ruta)
+        except OSError:
+            if not self._plantilla_lista(ruta):
+                raise
+            shutil.rmtree(temporal, ignore_errors=True)
+
+    def _copiar_plantilla(self, navegador: str, config: Dict[str, Any]) -> Optional[str]:
+        """Copia la plantilla a un directorio temporal propio del nuevo driver"""
+        plantilla = self._asegurar_plantilla(navegador, config)
+        if not plantilla:
+            return None
+        destino = tempfile.mkdtemp(prefix=f"perfil_{navegador}_")
+        try:
+            shutil.copytree(
+                plantilla, destino, dirs_exist_ok=True,
+                ignore=shutil.ignore_patterns('Singleton*', 'lock', '*.lock', 'parent.lock', MARCA_PLANTILLA)
+            )
+            return destino
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo copiar la plantilla de perfil: {e}")
+            shutil.rmtree(destino, ignore_errors=True)
+            return None
+
+    def estadisticas(self) -> Dict[str, Any]:
+        """Tiempos de lanzamiento de navegadores (segundos)"""
+        with self._lock:
+            tiempos = sorted(self._tiempos_arranque)
+            total = self.total_arranques
+            fallidos = self.arranques_fallidos
+        if not tiempos:
+            return {'arranques': total, 'fallidos': fallidos}
+        return {
+            'arranques': total,
+            'fallidos': fallidos,
+            'ultimo': round(self._tiempos_arranque[-1], 3),
+            'promedio': round(sum(tiempos) / len(tiempos), 3),
+            'p95': round(tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))], 3),
+            'maximo': round(tiempos[-1], 3)
+        }
+
+
+# Instancia compartida por todos los puntos de entrada del proceso
+fabrica_navegadores = BrowserFactory()
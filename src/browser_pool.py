@@ -0,0 +1,179 @@
+import threading
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class BrowserPoolAgotado(Exception):
+    """No hay navegadores disponibles en el pool dentro del tiempo de espera"""
+    pass
+
+class BrowserPool:
+    """Pool compartido de navegadores Selenium creados bajo demanda.
+
+    Los drivers se crean solo cuando se solicitan y se cierran cuando llevan
+    más de ``idle_timeout`` segundos sin usarse, de modo que un worker que
+    nunca usa Selenium no mantiene ningún navegador abierto.
+    """
+
+    def __init__(self, crear_driver: Callable[[], Any], max_size: int = 2, idle_timeout: float = 300):
+        self._crear_driver = crear_driver
+        self.max_size = max(1, max_size)
+        self.idle_timeout = idle_timeout
+        self._condicion = threading.Condition()
+        self._libres: List[Tuple[Any, float]] = []  # (driver, último uso)
+        self._en_uso = set()
+        self._creando = 0
+        self._cerrado = False
+        self._hilo_limpieza = None
+        self.drivers_creados = 0
+        self.drivers_cerrados = 0
+
+    @property
+    def total(self) -> int:
+        """Navegadores vivos (libres + en uso)"""
+        return len(self._libres) + len(self._en_uso)
+
+    def acquire(self, timeout: Optional[float] = None):
+        """Obtiene un driver del pool, creándolo si hay capacidad disponible"""
+        limite = None if timeout is None else time.monotonic() + timeout
+
+        with self._condicion:
+            while True:
+                if self._cerrado:
+                    raise RuntimeError("El pool de navegadores está cerrado")
+
+                # Reutilizar el driver usado más recientemente (caché del navegador más caliente)
+                if self._libres:
+                    driver, _ = self._libres.pop()
+                    self._en_uso.add(driver)
+                    return driver
+
+                if self.total + self._creando < self.max_size:
+                    self._creando += 1
+                    break
+
+                restante = None if limite is None else limite - time.monotonic()
+                if restante is not None and restante <= 0:
+                    raise BrowserPoolAgotado(
+                        f"Sin navegadores disponibles ({self.total}/{self.max_size} en uso)"
+                    )
+                self._condicion.wait(restante)
+
+        # Crear el driver fuera del lock: lanzar un navegador tarda segundos
+        try:
+            driver = self._crear_driver()
+        except Exception:
+            with self._condicion:
+                self._creando -= 1
+                self._condicion.notify()
+            raise
+
+        with self._condicion:
+            self._creando -= 1
+            self._en_uso.add(driver)
+            self.drivers_creados += 1
+            self._iniciar_limpieza()
+
+        logger.info(f"Navegador creado en el pool ({self.total}/{self.max_size})")
+        return driver
+
+    def release(self, driver, descartar: bool = False):
+        """Devuelve un driver al pool; si ``descartar`` es True se cierra"""
+        with self._condicion:
+            self._en_uso.discard(driver)
+            if descartar or self._cerrado:
+                cerrar = True
+            else:
+                self._libres.append((driver, time.monotonic()))
+                cerrar = False
+            self._condicion.notify()
+
+        if cerrar:
+            self._cerrar_driver(driver)
+
+    @contextmanager
+    def driver(self, timeout: Optional[float] = None):
+        """Context manager que adquiere y libera un driver"""
+        driver = self.acquire(timeout)
+        descartar = False
+        try:
+            yield driver
+        except Exception:
+            # Un driver que falló puede haber quedado en estado inconsistente
+            descartar = True
+            raise
+        finally:
+            self.release(driver, descartar=descartar)
+
+    def cerrar_inactivos(self) -> int:
+        """Cierra los drivers libres que superaron el tiempo de inactividad"""
+        ahora = time.monotonic()
+        with self._condicion:
+            vencidos = [driver for driver, ultimo_uso in self._libres if ahora - ultimo_uso >= self.idle_timeout]
+            self._libres = [(driver, ultimo_uso) for driver, ultimo_uso in self._libres if driver not in vencidos]
+
+        for driver in vencidos:
+            self._cerrar_driver(driver)
+
+        if vencidos:
+            logger.info(f"Navegadores inactivos cerrados: {len(vencidos)}")
+        return len(vencidos)
+
+    def _iniciar_limpieza(self):
+        """Arranca (una sola vez) el hilo que cierra navegadores inactivos"""
+        if self._hilo_limpieza or self.idle_timeout <= 0:
+            return
+        self._hilo_limpieza = threading.Thread(
+            target=self._bucle_limpieza,
+            name="browser-pool-limpieza",
+            daemon=True
+        )
+        self._hilo_limpieza.start()
+
+    def _bucle_limpieza(self):
+        intervalo = max(1.0, self.idle_timeout / 2)
+        while True:
+            with self._condicion:
+                self._condicion.wait_for(lambda: self._cerrado, timeout=intervalo)
+                if self._cerrado:
+                    return
+            try:
+                self.cerrar_inactivos()
+            except Exception as e:
+                logger.warning(f"Error cerrando navegadores inactivos: {e}")
+
+    def _cerrar_driver(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Error cerrando navegador del pool: {e}")
+        with self._condicion:
+            self.drivers_cerrados += 1
+
+    def estadisticas(self) -> Dict[str, int]:
+        """Retorna el estado actual del pool"""
+        with self._condicion:
+            return {
+                'max_size': self.max_size,
+                'total': self.total,
+                'en_uso': len(self._en_uso),
+                'libres': len(self._libres),
+                'creados': self.drivers_creados,
+                'cerrados': self.drivers_cerrados
+            }
+
+    def close(self):
+        """Cierra todos los drivers del pool"""
+        with self._condicion:
+            self._cerrado = True
+            drivers = [driver for driver, _ in self._libres] + list(self._en_uso)
+            self._libres = []
+            self._en_uso = set()
+            self._condicion.notify_all()
+
+        for driver in drivers:
+            self._cerrar_driver(driver)
+        logger.info("Pool de navegadores cerrado")
@@ -0,0 +1,222 @@
+import os
+import logging
+from typing import Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Patrones de URL por categoría de recurso (sintaxis de comodines de Network.setBlockedURLs)
+PATRONES_RECURSOS: Dict[str, List[str]] = {
+    'imagenes': ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp'],
+    'fuentes': ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot'],
+    'media': ['*.mp4', '*.webm', '*.mp3', '*.ogg', '*.wav', '*.m4a', '*.avi', '*.mov'],
+    'estilos': ['*.css'],
+    'analitica': [
+        '*google-analytics.com*',
+        '*googletagmanager.com*',
+        '*doubleclick.net*',
+        '*connect.facebook.net*',
+        '*hotjar.com*',
+        '*clarity.ms*',
+        '*newrelic.com*',
+        '*nr-data.net*',
+        '*quantserve.com*',
+        '*scorecardresearch.com*'
+    ]
+}
+
+# Categorías bloqueadas por defecto (las hojas de estilo se cargan salvo que se pidan)
+CATEGORIAS_POR_DEFECTO = ['imagenes', 'fuentes', 'media', 'analitica']
+
+ESTRATEGIAS_CARGA = ('normal', 'eager', 'none')
+
+
+def _lista_entorno(nombre: str, defecto: Optional[List[str]] = None) -> Optional[List[str]]:
+    """Lee una variable de entorno separada por comas; None si no está definida"""
+    valor = os.getenv(nombre)
+    if valor is None:
+        return defecto
+    return [item.strip() for item in valor.split(',') if item.strip()]
+
+
+def _partes_url(entrada: str):
+    """(esquema, host, ruta) de una entrada de la lista permitida (``*host/ruta*`` o URL completa)"""
+    entrada = entrada.strip()
+    esquema = '*'
+    if '://' in entrada:
+        esquema, entrada = entrada.split('://', 1)
+        esquema = esquema.lstrip('*') or '*'
+    host, barra, ruta = entrada.partition('/')
+    return esquema, host, '/' + ruta if barra and ruta else '/*'
+
+
+class BrowserProfile:
+    """Perfil de carga de recursos del navegador.
+
+    Define qué recursos se bloquean (imágenes, fuentes, media, analítica de
+    terceros...), qué excepciones necesita cada aseguradora y la estrategia de
+    carga de página (``pageLoadStrategy``). Una entrada de la lista permitida
+    es una categoría completa (``imagenes``) o un host/URL
+    (``*attest.palig.com/*``); estas últimas solo liberan ese host.
+    """
+
+    def __init__(self, bloquear: Iterable[str] = CATEGORIAS_POR_DEFECTO,
+                 permitidos: Iterable[str] = (),
+                 patrones_extra: Iterable[str] = (),
+                 page_load_strategy: str = 'eager'):
+        self.bloquear = [categoria.lower() for categoria in bloquear if categoria.lower() != 'ninguno']
+        self.permitidos = list(permitidos)
+        self.patrones_extra = list(patrones_extra)
+
+        if page_load_strategy not in ESTRATEGIAS_CARGA:
+            logger.warning(f"pageLoadStrategy '{page_load_strategy}' no válido, usando 'normal'")
+            page_load_strategy = 'normal'
+        self.page_load_strategy = page_load_strategy
+
+        desconocidas = [categoria for categoria in self.bloquear if categoria not in PATRONES_RECURSOS]
+        if desconocidas:
+            logger.warning(f"Categorías de recursos desconocidas (ignoradas): {', '.join(desconocidas)}")
+
+    @classmethod
+    def desde_entorno(cls, prefijo: Optional[str] = None) -> 'BrowserProfile':
+        """Construye el perfil desde variables de entorno.
+
+        Las variables globales ``SELENIUM_*`` definen los valores por defecto y
+        las de la aseguradora (``{prefijo}_SELENIUM_*``, p.ej. ``PALE_EC``) los
+        sobrescriben.
+        """
+        def leer(sufijo, defecto):
+            valor = _lista_entorno(f"SELENIUM_{sufijo}", defecto)
+            if prefijo:
+                valor = _lista_entorno(f"{prefijo}_SELENIUM_{sufijo}", valor)
+            return valor
+
+        estrategia = os.getenv('SELENIUM_PAGE_LOAD_STRATEGY', 'eager')
+        if prefijo:
+            estrategia = os.getenv(f"{prefijo}_SELENIUM_PAGE_LOAD_STRATEGY", estrategia)
+
+        return cls(
+            bloquear=leer('BLOQUEAR_RECURSOS', CATEGORIAS_POR_DEFECTO),
+            permitidos=leer('RECURSOS_PERMITIDOS', []),
+            patrones_extra=leer('PATRONES_BLOQUEADOS', []),
+            page_load_strategy=estrategia.strip().lower()
+        )
+
+    @classmethod
+    def desde_config(cls, config: Dict) -> 'BrowserProfile':
+        """Construye el perfil desde un diccionario de configuración de Selenium"""
+        bloquear = config.get('bloquear_recursos')
+        return cls(
+            bloquear=CATEGORIAS_POR_DEFECTO if bloquear is None else bloquear,
+            permitidos=config.get('recursos_permitidos') or [],
+            patrones_extra=config.get('patrones_bloqueados') or [],
+            page_load_strategy=config.get('page_load_strategy') or 'eager'
+        )
+
+    def categoria_bloqueada(self, categoria: str) -> bool:
+        """Indica si una categoría queda bloqueada después de aplicar la lista permitida"""
+        return categoria in self.bloquear and categoria not in self.permitidos
+
+    @property
+    def excepciones(self) -> List[str]:
+        """Entradas de la lista permitida que son hosts o URLs (no categorías completas)"""
+        return [entrada for entrada in self.permitidos if entrada not in PATRONES_RECURSOS]
+
+    def patrones_bloqueados(self) -> List[str]:
+        """Patrones de URL a bloquear (sin las categorías de la lista permitida)"""
+        patrones = []
+        for categoria in self.bloquear:
+            if self.categoria_bloqueada(categoria):
+                patrones.extend(PATRONES_RECURSOS.get(categoria, []))
+        patrones.extend(self.patrones_extra)
+
+        # Eliminar duplicados conservando el orden
+        return list(dict.fromkeys(patrones))
+
+    def patrones_permitidos(self) -> List[str]:
+        """Excepciones por host/URL en sintaxis URLPattern para ``urlPatterns`` de ``Network.setBlockedURLs``.
+
+        ``*attest.palig.com/*`` -> ``*://*attest.palig.com:*/*``: todo lo que venga de ese
+        host se carga aunque coincida con un patrón bloqueado; el resto de hosts sigue bloqueado.
+        """
+        patrones = []
+        for entrada in self.excepciones:
+            esquema, host, ruta = _partes_url(entrada)
+            if host:
+                puerto = '' if ':' in host else ':*'
+                patrones.append(f"{esquema}://{host}{puerto}{ruta}")
+        return list(dict.fromkeys(patrones))
+
+    def sitios_permitidos(self) -> List[str]:
+        """Excepciones por host en el formato de las preferencias de contenido de Chromium"""
+        sitios = []
+        for entrada in self.excepciones:
+            host = _partes_url(entrada)[1].split(':')[0]
+            if host.startswith('*'):
+                host = '[*.]' + host.lstrip('*.')
+            if host and '*' not in host.replace('[*.]', ''):
+                sitios.append(host)
+        return list(dict.fromkeys(sitios))
+
+    def aplicar_a_opciones(self, opciones):
+        """Aplica el perfil a las opciones de arranque (Chrome/Edge/Firefox)"""
+        opciones.page_load_strategy = self.page_load_strategy
+        bloquear_imagenes = self.categoria_bloqueada('imagenes')
+
+        if hasattr(opciones, 'add_experimental_option'):
+            if bloquear_imagenes:
+                # Bloqueo por defecto (no gestionado) para que las excepciones por host tengan efecto
+                preferencias = {'profile.default_content_setting_values.images': 2}
+                sitios = self.sitios_permitidos()
+                if sitios:
+                    preferencias['profile.content_settings.exceptions.images'] = {
+                        f"{sitio},*": {'setting': 1} for sitio in sitios
+                    }
+                opciones.add_experimental_option('prefs', preferencias)
+        elif hasattr(opciones, 'set_preference'):
+            # Firefox no soporta CDP ni excepciones por host en preferencias: con excepciones
+            # de imágenes no se bloquean las imágenes para no romper esos hosts
+            if bloquear_imagenes and not self.excepciones:
+                opciones.set_preference('permissions.default.image', 2)
+            if self.categoria_bloqueada('fuentes'):
+                opciones.set_preference('gfx.downloadable_fonts.enabled', False)
+            if self.categoria_bloqueada('media'):
+                opciones.set_preference('media.autoplay.default', 5)
+        return opciones
+
+    def aplicar_a_driver(self, driver) -> bool:
+        """Activa el bloqueo por patrón vía CDP en navegadores Chromium, con las excepciones por host"""
+        if not hasattr(driver, 'execute_cdp_cmd'):
+            return False
+
+        patrones = self.patrones_bloqueados()
+        parametros = {'urls': patrones}
+        permitidos = self.patrones_permitidos()
+        if permitidos:
+            # Las entradas de urlPatterns tienen precedencia sobre urls
+            parametros['urlPatterns'] = [{'urlPattern': patron, 'block': False} for patron in permitidos]
+        try:
+            driver.execute_cdp_cmd('Network.enable', {})
+            try:
+                driver.execute_cdp_cmd('Network.setBlockedURLs', parametros)
+            except Exception as e:
+                if not permitidos:
+                    raise
+                # Navegadores sin urlPatterns: se bloquea igual, pero sin excepciones por host
+                logger.warning(f"⚠️ El navegador no admite excepciones por host en el bloqueo ({e}); "
+                               f"sin excepciones para {', '.join(permitidos)}")
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patrones})
+            logger.info(f"🚫 Bloqueo de recursos activo: {len(patrones)} patrones, {len(permitidos)} excepciones "
+                        f"(pageLoadStrategy={self.page_load_strategy})")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo aplicar el bloqueo de recursos vía CDP: {e}")
+            return False
+
+    def to_dict(self) -> Dict:
+        """Representación serializable del perfil"""
+        return {
+            'bloquear_recursos': self.bloquear,
+            'recursos_permitidos': self.permitidos,
+            'patrones_bloqueados': self.patrones_extra,
+            'page_load_strategy': self.page_load_strategy
+        }
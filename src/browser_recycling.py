@@ -0,0 +1,179 @@
+import os
+import sys
+import time
+import logging
+from typing import Dict, List, Optional
+
+try:
+    import psutil
+except ImportError:  # psutil es opcional: en Linux se usa /proc como alternativa
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+def _pid_servicio(driver) -> Optional[int]:
+    """PID del proceso del driver (chromedriver/msedgedriver/geckodriver)"""
+    try:
+        return driver.service.process.pid
+    except Exception:
+        return None
+
+
+def _rss_proc_linux(pid_raiz: int) -> Optional[int]:
+    """Suma el RSS del árbol de procesos leyendo /proc (solo Linux)"""
+    hijos: Dict[int, List[int]] = {}
+    for entrada in os.listdir('/proc'):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat") as archivo:
+                # El nombre del proceso va entre paréntesis y puede contener espacios
+                campos = archivo.read().rsplit(')', 1)[1].split()
+            hijos.setdefault(int(campos[1]), []).append(int(entrada))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total = 0
+    pendientes = [pid_raiz]
+    while pendientes:
+        pid = pendientes.pop()
+        try:
+            with open(f"/proc/{pid}/status") as archivo:
+                for linea in archivo:
+                    if linea.startswith('VmRSS:'):
+                        total += int(linea.split()[1]) * 1024
+                        break
+        except OSError:
+            continue
+        pendientes.extend(hijos.get(pid, []))
+    return total
+
+
+def rss_arbol_navegador(driver) -> Optional[int]:
+    """RSS total (bytes) del driver y todos los procesos del navegador que cuelgan de él"""
+    pid = _pid_servicio(driver)
+    if not pid:
+        return None
+
+    if psutil:
+        try:
+            proceso = psutil.Process(pid)
+            total = proceso.memory_info().rss
+            for hijo in proceso.children(recursive=True):
+                try:
+                    total += hijo.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total
+        except psutil.Error:
+            return None
+
+    if sys.platform.startswith('linux'):
+        return _rss_proc_linux(pid)
+    return None
+
+
+class RecyclingPolicy:
+    """Política de reciclaje de navegadores de larga duración.
+
+    Un driver se reinicia cuando supera ``max_paginas`` páginas procesadas,
+    ``max_minutos`` de vida o ``max_rss_mb`` de memoria en su árbol de
+    procesos. Un límite en 0 desactiva ese criterio.
+    """
+
+    def __init__(self, max_paginas: int = 500, max_minutos: float = 180, max_rss_mb: float = 1500):
+        self.max_paginas = max_paginas
+        self.max_minutos = max_minutos
+        self.max_rss_mb = max_rss_mb
+        self.paginas = 0
+        self.inicio = time.monotonic()
+        self.reciclajes = 0
+        self.ultimo_rss = None
+
+    def reiniciar(self):
+        """Reinicia los contadores para un driver recién creado"""
+        self.paginas = 0
+        self.inicio = time.monotonic()
+        self.ultimo_rss = None
+
+    def registrar_pagina(self, cantidad: int = 1):
+        self.paginas += cantidad
+
+    def edad_minutos(self) -> float:
+        return (time.monotonic() - self.inicio) / 60
+
+    def motivo_reciclaje(self, driver) -> Optional[str]:
+        """Devuelve el motivo por el que el driver debe reciclarse, o None"""
+        if not driver:
+            return None
+
+        if self.max_paginas and self.paginas >= self.max_paginas:
+            return f"{self.paginas} páginas procesadas (máximo {self.max_paginas})"
+
+        if self.max_minutos and self.edad_minutos() >= self.max_minutos:
+            return f"{self.edad_minutos():.0f} minutos de vida (máximo {self.max_minutos})"
+
+        if self.max_rss_mb:
+            rss = rss_arbol_navegador(driver)
+            self.ultimo_rss = rss
+            if rss is not None and rss / (1024 * 1024) >= self.max_rss_mb:
+                return f"RSS del navegador {rss / (1024 * 1024):.0f} MB (máximo {self.max_rss_mb} MB)"
+
+        return None
+
+    def estadisticas(self) -> Dict:
+        return {
+            'paginas': self.paginas,
+            'edad_minutos': round(self.edad_minutos(), 1),
+            'rss_mb': round(self.ultimo_rss / (1024 * 1024), 1) if self.ultimo_rss else None,
+            'reciclajes': self.reciclajes
+        }
+
+
+def exportar_cookies(driver) -> List[Dict]:
+    """Exporta las cookies de todos los dominios (CDP) o, si no hay CDP, las del dominio actual"""
+    if hasattr(driver, 'execute_cdp_cmd'):
+        try:
+            return driver.execute_cdp_cmd('Network.getAllCookies', {}).get('cookies', [])
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudieron leer las cookies vía CDP: {e}")
+    try:
+        return driver.get_cookies()
+    except Exception as e:
+        logger.warning(f"⚠️ No se pudieron leer las cookies: {e}")
+        return []
+
+
+def restaurar_cookies(driver, cookies: List[Dict], url: Optional[str] = None) -> int:
+    """Restaura cookies exportadas en un driver nuevo; retorna cuántas se aplicaron"""
+    if not cookies:
+        return 0
+
+    if hasattr(driver, 'execute_cdp_cmd'):
+        campos = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+        parametros = []
+        for cookie in cookies:
+            parametro = {campo: cookie[campo] for campo in campos if campo in cookie}
+            # Las cookies de sesión vienen con expires=-1 y no deben enviarlo
+            if parametro.get('expires', 0) < 0 or cookie.get('session'):
+                parametro.pop('expires', None)
+            parametros.append(parametro)
+        try:
+            driver.execute_cdp_cmd('Network.setCookies', {'cookies': parametros})
+            return len(parametros)
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudieron restaurar las cookies vía CDP: {e}")
+
+    # Sin CDP solo se pueden añadir cookies del dominio cargado
+    if not url:
+        return 0
+    aplicadas = 0
+    driver.get(url)
+    for cookie in cookies:
+        try:
+            driver.add_cookie({clave: valor for clave, valor in cookie.items() if clave != 'sameSite' or valor})
+            aplicadas += 1
+        except Exception:
+            continue
+    return aplicadas
@@ -0,0 +1,79 @@
+"""
+Captura en bloque de los campos configurados en ``informacion_capturada``.
+
+En lugar de un ``WebDriverWait`` por campo, todos los selectores se resuelven
+en una sola llamada a ``execute_script`` que devuelve el valor de cada campo
+según su tipo: ``value`` (o ``placeholder``) para input, texto visible para
+text y la opción seleccionada para select. La llamada se repite hasta que
+aparecen todos los campos o, si falta alguno opcional, hasta que la página
+terminó de cargar y ya están los obligatorios. Así el tiempo de captura no
+depende de cuántos campos haya.
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional
+
+from src.deadline import acotar, esperar
+
+logger = logging.getLogger(__name__)
+
+# Tabla donde se guardan los valores capturados (se crea si no existe)
+TABLA_VALORES = 'valores_capturados'
+
+COLUMNAS_VALORES = {
+    'IdValor': 'INT IDENTITY(1,1) PRIMARY KEY',
+    'IdUrl': 'UNIQUEIDENTIFIER NOT NULL',
+    'NumDocIdentidad': 'NVARCHAR(50)',
+    'NombreCampo': 'NVARCHAR(100) NOT NULL',
+    'ValorCampo': 'NVARCHAR(MAX)',
+    'FechaCaptura': 'DATETIME2 DEFAULT GETDATE()'
+}
+
+# Devuelve {listo: readyState complete, valores: [valor o null por campo]}
+_SCRIPT_CAMPOS = """
+var valores = arguments[0].map(function (campo) {
+    var elemento;
+    try { elemento = document.querySelector(campo[0]); } catch (e) { return null; }
+    if (!elemento) { return null; }
+    switch (campo[1]) {
+        case 'input':
+            return elemento.value || elemento.getAttribute('placeholder') || '';
+        case 'text':
+            return elemento.innerText || '';
+        case 'select':
+            var opcion = elemento.selectedOptions && elemento.selectedOptions[0];
+            return opcion ? opcion.text : '';
+        default:
+            return elemento.innerText || elemento.value || '';
+    }
+});
+return {listo: document.readyState === 'complete', valores: valores};
+"""
+
+
+def capturar_campos(driver, campos: List[Dict], timeout: float = 10, intervalo: float = 0.25,
+                    reloj=time.monotonic) -> Dict[str, Optional[str]]:
+    """Valor (sin espacios en los extremos) de cada campo por ``NombreCampo``; None si no apareció.
+
+    ``campos`` son las filas de ``informacion_capturada`` (NombreCampo,
+    TipoCampo, SelectorCSS, Obligatorio). Espera como máximo ``timeout``
+    segundos, recortados al plazo del mensaje, por todos los campos juntos.
+    """
+    if not campos:
+        return {}
+    consulta = [[campo['SelectorCSS'], (campo['TipoCampo'] or '').lower()] for campo in campos]
+    obligatorios = [i for i, campo in enumerate(campos) if campo.get('Obligatorio')]
+
+    vence = reloj() + acotar(timeout)
+    while True:
+        resultado = driver.execute_script(_SCRIPT_CAMPOS, consulta)
+        valores = resultado['valores']
+        completos = all(valor is not None for valor in valores)
+        obligatorios_listos = all(valores[i] is not None for i in obligatorios)
+        if completos or (resultado['listo'] and obligatorios_listos) or reloj() >= vence:
+            break
+        esperar(min(intervalo, max(0.0, vence - reloj())))
+
+    return {campo['NombreCampo']: (valor.strip() if valor is not None else None)
+            for campo, valor in zip(campos, valores)}
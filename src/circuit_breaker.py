@@ -0,0 +1,118 @@
+"""
+Circuit breaker por portal de aseguradora.
+
+Tras ``umbral_fallos`` mensajes fallidos seguidos (login o búsqueda fallida,
+timeout, página 429/5xx) el circuito se abre: durante ``segundos_abierto``
+los mensajes de esa aseguradora no tocan el navegador y se difieren a la cola
+de reintentos. Pasado ese tiempo el circuito queda semiabierto y deja pasar un
+único mensaje de prueba: si sale bien se cierra, si falla se vuelve a abrir.
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from src.metrics import metricas
+
+logger = logging.getLogger(__name__)
+
+CERRADO = 'cerrado'
+SEMIABIERTO = 'semiabierto'
+ABIERTO = 'abierto'
+
+# Valor numérico de cada estado para el gauge scraping_circuito_estado
+VALOR_ESTADO = {CERRADO: 0, SEMIABIERTO: 1, ABIERTO: 2}
+
+
+class CircuitoAbierto(Exception):
+    """El portal de la aseguradora está fuera de servicio; reintentar en ``reintentar_en`` segundos"""
+
+    def __init__(self, nombre: str, reintentar_en: float):
+        super().__init__(f"Circuito abierto para {nombre} (prueba en {reintentar_en:.0f}s)")
+        self.nombre = nombre
+        self.reintentar_en = reintentar_en
+
+
+class CircuitBreaker:
+    """Abre el paso a un portal tras fallos consecutivos y lo prueba con un solo mensaje"""
+
+    def __init__(self, nombre: str, umbral_fallos: int = 5, segundos_abierto: float = 60.0,
+                 reloj=time.monotonic):
+        self.nombre = nombre
+        self.umbral_fallos = umbral_fallos
+        self.segundos_abierto = segundos_abierto
+        self._reloj = reloj
+
+        self.estado = CERRADO
+        self.fallos_consecutivos = 0
+        self.aperturas = 0
+        self._abierto_desde: Optional[float] = None
+        self._prueba_desde: Optional[float] = None  # mensaje de prueba en curso (semiabierto)
+        self._lock = threading.Lock()
+
+    def restante(self) -> float:
+        """Segundos hasta que el circuito abierto admita un mensaje de prueba"""
+        with self._lock:
+            if self.estado == CERRADO:
+                return 0.0
+            desde = self._prueba_desde if self.estado == SEMIABIERTO else self._abierto_desde
+            if desde is None:
+                return 0.0
+            return max(0.0, desde + self.segundos_abierto - self._reloj())
+
+    def permitir(self):
+        """Deja pasar el mensaje o lanza ``CircuitoAbierto``"""
+        with self._lock:
+            ahora = self._reloj()
+            if self.estado == CERRADO:
+                return
+            if self.estado == ABIERTO and ahora - self._abierto_desde >= self.segundos_abierto:
+                self.estado = SEMIABIERTO
+                self._prueba_desde = None
+                logger.info(f"🔌 {self.nombre}: circuito semiabierto - probando el portal con un mensaje")
+            if self.estado == SEMIABIERTO:
+                # Una prueba que nunca informó su resultado no bloquea el circuito para siempre
+                if self._prueba_desde is None or ahora - self._prueba_desde >= self.segundos_abierto:
+                    self._prueba_desde = ahora
+                    return
+                desde = self._prueba_desde
+            else:
+                desde = self._abierto_desde
+            restante = max(0.0, desde + self.segundos_abierto - ahora)
+        raise CircuitoAbierto(self.nombre, restante)
+
+    def registrar_exito(self):
+        with self._lock:
+            if self.estado != CERRADO:
+                logger.info(f"🔌 {self.nombre}: portal recuperado - circuito cerrado")
+            self.estado = CERRADO
+            self.fallos_consecutivos = 0
+            self._abierto_desde = None
+            self._prueba_desde = None
+
+    def registrar_fallo(self, motivo: str = 'error'):
+        with self._lock:
+            self.fallos_consecutivos += 1
+            if self.estado == SEMIABIERTO or (self.estado == CERRADO and
+                                              self.fallos_consecutivos >= self.umbral_fallos):
+                self._abrir(motivo)
+
+    def _abrir(self, motivo: str):
+        self.estado = ABIERTO
+        self.aperturas += 1
+        self._abierto_desde = self._reloj()
+        self._prueba_desde = None
+        metricas.incrementar('scraping_circuito_aperturas_total',
+                             descripcion='Aperturas del circuito por portal fuera de servicio',
+                             aseguradora=self.nombre, motivo=motivo)
+        logger.error(f"🔌 {self.nombre}: circuito ABIERTO tras {self.fallos_consecutivos} fallos seguidos "
+                     f"({motivo}) - mensajes diferidos {self.segundos_abierto:.0f}s")
+
+    def resumen(self) -> Dict:
+        with self._lock:
+            return {
+                'estado': self.estado,
+                'fallos_consecutivos': self.fallos_consecutivos,
+                'aperturas': self.aperturas
+            }
@@ -0,0 +1,206 @@
+"""
+Control adaptativo de concurrencia por portal de aseguradora (AIMD).
+
+Cada aseguradora tiene un ``AdaptiveLimiter`` con dos perillas:
+
+* ``limite``: mensajes simultáneos permitidos (entre 1 y el ``max_concurrencia``
+  del plugin). Sube de a uno tras ``limite`` mensajes sanos seguidos y se
+  multiplica por ``factor_reduccion`` ante congestión.
+* ``espera``: separación mínima entre dos mensajes que empiezan. Nunca baja de
+  SCRAPING_DELAY; se duplica ante congestión y se recupera restando
+  ``paso_espera`` por cada mensaje sano, antes de volver a subir el límite.
+
+Se considera congestión un timeout, una página de error HTTP 429/5xx, una
+espera atascada en ``authorization.ping``, una latencia muy por encima de la
+habitual o una tasa de errores sostenida. Las señales se dan durante el
+mensaje (``senalar_congestion``) y se aplican al liberarlo.
+"""
+
+import re
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from src.metrics import metricas
+
+logger = logging.getLogger(__name__)
+
+# Páginas de error que devuelven los portales cuando nos están limitando o caídos
+_PATRON_ERROR_HTTP = re.compile(
+    r'\b(429|5\d\d)\b|too many requests|service unavailable|bad gateway|gateway time-?out',
+    re.IGNORECASE
+)
+_CODIGOS_POR_TEXTO = {
+    'too many requests': '429',
+    'service unavailable': '503',
+    'bad gateway': '502',
+    'gateway time': '504',
+}
+
+
+def codigo_http_en_pagina(titulo: Optional[str]) -> Optional[str]:
+    """Código HTTP de congestión (429/5xx) que muestra el título de la página, o None"""
+    coincidencia = _PATRON_ERROR_HTTP.search(titulo or '')
+    if not coincidencia:
+        return None
+    if coincidencia.group(1):
+        return coincidencia.group(1)
+    texto = coincidencia.group(0).lower()
+    return next((codigo for clave, codigo in _CODIGOS_POR_TEXTO.items() if texto.startswith(clave)), '5xx')
+
+
+class Permiso:
+    """Turno concedido por el limitador; ``resultado`` se informa al liberarlo"""
+
+    def __init__(self):
+        self.resultado = 'ok'
+
+
+class AdaptiveLimiter:
+    """Límite de concurrencia y espera entre mensajes que se ajustan con AIMD"""
+
+    def __init__(self, nombre: str, maximo: int = 1, espera_minima: float = 0.0,
+                 espera_maxima: float = 60.0, latencia_objetivo: float = 0.0,
+                 tolerancia_latencia: float = 3.0, latencia_minima: float = 1.0, umbral_errores: float = 0.25,
+                 factor_reduccion: float = 0.5, paso_espera: float = 0.5,
+                 enfriamiento: float = 5.0, reloj=time.monotonic, dormir=time.sleep):
+        self.nombre = nombre
+        self.maximo = max(1, int(maximo))
+        self.espera_minima = max(0.0, float(espera_minima or 0))
+        self.espera_maxima = max(self.espera_minima, float(espera_maxima))
+        self.latencia_objetivo = latencia_objetivo  # 0 = tolerancia_latencia x latencia habitual
+        self.tolerancia_latencia = tolerancia_latencia
+        self.latencia_minima = latencia_minima  # por debajo nunca se considera lentitud del portal
+        self.umbral_errores = umbral_errores
+        self.factor_reduccion = factor_reduccion
+        self.paso_espera = paso_espera
+        self.enfriamiento = enfriamiento  # una sola reducción por ráfaga de fallos
+        self._reloj = reloj
+        self._dormir = dormir
+
+        self.limite = 1
+        self._sanos = 0  # mensajes sanos seguidos desde el último cambio de límite
+        self.espera = self.espera_minima
+        self.en_curso = 0
+        self.latencia_habitual: Optional[float] = None
+        self.muestras_latencia = 0
+        self.tasa_errores = 0.0
+        self.reducciones = 0
+        self._proximo_inicio = 0.0
+        self._ultima_reduccion: Optional[float] = None
+        self._condicion = threading.Condition()
+        self._local = threading.local()
+
+    # --- Turnos --------------------------------------------------------------
+
+    def adquirir(self, timeout: Optional[float] = None) -> bool:
+        """Espera un hueco bajo ``limite`` y respeta ``espera`` desde el último inicio, todo dentro de ``timeout``"""
+        limite_tiempo = None if timeout is None else self._reloj() + timeout
+        with self._condicion:
+            while self.en_curso >= self.limite:
+                restante = None if limite_tiempo is None else limite_tiempo - self._reloj()
+                if restante is not None and restante <= 0:
+                    return False
+                self._condicion.wait(restante)
+            ahora = self._reloj()
+            inicio = max(ahora, self._proximo_inicio)
+            if limite_tiempo is not None and inicio > limite_tiempo:
+                return False  # la espera entre mensajes no cabe en el timeout
+            self.en_curso += 1
+            self._proximo_inicio = inicio + self.espera
+            pausa = inicio - ahora
+        if pausa > 0:
+            self._dormir(pausa)
+        self._local.congestion = None
+        self._local.omitir_latencia = False
+        return True
+
+    def liberar(self, latencia: float, resultado: str = 'ok'):
+        """Devuelve el turno y ajusta límite y espera según cómo fue el mensaje"""
+        congestion = getattr(self._local, 'congestion', None)
+        omitir_latencia = getattr(self._local, 'omitir_latencia', False)
+        self._local.congestion = None
+        with self._condicion:
+            self.en_curso = max(0, self.en_curso - 1)
+            error = resultado != 'ok'
+            self.tasa_errores += 0.2 * ((1.0 if error or congestion else 0.0) - self.tasa_errores)
+
+            if congestion:
+                self._reducir(congestion)
+            elif error:
+                if self.tasa_errores > self.umbral_errores:
+                    self._reducir('errores')
+            elif not omitir_latencia and self._latencia_excesiva(latencia):
+                self._reducir('latencia')
+            else:
+                if not omitir_latencia:
+                    self._registrar_latencia(latencia)
+                self._aumentar()
+            self._condicion.notify_all()
+
+    # --- Señales durante el mensaje -------------------------------------------
+
+    def senalar_congestion(self, motivo: str):
+        """Marca el mensaje en curso (de este hilo) como congestionado por ``motivo``"""
+        if getattr(self._local, 'congestion', None) is None:
+            logger.warning(f"🚦 {self.nombre}: señal de congestión ({motivo})")
+        self._local.congestion = motivo
+
+    def omitir_latencia(self):
+        """El mensaje en curso no es representativo (p.ej. incluyó un login completo)"""
+        self._local.omitir_latencia = True
+
+    # --- AIMD ----------------------------------------------------------------
+
+    def _latencia_excesiva(self, latencia: float) -> bool:
+        if self.latencia_objetivo:
+            return latencia > self.latencia_objetivo
+        if self.latencia_habitual is None or self.muestras_latencia < 5 or latencia < self.latencia_minima:
+            return False
+        return latencia > self.latencia_habitual * self.tolerancia_latencia
+
+    def _registrar_latencia(self, latencia: float):
+        if self.latencia_habitual is None:
+            self.latencia_habitual = latencia
+        else:
+            self.latencia_habitual += 0.1 * (latencia - self.latencia_habitual)
+        self.muestras_latencia += 1
+
+    def _aumentar(self):
+        if self.espera > self.espera_minima:
+            self.espera = max(self.espera_minima, self.espera - self.paso_espera)
+        elif self.limite < self.maximo:
+            self._sanos += 1
+            if self._sanos >= self.limite:
+                self._sanos = 0
+                self.limite += 1
+                logger.info(f"🚦 {self.nombre}: concurrencia aumentada a {self.limite}")
+
+    def _reducir(self, motivo: str):
+        ahora = self._reloj()
+        if self._ultima_reduccion is not None and ahora - self._ultima_reduccion < self.enfriamiento:
+            return
+        self._ultima_reduccion = ahora
+        self.reducciones += 1
+        self._sanos = 0
+        self.limite = max(1, int(self.limite * self.factor_reduccion))
+        self.espera = min(self.espera_maxima, max(self.espera * 2, self.espera_minima, 1.0))
+        self._proximo_inicio = max(self._proximo_inicio, ahora + self.espera)
+        metricas.incrementar('scraping_concurrencia_reducciones_total',
+                             descripcion='Reducciones de concurrencia por congestión del portal',
+                             aseguradora=self.nombre, motivo=motivo)
+        logger.warning(f"🚦 {self.nombre}: congestión ({motivo}) - concurrencia {self.limite}, "
+                       f"espera {self.espera:.1f}s entre mensajes")
+
+    def estado(self) -> Dict[str, float]:
+        with self._condicion:
+            return {
+                'limite': self.limite,
+                'maximo': self.maximo,
+                'espera': self.espera,
+                'en_curso': self.en_curso,
+                'tasa_errores': self.tasa_errores,
+                'latencia_habitual': self.latencia_habitual,
+                'reducciones': self.reducciones
+            }
@@ -33,6 +33,108 @@ class Config:
     SCRAPING_DELAY = int(os.getenv('SCRAPING_DELAY')) if os.getenv('SCRAPING_DELAY') else None
     MAX_RETRIES = int(os.getenv('MAX_RETRIES')) if os.getenv('MAX_RETRIES') else None
     
+    # Límites de descarga para scraping con requests (opcionales)
+    SCRAPING_MAX_BYTES = int(os.getenv('SCRAPING_MAX_BYTES', '5242880'))  # 5 MB
+    SCRAPING_CHUNK_SIZE = int(os.getenv('SCRAPING_CHUNK_SIZE', '65536'))
+    SCRAPING_CONTENT_TYPES = [
+        tipo.strip().lower()
+        for tipo in os.getenv('SCRAPING_CONTENT_TYPES', 'text/html,application/xhtml+xml').split(',')
+        if tipo.strip()
+    ]
+    
+    # Ciclo de vida de Selenium (opcionales)
+    SELENIUM_IDLE_TIMEOUT = int(os.getenv('SELENIUM_IDLE_TIMEOUT', '300'))  # 0 = no cerrar por inactividad
+    SELENIUM_POOL_SIZE = int(os.getenv('SELENIUM_POOL_SIZE', '0'))  # 0 = driver propio por WebScraper
+    SELENIUM_POOL_TIMEOUT = int(os.getenv('SELENIUM_POOL_TIMEOUT', '60'))
+    
+    # Reciclaje de navegadores de larga duración (0 = criterio desactivado)
+    BROWSER_RECICLAR_PAGINAS = int(os.getenv('BROWSER_RECICLAR_PAGINAS', '500'))
+    BROWSER_RECICLAR_MINUTOS = float(os.getenv('BROWSER_RECICLAR_MINUTOS', '180'))
+    BROWSER_RECICLAR_RSS_MB = float(os.getenv('BROWSER_RECICLAR_RSS_MB', '1500'))
+    
+    # Portal de beneficios de PAN AMERICAN LIFE DE ECUADOR (se puede apuntar al
+    # portal local de benchmarks.portal_palig para pruebas sin conexión)
+    PALE_EC_BUSQUEDA_URL = os.getenv(
+        'PALE_EC_BUSQUEDA_URL',
+        'https://benefitsdirect.palig.com/Inicio/Contenido/InfoAsegurado/MisPolizasPVR.aspx'
+    )
+    # Límites del plugin PALE_EC: mensajes simultáneos por proceso y vida máxima
+    # de la sesión antes de forzar un nuevo login (0 = sin caducidad)
+    PALE_EC_MAX_CONCURRENCIA = int(os.getenv('PALE_EC_MAX_CONCURRENCIA', '1'))
+    PALE_EC_TTL_SESION_SEGUNDOS = float(os.getenv('PALE_EC_TTL_SESION_SEGUNDOS', '3600'))
+    PALE_EC_PLAZO_SEGUNDOS = float(os.getenv('PALE_EC_PLAZO_SEGUNDOS', '300'))
+    
+    # Concurrencia adaptativa por portal (AIMD): SCRAPING_DELAY es la espera mínima entre
+    # mensajes y CONCURRENCIA_ESPERA_MAXIMA el tope al que llega tras congestiones seguidas.
+    # Latencia objetivo en segundos (0 = 3 veces la latencia habitual del portal)
+    CONCURRENCIA_ESPERA_MAXIMA = float(os.getenv('CONCURRENCIA_ESPERA_MAXIMA', '60'))
+    CONCURRENCIA_LATENCIA_OBJETIVO = float(os.getenv('CONCURRENCIA_LATENCIA_OBJETIVO', '0'))
+    
+    # Caché de resultados por aseguradora + NumDocIdentidad (TTL 0 = desactivado).
+    # RESULTADOS_CACHE_SQLITE: archivo SQLite para conservarlo entre reinicios (vacío = solo memoria)
+    # (en modo supervisor, vacío = un SQLite temporal compartido por sus workers)
+    RESULTADOS_CACHE_TTL_SEGUNDOS = float(os.getenv('RESULTADOS_CACHE_TTL_SEGUNDOS', '21600'))
+    RESULTADOS_CACHE_MAX_ENTRADAS = int(os.getenv('RESULTADOS_CACHE_MAX_ENTRADAS', '5000'))
+    RESULTADOS_CACHE_SQLITE = os.getenv('RESULTADOS_CACHE_SQLITE', '')
+    # Pacientes no encontrados o inactivos: TTL corto para no repetir la búsqueda en reintentos
+    # (0 = desactivado; el campo ForzarBusqueda del mensaje ignora ambos cachés)
+    RESULTADOS_CACHE_NEGATIVO_TTL_SEGUNDOS = float(os.getenv('RESULTADOS_CACHE_NEGATIVO_TTL_SEGUNDOS', '900'))
+    
+    # Circuit breaker por portal: se abre tras CIRCUITO_UMBRAL_FALLOS fallos seguidos (0 = desactivado)
+    # y mientras está abierto los mensajes esperan CIRCUITO_REINTENTO_SEGUNDOS en la cola de reintentos
+    # (RABBITMQ_COLA_REINTENTOS, por defecto <RABBITMQ_QUEUE>.reintentos). CIRCUITO_MAX_REINTENTOS 0 = sin límite
+    CIRCUITO_UMBRAL_FALLOS = int(os.getenv('CIRCUITO_UMBRAL_FALLOS', '5'))
+    CIRCUITO_SEGUNDOS_ABIERTO = float(os.getenv('CIRCUITO_SEGUNDOS_ABIERTO', '60'))
+    CIRCUITO_REINTENTO_SEGUNDOS = float(os.getenv('CIRCUITO_REINTENTO_SEGUNDOS', '60'))
+    CIRCUITO_MAX_REINTENTOS = int(os.getenv('CIRCUITO_MAX_REINTENTOS', '0'))
+    RABBITMQ_COLA_REINTENTOS = os.getenv('RABBITMQ_COLA_REINTENTOS', '') or f"{RABBITMQ_QUEUE}.reintentos"
+    
+    # Plazo de cada mensaje (cabecera x-deadline o plazo_segundos del plugin; si no, PLAZO_MENSAJE_SEGUNDOS)
+    # y presupuesto máximo de cada etapa dentro de él. 0 = sin límite
+    PLAZO_MENSAJE_SEGUNDOS = float(os.getenv('PLAZO_MENSAJE_SEGUNDOS', '300'))
+    PLAZO_LOGIN_SEGUNDOS = float(os.getenv('PLAZO_LOGIN_SEGUNDOS', '180'))
+    PLAZO_BUSQUEDA_SEGUNDOS = float(os.getenv('PLAZO_BUSQUEDA_SEGUNDOS', '90'))
+    PLAZO_BD_SEGUNDOS = float(os.getenv('PLAZO_BD_SEGUNDOS', '30'))
+    
+    # Estrategia de lectura de la tabla de resultados: webdriver, js o lxml
+    # (ver python -m benchmarks.micro_tabla para comparar su rendimiento)
+    TABLA_RESULTADOS_ESTRATEGIA = os.getenv('TABLA_RESULTADOS_ESTRATEGIA', 'webdriver').strip().lower()
+    
+    # Endpoint de métricas en formato Prometheus (0 = desactivado)
+    METRICS_PORT = int(os.getenv('METRICS_PORT', '9108'))
+    METRICS_HOST = os.getenv('METRICS_HOST', '0.0.0.0')
+    METRICS_INTERVALO_COLA = float(os.getenv('METRICS_INTERVALO_COLA', '15'))  # segundos entre lecturas de la cola
+    
+    # Modo supervisor (--processes N): workers por contenedor, espera entre arranques, gracia para
+    # terminar el mensaje en curso al detenerse y espera máxima antes de reiniciar un worker caído.
+    # Cada worker publica sus métricas en METRICS_PORT + índice
+    WORKER_PROCESOS = int(os.getenv('WORKER_PROCESOS', '1'))
+    SUPERVISOR_ESCALONADO_SEGUNDOS = float(os.getenv('SUPERVISOR_ESCALONADO_SEGUNDOS', '5'))
+    SUPERVISOR_GRACIA_SEGUNDOS = float(os.getenv('SUPERVISOR_GRACIA_SEGUNDOS', '30'))
+    SUPERVISOR_ESPERA_MAXIMA_REINICIO = float(os.getenv('SUPERVISOR_ESPERA_MAXIMA_REINICIO', '60'))
+    
+    # Autoescalado por profundidad de la cola: workers recomendados para atender las llegadas y vaciar
+    # la cola en AUTOESCALADO_OBJETIVO_DRENADO_SEGUNDOS. Con AUTOESCALADO_MAX_PROCESOS > 1 el supervisor
+    # aplica la recomendación (baja solo tras AUTOESCALADO_ENFRIAMIENTO_SEGUNDOS); con 0 solo se publica
+    AUTOESCALADO_MIN_PROCESOS = int(os.getenv('AUTOESCALADO_MIN_PROCESOS', '1'))
+    AUTOESCALADO_MAX_PROCESOS = int(os.getenv('AUTOESCALADO_MAX_PROCESOS', '0'))
+    AUTOESCALADO_OBJETIVO_DRENADO_SEGUNDOS = float(os.getenv('AUTOESCALADO_OBJETIVO_DRENADO_SEGUNDOS', '300'))
+    AUTOESCALADO_UTILIZACION_OBJETIVO = float(os.getenv('AUTOESCALADO_UTILIZACION_OBJETIVO', '0.8'))
+    AUTOESCALADO_ENFRIAMIENTO_SEGUNDOS = float(os.getenv('AUTOESCALADO_ENFRIAMIENTO_SEGUNDOS', '300'))
+    AUTOESCALADO_INTERVALO_SEGUNDOS = float(os.getenv('AUTOESCALADO_INTERVALO_SEGUNDOS', '30'))
+    
+    # Logging del worker de producción (el nivel es LOG_LEVEL)
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'json').strip().lower()  # json o texto
+    LOG_FILE = os.getenv('LOG_FILE', 'production_worker.log')  # vacío = solo consola
+    LOG_MUESTREO = int(os.getenv('LOG_MUESTREO', '50'))  # 1 de cada N logs DEBUG por fila/iteración
+    
+    # Perfilado de mensajes (también por mensaje con la cabecera AMQP x-profile)
+    PROFILING_MODO = os.getenv('PROFILING_MODO', 'cprofile').strip().lower()  # cprofile o muestreo
+    PROFILING_MENSAJES = int(os.getenv('PROFILING_MENSAJES', '0'))  # perfilar los primeros N mensajes
+    PROFILING_DIRECTORIO = os.getenv('PROFILING_DIRECTORIO', 'profiles')
+    PROFILING_MAX_ARCHIVOS = int(os.getenv('PROFILING_MAX_ARCHIVOS', '50'))
+    PROFILING_INTERVALO_MS = float(os.getenv('PROFILING_INTERVALO_MS', '10'))  # solo modo muestreo
+    
     @classmethod
     def get_sql_connection_string(cls):
         """Genera la cadena de conexión para SQL Server"""
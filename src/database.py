@@ -1,3 +1,4 @@
+import math
 import pyodbc
 import logging
 from sqlalchemy import create_engine, text
@@ -5,6 +6,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from typing import Optional, List, Dict, Any
 from .config import Config
+from .deadline import acotar_opcional
 
 logger = logging.getLogger(__name__)
 
@@ -41,10 +43,19 @@ class DatabaseManager:
             logger.error(f"Error al conectar con la base de datos: {e}")
             return False
     
+    def _aplicar_plazo(self, session):
+        """Timeout de la consulta: PLAZO_BD_SEGUNDOS recortado al plazo del mensaje (0 = sin límite)"""
+        segundos = acotar_opcional(Config.PLAZO_BD_SEGUNDOS)
+        conexion = session.connection().connection
+        # La conexión del pool se reutiliza: el timeout se fija (o se limpia) en cada consulta
+        dbapi = getattr(conexion, 'driver_connection', None) or conexion
+        dbapi.timeout = int(math.ceil(segundos)) if segundos else 0
+    
     def execute_query(self, query: str, params: Optional[Dict] = None) -> List[Dict]:
         """Ejecuta una consulta SQL y retorna los resultados"""
         try:
             with self.Session() as session:
+                self._aplicar_plazo(session)
                 if params:
                     result = session.execute(text(query), params)
                 else:
@@ -68,6 +79,7 @@ class DatabaseManager:
             query = f"INSERT INTO {table_name} ({columns}) VALUES ({placeholders})"
             
             with self.Session() as session:
+                self._aplicar_plazo(session)
                 session.execute(text(query), data)
                 session.commit()
                 logger.info(f"Datos insertados exitosamente en {table_name}")
@@ -76,6 +88,49 @@ class DatabaseManager:
             logger.error(f"Error al insertar datos en {table_name}: {e}")
             return False
     
+    def insert_many(self, table_name: str, rows: List[Dict[str, Any]]) -> bool:
+        """Inserta varias filas (con las mismas columnas) en un solo INSERT por lote y una transacción"""
+        if not rows:
+            return True
+        try:
+            columns = list(rows[0].keys())
+            # SQL Server admite hasta 1000 filas por VALUES y 2100 parámetros por consulta
+            batch_size = max(1, min(1000, 2000 // len(columns)))
+            
+            with self.Session() as session:
+                self._aplicar_plazo(session)
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    values, params = [], {}
+                    for i, row in enumerate(batch):
+                        placeholders = []
+                        for j, column in enumerate(columns):
+                            params[f"p{i}_{j}"] = row.get(column)
+                            placeholders.append(f":p{i}_{j}")
+                        values.append(f"({', '.join(placeholders)})")
+                    query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES {', '.join(values)}"
+                    session.execute(text(query), params)
+                session.commit()
+                logger.info(f"{len(rows)} filas insertadas exitosamente en {table_name}")
+                return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error al insertar filas en {table_name}: {e}")
+            return False
+    
+    def estadisticas_pool(self) -> Dict[str, int]:
+        """Estado del pool de conexiones de SQLAlchemy (vacío si el pool no lo expone)"""
+        pool = getattr(self.engine, 'pool', None)
+        estadisticas = {}
+        for nombre, metodo in (('tamano', 'size'), ('en_uso', 'checkedout'),
+                               ('disponibles', 'checkedin'), ('desborde', 'overflow')):
+            funcion = getattr(pool, metodo, None)
+            if callable(funcion):
+                try:
+                    estadisticas[nombre] = funcion()
+                except Exception:
+                    continue
+        return estadisticas
+    
     def create_table_if_not_exists(self, table_name: str, columns: Dict[str, str]):
         """Crea una tabla si no existe"""
         try:
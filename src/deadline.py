@@ -0,0 +1,145 @@
+"""
+Plazo (deadline) de cada mensaje y presupuestos por etapa.
+
+El worker abre un plazo por mensaje con la cabecera AMQP ``x-deadline``
+(instante epoch en segundos fijado por el productor) o, si no viene, con el
+``plazo_segundos`` del plugin de la aseguradora. Dentro de él, el login, la
+búsqueda y cada consulta a BD tienen su propio presupuesto, que nunca supera
+lo que le queda al mensaje.
+
+Las esperas del flujo usan ``esperar`` (en lugar de ``time.sleep``) y
+``acotar`` (para los timeouts de ``WebDriverWait``); el timeout de la BD usa
+``acotar_opcional``, donde 0 significa sin límite propio. Agotado el plazo,
+todas lanzan ``PlazoAgotado`` de inmediato, así que los reintentos y las
+estrategias alternativas terminan sin volver a esperar. Fuera de un plazo se
+comportan como la espera original.
+"""
+
+import time
+import logging
+import contextvars
+from contextlib import contextmanager
+from typing import Optional
+
+from src.metrics import metricas
+
+logger = logging.getLogger(__name__)
+
+# Cabecera AMQP con el instante (epoch, segundos) en que el mensaje deja de interesar
+CABECERA = 'x-deadline'
+
+
+class PlazoAgotado(TimeoutError):
+    """Se agotó el tiempo del mensaje (o de la etapa ``etapa``)"""
+
+    def __init__(self, etapa: str):
+        super().__init__(f"Plazo agotado en la etapa '{etapa}'")
+        self.etapa = etapa
+
+
+class Plazo:
+    """Instante límite de una etapa sobre ``time.monotonic``"""
+
+    def __init__(self, segundos: float, etapa: str = 'mensaje', reloj=time.monotonic):
+        self.etapa = etapa
+        self._reloj = reloj
+        self.vence = reloj() + segundos
+
+    def restante(self) -> float:
+        return self.vence - self._reloj()
+
+    @property
+    def vencido(self) -> bool:
+        return self.restante() <= 0
+
+
+_plazo_actual: contextvars.ContextVar = contextvars.ContextVar('plazo_actual', default=None)
+
+
+def plazo_actual() -> Optional[Plazo]:
+    return _plazo_actual.get()
+
+
+@contextmanager
+def plazo(segundos: Optional[float], etapa: str = 'mensaje', reloj=time.monotonic):
+    """Acota el bloque a ``segundos`` sin pasar del plazo vigente; None o <= 0 = sin presupuesto propio"""
+    actual = _plazo_actual.get()
+    if not segundos or segundos <= 0:
+        yield actual
+        return
+    nuevo = Plazo(segundos, etapa, reloj)
+    if actual is not None and actual.vence <= nuevo.vence:
+        nuevo = actual
+    token = _plazo_actual.set(nuevo)
+    try:
+        yield nuevo
+    finally:
+        _plazo_actual.reset(token)
+
+
+def segundos_hasta(vence_epoch) -> Optional[float]:
+    """Segundos desde ahora hasta el instante epoch de la cabecera ``x-deadline`` (None si no es válido)"""
+    try:
+        return float(vence_epoch) - time.time()
+    except (TypeError, ValueError):
+        logger.warning(f"⚠️ Cabecera {CABECERA} no válida: {vence_epoch!r}")
+        return None
+
+
+def agotar(etapa: Optional[str] = None):
+    """Registra y lanza ``PlazoAgotado`` para ``etapa`` (por defecto la del plazo vigente)"""
+    actual = _plazo_actual.get()
+    etapa = etapa or (actual.etapa if actual else 'mensaje')
+    metricas.incrementar('scraping_plazos_agotados_total', descripcion='Mensajes cortados por agotar su plazo',
+                         etapa=etapa)
+    raise PlazoAgotado(etapa)
+
+
+def restante() -> Optional[float]:
+    """Segundos que le quedan al plazo vigente; None fuera de un plazo"""
+    actual = _plazo_actual.get()
+    return None if actual is None else max(0.0, actual.restante())
+
+
+def verificar():
+    """Lanza ``PlazoAgotado`` si el plazo vigente ya venció"""
+    actual = _plazo_actual.get()
+    if actual is not None and actual.vencido:
+        agotar()
+
+
+def acotar(segundos: float) -> float:
+    """``segundos`` recortado a lo que queda del plazo (timeouts de WebDriverWait)"""
+    actual = _plazo_actual.get()
+    if actual is None:
+        return segundos
+    queda = actual.restante()
+    if queda <= 0:
+        agotar()
+    return min(segundos, queda)
+
+
+def acotar_opcional(segundos: float) -> float:
+    """Como ``acotar``, pero 0 = sin límite propio: lo que quede del plazo, o 0 fuera de él (timeout de BD)"""
+    if segundos and segundos > 0:
+        return acotar(segundos)
+    actual = _plazo_actual.get()
+    if actual is None:
+        return 0
+    queda = actual.restante()
+    if queda <= 0:
+        agotar()
+    return queda
+
+
+def esperar(segundos: float):
+    """``time.sleep`` que no pasa del plazo y lo reporta agotado al despertar; <= 0 solo verifica"""
+    if segundos <= 0:
+        verificar()
+        return
+    actual = _plazo_actual.get()
+    if actual is None:
+        time.sleep(segundos)
+        return
+    time.sleep(acotar(segundos))
+    verificar()
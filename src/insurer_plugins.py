@@ -0,0 +1,234 @@
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Type
+
+from src.circuit_breaker import CircuitBreaker
+from src.concurrency import AdaptiveLimiter, Permiso
+from src.selector_resolver import SelectorResolver
+
+logger = logging.getLogger(__name__)
+
+
+class InsurerPlugin:
+    """Procesador de una aseguradora: declara sus pasos y sus límites.
+
+    El worker (``procesador``) ejecuta siempre el mismo flujo y delega en el
+    plugin cada paso que depende del portal:
+
+    1. ``login``: llena los campos y ejecuta las acciones configuradas en BD
+    2. ``post_login``: esperas propias del portal (p.ej. redirecciones OAuth2)
+    3. ``navegar_busqueda``: llegar a la página donde se busca al cliente
+    4. ``buscar``: llenar el formulario de búsqueda y enviarlo
+    5. ``extraer``: leer los resultados y guardar al cliente
+
+    Un plugin nuevo hereda de esta clase, fija ``nombre`` (el NombreCompleto
+    de los mensajes) y sobrescribe solo los pasos que necesita.
+    """
+
+    nombre: str = ''
+    codigo: Optional[str] = None  # prefijo de las variables {CODIGO}_* (navegador, perfil)
+    requiere_login: bool = True
+    max_concurrencia: int = 1  # techo del límite adaptativo de mensajes simultáneos por proceso
+    ttl_sesion_segundos: float = 0  # 0 = la sesión no caduca por tiempo
+    plazo_segundos: float = 0  # plazo por mensaje sin cabecera x-deadline; 0 = PLAZO_MENSAJE_SEGUNDOS
+
+    def __init__(self, procesador):
+        self.procesador = procesador
+
+    # --- Pasos del flujo ---------------------------------------------------
+
+    def login(self, url_info, datos_mensaje=None) -> bool:
+        return self.procesador._ejecutar_login_configurado(url_info)
+
+    def post_login(self, url_info):
+        pass
+
+    def navegar_busqueda(self, url_info):
+        pass
+
+    def buscar(self, id_url, datos_mensaje=None) -> bool:
+        return self.procesador._capturar_informacion_generica(id_url, datos_mensaje)
+
+    def extraer(self, nombre_completo, datos_mensaje=None) -> bool:
+        return True
+
+    # --- Sesión ------------------------------------------------------------
+
+    def sesion_expirada(self, fecha_login: Optional[datetime]) -> bool:
+        if not self.ttl_sesion_segundos or not fecha_login:
+            return False
+        return (datetime.now() - fecha_login).total_seconds() > self.ttl_sesion_segundos
+
+
+class GenericInsurerPlugin(InsurerPlugin):
+    """Aseguradoras sin plugin propio: sin login automático y captura genérica"""
+
+    requiere_login = False
+
+
+class PluginRegistry:
+    """Registro de plugins por nombre de aseguradora, con un limitador adaptativo y un circuito por aseguradora
+
+    Sin ``gestor`` explícito usa el de ``aseguradoras``: el módulo del plugin se
+    toma del ``manifest.json`` de la aseguradora y se importa solo cuando llega
+    el primer mensaje de esa aseguradora.
+    """
+
+    def __init__(self, gestor=None):
+        self._gestor = gestor
+        self._plugins: Dict[str, Type[InsurerPlugin]] = {}
+        self._buscados = set()  # nombres cuyo plugin ya se intentó importar
+        self._limitadores: Dict[str, AdaptiveLimiter] = {}
+        self._opciones_limitador: Dict = {}
+        self._circuitos: Dict[str, CircuitBreaker] = {}
+        self._opciones_circuito: Dict = {}
+        self._resolutores: Dict[str, SelectorResolver] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def gestor(self):
+        if self._gestor is None:
+            from aseguradoras import gestor
+            self._gestor = gestor
+        return self._gestor
+
+    def registrar(self, clase: Type[InsurerPlugin]) -> Type[InsurerPlugin]:
+        """Registra un plugin; se puede usar como decorador de la clase"""
+        if not clase.nombre:
+            raise ValueError(f"El plugin {clase.__name__} no define 'nombre'")
+        with self._lock:
+            self._plugins[clase.nombre] = clase
+        logger.debug(f"🧩 Plugin registrado: {clase.nombre} ({clase.__name__})")
+        return clase
+
+    def _cargar(self, nombre: str):
+        """Importa el plugin declarado en el manifiesto de ``nombre`` (una sola vez)"""
+        with self._lock:
+            if nombre in self._plugins or nombre in self._buscados:
+                return
+            self._buscados.add(nombre)
+            modulo = self.gestor.modulo_plugin(nombre)
+            if not modulo:
+                return
+            inicio = time.perf_counter()
+            try:
+                self.gestor.importar(modulo)
+            except Exception as e:
+                # El resto de aseguradoras sigue funcionando; esta usa el plugin genérico
+                logger.error(f"❌ No se pudo cargar el plugin {modulo}: {e}")
+                return
+            logger.info(f"🧩 Plugin {modulo} cargado en {time.perf_counter() - inicio:.2f}s")
+
+    def clase_para(self, nombre: str) -> Type[InsurerPlugin]:
+        self._cargar(nombre)
+        return self._plugins.get(nombre, GenericInsurerPlugin)
+
+    def crear(self, nombre: str, procesador) -> InsurerPlugin:
+        """Instancia el plugin de ``nombre`` (o el genérico) para un procesador"""
+        return self.clase_para(nombre)(procesador)
+
+    def nombres(self) -> List[str]:
+        """Aseguradoras con plugin registrado o declarado en un manifiesto (sin importarlos)"""
+        declarados = [m['nombre'] for m in self.gestor.manifiestos.values() if m.get('plugin')]
+        return sorted(set(self._plugins) | set(declarados))
+
+    def recargar(self):
+        """Relee los manifiestos; los plugins se reimportan en su próximo uso"""
+        with self._lock:
+            self.gestor.recargar()
+            for nombre in self._buscados:
+                clase = self._plugins.get(nombre)
+                if clase is not None:
+                    self.gestor.marcar_para_recargar(clase.__module__)
+            self._plugins = {nombre: clase for nombre, clase in self._plugins.items() if nombre not in self._buscados}
+            # Los mensajes en curso liberan su limitador anterior; los nuevos usan el techo recargado
+            self._limitadores = {nombre: limitador for nombre, limitador in self._limitadores.items()
+                                 if nombre not in self._buscados}
+            # Los circuitos y los selectores recordados describen el portal, no el plugin: se conservan
+            self._buscados = set()
+        logger.info("🔄 Plugins de aseguradoras recargados")
+
+    def configurar_limitadores(self, **opciones):
+        """Parámetros de los AdaptiveLimiter que se creen a partir de ahora (espera_minima, ...)"""
+        with self._lock:
+            self._opciones_limitador = dict(opciones)
+
+    def limitador(self, plugin: InsurerPlugin) -> Optional[AdaptiveLimiter]:
+        """Limitador de la aseguradora del plugin; None si el plugin no limita (max_concurrencia <= 0)"""
+        if not plugin.max_concurrencia or plugin.max_concurrencia <= 0:
+            return None
+        with self._lock:
+            limitador = self._limitadores.get(plugin.nombre)
+            if limitador is None:
+                limitador = self._limitadores[plugin.nombre] = AdaptiveLimiter(
+                    plugin.nombre, maximo=plugin.max_concurrencia, **self._opciones_limitador)
+            return limitador
+
+    def configurar_circuitos(self, **opciones):
+        """Parámetros de los CircuitBreaker que se creen a partir de ahora (umbral_fallos, segundos_abierto)"""
+        with self._lock:
+            self._opciones_circuito = dict(opciones)
+
+    def circuito(self, plugin: InsurerPlugin) -> Optional[CircuitBreaker]:
+        """Circuit breaker del portal de la aseguradora; None si está desactivado (umbral_fallos <= 0)"""
+        with self._lock:
+            if self._opciones_circuito.get('umbral_fallos', 1) <= 0:
+                return None
+            circuito = self._circuitos.get(plugin.nombre)
+            if circuito is None:
+                circuito = self._circuitos[plugin.nombre] = CircuitBreaker(plugin.nombre, **self._opciones_circuito)
+            return circuito
+
+    def circuitos(self) -> Dict[str, CircuitBreaker]:
+        with self._lock:
+            return dict(self._circuitos)
+
+    def resolutor(self, plugin: InsurerPlugin) -> SelectorResolver:
+        """Resolutor de selectores alternativos de la aseguradora, compartido por todos los procesadores"""
+        with self._lock:
+            resolutor = self._resolutores.get(plugin.nombre)
+            if resolutor is None:
+                resolutor = self._resolutores[plugin.nombre] = SelectorResolver(plugin.nombre)
+            return resolutor
+
+    def senalar_congestion(self, plugin: InsurerPlugin, motivo: str):
+        """Informa que el portal del plugin está limitando o lento en el mensaje en curso"""
+        limitador = self.limitador(plugin)
+        if limitador:
+            limitador.senalar_congestion(motivo)
+
+    def estados(self) -> Dict[str, Dict]:
+        with self._lock:
+            limitadores = dict(self._limitadores)
+        return {nombre: limitador.estado() for nombre, limitador in limitadores.items()}
+
+    @contextmanager
+    def limite(self, plugin: InsurerPlugin, timeout: Optional[float] = None):
+        """Turno del limitador adaptativo de la aseguradora; cede un Permiso cuyo ``resultado`` ajusta el límite"""
+        permiso = Permiso()
+        limitador = self.limitador(plugin)
+        if limitador is None:
+            yield permiso
+            return
+        inicio = time.perf_counter()
+        if not limitador.adquirir(timeout=timeout):
+            raise TimeoutError(f"Límite de concurrencia de {plugin.nombre} ({limitador.limite}) agotado")
+        espera = time.perf_counter() - inicio
+        if espera > 1:
+            logger.info(f"⏳ {plugin.nombre}: {espera:.1f}s esperando turno "
+                        f"(límite {limitador.limite}/{limitador.maximo}, {limitador.espera:.1f}s entre mensajes)")
+        inicio = time.perf_counter()
+        try:
+            yield permiso
+        except Exception:
+            permiso.resultado = 'error'
+            raise
+        finally:
+            limitador.liberar(time.perf_counter() - inicio, permiso.resultado)
+
+
+# Registro compartido por todos los procesadores del proceso
+registro_aseguradoras = PluginRegistry()
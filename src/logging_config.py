@@ -0,0 +1,128 @@
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+
+from .metrics import etiquetas_contexto
+
+FORMATO_TEXTO = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Atributos estándar de LogRecord; el resto se considera contexto (extra=...)
+_ATRIBUTOS_ESTANDAR = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro con nivel, logger, mensaje y contexto"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        documento = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+            'hilo': record.threadName,
+            'pid': record.process  # distingue los workers de --processes en el mismo archivo
+        }
+        for nombre, valor in vars(record).items():
+            if nombre not in _ATRIBUTOS_ESTANDAR and not nombre.startswith('_'):
+                documento[nombre] = valor
+        if record.exc_info:
+            documento['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(documento, ensure_ascii=False, default=str)
+
+
+class ContextoFilter(logging.Filter):
+    """Copia al registro las etiquetas de ``contexto_metricas`` (p.ej. la aseguradora).
+
+    Se ejecuta en el hilo que emite el log, antes de encolarlo; el formatter
+    corre después en el hilo del QueueListener, donde ese contexto ya no existe.
+    """
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for nombre, valor in etiquetas_contexto().items():
+            if not hasattr(record, nombre):
+                setattr(record, nombre, valor)
+        return True
+
+
+class Muestreador:
+    """Deja pasar uno de cada ``cada`` eventos por clave (para logs por fila o por iteración)"""
+
+    def __init__(self, cada: int = 50):
+        self.cada = max(1, cada)
+        self._conteos: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def permitir(self, clave: str) -> bool:
+        with self._lock:
+            conteo = self._conteos.get(clave, 0)
+            self._conteos[clave] = conteo + 1
+        return conteo % self.cada == 0
+
+
+def _nivel(nivel) -> int:
+    """Nivel numérico desde un nombre ('debug', 'INFO'...); INFO si no es válido"""
+    if isinstance(nivel, int):
+        return nivel
+    valor = logging.getLevelName(str(nivel or 'INFO').strip().upper())
+    return valor if isinstance(valor, int) else logging.INFO
+
+
+def configurar_logging(nivel='INFO', archivo: Optional[str] = None, formato: str = 'json',
+                       consola: bool = True, forzar: bool = False) -> Optional[QueueListener]:
+    """Configura el logger raíz con un QueueHandler; la escritura a consola y
+    archivo ocurre en el hilo del QueueListener, fuera del hilo que procesa mensajes.
+
+    Como ``logging.basicConfig``, no hace nada si el logger raíz ya tiene
+    handlers (p.ej. un script de prueba que importa el worker), salvo con
+    ``forzar=True``. Retorna el listener, o None si no se configuró.
+    """
+    global _listener
+
+    raiz = logging.getLogger()
+    if raiz.handlers and not forzar:
+        return None
+
+    nivel = _nivel(nivel)
+    formatter = JsonFormatter() if formato == 'json' else logging.Formatter(FORMATO_TEXTO)
+
+    destinos: List[logging.Handler] = []
+    if consola:
+        destinos.append(logging.StreamHandler(sys.stdout))
+    if archivo:
+        destinos.append(logging.FileHandler(archivo, encoding='utf-8'))
+    for handler in destinos:
+        handler.setFormatter(formatter)
+
+    detener_logging()
+
+    cola: queue.SimpleQueue = queue.SimpleQueue()
+    handler_cola = QueueHandler(cola)
+    handler_cola.addFilter(ContextoFilter())
+
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    raiz.addHandler(handler_cola)
+    raiz.setLevel(nivel)
+
+    _listener = QueueListener(cola, *destinos, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def detener_logging():
+    """Vacía la cola y detiene el listener (se registra también con atexit)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(detener_logging)
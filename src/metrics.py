@@ -0,0 +1,215 @@
+import time
+import bisect
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Límites de los buckets en segundos (cubren desde un ack hasta un login OAuth2 completo)
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300)
+
+METRICA_ETAPAS = 'scraping_etapa_duracion_segundos'
+
+# Etiquetas heredadas por las mediciones anidadas (p.ej. la aseguradora del mensaje)
+_etiquetas_contexto: contextvars.ContextVar = contextvars.ContextVar('etiquetas_metricas', default={})
+
+
+@contextmanager
+def contexto_metricas(**etiquetas):
+    """Fija etiquetas por defecto para todas las mediciones dentro del bloque"""
+    token = _etiquetas_contexto.set({**_etiquetas_contexto.get(), **etiquetas})
+    try:
+        yield
+    finally:
+        _etiquetas_contexto.reset(token)
+
+
+def etiquetas_contexto() -> Dict[str, str]:
+    """Etiquetas fijadas con ``contexto_metricas`` en el contexto actual"""
+    return dict(_etiquetas_contexto.get())
+
+
+class Histograma:
+    """Histograma acumulativo con buckets fijos"""
+
+    def __init__(self, buckets: Iterable[float] = BUCKETS_SEGUNDOS):
+        self.buckets = tuple(sorted(buckets))
+        self.conteos = [0] * (len(self.buckets) + 1)  # el último es +Inf
+        self.suma = 0.0
+        self.total = 0
+        self._lock = threading.Lock()
+
+    def observar(self, valor: float):
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._lock:
+            self.conteos[indice] += 1
+            self.suma += valor
+            self.total += 1
+
+    def copiar(self) -> 'Histograma':
+        copia = Histograma(self.buckets)
+        with self._lock:
+            copia.conteos = list(self.conteos)
+            copia.suma = self.suma
+            copia.total = self.total
+        return copia
+
+    def combinar(self, otro: 'Histograma'):
+        """Suma otro histograma con los mismos buckets"""
+        otro = otro.copiar()
+        with self._lock:
+            for i, conteo in enumerate(otro.conteos):
+                self.conteos[i] += conteo
+            self.suma += otro.suma
+            self.total += otro.total
+
+    def cuantil(self, q: float) -> Optional[float]:
+        """Estimación del cuantil por interpolación dentro del bucket (como histogram_quantile)"""
+        with self._lock:
+            conteos = list(self.conteos)
+            total = self.total
+        if not total:
+            return None
+
+        objetivo = q * total
+        acumulado = 0
+        for i, conteo in enumerate(conteos):
+            if acumulado + conteo >= objetivo and conteo:
+                if i == len(self.buckets):
+                    return self.buckets[-1] if self.buckets else None
+                inferior = self.buckets[i - 1] if i > 0 else 0.0
+                return inferior + (self.buckets[i] - inferior) * (objetivo - acumulado) / conteo
+            acumulado += conteo
+        return self.buckets[-1] if self.buckets else None
+
+
+class Medicion:
+    """Medición de una etapa en curso; ``terminar`` es idempotente"""
+
+    def __init__(self, registro: 'MetricsRegistry', etapa: str, etiquetas: Dict[str, str]):
+        self.registro = registro
+        self.etapa = etapa
+        self.etiquetas = {**_etiquetas_contexto.get(), **etiquetas}
+        self.inicio = time.perf_counter()
+        self.duracion: Optional[float] = None
+
+    @property
+    def terminada(self) -> bool:
+        return self.duracion is not None
+
+    def terminar(self, resultado: Optional[str] = None) -> float:
+        """Registra la duración con el resultado indicado (por defecto el de las etiquetas u 'ok')"""
+        if self.terminada:
+            return self.duracion
+        self.duracion = time.perf_counter() - self.inicio
+        if resultado is not None:
+            self.etiquetas['resultado'] = resultado
+        self.registro.observar_etapa(self.etapa, self.duracion, **self.etiquetas)
+        return self.duracion
+
+
+class MetricsRegistry:
+    """Registro en memoria de histogramas y contadores etiquetados"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histogramas: Dict[str, Dict] = {}
+        self._contadores: Dict[str, Dict] = {}
+
+    @staticmethod
+    def _clave(etiquetas: Dict[str, str]) -> Tuple[Tuple[str, str], ...]:
+        return tuple(sorted((nombre, str(valor)) for nombre, valor in etiquetas.items()))
+
+    def observar(self, nombre: str, valor: float, descripcion: str = '',
+                 buckets: Iterable[float] = BUCKETS_SEGUNDOS, **etiquetas):
+        """Registra una observación en el histograma ``nombre`` con las etiquetas dadas"""
+        clave = self._clave(etiquetas)
+        with self._lock:
+            familia = self._histogramas.setdefault(nombre, {'descripcion': descripcion, 'series': {}})
+            histograma = familia['series'].get(clave)
+            if histograma is None:
+                histograma = familia['series'][clave] = Histograma(buckets)
+        histograma.observar(valor)
+
+    def incrementar(self, nombre: str, valor: float = 1, descripcion: str = '', **etiquetas):
+        """Incrementa el contador ``nombre`` con las etiquetas dadas"""
+        clave = self._clave(etiquetas)
+        with self._lock:
+            familia = self._contadores.setdefault(nombre, {'descripcion': descripcion, 'series': {}})
+            familia['series'][clave] = familia['series'].get(clave, 0) + valor
+
+    def observar_etapa(self, etapa: str, duracion: float, **etiquetas):
+        etiquetas.setdefault('aseguradora', 'ninguna')
+        etiquetas.setdefault('resultado', 'ok')
+        self.observar(METRICA_ETAPAS, duracion, 'Duración de cada etapa del procesamiento', etapa=etapa, **etiquetas)
+        logger.debug(f"⏱️ {etapa}: {duracion:.3f}s {etiquetas}")
+
+    def iniciar(self, etapa: str, **etiquetas) -> Medicion:
+        """Inicia una medición manual; se registra al llamar ``terminar``"""
+        return Medicion(self, etapa, etiquetas)
+
+    @contextmanager
+    def medir(self, etapa: str, **etiquetas):
+        """Mide el bloque como una etapa; una excepción se registra con resultado 'error'"""
+        medicion = self.iniciar(etapa, **etiquetas)
+        try:
+            yield medicion
+        except BaseException:
+            medicion.terminar('error')
+            raise
+        medicion.terminar()
+
+    def histogramas(self) -> Dict[str, Dict]:
+        """Copia de los histogramas: nombre -> {'descripcion', 'series': {etiquetas: Histograma}}"""
+        with self._lock:
+            familias = {nombre: (familia['descripcion'], dict(familia['series']))
+                        for nombre, familia in self._histogramas.items()}
+        return {
+            nombre: {'descripcion': descripcion, 'series': {clave: h.copiar() for clave, h in series.items()}}
+            for nombre, (descripcion, series) in familias.items()
+        }
+
+    def contadores(self) -> Dict[str, Dict]:
+        """Copia de los contadores: nombre -> {'descripcion', 'series': {etiquetas: valor}}"""
+        with self._lock:
+            return {
+                nombre: {'descripcion': familia['descripcion'], 'series': dict(familia['series'])}
+                for nombre, familia in self._contadores.items()
+            }
+
+    def valor_contador(self, nombre: str, **etiquetas) -> float:
+        """Suma de las series del contador que coinciden con las etiquetas dadas"""
+        familia = self.contadores().get(nombre, {'series': {}})
+        buscadas = set(self._clave(etiquetas))
+        return sum(valor for clave, valor in familia['series'].items() if buscadas <= set(clave))
+
+    def resumen_etapas(self) -> Dict[str, Dict]:
+        """Conteo, promedio, p50 y p95 por etapa (todas las aseguradoras y resultados)"""
+        por_etapa: Dict[str, Histograma] = {}
+        familia = self.histogramas().get(METRICA_ETAPAS, {'series': {}})
+        for clave, histograma in familia['series'].items():
+            etapa = dict(clave).get('etapa', '')
+            acumulado = por_etapa.setdefault(etapa, Histograma(histograma.buckets))
+            acumulado.combinar(histograma)
+
+        return {
+            etapa: {
+                'n': histograma.total,
+                'promedio': round(histograma.suma / histograma.total, 3) if histograma.total else None,
+                'p50': round(histograma.cuantil(0.5), 3) if histograma.total else None,
+                'p95': round(histograma.cuantil(0.95), 3) if histograma.total else None
+            }
+            for etapa, histograma in sorted(por_etapa.items())
+        }
+
+    def reiniciar(self):
+        with self._lock:
+            self._histogramas = {}
+            self._contadores = {}
+
+
+# Registro compartido por todo el proceso
+metricas = MetricsRegistry()
@@ -0,0 +1,162 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import psutil
+except ImportError:  # psutil es opcional: en Linux se usa /proc como alternativa
+    psutil = None
+
+from .metrics import MetricsRegistry, metricas
+
+logger = logging.getLogger(__name__)
+
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Valor instantáneo calculado en cada scrape: (nombre, descripción, valor, etiquetas)
+Gauge = Tuple[str, str, float, Dict[str, str]]
+
+
+def rss_proceso() -> Optional[int]:
+    """RSS (bytes) del proceso actual, sin contar el navegador"""
+    if psutil:
+        try:
+            return psutil.Process().memory_info().rss
+        except psutil.Error:
+            return None
+    try:
+        with open('/proc/self/status') as archivo:
+            for linea in archivo:
+                if linea.startswith('VmRSS:'):
+                    return int(linea.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _etiquetas(pares: Iterable[Tuple[str, str]]) -> str:
+    texto = ','.join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in pares)
+    return f'{{{texto}}}' if texto else ''
+
+
+def _numero(valor: float) -> str:
+    if valor == float('inf'):
+        return '+Inf'
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+def formatear_prometheus(registro: MetricsRegistry = metricas, gauges: Iterable[Gauge] = ()) -> str:
+    """Serializa histogramas, contadores y gauges en el formato de texto de Prometheus"""
+    lineas: List[str] = []
+
+    for nombre, familia in sorted(registro.histogramas().items()):
+        lineas.append(f"# HELP {nombre} {familia['descripcion']}")
+        lineas.append(f"# TYPE {nombre} histogram")
+        for clave, histograma in sorted(familia['series'].items()):
+            acumulado = 0
+            limites = list(histograma.buckets) + [float('inf')]
+            for limite, conteo in zip(limites, histograma.conteos):
+                acumulado += conteo
+                lineas.append(f"{nombre}_bucket{_etiquetas(list(clave) + [('le', _numero(limite))])} {acumulado}")
+            lineas.append(f"{nombre}_sum{_etiquetas(clave)} {_numero(histograma.suma)}")
+            lineas.append(f"{nombre}_count{_etiquetas(clave)} {histograma.total}")
+
+    for nombre, familia in sorted(registro.contadores().items()):
+        lineas.append(f"# HELP {nombre} {familia['descripcion']}")
+        lineas.append(f"# TYPE {nombre} counter")
+        for clave, valor in sorted(familia['series'].items()):
+            lineas.append(f"{nombre}{_etiquetas(clave)} {_numero(valor)}")
+
+    descritos = set()
+    for nombre, descripcion, valor, etiquetas in gauges:
+        if valor is None:
+            continue
+        if nombre not in descritos:
+            lineas.append(f"# HELP {nombre} {descripcion}")
+            lineas.append(f"# TYPE {nombre} gauge")
+            descritos.add(nombre)
+        lineas.append(f"{nombre}{_etiquetas(sorted(etiquetas.items()))} {_numero(valor)}")
+
+    return '\n'.join(lineas) + '\n'
+
+
+class MetricsServer:
+    """Endpoint HTTP de métricas (/metrics) en un hilo aparte.
+
+    ``recolector`` se invoca en cada scrape y retorna los gauges del momento
+    (mensajes en curso, profundidad de la cola, RSS, ...). Se ejecuta en el
+    hilo del servidor, así que solo debe leer estado ya calculado.
+    """
+
+    def __init__(self, puerto: int, recolector: Optional[Callable[[], Iterable[Gauge]]] = None,
+                 host: str = '0.0.0.0', registro: MetricsRegistry = metricas):
+        self.puerto = puerto
+        self.host = host
+        self.recolector = recolector
+        self.registro = registro
+        self._servidor: Optional[ThreadingHTTPServer] = None
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def activo(self) -> bool:
+        return self._servidor is not None
+
+    def generar(self) -> str:
+        gauges: List[Gauge] = []
+        if self.recolector:
+            try:
+                gauges = list(self.recolector())
+            except Exception as e:
+                logger.warning(f"⚠️ Error recolectando métricas del worker: {e}")
+        gauges.append(('process_resident_memory_bytes', 'RSS del proceso del worker', rss_proceso(), {}))
+        return formatear_prometheus(self.registro, gauges)
+
+    def iniciar(self) -> bool:
+        """Levanta el servidor; un puerto ocupado no detiene al worker"""
+        servidor_metricas = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                ruta = self.path.split('?', 1)[0]
+                if ruta == '/metrics':
+                    cuerpo, tipo, estado = servidor_metricas.generar().encode('utf-8'), TIPO_CONTENIDO, 200
+                elif ruta == '/salud':
+                    cuerpo, tipo, estado = b'ok\n', 'text/plain; charset=utf-8', 200
+                else:
+                    cuerpo, tipo, estado = b'no encontrado\n', 'text/plain; charset=utf-8', 404
+                self.send_response(estado)
+                self.send_header('Content-Type', tipo)
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+            def log_message(self, formato, *args):
+                logger.debug(f"📈 {self.address_string()} {formato % args}")
+
+        try:
+            self._servidor = ThreadingHTTPServer((self.host, self.puerto), Manejador)
+        except OSError as e:
+            logger.error(f"❌ No se pudo iniciar el endpoint de métricas en {self.host}:{self.puerto}: {e}")
+            self._servidor = None
+            return False
+
+        self._servidor.daemon_threads = True
+        self.puerto = self._servidor.server_address[1]
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, name='metrics-server', daemon=True)
+        self._hilo.start()
+        logger.info(f"📈 Métricas disponibles en http://{self.host}:{self.puerto}/metrics")
+        return True
+
+    def detener(self):
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+            logger.info("📈 Endpoint de métricas detenido")
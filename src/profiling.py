@@ -0,0 +1,238 @@
+"""
+Perfilado opcional del procesamiento de mensajes (cProfile o muestreo de pila).
+
+Se activa para los próximos N mensajes con PROFILING_MENSAJES o para un
+mensaje puntual con la cabecera AMQP ``x-profile`` (``cprofile``, ``muestreo``
+o ``true``). Cada mensaje perfilado deja un archivo en PROFILING_DIRECTORIO
+(``.prof`` para cProfile, ``.folded`` con pilas colapsadas para el muestreo)
+y se conservan solo los PROFILING_MAX_ARCHIVOS más recientes.
+
+    python -m src.profiling resumen profiles --top 25
+    python -m src.profiling resumen profiles --aseguradora PAN_AMERICAN --orden tottime
+"""
+
+import os
+import re
+import sys
+import time
+import pstats
+import logging
+import argparse
+import cProfile
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODOS = ('cprofile', 'muestreo')
+CABECERA = 'x-profile'
+EXTENSIONES = {'cprofile': '.prof', 'muestreo': '.folded'}
+
+
+def _slug(texto, largo: int = 40) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', str(texto or 'na')).strip('_')[:largo] or 'na'
+
+
+def _marco(frame) -> str:
+    codigo = frame.f_code
+    return f"{os.path.basename(codigo.co_filename)}:{codigo.co_name}:{codigo.co_firstlineno}"
+
+
+class MuestreadorPila:
+    """Toma la pila de un hilo cada ``intervalo`` segundos y cuenta las pilas colapsadas"""
+
+    def __init__(self, intervalo: float = 0.01, id_hilo: Optional[int] = None):
+        self.intervalo = intervalo
+        self.id_hilo = id_hilo or threading.get_ident()
+        self.pilas: Dict[str, int] = {}
+        self.muestras = 0
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo):
+            frame = sys._current_frames().get(self.id_hilo)
+            marcos = []
+            while frame is not None:
+                marcos.append(_marco(frame))
+                frame = frame.f_back
+            if marcos:
+                clave = ';'.join(reversed(marcos))
+                self.pilas[clave] = self.pilas.get(clave, 0) + 1
+                self.muestras += 1
+
+    def iniciar(self):
+        self._hilo = threading.Thread(target=self._bucle, name='profiling-sampler', daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join()
+
+    def guardar(self, ruta: str):
+        """Formato de pilas colapsadas (``marco;marco;marco conteo``), compatible con flamegraph.pl"""
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            for pila, conteo in sorted(self.pilas.items(), key=lambda item: -item[1]):
+                archivo.write(f"{pila} {conteo}\n")
+
+
+class ProfilerMensajes:
+    """Decide qué mensajes se perfilan y guarda un volcado por mensaje"""
+
+    def __init__(self, modo: str = 'cprofile', mensajes: int = 0, directorio: str = 'profiles',
+                 max_archivos: int = 50, intervalo_ms: float = 10):
+        self.modo = self._validar_modo(modo) or 'cprofile'
+        self.mensajes_restantes = max(0, mensajes)
+        self.directorio = directorio
+        self.max_archivos = max_archivos
+        self.intervalo = max(intervalo_ms, 1) / 1000
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _validar_modo(valor) -> Optional[str]:
+        valor = str(valor or '').strip().lower()
+        if valor in MODOS:
+            return valor
+        if valor in ('1', 'true', 'si', 'sí', 'yes'):
+            return ''
+        return None
+
+    def activar(self, mensajes: int, modo: Optional[str] = None):
+        """Perfila los próximos ``mensajes`` mensajes"""
+        with self._lock:
+            self.mensajes_restantes = max(0, mensajes)
+            if modo:
+                self.modo = self._validar_modo(modo) or self.modo
+        logger.info(f"🔬 Perfilado activado para {mensajes} mensajes ({self.modo})")
+
+    def modo_para(self, cabeceras: Optional[Dict] = None) -> Optional[str]:
+        """Modo de perfilado para el próximo mensaje, o None si no se perfila"""
+        valor_cabecera = (cabeceras or {}).get(CABECERA)
+        if valor_cabecera is not None:
+            modo = self._validar_modo(valor_cabecera.decode() if isinstance(valor_cabecera, bytes) else valor_cabecera)
+            if modo is not None:
+                return modo or self.modo
+        with self._lock:
+            if self.mensajes_restantes <= 0:
+                return None
+            self.mensajes_restantes -= 1
+        return self.modo
+
+    def _ruta(self, id_mensaje, aseguradora, modo: str) -> str:
+        marca = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        nombre = f"{marca}_{_slug(aseguradora)}_{_slug(id_mensaje)}{EXTENSIONES[modo]}"
+        return os.path.join(self.directorio, nombre)
+
+    def _rotar(self):
+        """Elimina los volcados más antiguos por encima de ``max_archivos``"""
+        if self.max_archivos <= 0:
+            return
+        volcados = sorted(
+            (os.path.join(self.directorio, nombre) for nombre in os.listdir(self.directorio)
+             if nombre.endswith(tuple(EXTENSIONES.values()))),
+            key=os.path.getmtime
+        )
+        for ruta in volcados[:-self.max_archivos]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
+
+    @contextmanager
+    def perfilar(self, id_mensaje, aseguradora, modo: Optional[str]):
+        """Perfila el bloque con ``modo``; sin modo no hace nada. Cede la ruta del volcado (o None)"""
+        if not modo:
+            yield None
+            return
+
+        os.makedirs(self.directorio, exist_ok=True)
+        ruta = self._ruta(id_mensaje, aseguradora, modo)
+        inicio = time.perf_counter()
+        if modo == 'cprofile':
+            perfil = cProfile.Profile()
+            perfil.enable()
+        else:
+            perfil = MuestreadorPila(self.intervalo)
+            perfil.iniciar()
+        try:
+            yield ruta
+        finally:
+            if modo == 'cprofile':
+                perfil.disable()
+                perfil.dump_stats(ruta)
+            else:
+                perfil.detener()
+                perfil.guardar(ruta)
+            self._rotar()
+            logger.info(f"🔬 Perfil de {aseguradora} ({time.perf_counter() - inicio:.2f}s) guardado en {ruta}")
+
+
+def _filtrar(directorio: str, extension: str, aseguradora: Optional[str]) -> List[str]:
+    filtro = _slug(aseguradora) if aseguradora else None
+    return sorted(
+        os.path.join(directorio, nombre) for nombre in os.listdir(directorio)
+        if nombre.endswith(extension) and (not filtro or f"_{filtro}" in nombre)
+    )
+
+
+def resumir_muestreo(rutas: List[str], top: int = 25) -> Tuple[int, List[Tuple[str, int, int]]]:
+    """Total de muestras y [(función, muestras propias, muestras acumuladas)] ordenado por propias"""
+    propias: Dict[str, int] = {}
+    acumuladas: Dict[str, int] = {}
+    total = 0
+    for ruta in rutas:
+        with open(ruta, encoding='utf-8') as archivo:
+            for linea in archivo:
+                pila, _, conteo = linea.rstrip('\n').rpartition(' ')
+                if not pila:
+                    continue
+                conteo = int(conteo)
+                marcos = pila.split(';')
+                total += conteo
+                propias[marcos[-1]] = propias.get(marcos[-1], 0) + conteo
+                for marco in set(marcos):
+                    acumuladas[marco] = acumuladas.get(marco, 0) + conteo
+    filas = sorted(((marco, propias.get(marco, 0), acumulado) for marco, acumulado in acumuladas.items()),
+                   key=lambda fila: (-fila[1], -fila[2]))
+    return total, filas[:top]
+
+
+def main(argumentos: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Resumen de los perfiles de mensajes del worker")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    resumen = subparsers.add_parser('resumen', help="Funciones con más tiempo en todos los volcados")
+    resumen.add_argument('directorio', nargs='?', default=os.getenv('PROFILING_DIRECTORIO', 'profiles'))
+    resumen.add_argument('--top', type=int, default=25)
+    resumen.add_argument('--orden', default='cumulative', help="Orden de pstats: cumulative, tottime, ncalls...")
+    resumen.add_argument('--aseguradora', default=None, help="Solo volcados de esta aseguradora")
+    args = parser.parse_args(argumentos)
+
+    if not os.path.isdir(args.directorio):
+        print(f"❌ No existe el directorio {args.directorio}")
+        return 1
+
+    perfiles = _filtrar(args.directorio, EXTENSIONES['cprofile'], args.aseguradora)
+    muestreos = _filtrar(args.directorio, EXTENSIONES['muestreo'], args.aseguradora)
+    if not perfiles and not muestreos:
+        print(f"ℹ️ No hay volcados en {args.directorio}")
+        return 0
+
+    if perfiles:
+        print(f"📊 cProfile: {len(perfiles)} volcados")
+        estadisticas = pstats.Stats(*perfiles, stream=sys.stdout)
+        estadisticas.strip_dirs().sort_stats(args.orden).print_stats(args.top)
+
+    if muestreos:
+        total, filas = resumir_muestreo(muestreos, args.top)
+        print(f"📊 Muestreo de pila: {len(muestreos)} volcados, {total} muestras")
+        print(f"{'propias':>9} {'%':>6} {'acumuladas':>11} {'%':>6}  función")
+        for marco, propias, acumuladas in filas:
+            print(f"{propias:9d} {propias * 100 / total:6.1f} {acumuladas:11d} {acumuladas * 100 / total:6.1f}  {marco}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,359 @@
+"""
+Caché de resultados de búsqueda por aseguradora y NumDocIdentidad.
+
+Una búsqueda por documento suele devolver a toda la familia (titular y
+dependientes con su póliza, certificado y número de dependiente). Se guardan
+todas las filas de la tabla GridViewStylePV bajo el documento buscado, de modo
+que un mensaje posterior con ese mismo NumDocIdentidad, sea del titular o de
+un dependiente, se resuelve sin abrir el portal por el nombre de paciente
+normalizado. Nunca se sirven a un mensaje con otro documento: las filas solo
+identifican al paciente por su nombre y un homónimo de otra familia recibiría
+su póliza. Tiene dos niveles:
+
+* memoria: LRU de búsquedas acotado a ``max_entradas``
+* SQLite (opcional): sobrevive a reinicios y se comparte entre procesos de
+  la misma máquina
+
+Las búsquedas caducan a los ``ttl_segundos`` de guardadas.
+
+También se recuerdan, con un TTL corto (``ttl_negativo_segundos``), los
+pacientes que la búsqueda no encontró o encontró inactivos, con el motivo
+(``MOTIVOS_NEGATIVOS``), para que los reintentos y reentregas del mismo
+mensaje no repitan la búsqueda en el portal.
+
+Por último, coordina las búsquedas idénticas en curso: antes de ir al portal
+un worker reserva (aseguradora, documento) con ``reservar_busqueda``. Si otro
+worker ya la tiene, este espera a que la libere y vuelve a consultar el
+caché, que para entonces tiene el resultado (``esperar_busqueda``: una
+liberación del mismo proceso lo despierta al momento; la de otro proceso se ve
+en el siguiente sondeo). Con SQLite la reserva es una fila compartida por todos
+los procesos de la máquina y caduca sola si su dueño muere; sin SQLite solo
+coordina los hilos del proceso.
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from src.metrics import metricas
+from src.tabla_resultados import normalizar_nombre, normalizar_texto
+
+logger = logging.getLogger(__name__)
+
+COLUMNA_NOMBRE = 'Nombre del Paciente'
+
+# Motivos de un resultado negativo
+NO_ENCONTRADO = 'no_encontrado'  # la tabla tiene filas pero ninguna del paciente
+INACTIVO = 'inactivo'  # el paciente aparece pero ninguna de sus filas está activa
+SIN_RESULTADOS = 'sin_resultados'  # la búsqueda del documento no devolvió filas
+MOTIVOS_NEGATIVOS = (NO_ENCONTRADO, INACTIVO, SIN_RESULTADOS)
+
+# Cada cuánto vuelve a mirar un worker si terminó la búsqueda idéntica de otro proceso
+SONDEO_BUSQUEDA_EN_CURSO_SEGUNDOS = 1.0
+
+
+class ResultCache:
+    """LRU de búsquedas en memoria con un nivel SQLite opcional y caducidad por TTL"""
+
+    def __init__(self, ttl_segundos: float = 21600, max_entradas: int = 5000,
+                 ruta_sqlite: Optional[str] = None, ttl_negativo_segundos: float = 900, reloj=time.time):
+        self.ttl_segundos = ttl_segundos
+        self.ttl_negativo_segundos = ttl_negativo_segundos
+        self.max_entradas = max_entradas
+        self.ruta_sqlite = ruta_sqlite or None
+        self._reloj = reloj
+        # (aseguradora, documento) -> (guardado_en, filas)
+        self._memoria: "OrderedDict[Tuple[str, str], Tuple[float, List[Dict]]]" = OrderedDict()
+        # (aseguradora, documento, nombre) -> (guardado_en, motivo)
+        self._negativos: "OrderedDict[Tuple[str, str, str], Tuple[float, str]]" = OrderedDict()
+        # (aseguradora, documento) -> (propietario, vence_en) de las búsquedas en curso (sin SQLite)
+        self._reservas: Dict[Tuple[str, str], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        # Avisa a los hilos que esperan una búsqueda en curso cuando este proceso libera una reserva
+        self._liberaciones = threading.Condition(self._lock)
+        self._conexion = None
+        if self.ruta_sqlite:
+            self._conexion = sqlite3.connect(self.ruta_sqlite, check_same_thread=False, timeout=5)
+            self._conexion.execute('PRAGMA journal_mode=WAL')
+            self._conexion.execute("""
+                CREATE TABLE IF NOT EXISTS busquedas (
+                    aseguradora TEXT NOT NULL,
+                    documento TEXT NOT NULL,
+                    filas TEXT NOT NULL,
+                    guardado_en REAL NOT NULL,
+                    PRIMARY KEY (aseguradora, documento)
+                )
+            """)
+            self._conexion.execute("""
+                CREATE TABLE IF NOT EXISTS negativos (
+                    aseguradora TEXT NOT NULL,
+                    documento TEXT NOT NULL,
+                    nombre TEXT NOT NULL,
+                    motivo TEXT NOT NULL,
+                    guardado_en REAL NOT NULL,
+                    PRIMARY KEY (aseguradora, documento, nombre)
+                )
+            """)
+            self._conexion.execute("""
+                CREATE TABLE IF NOT EXISTS busquedas_en_curso (
+                    aseguradora TEXT NOT NULL,
+                    documento TEXT NOT NULL,
+                    propietario TEXT NOT NULL,
+                    vence_en REAL NOT NULL,
+                    PRIMARY KEY (aseguradora, documento)
+                )
+            """)
+            self._conexion.commit()
+
+    @property
+    def activo(self) -> bool:
+        return self.ttl_segundos > 0
+
+    @staticmethod
+    def _clave(aseguradora, documento) -> Tuple[str, str]:
+        return normalizar_nombre(aseguradora), normalizar_texto(str(documento or ''))
+
+    def _vigente(self, guardado_en: float) -> bool:
+        return self._reloj() - guardado_en <= self.ttl_segundos
+
+    @staticmethod
+    def _filas_de(filas: List[Dict], nombre: str) -> List[Dict]:
+        buscado = normalizar_nombre(nombre)
+        return [dict(fila) for fila in filas if normalizar_nombre(fila.get(COLUMNA_NOMBRE)) == buscado]
+
+    def obtener(self, aseguradora, documento, nombre: Optional[str]) -> Optional[List[Dict]]:
+        """Filas del paciente ``nombre`` en la búsqueda cacheada de ``documento``.
+
+        Retorna None si ``documento`` no tiene una búsqueda vigente y una lista
+        (vacía si el documento se buscó pero el paciente no aparece) en caso contrario.
+        """
+        if not self.activo or not nombre:
+            return None
+        clave = self._clave(aseguradora, documento)
+        filas, nivel = None, None
+        if clave[1]:
+            filas, nivel = self._buscar(clave)
+        if filas is not None:
+            filas = self._filas_de(filas, nombre)
+        metricas.incrementar('scraping_cache_resultados_total', descripcion='Consultas al caché de resultados',
+                             resultado=nivel if filas else 'fallo')
+        return filas
+
+    def _buscar(self, clave) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        with self._lock:
+            guardado = self._memoria.get(clave)
+            if guardado:
+                if self._vigente(guardado[0]):
+                    self._memoria.move_to_end(clave)
+                    return guardado[1], 'memoria'
+                self._quitar_de_memoria(clave)
+
+            if not self._conexion:
+                return None, None
+            fila = self._conexion.execute(
+                'SELECT filas, guardado_en FROM busquedas WHERE aseguradora = ? AND documento = ?', clave
+            ).fetchone()
+            if not fila:
+                return None, None
+            if not self._vigente(fila[1]):
+                self._borrar_de_sqlite(clave)
+                return None, None
+            filas = json.loads(fila[0])
+            self._guardar_en_memoria(clave, fila[1], filas)
+            return filas, 'sqlite'
+
+    def _guardar_en_memoria(self, clave, guardado_en: float, filas: List[Dict]):
+        if clave in self._memoria:
+            self._quitar_de_memoria(clave)
+        self._memoria[clave] = (guardado_en, filas)
+        while len(self._memoria) > self.max_entradas:
+            self._quitar_de_memoria(next(iter(self._memoria)))
+
+    def _quitar_de_memoria(self, clave):
+        self._memoria.pop(clave)
+
+    def _borrar_de_sqlite(self, clave):
+        self._conexion.execute('DELETE FROM busquedas WHERE aseguradora = ? AND documento = ?', clave)
+        self._conexion.commit()
+
+    def guardar(self, aseguradora, documento, filas: List[Dict]):
+        """Guarda todas las filas de la búsqueda de ``documento`` en ambos niveles"""
+        if not self.activo or not documento:
+            return
+        clave = self._clave(aseguradora, documento)
+        filas = [dict(fila) for fila in filas if fila]
+        ahora = self._reloj()
+        with self._lock:
+            self._guardar_en_memoria(clave, ahora, filas)
+            if self._conexion:
+                self._conexion.execute(
+                    'INSERT OR REPLACE INTO busquedas (aseguradora, documento, filas, guardado_en) VALUES (?, ?, ?, ?)',
+                    (clave[0], clave[1], json.dumps(filas, ensure_ascii=False), ahora)
+                )
+                self._conexion.commit()
+
+    def invalidar(self, aseguradora, documento):
+        """Olvida la búsqueda de ``documento`` y sus resultados negativos"""
+        clave = self._clave(aseguradora, documento)
+        with self._lock:
+            if clave in self._memoria:
+                self._quitar_de_memoria(clave)
+            for negativo in [negativo for negativo in self._negativos if negativo[:2] == clave]:
+                del self._negativos[negativo]
+            if self._conexion:
+                self._borrar_de_sqlite(clave)
+                self._conexion.execute('DELETE FROM negativos WHERE aseguradora = ? AND documento = ?', clave)
+                self._conexion.commit()
+
+    # --- Resultados negativos ---------------------------------------------------
+
+    def _clave_negativa(self, aseguradora, documento, nombre) -> Tuple[str, str, str]:
+        return self._clave(aseguradora, documento) + (normalizar_nombre(nombre),)
+
+    def obtener_negativo(self, aseguradora, documento, nombre: Optional[str]) -> Optional[str]:
+        """Motivo vigente por el que el paciente no se encontró activo, o None"""
+        if self.ttl_negativo_segundos <= 0 or not documento or not nombre:
+            return None
+        clave = self._clave_negativa(aseguradora, documento, nombre)
+        motivo = None
+        with self._lock:
+            guardado = self._negativos.get(clave)
+            if guardado is None and self._conexion:
+                guardado = self._conexion.execute(
+                    'SELECT guardado_en, motivo FROM negativos WHERE aseguradora = ? AND documento = ? AND nombre = ?',
+                    clave
+                ).fetchone()
+            if guardado and self._reloj() - guardado[0] <= self.ttl_negativo_segundos:
+                motivo = guardado[1]
+        if motivo:
+            metricas.incrementar('scraping_cache_negativos_total',
+                                 descripcion='Búsquedas evitadas por un resultado negativo reciente', motivo=motivo)
+        return motivo
+
+    def guardar_negativo(self, aseguradora, documento, nombre: Optional[str], motivo: str):
+        """Recuerda que la búsqueda de ``documento`` no encontró activo a ``nombre``"""
+        if self.ttl_negativo_segundos <= 0 or not documento or not nombre:
+            return
+        if motivo not in MOTIVOS_NEGATIVOS:
+            raise ValueError(f"Motivo de resultado negativo no válido: {motivo}")
+        clave = self._clave_negativa(aseguradora, documento, nombre)
+        ahora = self._reloj()
+        with self._lock:
+            self._negativos[clave] = (ahora, motivo)
+            self._negativos.move_to_end(clave)
+            while len(self._negativos) > self.max_entradas:
+                self._negativos.popitem(last=False)
+            if self._conexion:
+                self._conexion.execute(
+                    'INSERT OR REPLACE INTO negativos (aseguradora, documento, nombre, motivo, guardado_en) '
+                    'VALUES (?, ?, ?, ?, ?)', clave + (motivo, ahora)
+                )
+                self._conexion.commit()
+
+    def descartar_negativo(self, aseguradora, documento, nombre: Optional[str]):
+        """Olvida el resultado negativo del paciente (p.ej. porque ya se encontró activo)"""
+        if not nombre:
+            return
+        clave = self._clave_negativa(aseguradora, documento, nombre)
+        with self._lock:
+            self._negativos.pop(clave, None)
+            if self._conexion:
+                self._conexion.execute(
+                    'DELETE FROM negativos WHERE aseguradora = ? AND documento = ? AND nombre = ?', clave)
+                self._conexion.commit()
+
+    # --- Búsquedas en curso ----------------------------------------------------
+
+    def _propietario(self) -> str:
+        # Cada procesador (instancia) y cada hilo reserva por su cuenta
+        return f'{os.getpid()}:{id(self)}:{threading.get_ident()}'
+
+    def reservar_busqueda(self, aseguradora, documento, segundos: float) -> bool:
+        """Reserva la búsqueda de ``documento`` por ``segundos``; False si otro la tiene en curso.
+
+        Sin caché activo siempre reserva: no habría resultado que compartir.
+        """
+        if not self.activo or not documento:
+            return True
+        clave = self._clave(aseguradora, documento)
+        propietario = self._propietario()
+        ahora = self._reloj()
+        with self._lock:
+            if not self._conexion:
+                if self._reservada_por_otro(clave, propietario, ahora):
+                    return False
+                self._reservas[clave] = (propietario, ahora + segundos)
+                return True
+            cursor = self._conexion.execute(
+                'INSERT INTO busquedas_en_curso (aseguradora, documento, propietario, vence_en) VALUES (?, ?, ?, ?) '
+                'ON CONFLICT (aseguradora, documento) DO UPDATE SET propietario = excluded.propietario, '
+                'vence_en = excluded.vence_en '
+                'WHERE busquedas_en_curso.vence_en <= ? OR busquedas_en_curso.propietario = excluded.propietario',
+                clave + (propietario, ahora + segundos, ahora)
+            )
+            self._conexion.commit()
+            return cursor.rowcount == 1
+
+    def liberar_busqueda(self, aseguradora, documento):
+        """Libera la reserva de ``documento`` si es de este procesador"""
+        if not self.activo or not documento:
+            return
+        clave = self._clave(aseguradora, documento)
+        propietario = self._propietario()
+        with self._lock:
+            if not self._conexion:
+                if self._reservas.get(clave, ('',))[0] == propietario:
+                    del self._reservas[clave]
+            else:
+                self._conexion.execute(
+                    'DELETE FROM busquedas_en_curso WHERE aseguradora = ? AND documento = ? AND propietario = ?',
+                    clave + (propietario,)
+                )
+                self._conexion.commit()
+            self._liberaciones.notify_all()
+
+    def _reservada_por_otro(self, clave, propietario: str, ahora: float) -> bool:
+        """True si ``clave`` tiene una reserva vigente de otro propietario (con self._lock tomado)"""
+        if not self._conexion:
+            actual = self._reservas.get(clave)
+            return bool(actual and actual[0] != propietario and actual[1] > ahora)
+        return self._conexion.execute(
+            'SELECT 1 FROM busquedas_en_curso WHERE aseguradora = ? AND documento = ? AND propietario != ? '
+            'AND vence_en > ?', clave + (propietario, ahora)).fetchone() is not None
+
+    def esperar_busqueda(self, aseguradora, documento, segundos: float) -> bool:
+        """Espera hasta ``segundos`` a que otro libere la búsqueda de ``documento``; True si ya no está en curso
+
+        Las liberaciones de este proceso despiertan la espera al momento; las de
+        otros procesos (SQLite) se ven al volver a mirar, como muy tarde a los ``segundos``.
+        """
+        if not self.activo or not documento:
+            return True
+        clave = self._clave(aseguradora, documento)
+        propietario = self._propietario()
+        with self._liberaciones:
+            return self._liberaciones.wait_for(
+                lambda: not self._reservada_por_otro(clave, propietario, self._reloj()), timeout=segundos)
+
+    def busquedas_en_curso(self) -> int:
+        """Reservas vigentes (de todos los procesos que comparten el SQLite)"""
+        ahora = self._reloj()
+        with self._lock:
+            if not self._conexion:
+                return sum(1 for _, vence_en in self._reservas.values() if vence_en > ahora)
+            return self._conexion.execute(
+                'SELECT COUNT(*) FROM busquedas_en_curso WHERE vence_en > ?', (ahora,)).fetchone()[0]
+
+    def __len__(self):
+        return len(self._memoria)
+
+    def cerrar(self):
+        with self._lock:
+            if self._conexion:
+                self._conexion.close()
+                self._conexion = None
@@ -1,83 +1,185 @@
+import os
+import codecs
+import threading
 import requests
 import time
 import logging
 from typing import Dict, Any, Optional, List
 from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+from lxml import etree, html
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, WebDriverException
 from .config import Config
+from .browser_pool import BrowserPool
+from .browser_factory import fabrica_navegadores, config_desde_entorno
 
 logger = logging.getLogger(__name__)
 
+def crear_driver_chrome():
+    """Crea un driver de Chrome headless con la configuración estándar del scraper"""
+    config = config_desde_entorno(navegador='chrome')
+    if not os.getenv('SELENIUM_USER_AGENT'):
+        config['user_agent'] = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    return fabrica_navegadores.crear_driver(config)
+
+class RespuestaDemasiadoGrande(Exception):
+    """La respuesta HTTP supera el límite de bytes configurado"""
+    pass
+
 class WebScraper:
     """Clase para manejar las operaciones de scraping web"""
     
-    def __init__(self):
+    def __init__(self, pool: Optional[BrowserPool] = None):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # El driver se crea en el primer uso de Selenium (o se toma del pool compartido)
         self.driver = None
-        self._setup_selenium()
+        self.pool = pool
+        self._lock_driver = threading.RLock()
+        self._temporizador_inactividad = None
+        # Cuenta las entregas del driver: un cierre por inactividad ya disparado lo compara con
+        # la cuenta de cuando se programó y no cierra un driver entregado después (cancel() no lo detiene)
+        self._entregas_driver = 0
     
     def _setup_selenium(self):
         """Configura Selenium para casos que requieren JavaScript"""
         try:
-            chrome_options = Options()
-            chrome_options.add_argument('--headless')
-            chrome_options.add_argument('--no-sandbox')
-            chrome_options.add_argument('--disable-dev-shm-usage')
-            chrome_options.add_argument('--disable-gpu')
-            chrome_options.add_argument('--window-size=1920,1080')
-            chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
-            
-            self.driver = webdriver.Chrome(options=chrome_options)
+            self.driver = crear_driver_chrome()
             logger.info("Selenium WebDriver configurado correctamente")
         except Exception as e:
             logger.warning(f"No se pudo configurar Selenium: {e}")
             self.driver = None
     
+    def _obtener_driver(self):
+        """Obtiene un driver listo para usar, creándolo bajo demanda"""
+        if self.pool:
+            try:
+                return self.pool.acquire(timeout=Config.SELENIUM_POOL_TIMEOUT)
+            except Exception as e:
+                logger.warning(f"No se pudo obtener navegador del pool: {e}")
+                return None
+        
+        with self._lock_driver:
+            self._cancelar_cierre_inactivo()
+            self._entregas_driver += 1
+            if not self.driver:
+                self._setup_selenium()
+            return self.driver
+    
+    def _liberar_driver(self, driver, descartar: bool = False):
+        """Libera el driver después de usarlo y programa su cierre por inactividad"""
+        if self.pool:
+            self.pool.release(driver, descartar=descartar)
+            return
+        
+        with self._lock_driver:
+            if descartar:
+                self._cerrar_driver()
+            else:
+                self._programar_cierre_inactivo()
+    
+    def _programar_cierre_inactivo(self):
+        """Programa el cierre del driver si no se vuelve a usar en SELENIUM_IDLE_TIMEOUT segundos"""
+        if Config.SELENIUM_IDLE_TIMEOUT <= 0 or not self.driver:
+            return
+        self._cancelar_cierre_inactivo()
+        self._temporizador_inactividad = threading.Timer(Config.SELENIUM_IDLE_TIMEOUT, self._cerrar_por_inactividad,
+                                                         args=(self._entregas_driver,))
+        self._temporizador_inactividad.daemon = True
+        self._temporizador_inactividad.start()
+    
+    def _cancelar_cierre_inactivo(self):
+        if self._temporizador_inactividad:
+            self._temporizador_inactividad.cancel()
+            self._temporizador_inactividad = None
+    
+    def _cerrar_por_inactividad(self, entregas: int):
+        with self._lock_driver:
+            if entregas != self._entregas_driver:
+                return  # el driver se volvió a entregar mientras este cierre esperaba el lock
+            if self.driver:
+                logger.info(f"Cerrando Selenium WebDriver tras {Config.SELENIUM_IDLE_TIMEOUT}s de inactividad")
+                self._cerrar_driver()
+    
+    def _cerrar_driver(self):
+        if self.driver:
+            try:
+                self.driver.quit()
+                logger.info("Selenium WebDriver cerrado")
+            except Exception as e:
+                logger.warning(f"Error cerrando Selenium WebDriver: {e}")
+            self.driver = None
+    
     def scrape_with_requests(self, url: str, selectors: Dict[str, str] = None) -> Dict[str, Any]:
-        """Realiza scraping usando requests y BeautifulSoup"""
+        """Realiza scraping usando requests con descarga en streaming y límite de tamaño"""
         try:
             logger.info(f"Iniciando scraping de: {url}")
             
-            # Realizar petición HTTP
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            # Parsear HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Realizar petición HTTP sin cargar el cuerpo completo en memoria
+            response = self.session.get(url, timeout=30, stream=True)
+            try:
+                response.raise_for_status()
+                
+                # Abortar antes de descargar si el contenido no es HTML
+                content_type = response.headers.get('Content-Type', '')
+                if not self._es_contenido_html(content_type):
+                    logger.warning(f"Tipo de contenido no soportado para {url}: {content_type}")
+                    return {
+                        'url': url,
+                        'error': f"Tipo de contenido no soportado: {content_type}",
+                        'status_code': response.status_code,
+                        'timestamp': time.time()
+                    }
+                
+                # Parsear HTML de forma incremental
+                documento, bytes_leidos = self._parsear_respuesta_incremental(response, content_type)
+            finally:
+                response.close()
             
             # Extraer datos según selectores
             scraped_data = {
                 'url': url,
-                'title': soup.title.string if soup.title else '',
+                'title': self._extraer_titulo(documento),
                 'timestamp': time.time(),
-                'status_code': response.status_code
+                'status_code': response.status_code,
+                'bytes_descargados': bytes_leidos
             }
             
             if selectors:
                 for key, selector in selectors.items():
                     try:
-                        element = soup.select_one(selector)
-                        scraped_data[key] = element.get_text(strip=True) if element else ''
+                        elementos = documento.cssselect(selector) if documento is not None else []
+                        scraped_data[key] = self._texto_elemento(elementos[0]) if elementos else ''
                     except Exception as e:
                         logger.warning(f"Error al extraer {key}: {e}")
                         scraped_data[key] = ''
             
             # Extraer enlaces si no hay selectores específicos
             if not selectors:
-                links = soup.find_all('a', href=True)
-                scraped_data['links'] = [link['href'] for link in links[:10]]  # Primeros 10 enlaces
+                links = []
+                if documento is not None:
+                    for link in documento.iter('a'):
+                        href = link.get('href')
+                        if href:
+                            links.append(href)
+                            if len(links) >= 10:  # Primeros 10 enlaces
+                                break
+                scraped_data['links'] = links
             
             logger.info(f"Scraping completado exitosamente para: {url}")
             return scraped_data
             
+        except RespuestaDemasiadoGrande as e:
+            logger.error(f"Respuesta demasiado grande para {url}: {e}")
+            return {
+                'url': url,
+                'error': str(e),
+                'timestamp': time.time()
+            }
         except requests.RequestException as e:
             logger.error(f"Error en la petición HTTP para {url}: {e}")
             return {
@@ -93,31 +195,105 @@ class WebScraper:
                 'timestamp': time.time()
             }
     
+    def _es_contenido_html(self, content_type: str) -> bool:
+        """Verifica si el Content-Type corresponde a un documento HTML"""
+        if not content_type:
+            # Sin cabecera no se puede descartar; el límite de bytes protege la memoria
+            return True
+        tipo = content_type.split(';', 1)[0].strip().lower()
+        return tipo in Config.SCRAPING_CONTENT_TYPES
+    
+    def _obtener_charset(self, content_type: str) -> str:
+        """Obtiene el charset declarado en el Content-Type (utf-8 por defecto)"""
+        for parametro in content_type.split(';')[1:]:
+            clave, _, valor = parametro.partition('=')
+            if clave.strip().lower() == 'charset' and valor.strip():
+                charset = valor.strip().strip('"\'')
+                try:
+                    codecs.lookup(charset)
+                    return charset
+                except LookupError:
+                    logger.warning(f"Charset desconocido '{charset}', usando utf-8")
+        return 'utf-8'
+    
+    def _parsear_respuesta_incremental(self, response, content_type: str):
+        """Decodifica la respuesta por bloques y la entrega a un parser incremental de lxml"""
+        max_bytes = Config.SCRAPING_MAX_BYTES
+        
+        # Rechazar de inmediato si el servidor declara un tamaño mayor al permitido
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() and int(content_length) > max_bytes:
+            raise RespuestaDemasiadoGrande(
+                f"Content-Length {content_length} excede el límite de {max_bytes} bytes"
+            )
+        
+        decodificador = codecs.getincrementaldecoder(self._obtener_charset(content_type))(errors='replace')
+        parser = html.HTMLParser()
+        bytes_leidos = 0
+        
+        for bloque in response.iter_content(chunk_size=Config.SCRAPING_CHUNK_SIZE):
+            if not bloque:
+                continue
+            bytes_leidos += len(bloque)
+            if bytes_leidos > max_bytes:
+                raise RespuestaDemasiadoGrande(
+                    f"La descarga superó el límite de {max_bytes} bytes"
+                )
+            texto = decodificador.decode(bloque)
+            if texto:
+                parser.feed(texto)
+        
+        texto = decodificador.decode(b'', final=True)
+        if texto:
+            parser.feed(texto)
+        
+        if bytes_leidos == 0:
+            return None, 0
+        
+        try:
+            return parser.close(), bytes_leidos
+        except etree.XMLSyntaxError as e:
+            logger.warning(f"Documento HTML vacío o inválido: {e}")
+            return None, bytes_leidos
+    
+    def _extraer_titulo(self, documento) -> str:
+        """Obtiene el título del documento parseado"""
+        if documento is None:
+            return ''
+        titulo = documento.find('.//title')
+        return titulo.text_content().strip() if titulo is not None else ''
+    
+    def _texto_elemento(self, elemento) -> str:
+        """Devuelve el texto de un elemento con los fragmentos recortados (equivalente a get_text(strip=True))"""
+        return ''.join(fragmento.strip() for fragmento in elemento.itertext())
+    
     def scrape_with_selenium(self, url: str, selectors: Dict[str, str] = None, wait_time: int = 10) -> Dict[str, Any]:
         """Realiza scraping usando Selenium para páginas con JavaScript"""
-        if not self.driver:
+        driver = self._obtener_driver()
+        if not driver:
             logger.error("Selenium WebDriver no está disponible")
             return self.scrape_with_requests(url, selectors)
         
+        descartar_driver = False
         try:
             logger.info(f"Iniciando scraping con Selenium de: {url}")
             
             # Navegar a la URL
-            self.driver.get(url)
+            driver.get(url)
             
             # Esperar a que la página cargue
-            WebDriverWait(self.driver, wait_time).until(
+            WebDriverWait(driver, wait_time).until(
                 EC.presence_of_element_located((By.TAG_NAME, "body"))
             )
             
             # Obtener el HTML de la página
-            page_source = self.driver.page_source
+            page_source = driver.page_source
             soup = BeautifulSoup(page_source, 'html.parser')
             
             # Extraer datos según selectors
             scraped_data = {
                 'url': url,
-                'title': self.driver.title,
+                'title': driver.title,
                 'timestamp': time.time(),
                 'selenium_used': True
             }
@@ -126,7 +302,7 @@ class WebScraper:
                 for key, selector in selectors.items():
                     try:
                         # Intentar con Selenium primero
-                        element = self.driver.find_element(By.CSS_SELECTOR, selector)
+                        element = driver.find_element(By.CSS_SELECTOR, selector)
                         scraped_data[key] = element.text.strip()
                     except:
                         try:
@@ -149,6 +325,7 @@ class WebScraper:
             }
         except WebDriverException as e:
             logger.error(f"Error de WebDriver para {url}: {e}")
+            descartar_driver = True
             return {
                 'url': url,
                 'error': str(e),
@@ -161,13 +338,15 @@ class WebScraper:
                 'error': str(e),
                 'timestamp': time.time()
             }
+        finally:
+            self._liberar_driver(driver, descartar=descartar_driver)
     
     def scrape_url(self, url: str, use_selenium: bool = False, selectors: Dict[str, str] = None) -> Dict[str, Any]:
         """Método principal para realizar scraping de una URL"""
         # Aplicar delay para ser respetuoso con el servidor
         time.sleep(Config.SCRAPING_DELAY)
         
-        if use_selenium and self.driver:
+        if use_selenium:
             return self.scrape_with_selenium(url, selectors)
         else:
             return self.scrape_with_requests(url, selectors)
@@ -213,9 +392,9 @@ class WebScraper:
         if self.session:
             self.session.close()
         
-        if self.driver:
-            self.driver.quit()
-            logger.info("Selenium WebDriver cerrado")
+        with self._lock_driver:
+            self._cancelar_cierre_inactivo()
+            self._cerrar_driver()
     
     def __enter__(self):
         return self
@@ -4,7 +4,8 @@ import time
 from typing import Dict, Any
 from .rabbitmq_client import RabbitMQClient
 from .database import DatabaseManager
-from .scraper import WebScraper
+from .scraper import WebScraper, crear_driver_chrome
+from .browser_pool import BrowserPool
 from .config import Config
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,7 @@ class ScrapingWorker:
         self.rabbitmq_client = None
         self.database_manager = None
         self.scraper = None
+        self.browser_pool = None
         self.is_running = False
         
         # Configurar logging
@@ -32,7 +34,15 @@ class ScrapingWorker:
             # Inicializar conexiones
             self.rabbitmq_client = RabbitMQClient()
             self.database_manager = DatabaseManager()
-            self.scraper = WebScraper()
+            
+            # Selenium se inicia bajo demanda; opcionalmente desde un pool compartido
+            if Config.SELENIUM_POOL_SIZE > 0:
+                self.browser_pool = BrowserPool(
+                    crear_driver_chrome,
+                    max_size=Config.SELENIUM_POOL_SIZE,
+                    idle_timeout=Config.SELENIUM_IDLE_TIMEOUT
+                )
+            self.scraper = WebScraper(pool=self.browser_pool)
             
             # Probar conexiones
             if not self.database_manager.test_connection():
@@ -165,6 +175,9 @@ class ScrapingWorker:
             
             if self.scraper:
                 self.scraper.close()
+            
+            if self.browser_pool:
+                self.browser_pool.close()
                 
             logger.info("ScrapingWorker detenido correctamente")
             
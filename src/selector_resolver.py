@@ -0,0 +1,152 @@
+"""
+Resolución de selectores alternativos por aseguradora.
+
+Cuando un portal admite varios selectores para el mismo elemento (p.ej. el
+botón de búsqueda), en lugar de esperar cada uno por turno con su propio
+``WebDriverWait`` se sondean todos en una sola llamada a ``execute_script``,
+repetida hasta el timeout. El resolutor de cada aseguradora recuerda qué
+alternativa funcionó la última vez y la prueba primero.
+
+Los selectores ``alternativos`` (genéricos como ``.btn-primary``) solo se
+aceptan cuando la página terminó de cargar (``readyState`` complete) y
+ninguno de los configurados está presente, para no pulsar otro botón
+mientras el configurado aún no se ha renderizado.
+
+Los selectores se validan antes de esperar: ``:contains("texto")`` (de
+jQuery, no es CSS válido) se traduce a un filtro por texto, y los que el
+navegador rechaza en el primer sondeo se descartan para siempre.
+"""
+
+import re
+import time
+import logging
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+from selenium.common.exceptions import TimeoutException
+
+from src.deadline import acotar, esperar
+from src.metrics import metricas
+
+logger = logging.getLogger(__name__)
+
+# ``button:contains("Buscar")`` -> css ``button`` con texto ``Buscar``
+_CONTAINS = re.compile(r'^(?P<css>.*?):contains\(\s*(?P<comilla>["\']?)(?P<texto>.*?)(?P=comilla)\s*\)\s*$')
+
+# Devuelve [índice del candidato, elemento, índices de selectores inválidos].
+# Los alternativos van al final y solo cuentan con la página ya cargada.
+_SCRIPT_SONDEO = """
+var candidatos = arguments[0], soloVisibles = arguments[1], invalidos = [];
+var cargada = document.readyState === 'complete';
+for (var i = 0; i < candidatos.length; i++) {
+    if (candidatos[i][2] && !cargada) break;
+    var nodos;
+    try { nodos = document.querySelectorAll(candidatos[i][0]); } catch (e) { invalidos.push(i); continue; }
+    for (var j = 0; j < nodos.length; j++) {
+        var nodo = nodos[j], texto = candidatos[i][1];
+        if (texto && ((nodo.innerText || nodo.value || '').indexOf(texto) < 0)) continue;
+        if (soloVisibles && (nodo.disabled || !nodo.getClientRects().length)) continue;
+        return [i, nodo, invalidos];
+    }
+}
+return [-1, null, invalidos];
+"""
+
+
+class Candidato(NamedTuple):
+    selector: str  # tal como lo declara el plugin
+    css: str
+    texto: str  # filtro por texto visible ('' = sin filtro)
+    alternativo: bool = False  # solo con la página cargada y sin ninguno de los configurados
+
+
+def interpretar(selector: str, alternativo: bool = False) -> Optional[Candidato]:
+    """Candidato sondeable a partir de ``selector``; None si está vacío"""
+    selector = (selector or '').strip()
+    if not selector:
+        return None
+    coincidencia = _CONTAINS.match(selector)
+    if coincidencia:
+        return Candidato(selector, coincidencia.group('css').strip() or '*', coincidencia.group('texto'), alternativo)
+    return Candidato(selector, selector, '', alternativo)
+
+
+class SelectorResolver:
+    """Resuelve grupos de selectores alternativos de una aseguradora y recuerda el último que funcionó"""
+
+    def __init__(self, nombre: str, intervalo: float = 0.25, reloj=time.monotonic):
+        self.nombre = nombre
+        self.intervalo = intervalo
+        self._reloj = reloj
+        self._ultimo: Dict[str, str] = {}
+        self._invalidos = set()
+        self._lock = threading.Lock()
+
+    def ultimo(self, grupo: str) -> Optional[str]:
+        with self._lock:
+            return self._ultimo.get(grupo)
+
+    def candidatos(self, grupo: str, selectores: List[str],
+                   alternativos: Optional[List[str]] = None) -> List[Candidato]:
+        """Selectores válidos y sin repetir: los configurados antes que los alternativos y,
+        dentro de cada grupo, el último que funcionó primero"""
+        with self._lock:
+            ultimo = self._ultimo.get(grupo)
+            invalidos = set(self._invalidos)
+        vistos, candidatos = set(), []
+        for selector, alternativo in [(s, False) for s in selectores] + [(s, True) for s in alternativos or []]:
+            candidato = interpretar(selector, alternativo)
+            if candidato is None or candidato.selector in vistos or candidato.selector in invalidos:
+                continue
+            vistos.add(candidato.selector)
+            candidatos.append(candidato)
+        candidatos.sort(key=lambda candidato: (candidato.alternativo, candidato.selector != ultimo))
+        return candidatos
+
+    def resolver(self, driver, grupo: str, selectores: List[str], timeout: float = 10, visible: bool = True,
+                 alternativos: Optional[List[str]] = None):
+        """Primer elemento (visible y habilitado si ``visible``) de cualquiera de ``selectores``.
+
+        Los ``alternativos`` solo se aceptan con la página cargada y ninguno de
+        ``selectores`` presente. Lanza ``TimeoutException`` si nada aparece en
+        ``timeout`` segundos (recortados al plazo del mensaje).
+        """
+        candidatos = self.candidatos(grupo, selectores, alternativos)
+        if not candidatos:
+            raise TimeoutException(f"Sin selectores válidos para '{grupo}' en {self.nombre}")
+
+        vence = self._reloj() + acotar(timeout)
+        while True:
+            indice, elemento, invalidos = driver.execute_script(
+                _SCRIPT_SONDEO, [[c.css, c.texto, c.alternativo] for c in candidatos], visible)
+            if invalidos:
+                candidatos = self._descartar(candidatos, invalidos)
+                if indice >= 0:
+                    indice -= sum(1 for i in invalidos if i < indice)
+            if elemento is not None:
+                return self._recordar(grupo, candidatos[indice], elemento)
+            if not candidatos or self._reloj() >= vence:
+                break
+            esperar(min(self.intervalo, max(0.0, vence - self._reloj())))
+
+        metricas.incrementar('scraping_selectores_resueltos_total', descripcion='Resolución de selectores alternativos',
+                             aseguradora=self.nombre, resultado='fallo')
+        raise TimeoutException(f"Ningún selector de '{grupo}' apareció en {timeout:.0f}s: "
+                               f"{[c.selector for c in candidatos]}")
+
+    def _descartar(self, candidatos: List[Candidato], invalidos: List[int]) -> List[Candidato]:
+        descartados = [candidatos[i].selector for i in invalidos]
+        with self._lock:
+            self._invalidos.update(descartados)
+        for selector in descartados:
+            logger.warning(f"⚠️ {self.nombre}: selector no válido descartado: {selector}")
+        return [c for i, c in enumerate(candidatos) if i not in set(invalidos)]
+
+    def _recordar(self, grupo: str, candidato: Candidato, elemento):
+        with self._lock:
+            recordado = self._ultimo.get(grupo) == candidato.selector
+            self._ultimo[grupo] = candidato.selector
+        metricas.incrementar('scraping_selectores_resueltos_total', descripcion='Resolución de selectores alternativos',
+                             aseguradora=self.nombre, resultado='memoria' if recordado else 'alternativo')
+        logger.info(f"🎯 {self.nombre}: '{grupo}' resuelto con {candidato.selector}")
+        return elemento
@@ -0,0 +1,225 @@
+"""
+Supervisor de varios procesos worker (``run_production_worker.py --processes N``).
+
+Cada hijo es un ``ProductionWorker`` completo (su procesador, su navegador y su
+conexión a RabbitMQ), de modo que un solo contenedor puede aprovechar todos los
+núcleos de la máquina. El supervisor:
+
+- arranca los hijos escalonados (``escalonado_segundos`` entre uno y otro) para
+  no lanzar N navegadores y N logins a la vez;
+- reinicia el hijo que termina sin que se haya pedido la parada, con una espera
+  que se duplica en cada caída seguida (hasta ``espera_maxima_reinicio``);
+- asigna a cada hijo su puerto de métricas: ``puerto_metricas_base + indice``;
+- ante SIGTERM/SIGINT detiene a todos con SIGTERM, les da ``gracia_segundos``
+  para terminar el mensaje en curso y mata a los que no terminaron. SIGHUP se
+  reenvía a los hijos (recarga de plugins);
+- con ``autoescalado`` (un ``QueueAutoscaler``) y ``leer_cola``, cada
+  ``intervalo_autoescalado`` segundos lee la profundidad de la cola y ajusta el
+  número de hijos a la recomendación, entre sus ``minimo`` y ``maximo``. Los
+  hijos suman sus mensajes atendidos y segundos de servicio en ``estadisticas``
+  (un ``Array`` compartido: ``[2*i]`` mensajes y ``[2*i+1]`` segundos del hijo i).
+
+Los hijos se crean con el contexto ``spawn``: empiezan con un intérprete limpio,
+sin heredar los hilos (logging, métricas) ni los locks del supervisor.
+"""
+
+import os
+import time
+import signal
+import logging
+import threading
+import multiprocessing
+from typing import Callable, Dict, List, Optional
+
+from src.autoscaler import QueueAutoscaler
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerSupervisor:
+    """Mantiene ``procesos`` workers hijos vivos y coordina su parada.
+
+    ``objetivo(indice, puerto_metricas, estadisticas)`` es la función que
+    ejecuta cada hijo; debe poder importarse desde un módulo (requisito de
+    ``spawn``).
+    """
+
+    def __init__(self, procesos: int, objetivo: Callable, escalonado_segundos: float = 5.0,
+                 gracia_segundos: float = 30.0, espera_maxima_reinicio: float = 60.0,
+                 puerto_metricas_base: int = 0, intervalo: float = 0.5, contexto=None,
+                 autoescalado: Optional[QueueAutoscaler] = None, leer_cola: Optional[Callable[[], int]] = None,
+                 intervalo_autoescalado: float = 30.0, reloj=time.monotonic):
+        if procesos < 1:
+            raise ValueError(f"procesos debe ser >= 1 (recibido {procesos})")
+        self.procesos = procesos
+        self.objetivo = objetivo
+        self.escalonado_segundos = escalonado_segundos
+        self.gracia_segundos = gracia_segundos
+        self.espera_maxima_reinicio = espera_maxima_reinicio
+        self.puerto_metricas_base = puerto_metricas_base
+        self.intervalo = intervalo
+        self._contexto = contexto or multiprocessing.get_context('spawn')
+        self._reloj = reloj
+        self.autoescalado = autoescalado if leer_cola else None
+        self.leer_cola = leer_cola
+        self.intervalo_autoescalado = intervalo_autoescalado
+        self.capacidad = max(procesos, (self.autoescalado.maximo or 0) if self.autoescalado else 0)
+        self.estadisticas = self._contexto.Array('d', 2 * self.capacidad)
+
+        self.reinicios = 0
+        self._hijos: Dict[int, multiprocessing.Process] = {}
+        self._iniciado_en: Dict[int, float] = {}
+        self._caidas_seguidas: Dict[int, int] = {}
+        self._pendientes: Dict[int, float] = {}  # indice -> instante en que (re)arrancar
+        self._retirados: List[multiprocessing.Process] = []  # hijos sobrantes tras escalar hacia abajo
+        self._proximo_autoescalado = 0.0
+        self._detener = threading.Event()
+        self._lock = threading.Lock()
+
+    def puerto_metricas(self, indice: int) -> int:
+        """Puerto de métricas del hijo ``indice``; 0 si las métricas están desactivadas"""
+        return self.puerto_metricas_base + indice if self.puerto_metricas_base else 0
+
+    def vivos(self) -> int:
+        with self._lock:
+            return sum(1 for proceso in self._hijos.values() if proceso.is_alive())
+
+    def instalar_senales(self):
+        """SIGTERM/SIGINT detienen a todos los hijos; SIGHUP se les reenvía (solo desde el hilo principal)"""
+        signal.signal(signal.SIGTERM, lambda signum, frame: self.detener())
+        signal.signal(signal.SIGINT, lambda signum, frame: self.detener())
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, lambda signum, frame: self.reenviar(signal.SIGHUP))
+
+    def detener(self):
+        """Pide la parada coordinada; ``ejecutar`` retorna cuando terminan todos los hijos"""
+        if not self._detener.is_set():
+            logger.info("📡 Parada solicitada - deteniendo los workers")
+        self._detener.set()
+
+    def reenviar(self, senal: int):
+        with self._lock:
+            hijos = [proceso for proceso in self._hijos.values() if proceso.is_alive()]
+        for proceso in hijos:
+            try:
+                os.kill(proceso.pid, senal)
+            except ProcessLookupError:
+                continue
+        logger.info(f"📡 Señal {senal} reenviada a {len(hijos)} workers")
+
+    def ejecutar(self):
+        """Arranca los hijos y los mantiene vivos hasta ``detener()``"""
+        logger.info(f"👷 Supervisor iniciado: {self.procesos} workers, "
+                    f"arranque escalonado cada {self.escalonado_segundos:.0f}s")
+        ahora = self._reloj()
+        for indice in range(self.procesos):
+            self._pendientes[indice] = ahora + indice * self.escalonado_segundos
+        self._proximo_autoescalado = ahora + self.intervalo_autoescalado
+        try:
+            while not self._detener.is_set():
+                self._revisar()
+                if self.autoescalado and self._reloj() >= self._proximo_autoescalado:
+                    self._proximo_autoescalado = self._reloj() + self.intervalo_autoescalado
+                    self._autoescalar()
+                self._detener.wait(self.intervalo)
+        finally:
+            self._parar_hijos()
+        logger.info("🔌 Supervisor detenido: todos los workers terminaron")
+
+    def _arrancar(self, indice: int):
+        puerto = self.puerto_metricas(indice)
+        proceso = self._contexto.Process(target=self.objetivo, args=(indice, puerto, self.estadisticas),
+                                         name=f"worker-{indice}")
+        proceso.start()
+        with self._lock:
+            self._hijos[indice] = proceso
+            self._iniciado_en[indice] = self._reloj()
+        logger.info(f"👷 Worker {indice} iniciado (pid {proceso.pid}, métricas: {puerto or 'desactivadas'})")
+
+    def escalar(self, procesos: int):
+        """Ajusta el número de hijos: los nuevos arrancan escalonados, los sobrantes terminan su mensaje"""
+        procesos = max(1, min(procesos, self.capacidad))
+        ahora = self._reloj()
+        with self._lock:
+            actuales = self.procesos
+            for indice in range(actuales, procesos):
+                self._pendientes[indice] = ahora + (indice - actuales) * self.escalonado_segundos
+            for indice in range(procesos, actuales):
+                self._pendientes.pop(indice, None)
+                proceso = self._hijos.pop(indice, None)
+                if proceso is not None:
+                    # SIGTERM: salida ordenada del worker (un mensaje sin ack vuelve a la cola)
+                    proceso.terminate()
+                    self._retirados.append(proceso)
+            self.procesos = procesos
+        if procesos != actuales:
+            logger.info(f"📈 Workers: {actuales} -> {procesos}")
+
+    def _autoescalar(self):
+        """Lee la cola y escala hacia la recomendación del autoescalado"""
+        try:
+            profundidad = self.leer_cola()
+        except Exception as e:
+            logger.warning(f"⚠️ No se pudo leer la cola para el autoescalado: {e}")
+            return
+        if profundidad is None:
+            return
+        with self.estadisticas.get_lock():
+            atendidos = sum(self.estadisticas[0::2])
+            servicio = sum(self.estadisticas[1::2])
+        self.autoescalado.muestrear(profundidad, atendidos, servicio)
+        objetivo = self.autoescalado.objetivo(self.procesos)
+        if objetivo != self.procesos:
+            servicio_mensaje = self.autoescalado.tiempo_servicio or 0.0
+            logger.info(f"📈 Autoescalado: cola {profundidad}, llegada {self.autoescalado.tasa_llegada or 0:.2f}/s, "
+                        f"servicio {servicio_mensaje:.1f}s por mensaje")
+            self.escalar(objetivo)
+
+    def _revisar(self):
+        """Reinicia los hijos caídos (con espera creciente) y arranca los que tocan"""
+        ahora = self._reloj()
+        with self._lock:
+            caidos = [(indice, proceso) for indice, proceso in self._hijos.items() if not proceso.is_alive()]
+            for indice, _ in caidos:
+                del self._hijos[indice]
+            terminados = [proceso for proceso in self._retirados if not proceso.is_alive()]
+            self._retirados = [proceso for proceso in self._retirados if proceso.is_alive()]
+        for proceso in terminados:
+            proceso.join()
+            logger.info(f"👋 Worker {proceso.name} (pid {proceso.pid}) retirado")
+
+        for indice, proceso in caidos:
+            duracion = ahora - self._iniciado_en[indice]
+            # Un hijo que aguantó más que la espera máxima vuelve a empezar la cuenta de caídas
+            caidas = 1 if duracion >= self.espera_maxima_reinicio else self._caidas_seguidas.get(indice, 0) + 1
+            self._caidas_seguidas[indice] = caidas
+            espera = min(self.espera_maxima_reinicio, 2.0 ** (caidas - 1))
+            self._pendientes[indice] = ahora + espera
+            self.reinicios += 1
+            logger.error(f"💥 Worker {indice} (pid {proceso.pid}) terminó con código {proceso.exitcode} "
+                         f"tras {duracion:.0f}s - reinicio en {espera:.0f}s")
+
+        with self._lock:
+            listos = [indice for indice, instante in sorted(self._pendientes.items()) if instante <= ahora]
+            for indice in listos:
+                del self._pendientes[indice]
+        for indice in listos:
+            if not self._detener.is_set():
+                self._arrancar(indice)
+
+    def _parar_hijos(self):
+        with self._lock:
+            hijos = list(self._hijos.values()) + self._retirados
+        for proceso in hijos:
+            if proceso.is_alive():
+                proceso.terminate()
+
+        limite = self._reloj() + self.gracia_segundos
+        for proceso in hijos:
+            proceso.join(max(0.0, limite - self._reloj()))
+        for proceso in hijos:
+            if proceso.is_alive():
+                logger.warning(f"⚠️ Worker {proceso.name} (pid {proceso.pid}) no terminó en "
+                               f"{self.gracia_segundos:.0f}s - se fuerza la salida")
+                proceso.kill()
+                proceso.join()
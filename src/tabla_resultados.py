@@ -0,0 +1,138 @@
+import logging
+from typing import Dict, Iterable, List, Optional
+
+import lxml.html
+
+logger = logging.getLogger(__name__)
+
+SELECTOR_TABLA = 'table.GridViewStylePV'
+
+# Estrategias de extracción de la tabla de resultados
+# - webdriver: una llamada WebDriver por fila y por celda (comportamiento original)
+# - js: una sola llamada execute_script que devuelve todas las celdas
+# - lxml: se parsea driver.page_source en Python, sin llamadas por celda
+ESTRATEGIAS = ('webdriver', 'js', 'lxml')
+
+_SCRIPT_TABLA = """
+const tabla = arguments[0] || document.querySelector(arguments[1]);
+if (!tabla) { return null; }
+return Array.from(tabla.rows).map(fila =>
+    Array.from(fila.cells).map(celda => [celda.tagName, celda.innerText])
+);
+"""
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+    """Colapsa espacios en blanco (incluye saltos de línea y tabulaciones)"""
+    return ' '.join((texto or '').split())
+
+
+def normalizar_nombre(nombre: Optional[str]) -> str:
+    """Normalización usada para comparar nombres de pacientes"""
+    return normalizar_texto(nombre).upper()
+
+
+class TablaResultados:
+    """Encabezados y filas (dicts encabezado -> valor) de una tabla de resultados.
+
+    ``filas`` puede ser un generador (estrategia webdriver) para poder
+    detener la lectura en cuanto se encuentra el cliente buscado.
+    """
+
+    def __init__(self, encabezados: List[str], filas: Iterable[Dict[str, str]], total_filas: int):
+        self.encabezados = encabezados
+        self.filas = filas
+        self.total_filas = total_filas
+
+
+def _fila_a_dict(encabezados: List[str], valores: List[str]) -> Dict[str, str]:
+    return {encabezados[j]: valor for j, valor in enumerate(valores) if j < len(encabezados)}
+
+
+def _desde_celdas(celdas_por_fila: List[List]) -> TablaResultados:
+    """Construye la tabla desde [[(tag, texto), ...], ...] (estrategias js y lxml)"""
+    if not celdas_por_fila:
+        return TablaResultados([], [], 0)
+
+    encabezados = [normalizar_texto(texto) for _, texto in celdas_por_fila[0] if normalizar_texto(texto)]
+
+    filas = []
+    if len(celdas_por_fila) > 1:
+        for celdas in celdas_por_fila[1:]:
+            valores = [normalizar_texto(texto) for tag, texto in celdas if tag.upper() == 'TD']
+            if valores:
+                fila = _fila_a_dict(encabezados, valores)
+                if fila:
+                    filas.append(fila)
+    return TablaResultados(encabezados, filas, len(celdas_por_fila))
+
+
+def extraer_tabla_html(html: str, selector: str = SELECTOR_TABLA) -> Optional[TablaResultados]:
+    """Extrae la tabla desde el HTML de la página con lxml; None si no existe"""
+    documento = lxml.html.fromstring(html)
+    tablas = documento.cssselect(selector)
+    if not tablas:
+        return None
+    filas = tablas[0].xpath('./tr | ./thead/tr | ./tbody/tr | ./tfoot/tr')
+    return _desde_celdas([
+        [(celda.tag, ''.join(celda.itertext())) for celda in fila.iterchildren('th', 'td')]
+        for fila in filas
+    ])
+
+
+def _extraer_tabla_webdriver(tabla) -> TablaResultados:
+    from selenium.webdriver.common.by import By
+
+    filas = tabla.find_elements(By.CSS_SELECTOR, 'tr')
+    if len(filas) <= 1:
+        return TablaResultados([], [], len(filas))
+
+    celdas_header = filas[0].find_elements(By.CSS_SELECTOR, 'th, td')
+    encabezados = [celda.text.strip() for celda in celdas_header if celda.text.strip()]
+
+    def iterar():
+        for fila in filas[1:]:
+            celdas = fila.find_elements(By.CSS_SELECTOR, 'td')
+            if celdas:
+                datos = _fila_a_dict(encabezados, [celda.text.strip() for celda in celdas])
+                if datos:
+                    yield datos
+
+    return TablaResultados(encabezados, iterar(), len(filas))
+
+
+def extraer_tabla(driver, estrategia: str = 'webdriver', selector: str = SELECTOR_TABLA,
+                  tabla=None) -> Optional[TablaResultados]:
+    """Extrae la tabla de resultados con la estrategia indicada.
+
+    ``tabla`` es el WebElement ya localizado (opcional); si no se pasa se busca
+    con ``selector``. Retorna None si la tabla no existe.
+    """
+    if estrategia not in ESTRATEGIAS:
+        logger.warning(f"⚠️ Estrategia de tabla '{estrategia}' no válida, usando 'webdriver'")
+        estrategia = 'webdriver'
+
+    if estrategia == 'lxml':
+        return extraer_tabla_html(driver.page_source, selector)
+
+    if estrategia == 'js':
+        celdas = driver.execute_script(_SCRIPT_TABLA, tabla, selector)
+        return None if celdas is None else _desde_celdas(celdas)
+
+    if tabla is None:
+        from selenium.webdriver.common.by import By
+        encontradas = driver.find_elements(By.CSS_SELECTOR, selector)
+        if not encontradas:
+            return None
+        tabla = encontradas[0]
+    return _extraer_tabla_webdriver(tabla)
+
+
+def buscar_fila_por_nombre(filas: Iterable[Dict[str, str]], nombre: str,
+                           columna: str = 'Nombre del Paciente') -> Optional[Dict[str, str]]:
+    """Primera fila cuyo nombre coincide (normalizado) con ``nombre``"""
+    buscado = normalizar_nombre(nombre)
+    for fila in filas:
+        if normalizar_nombre(fila.get(columna)) == buscado:
+            return fila
+    return None
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar la recomendación de workers según la cola
+(tasa de llegada, tiempo de servicio, límites e histéresis al bajar)
+"""
+
+import sys
+import logging
+
+from src.autoscaler import QueueAutoscaler
+from reloj_falso import RelojFalso
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _autoescalado(reloj, **opciones):
+    opciones.setdefault('suavizado', 1.0)  # sin suavizado para que las cuentas sean exactas
+    opciones.setdefault('utilizacion_objetivo', 1.0)
+    return QueueAutoscaler(reloj=reloj, **opciones)
+
+
+def test_sin_servicio_medido_mantiene_el_minimo():
+    reloj = RelojFalso()
+    autoescalado = _autoescalado(reloj, minimo=2)
+    assert autoescalado.muestrear(500, 0, 0) == 2
+    reloj.ahora += 10
+    assert autoescalado.muestrear(800, 0, 0) == 2
+    assert autoescalado.tiempo_servicio is None and autoescalado.tasa_llegada == 30
+
+
+def test_recomienda_segun_llegada_y_servicio():
+    reloj = RelojFalso()
+    autoescalado = _autoescalado(reloj, objetivo_drenado_segundos=100, navegadores_por_worker=2)
+    autoescalado.muestrear(0, 0, 0)
+    reloj.ahora += 10
+    # 20 atendidos en 10 s con 4 s cada uno, la cola sigue vacía: llegan 2/s -> 2 * 4 = 8 workers
+    assert autoescalado.muestrear(0, 20, 80) == 8
+    assert autoescalado.tiempo_servicio == 4 and autoescalado.tasa_llegada == 2
+    assert autoescalado.navegadores_recomendados == 16
+    reloj.ahora += 10
+    # Además se acumularon 100 mensajes: hay que drenarlos en 100 s (+1/s) -> (12 + 1) * 4 = 52
+    assert autoescalado.muestrear(100, 40, 160) == 52
+
+
+def test_limites_y_extrapolacion_de_consumidores():
+    reloj = RelojFalso()
+    autoescalado = _autoescalado(reloj, minimo=1, maximo=5)
+    autoescalado.muestrear(0, 0, 0)
+    reloj.ahora += 10
+    # Este proceso atendió 10; con 3 consumidores iguales llegaron 30 en 10 s
+    autoescalado.muestrear(0, 10, 10, factor_consumidores=3)
+    assert autoescalado.tasa_llegada == 3
+    assert autoescalado.recomendados == 3
+    reloj.ahora += 10
+    autoescalado.muestrear(1000, 20, 20, factor_consumidores=3)
+    assert autoescalado.recomendados == 5
+    reloj.ahora += 10
+    autoescalado.muestrear(0, 20, 20)
+    assert autoescalado.recomendados == 1
+
+
+def test_sube_ya_y_baja_tras_el_enfriamiento():
+    reloj = RelojFalso()
+    autoescalado = _autoescalado(reloj, enfriamiento_segundos=300)
+    autoescalado.recomendados = 6
+    assert autoescalado.objetivo(4) == 6
+
+    autoescalado.recomendados = 2
+    assert autoescalado.objetivo(6) == 6
+    reloj.ahora += 200
+    assert autoescalado.objetivo(6) == 6
+    reloj.ahora += 100
+    assert autoescalado.objetivo(6) == 2
+
+    # Una recomendación alta en medio reinicia el enfriamiento
+    autoescalado.recomendados = 1
+    assert autoescalado.objetivo(2) == 2
+    autoescalado.recomendados = 2
+    assert autoescalado.objetivo(2) == 2
+    autoescalado.recomendados = 1
+    reloj.ahora += 299
+    assert autoescalado.objetivo(2) == 2
+
+
+def test_gauges():
+    autoescalado = _autoescalado(RelojFalso(), minimo=3)
+    gauges = {nombre: valor for nombre, _, valor, _ in autoescalado.gauges()}
+    assert gauges['scraping_autoescalado_workers_recomendados'] == 3
+    assert gauges['scraping_autoescalado_navegadores_recomendados'] == 3
+    assert gauges['scraping_autoescalado_tasa_llegada'] is None
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_sin_servicio_medido_mantiene_el_minimo,
+        test_recomienda_segun_llegada_y_servicio,
+        test_limites_y_extrapolacion_de_consumidores,
+        test_sube_ya_y_baja_tras_el_enfriamiento,
+        test_gauges
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar las piezas del benchmark de throughput que no
+requieren navegador: percentiles, comparación de reportes y servicios simulados
+"""
+
+import sys
+import json
+import logging
+
+from benchmarks.portal_palig import PortalPalig, SELECTOR_IDENTIFICACION
+from benchmarks.throughput import (
+    BaseDatosSimulada, comparar_reportes, construir_mensajes, generar_clientes, percentil, resumir
+)
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _reporte(p95_login, clientes_por_minuto):
+    return {'escenarios': [{
+        'concurrencia': 1, 'lote': 1, 'filas': 20,
+        'clientes_por_minuto': clientes_por_minuto,
+        'etapas': {'login': {'p95': p95_login}}
+    }]}
+
+
+def test_percentiles():
+    valores = [float(i) for i in range(1, 101)]
+    assert percentil(valores, 50) == 50.5
+    assert abs(percentil(valores, 99) - 99.01) < 1e-9
+    assert percentil([], 50) is None
+    resumen = resumir([0.2, 0.1, 0.3])
+    assert resumen['n'] == 3 and resumen['p50'] == 0.2 and resumen['maximo'] == 0.3
+
+
+def test_comparar_detecta_regresiones():
+    base = _reporte(10.0, 30.0)
+    assert comparar_reportes(base, _reporte(11.0, 29.0), tolerancia=0.15) == []
+    regresiones = comparar_reportes(base, _reporte(12.0, 20.0), tolerancia=0.15)
+    assert len(regresiones) == 2
+    assert 'login' in regresiones[0] and 'throughput' in regresiones[1]
+
+
+def test_mensajes_por_lote():
+    clientes = generar_clientes(5)
+    mensajes = construir_mensajes(clientes, 2)
+    assert len(mensajes) == 3
+    assert len(json.loads(mensajes[0])['Clientes']) == 2
+    assert json.loads(construir_mensajes(clientes, 1)[0])['NumDocIdentidad'] == clientes[0]['NumDocIdentidad']
+
+
+def test_base_datos_simulada():
+    portal = PortalPalig()
+    base_datos = BaseDatosSimulada(portal)
+    url = base_datos.execute_query("SELECT id FROM urls_automatizacion WHERE nombre = :nombre", {'nombre': 'x'})
+    assert url[0]['url_login'] == portal.url_login
+    campos = base_datos.execute_query("SELECT * FROM informacion_capturada WHERE IdUrl = :id_url")
+    assert campos[0]['SelectorCSS'] == SELECTOR_IDENTIFICACION
+    assert base_datos.execute_query("\n  INSERT INTO [FacturaCliente] VALUES (:a)", {'a': 1}) == []
+    assert base_datos.escrituras == [{'a': 1}]
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_percentiles,
+        test_comparar_detecta_regresiones,
+        test_mensajes_por_lote,
+        test_base_datos_simulada
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar la fábrica de navegadores (precedencia de la
+configuración, opciones por navegador, plantilla de perfil reutilizada y
+estadísticas de arranque) sin lanzar navegadores reales
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.edge.options import Options as EdgeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+from src.browser_factory import MARCA_PLANTILLA, BrowserFactory, config_desde_entorno
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class DriverFalso:
+    def __init__(self, navegador):
+        self.navegador = navegador
+        self.timeout_pagina = None
+        self.cerrado = False
+
+    def set_page_load_timeout(self, segundos):
+        self.timeout_pagina = segundos
+
+    def execute_cdp_cmd(self, comando, parametros):
+        pass
+
+    def quit(self):
+        self.cerrado = True
+
+
+class FabricaFalsa(BrowserFactory):
+    """``_lanzar`` no abre un navegador: escribe un archivo en el perfil y registra el arranque"""
+
+    def __init__(self, directorio_plantillas=None, fallar=False, bloquear=None, fallar_plantilla=False):
+        super().__init__(directorio_plantillas or tempfile.mkdtemp())
+        self.lanzados = []
+        self.fallar = fallar
+        self.fallar_plantilla = fallar_plantilla
+        self.bloquear = bloquear  # Event que retiene el lanzamiento de la plantilla
+
+    def _lanzar(self, navegador, opciones):
+        directorio = next((argumento.split('=', 1)[1] for argumento in opciones.arguments
+                           if argumento.startswith('--user-data-dir=')), None)
+        # La plantilla se construye en un temporal dentro del directorio de plantillas
+        es_plantilla = bool(directorio) and os.path.dirname(directorio) == self.directorio_plantillas
+        self.lanzados.append(('plantilla' if es_plantilla else 'driver', navegador, opciones))
+        if es_plantilla and self.bloquear:
+            self.bloquear.wait(5)
+        if (self.fallar and not es_plantilla) or (self.fallar_plantilla and es_plantilla):
+            raise RuntimeError('no arrancó')
+        if directorio:
+            with open(os.path.join(directorio, 'Preferences'), 'w') as archivo:
+                archivo.write('{}')
+        return DriverFalso(navegador)
+
+
+@contextmanager
+def _entorno(**variables):
+    anteriores = {nombre: os.environ.get(nombre) for nombre in variables}
+    os.environ.update(variables)
+    try:
+        yield
+    finally:
+        for nombre, valor in anteriores.items():
+            if valor is None:
+                os.environ.pop(nombre, None)
+            else:
+                os.environ[nombre] = valor
+
+
+def test_precedencia_de_config_desde_entorno():
+    with _entorno(SELENIUM_NAVEGADOR='edge', SELENIUM_HEADLESS='true', SELENIUM_WINDOW_SIZE='1280,720'):
+        assert config_desde_entorno()['navegador'] == 'edge'
+        with _entorno(PALE_EC_SELENIUM_NAVEGADOR='firefox', PALE_EC_SELENIUM_HEADLESS='false'):
+            config = config_desde_entorno('PALE_EC')
+            assert config['navegador'] == 'firefox' and config['headless'] is False
+            assert config['window_size'] == '1280,720'  # lo global vale si la aseguradora no lo cambia
+            # El argumento explícito gana a ambas variables
+            assert config_desde_entorno('PALE_EC', navegador='chrome')['navegador'] == 'chrome'
+
+
+def test_opciones_por_navegador():
+    fabrica = FabricaFalsa()
+    config = fabrica._normalizar_config({'window_size': '1280x720', 'opciones_especiales': ['--no-sandbox', '--lang=es']})
+
+    chrome = fabrica._construir_opciones('chrome', config)
+    assert isinstance(chrome, ChromeOptions)
+    assert '--headless=new' in chrome.arguments and '--window-size=1280,720' in chrome.arguments
+    assert chrome.arguments.count('--no-sandbox') == 1 and '--lang=es' in chrome.arguments
+
+    assert isinstance(fabrica._construir_opciones('edge', config), EdgeOptions)
+
+    firefox = fabrica._construir_opciones('firefox', dict(config, ocultar_webdriver=True))
+    assert isinstance(firefox, FirefoxOptions)
+    assert '-headless' in firefox.arguments and '--width=1280' in firefox.arguments
+    assert firefox.preferences['dom.webdriver.enabled'] is False
+
+    try:
+        fabrica._normalizar_config({'navegador': 'safari'})
+        raise AssertionError('debía rechazar un navegador no soportado')
+    except ValueError:
+        pass
+
+
+def test_plantilla_se_crea_una_vez_y_se_reutiliza():
+    fabrica = FabricaFalsa()
+    primero = fabrica.crear_driver({'navegador': 'chrome'})
+    segundo = fabrica.crear_driver({'navegador': 'chrome'})
+    assert [tipo for tipo, _, _ in fabrica.lanzados] == ['plantilla', 'driver', 'driver']
+    assert primero.timeout_pagina == 30
+
+    # Cada driver arranca sobre su propia copia de la plantilla
+    directorios = [argumento for _, _, opciones in fabrica.lanzados[1:] for argumento in opciones.arguments
+                   if argumento.startswith('--user-data-dir=')]
+    assert len(set(directorios)) == 2
+    assert all(os.path.exists(os.path.join(directorio.split('=', 1)[1], 'Preferences')) for directorio in directorios)
+
+    # La plantilla se publicó completa y su marca no pasa a las copias
+    ruta = fabrica._ruta_plantilla('chrome')
+    assert sorted(os.listdir(fabrica.directorio_plantillas)) == ['plantilla_chrome']
+    assert os.path.exists(os.path.join(ruta, MARCA_PLANTILLA))
+    assert not any(os.path.exists(os.path.join(directorio.split('=', 1)[1], MARCA_PLANTILLA)) for directorio in directorios)
+
+    # Otra fábrica (otro proceso) reutiliza la plantilla ya creada en disco
+    otra = FabricaFalsa(fabrica.directorio_plantillas)
+    otra.crear_driver({'navegador': 'chrome'})
+    assert [tipo for tipo, _, _ in otra.lanzados] == ['driver']
+    del primero, segundo
+
+
+def test_plantilla_sin_marca_se_reconstruye():
+    # Restos de una construcción interrumpida: hay archivos pero no la marca de plantilla lista
+    fabrica = FabricaFalsa()
+    ruta = fabrica._ruta_plantilla('edge')
+    os.makedirs(ruta)
+    with open(os.path.join(ruta, 'Local State'), 'w') as archivo:
+        archivo.write('{')
+    fabrica.crear_driver({'navegador': 'edge'})
+    assert [tipo for tipo, _, _ in fabrica.lanzados] == ['plantilla', 'driver']
+    assert sorted(os.listdir(ruta)) == [MARCA_PLANTILLA, 'Preferences']
+
+    # Si la plantilla no llega a crearse, la ruta no queda con restos que otro proceso tome por lista
+    fallida = FabricaFalsa(fallar_plantilla=True)
+    assert fallida._asegurar_plantilla('chrome', fallida._normalizar_config({})) is None
+    assert os.listdir(fallida.directorio_plantillas) == []
+
+
+def test_plantilla_no_retiene_el_lock_de_la_fabrica():
+    liberar = threading.Event()
+    fabrica = FabricaFalsa(bloquear=liberar)
+    hilo = threading.Thread(target=lambda: fabrica.crear_driver({'navegador': 'chrome'}))
+    hilo.start()
+    while not fabrica.lanzados:
+        time.sleep(0.01)
+    # Mientras se lanza la plantilla de Chrome, las estadísticas y Firefox no esperan
+    inicio = time.monotonic()
+    assert fabrica.estadisticas()['arranques'] == 0
+    fabrica.crear_driver({'navegador': 'firefox', 'plantilla_perfil': False})
+    assert time.monotonic() - inicio < 1
+    liberar.set()
+    hilo.join(5)
+    assert fabrica.estadisticas()['arranques'] == 2
+
+
+def test_estadisticas_de_arranque():
+    fabrica = FabricaFalsa()
+    assert fabrica.estadisticas() == {'arranques': 0, 'fallidos': 0}
+    for _ in range(3):
+        fabrica.crear_driver({'navegador': 'edge', 'plantilla_perfil': False})
+    estadisticas = fabrica.estadisticas()
+    assert estadisticas['arranques'] == 3 and estadisticas['fallidos'] == 0
+    assert 0 <= estadisticas['promedio'] <= estadisticas['p95'] <= estadisticas['maximo']
+
+    fallida = FabricaFalsa(fallar=True)
+    try:
+        fallida.crear_driver({'navegador': 'chrome'})
+        raise AssertionError('debía propagar el error de arranque')
+    except RuntimeError:
+        pass
+    assert fallida.estadisticas() == {'arranques': 0, 'fallidos': 1}
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_precedencia_de_config_desde_entorno,
+        test_opciones_por_navegador,
+        test_plantilla_se_crea_una_vez_y_se_reutiliza,
+        test_plantilla_sin_marca_se_reconstruye,
+        test_plantilla_no_retiene_el_lock_de_la_fabrica,
+        test_estadisticas_de_arranque
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
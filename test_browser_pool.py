@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el pool de navegadores con creación bajo demanda
+y cierre por inactividad (sin abrir navegadores reales)
+"""
+
+import sys
+import time
+import logging
+
+from src.browser_pool import BrowserPool, BrowserPoolAgotado
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class DriverSimulado:
+    """Driver falso que solo registra si fue cerrado"""
+
+    def __init__(self, numero):
+        self.numero = numero
+        self.cerrado = False
+
+    def quit(self):
+        self.cerrado = True
+
+
+def _fabrica():
+    creados = []
+
+    def crear():
+        driver = DriverSimulado(len(creados) + 1)
+        creados.append(driver)
+        return driver
+
+    return crear, creados
+
+
+def test_no_crea_navegadores_sin_uso():
+    crear, creados = _fabrica()
+    pool = BrowserPool(crear, max_size=2, idle_timeout=60)
+    assert pool.estadisticas()['total'] == 0
+    assert creados == []
+    pool.close()
+
+
+def test_reutiliza_driver_liberado():
+    crear, creados = _fabrica()
+    pool = BrowserPool(crear, max_size=2, idle_timeout=60)
+    with pool.driver() as primero:
+        pass
+    with pool.driver() as segundo:
+        pass
+    assert primero is segundo
+    assert len(creados) == 1
+    pool.close()
+    assert primero.cerrado
+
+
+def test_respeta_tamano_maximo():
+    crear, creados = _fabrica()
+    pool = BrowserPool(crear, max_size=1, idle_timeout=60)
+    driver = pool.acquire()
+    try:
+        pool.acquire(timeout=0.1)
+        assert False, "Se esperaba BrowserPoolAgotado"
+    except BrowserPoolAgotado:
+        pass
+    pool.release(driver)
+    pool.close()
+
+
+def test_descarta_driver_con_error():
+    crear, creados = _fabrica()
+    pool = BrowserPool(crear, max_size=1, idle_timeout=60)
+    try:
+        with pool.driver():
+            raise RuntimeError("fallo simulado")
+    except RuntimeError:
+        pass
+    assert creados[0].cerrado
+    assert pool.estadisticas()['total'] == 0
+    pool.close()
+
+
+def test_cierra_navegadores_inactivos():
+    crear, creados = _fabrica()
+    pool = BrowserPool(crear, max_size=2, idle_timeout=0.2)
+    with pool.driver():
+        pass
+    time.sleep(0.3)
+    assert pool.cerrar_inactivos() == 1
+    assert creados[0].cerrado
+    assert pool.estadisticas()['total'] == 0
+    pool.close()
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_no_crea_navegadores_sin_uso,
+        test_reutiliza_driver_liberado,
+        test_respeta_tamano_maximo,
+        test_descarta_driver_con_error,
+        test_cierra_navegadores_inactivos
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
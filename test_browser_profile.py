@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el perfil de carga de recursos del navegador
+(categorías bloqueadas, lista permitida por categoría o por host y reparto
+entre preferencias de arranque y bloqueo CDP)
+"""
+
+import sys
+import logging
+
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.firefox.options import Options as FirefoxOptions
+
+from src.browser_profile import PATRONES_RECURSOS, BrowserProfile
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class DriverFalso:
+    """Registra los comandos CDP; ``sin_url_patterns`` emula un Chrome anterior a urlPatterns"""
+
+    def __init__(self, sin_url_patterns=False):
+        self.sin_url_patterns = sin_url_patterns
+        self.comandos = []
+
+    def execute_cdp_cmd(self, comando, parametros):
+        if self.sin_url_patterns and 'urlPatterns' in parametros:
+            raise RuntimeError('Invalid parameters')
+        self.comandos.append((comando, parametros))
+
+
+def test_categorias_por_defecto():
+    perfil = BrowserProfile()
+    patrones = perfil.patrones_bloqueados()
+    assert '*.png' in patrones and '*.woff2' in patrones and '*.mp4' in patrones
+    assert '*google-analytics.com*' in patrones
+    assert '*.css' not in patrones  # los estilos solo si se piden
+    assert perfil.page_load_strategy == 'eager'
+
+    perfil = BrowserProfile(bloquear=['estilos', 'desconocida'], patrones_extra=['*chat-widget*', '*.css'])
+    assert perfil.patrones_bloqueados() == ['*.css', '*chat-widget*']
+    assert BrowserProfile(bloquear=['ninguno']).patrones_bloqueados() == []
+
+
+def test_lista_permitida_por_categoria():
+    perfil = BrowserProfile(permitidos=['imagenes'])
+    patrones = perfil.patrones_bloqueados()
+    assert not set(PATRONES_RECURSOS['imagenes']) & set(patrones)
+    assert '*.woff' in patrones
+    assert perfil.patrones_permitidos() == [] and perfil.excepciones == []
+
+
+def test_excepcion_por_host_no_quita_patrones():
+    perfil = BrowserProfile(permitidos=['*attest.palig.com/*', 'https://cdn.palig.com/captcha/*'])
+    # El resto de hosts sigue con todos los patrones bloqueados
+    assert perfil.patrones_bloqueados() == BrowserProfile().patrones_bloqueados()
+    assert perfil.patrones_permitidos() == ['*://*attest.palig.com:*/*', 'https://cdn.palig.com:*/captcha/*']
+    assert perfil.sitios_permitidos() == ['[*.]attest.palig.com', 'cdn.palig.com']
+
+
+def test_cdp_con_excepciones_por_host():
+    driver = DriverFalso()
+    assert BrowserProfile(permitidos=['*attest.palig.com/*']).aplicar_a_driver(driver)
+    comando, parametros = driver.comandos[-1]
+    assert comando == 'Network.setBlockedURLs'
+    assert '*.png' in parametros['urls']
+    assert parametros['urlPatterns'] == [{'urlPattern': '*://*attest.palig.com:*/*', 'block': False}]
+
+    # Sin excepciones no se envía urlPatterns
+    driver = DriverFalso()
+    BrowserProfile().aplicar_a_driver(driver)
+    assert 'urlPatterns' not in driver.comandos[-1][1]
+
+    # Un navegador sin urlPatterns mantiene el bloqueo, sin las excepciones
+    driver = DriverFalso(sin_url_patterns=True)
+    assert BrowserProfile(permitidos=['*attest.palig.com/*']).aplicar_a_driver(driver)
+    assert driver.comandos[-1] == ('Network.setBlockedURLs', {'urls': BrowserProfile().patrones_bloqueados()})
+
+    assert not BrowserProfile().aplicar_a_driver(object())  # Firefox: sin CDP
+
+
+def test_preferencias_de_chrome_con_excepciones():
+    opciones = BrowserProfile().aplicar_a_opciones(ChromeOptions())
+    assert opciones.page_load_strategy == 'eager'
+    assert opciones.experimental_options['prefs'] == {'profile.default_content_setting_values.images': 2}
+
+    # Una excepción por host mantiene el bloqueo de imágenes para el resto
+    opciones = BrowserProfile(permitidos=['*attest.palig.com/*']).aplicar_a_opciones(ChromeOptions())
+    preferencias = opciones.experimental_options['prefs']
+    assert preferencias['profile.default_content_setting_values.images'] == 2
+    assert preferencias['profile.content_settings.exceptions.images'] == {'[*.]attest.palig.com,*': {'setting': 1}}
+
+    # Permitir la categoría completa quita el bloqueo de imágenes de las preferencias
+    opciones = BrowserProfile(permitidos=['imagenes']).aplicar_a_opciones(ChromeOptions())
+    assert 'prefs' not in opciones.experimental_options
+
+
+def test_preferencias_de_firefox():
+    opciones = BrowserProfile(page_load_strategy='normal').aplicar_a_opciones(FirefoxOptions())
+    assert opciones.page_load_strategy == 'normal'
+    assert opciones.preferences['permissions.default.image'] == 2
+    assert opciones.preferences['gfx.downloadable_fonts.enabled'] is False
+
+    # Firefox no admite excepciones por host: con ellas se cargan las imágenes
+    opciones = BrowserProfile(permitidos=['*attest.palig.com/*']).aplicar_a_opciones(FirefoxOptions())
+    assert 'permissions.default.image' not in opciones.preferences
+    assert opciones.preferences['gfx.downloadable_fonts.enabled'] is False
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_categorias_por_defecto,
+        test_lista_permitida_por_categoria,
+        test_excepcion_por_host_no_quita_patrones,
+        test_cdp_con_excepciones_por_host,
+        test_preferencias_de_chrome_con_excepciones,
+        test_preferencias_de_firefox
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar la política de reciclaje de navegadores y la
+exportación/restauración de cookies (sin abrir navegadores reales)
+"""
+
+import sys
+import logging
+
+from src.browser_recycling import RecyclingPolicy, exportar_cookies, restaurar_cookies
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class DriverSimulado:
+    """Driver falso con soporte CDP para cookies"""
+
+    def __init__(self, cookies=None):
+        self.cookies = list(cookies or [])
+        self.comandos = []
+
+    def execute_cdp_cmd(self, comando, parametros):
+        self.comandos.append((comando, parametros))
+        if comando == 'Network.getAllCookies':
+            return {'cookies': list(self.cookies)}
+        if comando == 'Network.setCookies':
+            self.cookies = list(parametros['cookies'])
+        return {}
+
+
+def test_recicla_por_paginas():
+    politica = RecyclingPolicy(max_paginas=3, max_minutos=0, max_rss_mb=0)
+    driver = DriverSimulado()
+    politica.registrar_pagina(2)
+    assert politica.motivo_reciclaje(driver) is None
+    politica.registrar_pagina()
+    assert 'páginas' in politica.motivo_reciclaje(driver)
+    politica.reiniciar()
+    assert politica.motivo_reciclaje(driver) is None
+
+
+def test_recicla_por_edad():
+    politica = RecyclingPolicy(max_paginas=0, max_minutos=1, max_rss_mb=0)
+    politica.inicio -= 120
+    assert 'minutos' in politica.motivo_reciclaje(DriverSimulado())
+
+
+def test_limites_en_cero_desactivan_reciclaje():
+    politica = RecyclingPolicy(max_paginas=0, max_minutos=0, max_rss_mb=0)
+    politica.registrar_pagina(10000)
+    politica.inicio -= 10 ** 6
+    assert politica.motivo_reciclaje(DriverSimulado()) is None
+
+
+def test_cookies_sobreviven_al_reciclaje():
+    cookies = [
+        {'name': 'ASP.NET_SessionId', 'value': 'abc', 'domain': 'benefitsdirect.palig.com',
+         'path': '/', 'expires': -1, 'session': True, 'httpOnly': True},
+        {'name': 'token', 'value': 'xyz', 'domain': '.palig.com', 'path': '/', 'expires': 1999999999}
+    ]
+    viejo = DriverSimulado(cookies)
+    nuevo = DriverSimulado()
+    exportadas = exportar_cookies(viejo)
+    assert restaurar_cookies(nuevo, exportadas) == 2
+    assert 'expires' not in nuevo.cookies[0]
+    assert nuevo.cookies[1]['expires'] == 1999999999
+    assert 'session' not in nuevo.cookies[0]
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_recicla_por_paginas,
+        test_recicla_por_edad,
+        test_limites_en_cero_desactivan_reciclaje,
+        test_cookies_sobreviven_al_reciclaje
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar la captura en bloque de los campos de
+informacion_capturada (una llamada al navegador por sondeo, sin esperar por
+campos opcionales que no existen)
+"""
+
+import sys
+import logging
+
+from src.captura_campos import capturar_campos
+from reloj_falso import RelojFalso
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+CAMPOS = [
+    {'NombreCampo': 'Titular', 'TipoCampo': 'text', 'SelectorCSS': 'h1', 'Obligatorio': True},
+    {'NombreCampo': 'Documento', 'TipoCampo': 'input', 'SelectorCSS': '#doc', 'Obligatorio': True},
+    {'NombreCampo': 'Plan', 'TipoCampo': 'select', 'SelectorCSS': 'select[name="plan"]', 'Obligatorio': False},
+    {'NombreCampo': 'Notas', 'TipoCampo': 'text', 'SelectorCSS': '.notas', 'Obligatorio': False}
+]
+
+
+class DriverFalso:
+    """Emula el script de captura: ``paginas`` es la secuencia de estados que ve cada sondeo"""
+
+    def __init__(self, paginas):
+        self.paginas = list(paginas)
+        self.sondeos = 0
+
+    def execute_script(self, script, consulta):
+        valores, listo = self.paginas[min(self.sondeos, len(self.paginas) - 1)]
+        self.sondeos += 1
+        return {'listo': listo, 'valores': [valores.get(selector) for selector, _ in consulta]}
+
+
+def test_todos_los_campos_en_un_sondeo():
+    driver = DriverFalso([({'h1': ' JUAN PEREZ ', '#doc': '0912345678', 'select[name="plan"]': 'Gold',
+                            '.notas': ''}, True)])
+    valores = capturar_campos(driver, CAMPOS, intervalo=0)
+    assert driver.sondeos == 1
+    assert valores == {'Titular': 'JUAN PEREZ', 'Documento': '0912345678', 'Plan': 'Gold', 'Notas': ''}
+
+
+def test_opcional_ausente_no_espera_si_la_pagina_cargo():
+    driver = DriverFalso([({'h1': 'JUAN', '#doc': '1'}, True)])
+    valores = capturar_campos(driver, CAMPOS, intervalo=0)
+    assert driver.sondeos == 1
+    assert valores['Plan'] is None and valores['Notas'] is None
+
+
+def test_espera_a_los_obligatorios():
+    driver = DriverFalso([({}, False), ({'h1': 'JUAN'}, True), ({'h1': 'JUAN', '#doc': '1'}, True)])
+    valores = capturar_campos(driver, CAMPOS, intervalo=0)
+    assert driver.sondeos == 3
+    assert valores['Documento'] == '1'
+
+
+def test_timeout_unico_para_todos_los_campos():
+    driver = DriverFalso([({}, True)])
+    valores = capturar_campos(driver, CAMPOS, timeout=5, intervalo=0, reloj=RelojFalso(ahora=0.0, paso=1))
+    assert all(valor is None for valor in valores.values())
+    # El número de sondeos depende del timeout, no de la cantidad de campos
+    assert driver.sondeos <= 5
+    assert capturar_campos(driver, []) == {}
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_todos_los_campos_en_un_sondeo,
+        test_opcional_ausente_no_espera_si_la_pagina_cargo,
+        test_espera_a_los_obligatorios,
+        test_timeout_unico_para_todos_los_campos
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
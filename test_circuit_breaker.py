@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el circuit breaker por portal (apertura tras
+fallos seguidos, fallo rápido mientras está abierto y un único mensaje de
+prueba al quedar semiabierto)
+"""
+
+import sys
+import logging
+
+from src.circuit_breaker import ABIERTO, CERRADO, SEMIABIERTO, CircuitBreaker, CircuitoAbierto
+from src.insurer_plugins import InsurerPlugin, PluginRegistry
+from reloj_falso import RelojFalso
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _rechazado(circuito):
+    try:
+        circuito.permitir()
+    except CircuitoAbierto as e:
+        return e
+    return None
+
+
+def test_abre_tras_fallos_seguidos():
+    reloj = RelojFalso()
+    circuito = CircuitBreaker('PORTAL', umbral_fallos=3, segundos_abierto=60, reloj=reloj)
+    circuito.registrar_fallo('timeout')
+    circuito.registrar_fallo('timeout')
+    circuito.registrar_exito()  # un éxito reinicia la cuenta
+    for _ in range(2):
+        circuito.permitir()
+        circuito.registrar_fallo('http_503')
+    assert circuito.estado == CERRADO
+    circuito.registrar_fallo('http_503')
+    assert circuito.estado == ABIERTO and circuito.aperturas == 1
+
+    reloj.ahora += 20
+    error = _rechazado(circuito)
+    assert error is not None and error.nombre == 'PORTAL' and error.reintentar_en == 40
+    assert circuito.restante() == 40
+
+
+def test_semiabierto_deja_pasar_una_sola_prueba():
+    reloj = RelojFalso()
+    circuito = CircuitBreaker('PORTAL', umbral_fallos=1, segundos_abierto=60, reloj=reloj)
+    circuito.registrar_fallo()
+    reloj.ahora += 60
+    assert _rechazado(circuito) is None
+    assert circuito.estado == SEMIABIERTO
+    assert _rechazado(circuito) is not None  # la prueba sigue en curso
+
+    # La prueba falla: vuelve a abrirse por otro periodo completo
+    circuito.registrar_fallo('error')
+    assert circuito.estado == ABIERTO and circuito.aperturas == 2
+    reloj.ahora += 59
+    assert _rechazado(circuito) is not None
+
+    # La siguiente prueba sale bien: el circuito se cierra
+    reloj.ahora += 1
+    assert _rechazado(circuito) is None
+    circuito.registrar_exito()
+    assert circuito.estado == CERRADO and circuito.restante() == 0
+    assert _rechazado(circuito) is None and _rechazado(circuito) is None
+
+
+def test_prueba_perdida_no_bloquea_el_circuito():
+    reloj = RelojFalso()
+    circuito = CircuitBreaker('PORTAL', umbral_fallos=1, segundos_abierto=30, reloj=reloj)
+    circuito.registrar_fallo()
+    reloj.ahora += 30
+    assert _rechazado(circuito) is None  # prueba que nunca informa su resultado
+    reloj.ahora += 30
+    assert _rechazado(circuito) is None
+
+
+def test_circuito_por_aseguradora_en_el_registro():
+    registro = PluginRegistry(gestor=object())
+    plugin = type('PluginPrueba', (InsurerPlugin,), {'nombre': 'ASEGURADORA DE PRUEBA'})(None)
+    registro.configurar_circuitos(umbral_fallos=2, segundos_abierto=60)
+    circuito = registro.circuito(plugin)
+    assert circuito is registro.circuito(plugin)
+    assert circuito.umbral_fallos == 2
+    assert list(registro.circuitos()) == ['ASEGURADORA DE PRUEBA']
+
+    registro.configurar_circuitos(umbral_fallos=0)
+    assert PluginRegistry(gestor=object()).circuito(plugin) is not None  # activo por defecto
+    assert registro.circuito(plugin) is None
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_abre_tras_fallos_seguidos,
+        test_semiabierto_deja_pasar_una_sola_prueba,
+        test_prueba_perdida_no_bloquea_el_circuito,
+        test_circuito_por_aseguradora_en_el_registro
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el limitador adaptativo de concurrencia por
+portal (aumento aditivo, reducción multiplicativa, espera entre mensajes y
+detección de páginas de error 429/5xx)
+"""
+
+import sys
+import logging
+import threading
+
+from src.concurrency import AdaptiveLimiter, codigo_http_en_pagina
+from reloj_falso import RelojFalso
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _limitador(**opciones):
+    reloj = RelojFalso()
+    opciones.setdefault('maximo', 4)
+    return AdaptiveLimiter('PORTAL', reloj=reloj, dormir=reloj.dormir, **opciones), reloj
+
+
+def _mensaje(limitador, reloj, latencia=1.0, resultado='ok', congestion=None):
+    assert limitador.adquirir()
+    if congestion:
+        limitador.senalar_congestion(congestion)
+    reloj.ahora += latencia
+    limitador.liberar(latencia, resultado)
+
+
+def test_aumento_aditivo_hasta_el_techo():
+    limitador, reloj = _limitador(maximo=3)
+    assert limitador.estado()['limite'] == 1
+    _mensaje(limitador, reloj)
+    assert limitador.estado()['limite'] == 2
+    for _ in range(2):
+        _mensaje(limitador, reloj)
+    assert limitador.estado()['limite'] == 3
+    for _ in range(20):
+        _mensaje(limitador, reloj)
+    assert limitador.estado()['limite'] == 3  # nunca supera max_concurrencia del plugin
+
+
+def test_congestion_reduce_limite_y_aumenta_espera():
+    limitador, reloj = _limitador(maximo=8, espera_minima=1.0, enfriamiento=5.0)
+    for _ in range(30):
+        _mensaje(limitador, reloj)
+    assert limitador.estado()['limite'] == 8
+
+    _mensaje(limitador, reloj, congestion='http_429')
+    estado = limitador.estado()
+    assert estado['limite'] == 4 and estado['espera'] == 2.0 and estado['reducciones'] == 1
+
+    # Una segunda señal dentro del enfriamiento no vuelve a recortar
+    _mensaje(limitador, reloj, latencia=0.5, congestion='timeout')
+    assert limitador.estado()['reducciones'] == 1
+
+    # Con mensajes sanos la espera vuelve primero a SCRAPING_DELAY y luego sube el límite
+    reloj.ahora += 6
+    _mensaje(limitador, reloj)
+    assert limitador.estado()['espera'] == 1.5 and limitador.estado()['limite'] == 4
+    _mensaje(limitador, reloj)
+    assert limitador.estado()['espera'] == 1.0 and limitador.estado()['limite'] == 4
+    for _ in range(4):
+        _mensaje(limitador, reloj)
+    assert limitador.estado()['limite'] == 5
+
+
+def test_espera_entre_inicios_de_mensajes():
+    limitador, reloj = _limitador(maximo=2, espera_minima=2.0)
+    assert limitador.adquirir()
+    assert reloj.pausas == []
+    limitador.liberar(0.1)
+    assert limitador.adquirir()
+    assert reloj.pausas == [2.0]  # SCRAPING_DELAY desde el inicio anterior
+    limitador.liberar(0.1)
+    # Si la espera no cabe en el timeout no se duerme ni se toma el turno
+    assert not limitador.adquirir(timeout=1.0)
+    assert reloj.pausas == [2.0] and limitador.estado()['en_curso'] == 0
+    assert limitador.adquirir(timeout=2.0)
+    assert reloj.pausas == [2.0, 2.0]
+    limitador.liberar(0.1)
+
+
+def test_latencia_y_errores_sostenidos():
+    limitador, reloj = _limitador(maximo=4)
+    for _ in range(10):
+        _mensaje(limitador, reloj, latencia=1.0)
+    _mensaje(limitador, reloj, latencia=10.0)
+    assert limitador.estado()['reducciones'] == 1
+
+    limitador, reloj = _limitador(maximo=4, enfriamiento=0)
+    _mensaje(limitador, reloj, resultado='error')
+    assert limitador.estado()['reducciones'] == 0  # un error aislado no recorta
+    _mensaje(limitador, reloj, resultado='error')
+    assert limitador.estado()['reducciones'] == 1
+
+    # Un mensaje con login completo no cuenta como latencia del portal
+    limitador, reloj = _limitador(maximo=4)
+    for _ in range(10):
+        _mensaje(limitador, reloj, latencia=1.0)
+    assert limitador.adquirir()
+    limitador.omitir_latencia()
+    limitador.liberar(60.0)
+    assert limitador.estado()['reducciones'] == 0
+
+
+def test_limite_bloquea_hasta_liberar():
+    limitador = AdaptiveLimiter('PORTAL', maximo=1)
+    assert limitador.adquirir()
+    assert not limitador.adquirir(timeout=0.01)
+    liberado = threading.Timer(0.05, lambda: limitador.liberar(0.05))
+    liberado.start()
+    assert limitador.adquirir(timeout=2)
+    limitador.liberar(0.01)
+
+
+def test_codigo_http_en_titulo():
+    assert codigo_http_en_pagina('429 Too Many Requests') == '429'
+    assert codigo_http_en_pagina('Service Unavailable') == '503'
+    assert codigo_http_en_pagina('502 Bad Gateway - nginx') == '502'
+    assert codigo_http_en_pagina('Mis Pólizas - PALIG') is None
+    assert codigo_http_en_pagina(None) is None
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_aumento_aditivo_hasta_el_techo,
+        test_congestion_reduce_limite_y_aumenta_espera,
+        test_espera_entre_inicios_de_mensajes,
+        test_latencia_y_errores_sostenidos,
+        test_limite_bloquea_hasta_liberar,
+        test_codigo_http_en_titulo
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el plazo por mensaje (anidado por etapas,
+esperas recortadas y cancelación inmediata al agotarse)
+"""
+
+import sys
+import time
+import logging
+
+from src.deadline import PlazoAgotado, acotar, acotar_opcional, esperar, plazo, plazo_actual, restante, segundos_hasta
+from reloj_falso import RelojFalso
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def test_sin_plazo_las_esperas_no_cambian():
+    assert plazo_actual() is None and restante() is None
+    assert acotar(10) == 10
+    assert acotar_opcional(0) == 0
+    with plazo(0, 'login'):
+        assert plazo_actual() is None
+    inicio = time.monotonic()
+    esperar(0.01)
+    assert time.monotonic() - inicio >= 0.01
+
+
+def test_la_etapa_no_pasa_del_plazo_del_mensaje():
+    reloj = RelojFalso()
+    with plazo(60, 'mensaje', reloj=reloj) as mensaje:
+        # Un presupuesto mayor que lo que queda se queda con el plazo del mensaje
+        with plazo(180, 'login', reloj=reloj) as login:
+            assert login is mensaje
+        with plazo(20, 'busqueda', reloj=reloj) as busqueda:
+            assert busqueda.etapa == 'busqueda'
+            assert acotar(30) == 20 and acotar(5) == 5
+            assert acotar(0) == 0
+            # Solo el timeout de BD trata 0 como «sin límite propio»
+            assert acotar_opcional(0) == 20 and acotar_opcional(30) == 20
+        assert plazo_actual() is mensaje
+    assert plazo_actual() is None
+
+
+def test_plazo_agotado_corta_la_espera():
+    reloj = RelojFalso()
+    with plazo(30, 'busqueda', reloj=reloj):
+        reloj.ahora += 31
+        try:
+            acotar(10)
+            raise AssertionError('acotar debía lanzar PlazoAgotado')
+        except PlazoAgotado as e:
+            assert e.etapa == 'busqueda'
+        try:
+            esperar(10)
+            raise AssertionError('esperar debía lanzar PlazoAgotado')
+        except PlazoAgotado:
+            pass
+
+
+def test_esperar_se_recorta_al_plazo():
+    with plazo(0.05, 'login'):
+        inicio = time.monotonic()
+        try:
+            esperar(5)
+            raise AssertionError('esperar debía lanzar PlazoAgotado')
+        except PlazoAgotado as e:
+            assert e.etapa == 'login'
+        assert time.monotonic() - inicio < 1
+
+
+def test_esperar_cero_no_duerme_hasta_el_plazo():
+    # Los bucles de sondeo llaman esperar(0) en su última vuelta
+    with plazo(30, 'busqueda'):
+        inicio = time.monotonic()
+        esperar(0)
+        esperar(-1)
+        assert time.monotonic() - inicio < 1
+    reloj = RelojFalso()
+    with plazo(30, 'busqueda', reloj=reloj):
+        reloj.ahora += 31
+        try:
+            esperar(0)
+            raise AssertionError('esperar(0) debía lanzar PlazoAgotado')
+        except PlazoAgotado:
+            pass
+
+
+def test_cabecera_x_deadline():
+    assert 55 < segundos_hasta(time.time() + 60) <= 60
+    assert segundos_hasta(str(time.time() - 5)) < 0
+    assert segundos_hasta('mañana') is None
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_sin_plazo_las_esperas_no_cambian,
+        test_la_etapa_no_pasa_del_plazo_del_mensaje,
+        test_plazo_agotado_corta_la_espera,
+        test_esperar_se_recorta_al_plazo,
+        test_esperar_cero_no_duerme_hasta_el_plazo,
+        test_cabecera_x_deadline
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el registro de plugins por aseguradora
+(despacho por nombre, plugin genérico, TTL de sesión, límite de concurrencia
+y descubrimiento perezoso por manifest.json)
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timedelta
+
+from aseguradoras import GestorAseguradoras
+from src.insurer_plugins import GenericInsurerPlugin, InsurerPlugin, PluginRegistry
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class ProcesadorFalso:
+    """Registra qué pasos genéricos del worker invoca cada plugin"""
+
+    def __init__(self):
+        self.llamadas = []
+
+    def _ejecutar_login_configurado(self, url_info):
+        self.llamadas.append(('login', url_info['id']))
+        return True
+
+    def _capturar_informacion_generica(self, id_url, datos_mensaje=None):
+        self.llamadas.append(('generica', id_url))
+        return True
+
+
+def _registro_con_plugin():
+    registro = PluginRegistry(gestor=GestorAseguradoras(directorio=tempfile.mkdtemp()))
+
+    @registro.registrar
+    class PluginPrueba(InsurerPlugin):
+        nombre = 'ASEGURADORA DE PRUEBA'
+        codigo = 'PRUEBA'
+        max_concurrencia = 2
+        ttl_sesion_segundos = 60
+
+        def buscar(self, id_url, datos_mensaje=None):
+            self.procesador.llamadas.append(('buscar', id_url, datos_mensaje['NumDocIdentidad']))
+            return self.extraer('JUAN PEREZ', datos_mensaje)
+
+    return registro, PluginPrueba
+
+
+def test_despacho_por_nombre():
+    registro, PluginPrueba = _registro_con_plugin()
+    procesador = ProcesadorFalso()
+    plugin = registro.crear('ASEGURADORA DE PRUEBA', procesador)
+    assert isinstance(plugin, PluginPrueba) and plugin.codigo == 'PRUEBA'
+    assert plugin.login({'id': 7})
+    assert plugin.buscar(7, {'NumDocIdentidad': '0912345678'})
+    assert procesador.llamadas == [('login', 7), ('buscar', 7, '0912345678')]
+    assert registro.nombres() == ['ASEGURADORA DE PRUEBA']
+
+
+def test_aseguradora_sin_plugin_usa_generico():
+    registro, _ = _registro_con_plugin()
+    procesador = ProcesadorFalso()
+    plugin = registro.crear('OTRA ASEGURADORA', procesador)
+    assert type(plugin) is GenericInsurerPlugin
+    assert not plugin.requiere_login and plugin.codigo is None
+    assert plugin.buscar(3)
+    assert procesador.llamadas == [('generica', 3)]
+
+    try:
+        registro.registrar(type('SinNombre', (InsurerPlugin,), {}))
+        assert False, "un plugin sin nombre debe rechazarse"
+    except ValueError:
+        pass
+
+
+def test_ttl_de_sesion():
+    registro, _ = _registro_con_plugin()
+    plugin = registro.crear('ASEGURADORA DE PRUEBA', ProcesadorFalso())
+    assert not plugin.sesion_expirada(datetime.now() - timedelta(seconds=30))
+    assert plugin.sesion_expirada(datetime.now() - timedelta(seconds=90))
+    assert not plugin.sesion_expirada(None)
+    generico = registro.crear('OTRA ASEGURADORA', ProcesadorFalso())
+    assert not generico.sesion_expirada(datetime.now() - timedelta(days=30))
+
+
+def test_limite_de_concurrencia():
+    registro, _ = _registro_con_plugin()
+    plugin = registro.crear('ASEGURADORA DE PRUEBA', ProcesadorFalso())
+    en_curso, maximo = [0], [0]
+    lock = threading.Lock()
+
+    def trabajo():
+        with registro.limite(plugin):
+            with lock:
+                en_curso[0] += 1
+                maximo[0] = max(maximo[0], en_curso[0])
+            time.sleep(0.05)
+            with lock:
+                en_curso[0] -= 1
+
+    # El límite adaptativo arranca en 1 y sube con mensajes sanos hasta max_concurrencia
+    for _ in range(3):
+        with registro.limite(plugin):
+            pass
+    assert registro.estados()['ASEGURADORA DE PRUEBA']['limite'] == 2
+
+    hilos = [threading.Thread(target=trabajo) for _ in range(6)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    assert maximo[0] == 2
+
+    with registro.limite(plugin), registro.limite(plugin):
+        try:
+            with registro.limite(plugin, timeout=0.01):
+                assert False, "el tercer mensaje simultáneo no debe entrar"
+        except TimeoutError:
+            pass
+
+
+def _escribir_manifiesto(directorio, carpeta, contenido):
+    os.makedirs(os.path.join(directorio, carpeta))
+    with open(os.path.join(directorio, carpeta, 'manifest.json'), 'w', encoding='utf-8') as archivo:
+        archivo.write(contenido if isinstance(contenido, str) else json.dumps(contenido))
+
+
+def test_descubrimiento_por_manifiesto():
+    directorio = tempfile.mkdtemp()
+    _escribir_manifiesto(directorio, 'aseguradora_a', {
+        'nombre': 'ASEGURADORA A', 'codigo': 'A', 'pais': 'Ecuador', 'activa': True,
+        'plugin': 'aseguradoras.aseguradora_a.plugin'
+    })
+    _escribir_manifiesto(directorio, 'rota', '{no es json')
+    os.makedirs(os.path.join(directorio, 'sin_manifiesto'))
+
+    gestor = GestorAseguradoras(directorio=directorio)
+    assert [a['codigo'] for a in gestor.listar_aseguradoras()] == ['aseguradora_a']
+    assert 'rota' in gestor.errores
+    assert gestor.modulo_plugin('ASEGURADORA A') == 'aseguradoras.aseguradora_a.plugin'
+    assert gestor.modulo_plugin('OTRA') is None
+    assert gestor.aseguradoras_disponibles == {}  # listar no importa ningún paquete
+
+    # Caché: un manifiesto nuevo no se ve hasta recargar()
+    _escribir_manifiesto(directorio, 'aseguradora_b', {'nombre': 'ASEGURADORA B'})
+    assert len(gestor.listar_aseguradoras()) == 1
+    gestor.recargar()
+    assert [a['nombre'] for a in gestor.listar_aseguradoras()] == ['ASEGURADORA A', 'ASEGURADORA B']
+
+    # Un plugin que no se puede importar deja a la aseguradora con el genérico
+    registro = PluginRegistry(gestor=gestor)
+    assert registro.nombres() == ['ASEGURADORA A']
+    assert registro.clase_para('ASEGURADORA A') is GenericInsurerPlugin
+
+
+def test_plugin_se_importa_en_el_primer_uso():
+    # En un proceso aparte para que sys.modules no venga de otras pruebas
+    codigo = (
+        "import sys\n"
+        "from src.insurer_plugins import registro_aseguradoras\n"
+        "import aseguradoras\n"
+        "paquete = 'aseguradoras.pan_american_life_ecuador'\n"
+        "assert paquete not in sys.modules\n"
+        "assert registro_aseguradoras.nombres() == ['PAN AMERICAN LIFE DE ECUADOR']\n"
+        "assert paquete not in sys.modules\n"
+        "clase = registro_aseguradoras.clase_para('PAN AMERICAN LIFE DE ECUADOR')\n"
+        "assert clase.codigo == 'PALE_EC' and paquete + '.plugin' in sys.modules\n"
+        "registro_aseguradoras.recargar()\n"
+        "assert registro_aseguradoras.clase_para('PAN AMERICAN LIFE DE ECUADOR') is not clase\n"
+    )
+    entorno = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(__file__)))
+    for variable, valor in {
+        'SQL_SERVER_HOST': 'localhost', 'SQL_SERVER_DATABASE': 'prueba',
+        'RABBITMQ_HOST': 'localhost', 'RABBITMQ_PORT': '5672',
+        'RABBITMQ_USERNAME': 'prueba', 'RABBITMQ_PASSWORD': 'prueba',
+        'RABBITMQ_QUEUE': 'prueba', 'RABBITMQ_EXCHANGE': 'prueba',
+        'LOG_LEVEL': 'WARNING', 'SCRAPING_DELAY': '0', 'MAX_RETRIES': '1'
+    }.items():
+        entorno.setdefault(variable, valor)
+    resultado = subprocess.run([sys.executable, '-c', codigo], env=entorno, capture_output=True, text=True)
+    assert resultado.returncode == 0, resultado.stderr
+    assert resultado.stdout == ''  # importar aseguradoras ya no imprime el escaneo
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_despacho_por_nombre,
+        test_aseguradora_sin_plugin_usa_generico,
+        test_ttl_de_sesion,
+        test_limite_de_concurrencia,
+        test_descubrimiento_por_manifiesto,
+        test_plugin_se_importa_en_el_primer_uso
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el logging estructurado (JSON), la
+escritura en segundo plano con QueueListener y el muestreo de logs por fila
+"""
+
+import os
+import sys
+import json
+import logging
+import tempfile
+
+from src.logging_config import JsonFormatter, Muestreador, configurar_logging, detener_logging
+from src.metrics import contexto_metricas
+
+logger = logging.getLogger(__name__)
+
+
+def _restaurar_raiz(handlers, nivel):
+    raiz = logging.getLogger()
+    for handler in list(raiz.handlers):
+        raiz.removeHandler(handler)
+    for handler in handlers:
+        raiz.addHandler(handler)
+    raiz.setLevel(nivel)
+
+
+def test_formato_json_con_contexto():
+    registro = logging.LogRecord('worker', logging.WARNING, __file__, 1, '⚠️ fila %s', (7,), None)
+    registro.aseguradora = 'PAN AMERICAN LIFE DE ECUADOR'
+    documento = json.loads(JsonFormatter().format(registro))
+    assert documento['nivel'] == 'WARNING'
+    assert documento['mensaje'] == '⚠️ fila 7'
+    assert documento['aseguradora'] == 'PAN AMERICAN LIFE DE ECUADOR'
+    assert 'args' not in documento and 'msg' not in documento
+
+
+def test_listener_escribe_archivo_y_respeta_nivel():
+    raiz = logging.getLogger()
+    handlers, nivel = list(raiz.handlers), raiz.level
+    directorio = tempfile.mkdtemp()
+    archivo = os.path.join(directorio, 'worker.log')
+    try:
+        assert configurar_logging('warning', archivo=archivo, consola=False, forzar=True)
+        prueba = logging.getLogger('prueba.logging')
+        with contexto_metricas(aseguradora='PALE'):
+            prueba.info('no debe aparecer')
+            prueba.warning('búsqueda lenta')
+        detener_logging()  # vacía la cola antes de leer el archivo
+
+        with open(archivo, encoding='utf-8') as entrada:
+            lineas = [json.loads(linea) for linea in entrada if linea.strip()]
+        assert [linea['mensaje'] for linea in lineas] == ['búsqueda lenta']
+        assert lineas[0]['aseguradora'] == 'PALE'
+    finally:
+        detener_logging()
+        _restaurar_raiz(handlers, nivel)
+
+
+def test_no_reconfigura_si_ya_hay_handlers():
+    raiz = logging.getLogger()
+    handlers, nivel = list(raiz.handlers), raiz.level
+    existente = logging.NullHandler()
+    raiz.addHandler(existente)
+    try:
+        assert configurar_logging('DEBUG', consola=False) is None
+        assert existente in raiz.handlers
+    finally:
+        _restaurar_raiz(handlers, nivel)
+
+
+def test_muestreo_por_clave():
+    muestreo = Muestreador(cada=10)
+    permitidos = [muestreo.permitir('fila') for _ in range(25)]
+    assert sum(permitidos) == 3 and permitidos[0]
+    assert muestreo.permitir('otra_clave')
+    assert all(Muestreador(cada=0).permitir('x') for _ in range(3))
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    pruebas = [
+        test_formato_json_con_contexto,
+        test_listener_escribe_archivo_y_respeta_nivel,
+        test_no_reconfigura_si_ya_hay_handlers,
+        test_muestreo_por_clave
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el registro de tiempos por etapa
+(histogramas, cuantiles, etiquetas heredadas y contadores)
+"""
+
+import sys
+import logging
+
+from src.metrics import METRICA_ETAPAS, Histograma, MetricsRegistry, contexto_metricas
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def test_cuantiles_histograma():
+    histograma = Histograma(buckets=(1, 2, 4))
+    for valor in (0.5, 1.5, 1.5, 3, 10):
+        histograma.observar(valor)
+    assert histograma.total == 5
+    assert histograma.conteos == [1, 2, 1, 1]
+    assert 1 <= histograma.cuantil(0.5) <= 2
+    # Lo que cae en +Inf se reporta con el último límite
+    assert histograma.cuantil(0.99) == 4
+    assert Histograma().cuantil(0.5) is None
+
+
+def test_medir_registra_error():
+    registro = MetricsRegistry()
+    with registro.medir('login'):
+        pass
+    try:
+        with registro.medir('login'):
+            raise ValueError('portal caído')
+    except ValueError:
+        pass
+
+    series = registro.histogramas()[METRICA_ETAPAS]['series']
+    resultados = sorted(dict(clave)['resultado'] for clave in series)
+    assert resultados == ['error', 'ok']
+    assert registro.resumen_etapas()['login']['n'] == 2
+
+
+def test_contexto_y_terminar_idempotente():
+    registro = MetricsRegistry()
+    with contexto_metricas(aseguradora='PAN AMERICAN LIFE DE ECUADOR'):
+        medicion = registro.iniciar('busqueda')
+    duracion = medicion.terminar()
+    assert medicion.terminar('error') == duracion
+
+    series = registro.histogramas()[METRICA_ETAPAS]['series']
+    assert len(series) == 1
+    etiquetas = dict(next(iter(series)))
+    assert etiquetas == {'aseguradora': 'PAN AMERICAN LIFE DE ECUADOR', 'etapa': 'busqueda', 'resultado': 'ok'}
+    # Fuera del bloque se usa la etiqueta por defecto
+    registro.observar_etapa('ack', 0.001)
+    assert registro.valor_contador('inexistente') == 0
+    assert any(dict(clave).get('aseguradora') == 'ninguna' for clave in registro.histogramas()[METRICA_ETAPAS]['series'])
+
+
+def test_contadores():
+    registro = MetricsRegistry()
+    registro.incrementar('scraping_mensajes_total', resultado='ok')
+    registro.incrementar('scraping_mensajes_total', resultado='ok')
+    registro.incrementar('scraping_mensajes_total', resultado='error')
+    assert registro.valor_contador('scraping_mensajes_total') == 3
+    assert registro.valor_contador('scraping_mensajes_total', resultado='ok') == 2
+    registro.reiniciar()
+    assert registro.contadores() == {}
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_cuantiles_histograma,
+        test_medir_registra_error,
+        test_contexto_y_terminar_idempotente,
+        test_contadores
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
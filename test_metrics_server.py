@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el endpoint de métricas en formato
+Prometheus (histogramas, contadores, gauges y /salud)
+"""
+
+import sys
+import logging
+import urllib.error
+import urllib.request
+
+from src.metrics import MetricsRegistry
+from src.metrics_server import MetricsServer, formatear_prometheus, rss_proceso
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def test_formato_histograma_y_contador():
+    registro = MetricsRegistry()
+    registro.observar_etapa('login', 0.3, aseguradora='PAN AMERICAN LIFE DE ECUADOR')
+    registro.observar_etapa('login', 45, aseguradora='PAN AMERICAN LIFE DE ECUADOR')
+    registro.incrementar('scraping_mensajes_total', descripcion='Mensajes', resultado='ok')
+    texto = formatear_prometheus(registro)
+
+    assert '# TYPE scraping_etapa_duracion_segundos histogram' in texto
+    assert ('scraping_etapa_duracion_segundos_bucket{aseguradora="PAN AMERICAN LIFE DE ECUADOR",'
+            'etapa="login",resultado="ok",le="0.5"} 1') in texto
+    assert 'le="+Inf"} 2' in texto
+    assert 'scraping_etapa_duracion_segundos_count{aseguradora="PAN AMERICAN LIFE DE ECUADOR",etapa="login",resultado="ok"} 2' in texto
+    assert '# TYPE scraping_mensajes_total counter' in texto
+    assert 'scraping_mensajes_total{resultado="ok"} 1' in texto
+
+
+def test_gauges_omiten_valores_nulos_y_escapan_etiquetas():
+    gauges = [
+        ('scraping_cola_mensajes', 'Mensajes en cola', 7, {'cola': 'cola "principal"'}),
+        ('scraping_cache_url_ratio_aciertos', 'Aciertos', None, {})
+    ]
+    texto = formatear_prometheus(MetricsRegistry(), gauges)
+    assert 'scraping_cola_mensajes{cola="cola \\"principal\\""} 7' in texto
+    assert 'scraping_cache_url_ratio_aciertos' not in texto
+
+
+def test_endpoint_http():
+    registro = MetricsRegistry()
+    registro.incrementar('scraping_logins_total', resultado='ok')
+    servidor = MetricsServer(0, lambda: [('scraping_mensajes_en_curso', 'En curso', 1, {})],
+                             host='127.0.0.1', registro=registro)
+    assert servidor.iniciar()
+    try:
+        base = f"http://127.0.0.1:{servidor.puerto}"
+        with urllib.request.urlopen(f"{base}/metrics", timeout=5) as respuesta:
+            assert respuesta.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            texto = respuesta.read().decode('utf-8')
+        assert 'scraping_logins_total{resultado="ok"} 1' in texto
+        assert 'scraping_mensajes_en_curso 1' in texto
+        if rss_proceso():
+            assert 'process_resident_memory_bytes ' in texto
+
+        with urllib.request.urlopen(f"{base}/salud", timeout=5) as respuesta:
+            assert respuesta.read() == b'ok\n'
+        try:
+            urllib.request.urlopen(f"{base}/otra", timeout=5)
+            assert False, "se esperaba 404"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        servidor.detener()
+    assert not servidor.activo
+
+
+def test_recolector_con_error_no_rompe_el_scrape():
+    def recolector():
+        raise RuntimeError('estado inconsistente')
+
+    servidor = MetricsServer(0, recolector, registro=MetricsRegistry())
+    texto = servidor.generar()
+    assert 'scraping_' not in texto
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_formato_histograma_y_contador,
+        test_gauges_omiten_valores_nulos_y_escapan_etiquetas,
+        test_endpoint_http,
+        test_recolector_con_error_no_rompe_el_scrape
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el portal PALIG local de benchmarks:
+flujo OAuth2, sesión ASP.NET y tabla de resultados configurable
+"""
+
+import re
+import sys
+import logging
+
+import requests
+from lxml import html
+
+from benchmarks.portal_palig import PortalPalig, ID_IDENTIFICACION
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _login(portal, sesion):
+    """Recorre login -> authorization.ping -> Login.aspx y retorna la página de búsqueda"""
+    respuesta = sesion.get(portal.url_login)
+    accion = html.fromstring(respuesta.text).forms[0].action
+    respuesta = sesion.post(
+        f"{portal.url_base_auth}{accion}",
+        data={'pf.username': portal.usuario, 'pf.pass': portal.password}
+    )
+    assert 'authorization.ping' in respuesta.url
+    destino = re.search(r'url=([^"]+)"', respuesta.text).group(1).replace('&amp;', '&')
+    return sesion.get(destino)
+
+
+def test_flujo_completo_con_tabla():
+    with PortalPalig(filas=50, espera_ping=0, semilla=1) as portal:
+        portal.registrar_asegurado('0102158896', 'Maria Jose Perez Lopez', dependientes=['Luis Perez Vera'])
+        sesion = requests.Session()
+        respuesta = _login(portal, sesion)
+        assert respuesta.url == portal.url_busqueda
+        assert ID_IDENTIFICACION in respuesta.text
+
+        respuesta = sesion.post(portal.url_busqueda, data={ID_IDENTIFICACION: '0102158896'})
+        filas = html.fromstring(respuesta.text).cssselect('table.GridViewStylePV tr')
+        assert len(filas) == 51
+        nombres = [fila.cssselect('td')[3].text for fila in filas[1:]]
+        assert nombres[-2:] == ['MARIA JOSE PEREZ LOPEZ', 'LUIS PEREZ VERA']
+        assert portal.estadisticas()['logins'] == 1
+
+
+def test_busqueda_sin_sesion_redirige_al_login():
+    with PortalPalig(espera_ping=0) as portal:
+        respuesta = requests.get(portal.url_busqueda)
+        assert 'authorization.oauth2' in respuesta.url
+        assert 'id="username"' in respuesta.text
+
+
+def test_credenciales_incorrectas():
+    with PortalPalig() as portal:
+        sesion = requests.Session()
+        accion = html.fromstring(sesion.get(portal.url_login).text).forms[0].action
+        respuesta = sesion.post(f"{portal.url_base_auth}{accion}", data={'pf.username': 'x', 'pf.pass': 'y'})
+        assert 'class="error"' in respuesta.text
+
+
+def test_fallos_inyectados():
+    with PortalPalig(tasa_fallos=1.0) as portal:
+        assert requests.get(portal.url_login).status_code == 503
+        assert portal.estadisticas()['fallos_inyectados'] == 1
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_flujo_completo_con_tabla,
+        test_busqueda_sin_sesion_redirige_al_login,
+        test_credenciales_incorrectas,
+        test_fallos_inyectados
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
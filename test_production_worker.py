@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el worker de producción sin SQL Server ni
+RabbitMQ: parada ordenada ante SIGTERM, captura genérica de las aseguradoras
+sin login automático, reintento acotado del login y plazo agotado al leer la
+configuración, con una base de datos, un navegador, un canal y una conexión en
+memoria
+"""
+
+import os
+import sys
+import json
+import signal
+import logging
+from contextlib import contextmanager
+
+# Variables mínimas para poder importar src.config sin archivo .env
+for _variable, _valor in {
+    'SQL_SERVER_HOST': 'localhost', 'SQL_SERVER_DATABASE': 'pruebas',
+    'RABBITMQ_HOST': 'localhost', 'RABBITMQ_PORT': '5672',
+    'RABBITMQ_USERNAME': 'pruebas', 'RABBITMQ_PASSWORD': 'pruebas',
+    'RABBITMQ_QUEUE': 'pruebas', 'RABBITMQ_EXCHANGE': 'pruebas',
+    'LOG_LEVEL': 'WARNING', 'SCRAPING_DELAY': '0', 'MAX_RETRIES': '1'
+}.items():
+    os.environ.setdefault(_variable, _valor)
+
+import run_production_worker
+from run_production_worker import AseguradoraProcessor, ProductionWorker
+from src.deadline import PlazoAgotado
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class BaseDatosFalsa:
+    """Sustituto de DatabaseManager: responde con ``tablas`` (FROM tabla -> filas) y registra las escrituras"""
+
+    def __init__(self, tablas=None):
+        self.tablas = tablas or {}
+        self.escrituras = []
+        self.inserciones = []
+
+    def execute_query(self, query, params=None):
+        consulta = ' '.join(query.split())
+        if consulta.startswith(('INSERT', 'UPDATE')):
+            self.escrituras.append((consulta, params))
+            return []
+        return next((list(filas) for tabla, filas in self.tablas.items() if f'FROM {tabla} ' in consulta), [])
+
+    def create_table_if_not_exists(self, tabla, columnas):
+        return True
+
+    def insert_many(self, tabla, filas):
+        self.inserciones.append((tabla, list(filas)))
+        return True
+
+    def test_connection(self):
+        return True
+
+    def close(self):
+        pass
+
+
+class ElementoFalso:
+    pass
+
+
+class DriverFalso:
+    """Navegador en memoria: registra las páginas abiertas y responde al script de captura de campos"""
+
+    def __init__(self, valores):
+        self.valores = valores
+        self.paginas = []
+        self.title = 'Consulta de asegurados'
+
+    def get(self, url):
+        self.paginas.append(url)
+
+    def find_element(self, by, valor):
+        return ElementoFalso()
+
+    def execute_script(self, script, consulta):
+        return {'valores': [self.valores.get(selector) for selector, _ in consulta], 'listo': True}
+
+    def quit(self):
+        pass
+
+
+class DriverDesconectado(DriverFalso):
+    """Navegador cuya sesión se perdió: toda navegación falla como en Chrome"""
+
+    def get(self, url):
+        self.paginas.append(url)
+        raise RuntimeError('invalid session id')
+
+
+class MetodoFalso:
+    def __init__(self, delivery_tag):
+        self.delivery_tag = delivery_tag
+
+
+class ColaFalsa:
+    class method:
+        message_count = 0
+        consumer_count = 1
+
+
+class ConexionFalsa:
+    """Conexión pika en memoria: los callbacks thread-safe se atienden entre entregas"""
+
+    def __init__(self, eventos):
+        self.eventos = eventos
+        self.callbacks = []
+        self.is_open = True
+
+    @property
+    def is_closed(self):
+        return not self.is_open
+
+    def add_callback_threadsafe(self, callback):
+        self.callbacks.append(callback)
+
+    def call_later(self, segundos, callback):
+        pass
+
+    def close(self):
+        self.eventos.append('cierre_conexion')
+        self.is_open = False
+
+
+class CanalFalso:
+    """Canal que entrega ``mensajes`` de uno en uno como BlockingChannel.start_consuming"""
+
+    def __init__(self, conexion, eventos, mensajes):
+        self.conexion = conexion
+        self.eventos = eventos
+        self.mensajes = list(mensajes)
+        self.consumiendo = False
+        self.callback = None
+        self.is_open = True
+
+    @property
+    def is_closed(self):
+        return not self.is_open
+
+    def queue_declare(self, **kwargs):
+        return ColaFalsa()
+
+    def basic_qos(self, prefetch_count):
+        pass
+
+    def basic_consume(self, queue, on_message_callback, auto_ack):
+        self.callback = on_message_callback
+
+    def start_consuming(self):
+        self.consumiendo = True
+        etiqueta = 0
+        while self.consumiendo and self.mensajes:
+            etiqueta += 1
+            self.callback(self, MetodoFalso(etiqueta), None, self.mensajes.pop(0))
+            # Como pika, los callbacks pendientes se atienden al volver del mensaje
+            while self.conexion.callbacks:
+                self.conexion.callbacks.pop(0)()
+
+    def stop_consuming(self):
+        self.eventos.append('stop_consuming')
+        self.consumiendo = False
+
+    def basic_ack(self, delivery_tag):
+        self.eventos.append(('ack', delivery_tag))
+
+    def basic_nack(self, delivery_tag, requeue=True):
+        self.eventos.append(('nack', delivery_tag))
+
+    def close(self):
+        self.eventos.append('cierre_canal')
+        self.is_open = False
+
+
+def _mensaje(documento):
+    return json.dumps({'NombreCompleto': 'ASEGURADORA DE PRUEBA', 'NumDocIdentidad': documento}).encode('utf-8')
+
+
+@contextmanager
+def _procesador_del_worker(procesador):
+    """``ProductionWorker.startup`` crea este procesador y al salir se restauran las señales"""
+    clase = run_production_worker.AseguradoraProcessor
+    anteriores = {senal: signal.getsignal(senal) for senal in (signal.SIGINT, signal.SIGTERM)}
+    run_production_worker.AseguradoraProcessor = lambda: procesador
+    try:
+        yield
+    finally:
+        run_production_worker.AseguradoraProcessor = clase
+        for senal, manejador in anteriores.items():
+            signal.signal(senal, manejador)
+
+
+def test_sigterm_termina_el_mensaje_en_curso():
+    eventos = []
+    conexion = ConexionFalsa(eventos)
+    canal = CanalFalso(conexion, eventos, [_mensaje('0912345678'), _mensaje('0987654321')])
+    procesador = AseguradoraProcessor(db_manager=BaseDatosFalsa())
+
+    def conectar():
+        procesador.rabbitmq_connection = conexion
+        procesador.rabbitmq_channel = canal
+        return True
+
+    def procesar(message_data, vence_en=None):
+        os.kill(os.getpid(), signal.SIGTERM)  # llega a mitad del mensaje
+        eventos.append(('procesado', message_data['NumDocIdentidad']))
+        return True
+
+    procesador.connect_rabbitmq = conectar
+    procesador.process_aseguradora_message = procesar
+
+    with _procesador_del_worker(procesador):
+        worker = ProductionWorker()
+        try:
+            worker.startup()
+            raise AssertionError('el worker debía terminar con sys.exit')
+        except SystemExit as e:
+            assert e.code == 0
+
+    # El mensaje en curso termina y se confirma antes de cerrar; el siguiente no se entrega
+    assert eventos == [('procesado', '0912345678'), ('ack', 1), 'stop_consuming', 'cierre_canal', 'cierre_conexion']
+    assert procesador.mensajes_procesados == 1 and len(canal.mensajes) == 1
+    assert not worker.running
+
+
+def test_aseguradora_generica_guarda_los_campos_capturados():
+    base_datos = BaseDatosFalsa({
+        'urls_automatizacion': [{
+            'id': 7, 'nombre': 'ASEGURADORA GENERICA', 'url_login': 'https://generica.test/login',
+            'url_destino': 'https://generica.test/consulta', 'descripcion': None, 'fecha_creacion': None
+        }],
+        'informacion_capturada': [
+            {'NombreCampo': 'Plan', 'TipoCampo': 'text', 'SelectorCSS': '#plan', 'Orden': 1, 'Obligatorio': True},
+            {'NombreCampo': 'Estado', 'TipoCampo': 'text', 'SelectorCSS': '#estado', 'Orden': 2, 'Obligatorio': False}
+        ]
+    })
+    procesador = AseguradoraProcessor(db_manager=base_datos)
+    procesador.driver = DriverFalso({'#plan': ' Plan Oro ', '#estado': 'Activo'})
+    assert not procesador.plugin_para('ASEGURADORA GENERICA').requiere_login
+
+    mensaje = {'NombreCompleto': 'ASEGURADORA GENERICA', 'NumDocIdentidad': '0912345678'}
+    assert procesador.process_aseguradora_message(mensaje)
+
+    # Sin login: se abre la página de destino y la captura genérica termina en un solo INSERT
+    assert procesador.driver.paginas == ['https://generica.test/consulta']
+    assert base_datos.inserciones == [('valores_capturados', [
+        {'IdUrl': '7', 'NumDocIdentidad': '0912345678', 'NombreCampo': 'Plan', 'ValorCampo': 'Plan Oro'},
+        {'IdUrl': '7', 'NumDocIdentidad': '0912345678', 'NombreCampo': 'Estado', 'ValorCampo': 'Activo'}
+    ])]
+    procesador.cache_resultados.cerrar()
+
+
+def test_login_reintenta_una_sola_vez_tras_recrear_la_sesion():
+    procesador = AseguradoraProcessor(db_manager=BaseDatosFalsa())
+    procesador.driver = DriverDesconectado({})
+    recreaciones = []
+
+    def recrear():
+        # La sesión se recrea bien, pero el navegador nuevo vuelve a desconectarse
+        recreaciones.append(procesador.driver)
+        procesador.driver = DriverDesconectado({})
+        return True
+
+    procesador._recrear_sesion_navegador = recrear
+    url_info = {'id': '1', 'nombre': 'ASEGURADORA DE PRUEBA', 'url_login': 'https://portal.test/login'}
+
+    assert procesador.execute_login(url_info) is False
+    assert len(recreaciones) == 1
+    assert recreaciones[0].paginas == procesador.driver.paginas == ['https://portal.test/login']
+    procesador.cache_resultados.cerrar()
+
+
+def test_plazo_agotado_en_la_configuracion_se_propaga():
+    class BaseDatosLenta(BaseDatosFalsa):
+        def execute_query(self, query, params=None):
+            raise PlazoAgotado('bd')
+
+    procesador = AseguradoraProcessor(db_manager=BaseDatosLenta())
+    try:
+        procesador.get_url_by_aseguradora_name('ASEGURADORA DE PRUEBA')
+        raise AssertionError('el plazo agotado no debía convertirse en "sin configuración"')
+    except PlazoAgotado:
+        pass
+    assert 'ASEGURADORA DE PRUEBA' not in procesador.url_cache
+    procesador.cache_resultados.cerrar()
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_sigterm_termina_el_mensaje_en_curso,
+        test_aseguradora_generica_guarda_los_campos_capturados,
+        test_login_reintenta_una_sola_vez_tras_recrear_la_sesion,
+        test_plazo_agotado_en_la_configuracion_se_propaga
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el perfilado opcional de mensajes
+(activación por contador o cabecera, volcados rotativos y resumen)
+"""
+
+import io
+import os
+import sys
+import time
+import logging
+import tempfile
+import contextlib
+
+from src.profiling import ProfilerMensajes, main, resumir_muestreo
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _trabajo_lento(segundos=0.15):
+    fin = time.perf_counter() + segundos
+    total = 0
+    while time.perf_counter() < fin:
+        total += sum(range(200))
+    return total
+
+
+def test_activacion_por_contador_y_cabecera():
+    profiler = ProfilerMensajes(modo='cprofile', mensajes=2, directorio=tempfile.mkdtemp())
+    assert [profiler.modo_para({}) for _ in range(3)] == ['cprofile', 'cprofile', None]
+    assert profiler.modo_para({'x-profile': b'muestreo'}) == 'muestreo'
+    assert profiler.modo_para({'x-profile': 'true'}) == 'cprofile'
+    assert profiler.modo_para({'x-profile': 'no'}) is None
+    assert profiler.modo_para(None) is None
+
+
+def test_volcado_cprofile_con_rotacion():
+    directorio = tempfile.mkdtemp()
+    profiler = ProfilerMensajes(directorio=directorio, max_archivos=2)
+    rutas = []
+    for numero in range(3):
+        with profiler.perfilar(f"msg-{numero}", 'PAN AMERICAN LIFE DE ECUADOR', 'cprofile') as ruta:
+            _trabajo_lento(0.01)
+        rutas.append(ruta)
+        time.sleep(0.01)
+
+    restantes = sorted(os.listdir(directorio))
+    assert len(restantes) == 2
+    assert not os.path.exists(rutas[0])
+    assert all('PAN_AMERICAN_LIFE_DE_ECUADOR_msg' in nombre and nombre.endswith('.prof') for nombre in restantes)
+
+    with profiler.perfilar('msg-x', 'PALE', None) as ruta:
+        assert ruta is None
+
+
+def test_muestreo_y_resumen():
+    directorio = tempfile.mkdtemp()
+    profiler = ProfilerMensajes(directorio=directorio, intervalo_ms=2)
+    with profiler.perfilar('msg-1', 'PALE', 'muestreo') as ruta:
+        _trabajo_lento()
+    total, filas = resumir_muestreo([ruta])
+    assert total > 0
+    assert any('_trabajo_lento' in marco for marco, _, _ in filas)
+
+
+def test_cli_resumen():
+    directorio = tempfile.mkdtemp()
+    profiler = ProfilerMensajes(directorio=directorio, intervalo_ms=2)
+    with profiler.perfilar('msg-1', 'PALE', 'cprofile'):
+        _trabajo_lento(0.02)
+    with profiler.perfilar('msg-2', 'OTRA', 'muestreo'):
+        _trabajo_lento()
+
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        assert main(['resumen', directorio, '--top', '5']) == 0
+    texto = salida.getvalue()
+    assert 'cProfile: 1 volcados' in texto and 'Muestreo de pila: 1 volcados' in texto
+
+    salida = io.StringIO()
+    with contextlib.redirect_stdout(salida):
+        main(['resumen', directorio, '--aseguradora', 'OTRA'])
+    assert 'cProfile' not in salida.getvalue()
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_activacion_por_contador_y_cabecera,
+        test_volcado_cprofile_con_rotacion,
+        test_muestreo_y_resumen,
+        test_cli_resumen
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
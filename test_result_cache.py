@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el caché de resultados por aseguradora y
+NumDocIdentidad (LRU en memoria, caducidad por TTL, coincidencia de nombre,
+dependientes desde la búsqueda del mismo documento, nivel SQLite compartido entre
+instancias, resultados negativos con TTL corto y reserva de búsquedas en curso)
+"""
+
+import os
+import sys
+import time
+import logging
+import tempfile
+import threading
+
+from src.result_cache import INACTIVO, NO_ENCONTRADO, ResultCache
+from reloj_falso import RelojFalso
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+ASEGURADORA = 'PAN AMERICAN LIFE DE ECUADOR'
+
+
+def _fila(nombre='JUAN PEREZ', poliza='P-1', dependiente='0', status='ACTIVO'):
+    return {'Nombre del Paciente': nombre, 'Póliza': poliza, 'No. Dependiente': dependiente, 'Status': status}
+
+
+FAMILIA = [
+    _fila('JUAN PEREZ'),
+    _fila('ANA LOPEZ', dependiente='1'),
+    _fila('LUIS PEREZ LOPEZ', dependiente='2')
+]
+
+
+def test_acierto_y_caducidad():
+    reloj = RelojFalso()
+    cache = ResultCache(ttl_segundos=60, reloj=reloj)
+    assert cache.obtener(ASEGURADORA, '0912345678', 'JUAN PEREZ') is None
+    cache.guardar(ASEGURADORA, '0912345678', FAMILIA)
+    assert cache.obtener(ASEGURADORA, ' 0912345678 ', 'JUAN PEREZ')[0]['Póliza'] == 'P-1'
+    assert cache.obtener(ASEGURADORA.lower(), '0912345678', 'JUAN PEREZ')
+
+    reloj.ahora += 61
+    assert cache.obtener(ASEGURADORA, '0912345678', 'JUAN PEREZ') is None
+    assert len(cache) == 0
+
+
+def test_nombre_debe_coincidir():
+    cache = ResultCache(ttl_segundos=60)
+    cache.guardar(ASEGURADORA, '0912345678', [_fila('José Pérez')])
+    assert cache.obtener(ASEGURADORA, '0912345678', ' JOSÉ  PÉREZ')  # mismo criterio que la tabla
+    assert cache.obtener(ASEGURADORA, '0912345678', 'MARIA PEREZ') == []  # documento buscado, paciente ausente
+    assert cache.obtener('OTRA ASEGURADORA', '0912345678', 'JOSÉ PÉREZ') is None
+    assert cache.obtener(ASEGURADORA, '0912345678', None) is None
+
+
+def test_dependientes_desde_la_busqueda_del_mismo_documento():
+    cache = ResultCache(ttl_segundos=60)
+    cache.guardar(ASEGURADORA, '0912345678', FAMILIA)
+    # Los mensajes de la familia con el documento buscado se responden por nombre
+    assert cache.obtener(ASEGURADORA, '0912345678', 'ana lopez')[0]['No. Dependiente'] == '1'
+    assert cache.obtener(ASEGURADORA, '0912345678', 'LUIS PEREZ LOPEZ')[0]['No. Dependiente'] == '2'
+
+    # Con otro documento no se sirve por nombre: podría ser un homónimo de otra familia
+    assert cache.obtener(ASEGURADORA, '1700000002', 'LUIS PEREZ LOPEZ') is None
+    cache.guardar(ASEGURADORA, '0987654321', [_fila('JUAN PEREZ', poliza='P-9')])
+    assert cache.obtener(ASEGURADORA, '0987654321', 'JUAN PEREZ')[0]['Póliza'] == 'P-9'
+    assert cache.obtener(ASEGURADORA, '0912345678', 'JUAN PEREZ')[0]['Póliza'] == 'P-1'
+
+    cache.invalidar(ASEGURADORA, '0912345678')
+    assert cache.obtener(ASEGURADORA, '0912345678', 'LUIS PEREZ LOPEZ') is None
+
+
+def test_lru_acotado():
+    cache = ResultCache(ttl_segundos=60, max_entradas=2)
+    cache.guardar(ASEGURADORA, '1', [_fila('A', poliza='P-1')])
+    cache.guardar(ASEGURADORA, '2', [_fila('B', poliza='P-2')])
+    assert cache.obtener(ASEGURADORA, '1', 'A')  # '1' pasa a ser el más reciente
+    cache.guardar(ASEGURADORA, '3', [_fila('C', poliza='P-3')])
+    assert len(cache) == 2
+    assert cache.obtener(ASEGURADORA, '2', 'B') is None
+    assert cache.obtener(ASEGURADORA, '1', 'A') and cache.obtener(ASEGURADORA, '3', 'C')
+
+
+def test_nivel_sqlite_entre_instancias():
+    ruta = os.path.join(tempfile.mkdtemp(), 'resultados.sqlite')
+    reloj = RelojFalso()
+    primero = ResultCache(ttl_segundos=60, ruta_sqlite=ruta, reloj=reloj)
+    primero.guardar(ASEGURADORA, '0912345678', FAMILIA)
+    primero.cerrar()
+
+    segundo = ResultCache(ttl_segundos=60, ruta_sqlite=ruta, reloj=reloj)
+    assert len(segundo) == 0
+    assert segundo.obtener(ASEGURADORA, '0912345678', 'LUIS PEREZ LOPEZ')[0]['No. Dependiente'] == '2'
+    assert segundo.obtener(ASEGURADORA, '1700000002', 'LUIS PEREZ LOPEZ') is None
+    assert len(segundo) == 1  # el acierto en SQLite sube a memoria
+
+    segundo.invalidar(ASEGURADORA, '0912345678')
+    assert segundo.obtener(ASEGURADORA, '0912345678', 'JUAN PEREZ') is None
+    segundo.guardar(ASEGURADORA, '0999999999', [_fila()])
+    reloj.ahora += 61
+    assert segundo.obtener(ASEGURADORA, '0999999999', 'JUAN PEREZ') is None
+    segundo.cerrar()
+
+
+def test_ttl_cero_desactiva():
+    cache = ResultCache(ttl_segundos=0)
+    assert not cache.activo
+    cache.guardar(ASEGURADORA, '0912345678', FAMILIA)
+    assert cache.obtener(ASEGURADORA, '0912345678', 'JUAN PEREZ') is None
+    assert len(cache) == 0
+
+
+def test_negativos_con_ttl_corto():
+    reloj = RelojFalso()
+    cache = ResultCache(ttl_segundos=3600, ttl_negativo_segundos=60, reloj=reloj)
+    assert cache.obtener_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ') is None
+    cache.guardar_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ', INACTIVO)
+    assert cache.obtener_negativo(ASEGURADORA, '0912345678', ' juan  perez') == INACTIVO
+    assert cache.obtener_negativo(ASEGURADORA, '0912345678', 'ANA LOPEZ') is None  # otro paciente del documento
+
+    reloj.ahora += 61
+    assert cache.obtener_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ') is None
+
+    cache.guardar_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ', NO_ENCONTRADO)
+    cache.descartar_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ')
+    assert cache.obtener_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ') is None
+
+    cache.guardar_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ', NO_ENCONTRADO)
+    cache.invalidar(ASEGURADORA, '0912345678')
+    assert cache.obtener_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ') is None
+
+    try:
+        cache.guardar_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ', 'otro')
+        assert False, "un motivo desconocido debe rechazarse"
+    except ValueError:
+        pass
+
+    apagado = ResultCache(ttl_negativo_segundos=0)
+    apagado.guardar_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ', INACTIVO)
+    assert apagado.obtener_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ') is None
+
+
+def test_negativos_en_sqlite():
+    ruta = os.path.join(tempfile.mkdtemp(), 'resultados.sqlite')
+    primero = ResultCache(ruta_sqlite=ruta)
+    primero.guardar_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ', NO_ENCONTRADO)
+    primero.cerrar()
+    segundo = ResultCache(ruta_sqlite=ruta)
+    assert segundo.obtener_negativo(ASEGURADORA, '0912345678', 'JUAN PEREZ') == NO_ENCONTRADO
+    segundo.cerrar()
+
+
+def test_reserva_de_busquedas_en_curso_entre_instancias():
+    ruta = os.path.join(tempfile.mkdtemp(), 'resultados.sqlite')
+    reloj = RelojFalso()
+    # Dos workers (procesos) que comparten el SQLite
+    primero = ResultCache(ttl_segundos=60, ruta_sqlite=ruta, reloj=reloj)
+    segundo = ResultCache(ttl_segundos=60, ruta_sqlite=ruta, reloj=reloj)
+    assert primero.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+    assert primero.reservar_busqueda(ASEGURADORA, '0912345678', 30)  # renovar la propia
+    assert not segundo.reservar_busqueda(ASEGURADORA.lower(), ' 0912345678', 30)
+    assert segundo.reservar_busqueda(ASEGURADORA, '0999999999', 30)
+    assert segundo.busquedas_en_curso() == 2
+
+    # Al terminar, el primero guarda las filas y libera: el segundo las encuentra en el caché
+    segundo.liberar_busqueda(ASEGURADORA, '0912345678')  # no es suya: no libera nada
+    assert not segundo.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+    primero.guardar(ASEGURADORA, '0912345678', FAMILIA)
+    primero.liberar_busqueda(ASEGURADORA, '0912345678')
+    assert segundo.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+    assert segundo.obtener(ASEGURADORA, '0912345678', 'ANA LOPEZ')[0]['No. Dependiente'] == '1'
+
+    # La reserva de un worker caído caduca sola
+    assert not primero.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+    reloj.ahora += 31
+    assert primero.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+    primero.cerrar()
+    segundo.cerrar()
+
+
+def test_reserva_sin_sqlite_y_sin_cache():
+    cache = ResultCache(ttl_segundos=60)
+    assert cache.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+    otro_hilo = []
+    hilo = threading.Thread(target=lambda: otro_hilo.append(cache.reservar_busqueda(ASEGURADORA, '0912345678', 30)))
+    hilo.start()
+    hilo.join()
+    assert otro_hilo == [False]
+    cache.liberar_busqueda(ASEGURADORA, '0912345678')
+    assert cache.busquedas_en_curso() == 0
+
+    # Sin caché no hay resultado que compartir: nunca se espera
+    desactivado = ResultCache(ttl_segundos=0)
+    assert desactivado.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+    assert desactivado.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+
+
+def test_espera_de_busqueda_despierta_al_liberar():
+    cache = ResultCache(ttl_segundos=60)
+    esperas = []
+
+    def esperar_en_otro_hilo():
+        inicio = time.monotonic()
+        esperas.append((cache.esperar_busqueda(ASEGURADORA, '0912345678', 5), time.monotonic() - inicio))
+
+    assert cache.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+    hilo = threading.Thread(target=esperar_en_otro_hilo)
+    hilo.start()
+    time.sleep(0.05)
+    cache.liberar_busqueda(ASEGURADORA, '0912345678')
+    hilo.join(5)
+    listo, segundos = esperas[0]
+    assert listo and segundos < 1  # sin esperar el sondeo completo
+
+    # La reserva de otro proceso (SQLite) se vuelve a mirar al vencer la espera
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'resultados.sqlite')
+        otro_proceso, cache = ResultCache(ttl_segundos=60, ruta_sqlite=ruta), ResultCache(ttl_segundos=60, ruta_sqlite=ruta)
+        assert otro_proceso.reservar_busqueda(ASEGURADORA, '0912345678', 30)
+        assert not cache.esperar_busqueda(ASEGURADORA, '0912345678', 0.05)
+        otro_proceso.liberar_busqueda(ASEGURADORA, '0912345678')
+        assert cache.esperar_busqueda(ASEGURADORA, '0912345678', 0.05)
+        otro_proceso.cerrar()
+        cache.cerrar()
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_acierto_y_caducidad,
+        test_nombre_debe_coincidir,
+        test_dependientes_desde_la_busqueda_del_mismo_documento,
+        test_lru_acotado,
+        test_nivel_sqlite_entre_instancias,
+        test_ttl_cero_desactiva,
+        test_negativos_con_ttl_corto,
+        test_negativos_en_sqlite,
+        test_reserva_de_busquedas_en_curso_entre_instancias,
+        test_reserva_sin_sqlite_y_sin_cache,
+        test_espera_de_busqueda_despierta_al_liberar
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
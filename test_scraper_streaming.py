@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar la descarga en streaming de scrape_with_requests
+(límite de bytes, aborto por Content-Type y parseo incremental con lxml) y el
+cierre por inactividad del driver de Selenium
+"""
+
+import os
+import sys
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Variables mínimas para poder importar src.config sin archivo .env
+for variable, valor in {
+    'SQL_SERVER_HOST': 'localhost', 'SQL_SERVER_DATABASE': 'pruebas',
+    'RABBITMQ_HOST': 'localhost', 'RABBITMQ_PORT': '5672',
+    'RABBITMQ_USERNAME': 'admin', 'RABBITMQ_PASSWORD': 'admin123',
+    'RABBITMQ_QUEUE': 'pruebas', 'RABBITMQ_EXCHANGE': 'pruebas',
+    'LOG_LEVEL': 'INFO', 'SCRAPING_DELAY': '0', 'MAX_RETRIES': '1'
+}.items():
+    os.environ.setdefault(variable, valor)
+
+from src.config import Config
+from src.scraper import WebScraper
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PAGINA_HTML = (
+    '<html><head><title> Póliza de prueba </title></head>'
+    '<body><h1 class="titulo"> Cliente <b>ACTIVO</b> </h1>'
+    '<a href="/uno">1</a><a href="/dos">2</a></body></html>'
+).encode('iso-8859-1')
+
+
+class ManejadorPruebas(BaseHTTPRequestHandler):
+    """Servidor local con respuestas HTML, binarias y de gran tamaño"""
+
+    def do_GET(self):
+        if self.path == '/grande':
+            tipo, cuerpo = 'text/html', b'<html><body>' + b'x' * (Config.SCRAPING_MAX_BYTES + 1024)
+        elif self.path == '/pdf':
+            tipo, cuerpo = 'application/pdf', b'%PDF-1.4'
+        else:
+            tipo, cuerpo = 'text/html; charset=iso-8859-1', PAGINA_HTML
+
+        self.send_response(200)
+        self.send_header('Content-Type', tipo)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, *args):
+        pass
+
+
+def _iniciar_servidor():
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), ManejadorPruebas)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_port}"
+
+
+def _crear_scraper():
+    # Selenium se crea bajo demanda, por lo que el constructor no abre navegador
+    return WebScraper()
+
+
+def test_scraping_html_con_selectores():
+    servidor, base = _iniciar_servidor()
+    try:
+        resultado = _crear_scraper().scrape_with_requests(base + '/', {'titulo': 'h1.titulo'})
+        logger.info(f"📄 Resultado: {resultado}")
+        assert resultado['title'] == 'Póliza de prueba'
+        assert resultado['titulo'] == 'ClienteACTIVO'
+        assert resultado['bytes_descargados'] == len(PAGINA_HTML)
+    finally:
+        servidor.shutdown()
+
+
+def test_scraping_enlaces_sin_selectores():
+    servidor, base = _iniciar_servidor()
+    try:
+        resultado = _crear_scraper().scrape_with_requests(base + '/')
+        assert resultado['links'] == ['/uno', '/dos']
+    finally:
+        servidor.shutdown()
+
+
+def test_aborto_por_tipo_de_contenido():
+    servidor, base = _iniciar_servidor()
+    try:
+        resultado = _crear_scraper().scrape_with_requests(base + '/pdf')
+        logger.info(f"📄 Resultado: {resultado}")
+        assert 'error' in resultado
+        assert 'application/pdf' in resultado['error']
+    finally:
+        servidor.shutdown()
+
+
+def test_limite_de_bytes():
+    servidor, base = _iniciar_servidor()
+    try:
+        resultado = _crear_scraper().scrape_with_requests(base + '/grande')
+        logger.info(f"📄 Resultado: {resultado}")
+        assert 'error' in resultado
+        assert str(Config.SCRAPING_MAX_BYTES) in resultado['error']
+    finally:
+        servidor.shutdown()
+
+
+class DriverFalso:
+    def __init__(self):
+        self.cerrado = False
+
+    def quit(self):
+        self.cerrado = True
+
+
+def test_cierre_inactivo_no_cierra_un_driver_entregado():
+    scraper = _crear_scraper()
+    driver = scraper.driver = DriverFalso()
+    timeout_anterior = Config.SELENIUM_IDLE_TIMEOUT
+    Config.SELENIUM_IDLE_TIMEOUT = 60
+    try:
+        scraper._liberar_driver(driver)
+        temporizador = scraper._temporizador_inactividad
+        # El temporizador ya disparó y espera el lock mientras el driver se vuelve a entregar
+        assert scraper._obtener_driver() is driver
+        temporizador.function(*temporizador.args)
+        assert not driver.cerrado and scraper.driver is driver
+
+        # Sin nuevas entregas, el cierre programado sí cierra el driver
+        scraper._liberar_driver(driver)
+        temporizador = scraper._temporizador_inactividad
+        scraper._cancelar_cierre_inactivo()
+        temporizador.function(*temporizador.args)
+        assert driver.cerrado and scraper.driver is None
+    finally:
+        Config.SELENIUM_IDLE_TIMEOUT = timeout_anterior
+        scraper.close()
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_scraping_html_con_selectores,
+        test_scraping_enlaces_sin_selectores,
+        test_aborto_por_tipo_de_contenido,
+        test_limite_de_bytes,
+        test_cierre_inactivo_no_cierra_un_driver_entregado
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
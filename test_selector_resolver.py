@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar la resolución de selectores alternativos
+(sondeo conjunto, memoria del último que funcionó, descarte de inválidos y
+alternativos solo con la página cargada)
+"""
+
+import sys
+import logging
+
+from selenium.common.exceptions import TimeoutException
+
+from src.selector_resolver import SelectorResolver, interpretar
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class DriverFalso:
+    """Emula el script de sondeo: ``elementos`` por css, ``textos`` de cada elemento y ``cargada``"""
+
+    def __init__(self, elementos, textos=None, invalidos=(), cargada=True):
+        self.elementos = elementos
+        self.textos = textos or {}
+        self.invalidos = set(invalidos)
+        self.cargada = cargada
+        self.sondeos = []
+
+    def execute_script(self, script, candidatos, visible):
+        self.sondeos.append([css for css, _, _ in candidatos])
+        invalidos = []
+        for i, (css, texto, alternativo) in enumerate(candidatos):
+            if alternativo and not self.cargada:
+                break
+            if css in self.invalidos:
+                invalidos.append(i)
+                continue
+            for elemento in self.elementos.get(css, []):
+                if texto and texto not in self.textos.get(elemento, ''):
+                    continue
+                return [i, elemento, invalidos]
+        return [-1, None, invalidos]
+
+
+def test_contains_se_traduce_a_filtro_por_texto():
+    assert interpretar('button:contains("Buscar")')[1:3] == ('button', 'Buscar')
+    assert interpretar(":contains('Consultar')")[1:3] == ('*', 'Consultar')
+    assert interpretar('.btn-primary')[1:3] == ('.btn-primary', '')
+    assert interpretar('  ') is None
+
+    driver = DriverFalso({'button': ['cancelar', 'consultar']},
+                         textos={'cancelar': 'Cancelar', 'consultar': 'Consultar póliza'})
+    resolutor = SelectorResolver('PALIG')
+    assert resolutor.resolver(driver, 'boton', ['button:contains("Consultar")'], timeout=1) == 'consultar'
+
+
+def test_todos_los_candidatos_en_un_sondeo_y_memoria():
+    resolutor = SelectorResolver('PALIG')
+    driver = DriverFalso({'.btn-buscar': ['boton']})
+    selectores = ['#btnBuscar', 'button[type="submit"]', '.btn-buscar', '#btnBuscar']
+    assert resolutor.resolver(driver, 'boton', selectores, timeout=1) == 'boton'
+    # Un solo execute_script con los candidatos sin repetir
+    assert driver.sondeos == [['#btnBuscar', 'button[type="submit"]', '.btn-buscar']]
+    assert resolutor.ultimo('boton') == '.btn-buscar'
+
+    # La próxima vez el que funcionó va primero
+    driver.sondeos = []
+    resolutor.resolver(driver, 'boton', selectores, timeout=1)
+    assert driver.sondeos[0][0] == '.btn-buscar'
+
+
+def test_selector_invalido_se_descarta():
+    resolutor = SelectorResolver('PALIG', intervalo=0)
+    driver = DriverFalso({'.ok': ['boton']}, invalidos=['button:has(>span'])
+    assert resolutor.resolver(driver, 'boton', ['button:has(>span', '.ok'], timeout=1) == 'boton'
+    driver.sondeos = []
+    resolutor.resolver(driver, 'boton', ['button:has(>span', '.ok'], timeout=1)
+    assert driver.sondeos == [['.ok']]
+
+
+def test_alternativos_solo_con_la_pagina_cargada():
+    resolutor = SelectorResolver('PALIG', intervalo=0)
+    driver = DriverFalso({'.btn-primary': ['otro']}, cargada=False)
+    original = driver.execute_script
+
+    def renderizar(*args):
+        # El botón configurado aparece en el segundo sondeo, con la página aún cargando
+        if len(driver.sondeos) == 1:
+            driver.elementos['#btnBuscar'] = ['configurado']
+        return original(*args)
+
+    driver.execute_script = renderizar
+    assert resolutor.resolver(driver, 'boton', ['#btnBuscar'], timeout=1,
+                              alternativos=['.btn-primary']) == 'configurado'
+    assert len(driver.sondeos) == 2
+
+    # Con la página cargada y sin el configurado se acepta el alternativo...
+    driver = DriverFalso({'.btn-primary': ['otro']})
+    assert resolutor.resolver(driver, 'boton', ['#btnBuscar'], timeout=1, alternativos=['.btn-primary']) == 'otro'
+    assert resolutor.ultimo('boton') == '.btn-primary'
+
+    # ...pero recordarlo no lo adelanta al configurado
+    driver.elementos['#btnBuscar'] = ['configurado']
+    driver.sondeos = []
+    assert resolutor.resolver(driver, 'boton', ['#btnBuscar'], timeout=1,
+                              alternativos=['.btn-primary']) == 'configurado'
+    assert driver.sondeos == [['#btnBuscar', '.btn-primary']]
+
+
+def test_timeout_si_ninguno_aparece():
+    reloj = [0.0]
+    resolutor = SelectorResolver('PALIG', intervalo=0, reloj=lambda: reloj[0])
+    driver = DriverFalso({})
+    original = driver.execute_script
+
+    def avanzar(*args):
+        reloj[0] += 1
+        return original(*args)
+
+    driver.execute_script = avanzar
+    try:
+        resolutor.resolver(driver, 'boton', ['#a', '#b'], timeout=3)
+        raise AssertionError('debía lanzar TimeoutException')
+    except TimeoutException:
+        pass
+    assert len(driver.sondeos) == 3
+    assert resolutor.ultimo('boton') is None
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_contains_se_traduce_a_filtro_por_texto,
+        test_todos_los_candidatos_en_un_sondeo_y_memoria,
+        test_selector_invalido_se_descarta,
+        test_alternativos_solo_con_la_pagina_cargada,
+        test_timeout_si_ninguno_aparece
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
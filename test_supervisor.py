@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar el supervisor de procesos worker (arranque
+escalonado, reinicio de workers caídos y parada coordinada)
+"""
+
+import sys
+import time
+import signal
+import logging
+import threading
+
+from src.autoscaler import QueueAutoscaler
+from src.supervisor import WorkerSupervisor
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _caer(indice, puerto_metricas, estadisticas):
+    sys.exit(3)
+
+
+def _trabajar(indice, puerto_metricas, estadisticas):
+    # Como ProductionWorker: SIGTERM termina el mensaje en curso y sale limpio
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    while True:
+        # Un mensaje de 10 s de servicio cada 50 ms, sumado en el Array del supervisor
+        with estadisticas.get_lock():
+            estadisticas[2 * indice] += 1
+            estadisticas[2 * indice + 1] += 10
+        time.sleep(0.05)
+
+
+def _esperar(condicion, timeout=20):
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if condicion():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def _en_hilo(supervisor):
+    hilo = threading.Thread(target=supervisor.ejecutar, daemon=True)
+    hilo.start()
+    return hilo
+
+
+def test_puertos_de_metricas():
+    supervisor = WorkerSupervisor(3, _trabajar, puerto_metricas_base=9108)
+    assert [supervisor.puerto_metricas(i) for i in range(3)] == [9108, 9109, 9110]
+    assert WorkerSupervisor(2, _trabajar).puerto_metricas(1) == 0
+    try:
+        WorkerSupervisor(0, _trabajar)
+        raise AssertionError('procesos=0 debía rechazarse')
+    except ValueError:
+        pass
+
+
+def test_arranque_escalonado_y_parada_coordinada():
+    supervisor = WorkerSupervisor(2, _trabajar, escalonado_segundos=1.5, gracia_segundos=10, intervalo=0.05)
+    hilo = _en_hilo(supervisor)
+    assert _esperar(lambda: supervisor.vivos() == 1)
+    # El segundo worker todavía espera su turno
+    assert supervisor.vivos() == 1
+    assert _esperar(lambda: supervisor.vivos() == 2)
+    time.sleep(1)  # el hijo recién creado (spawn) instala su manejador de SIGTERM
+
+    hijos = list(supervisor._hijos.values())
+    supervisor.detener()
+    hilo.join(15)
+    assert not hilo.is_alive()
+    assert all(hijo.exitcode == 0 for hijo in hijos)
+    assert supervisor.reinicios == 0
+
+
+def test_reinicia_workers_caidos():
+    supervisor = WorkerSupervisor(1, _caer, escalonado_segundos=0, espera_maxima_reinicio=0.1, intervalo=0.05)
+    hilo = _en_hilo(supervisor)
+    assert _esperar(lambda: supervisor.reinicios >= 3)
+    supervisor.detener()
+    hilo.join(15)
+    assert not hilo.is_alive()
+
+
+def test_autoescalado_sube_hasta_el_maximo_y_escalar_baja():
+    supervisor = WorkerSupervisor(1, _trabajar, escalonado_segundos=0.1, intervalo=0.05,
+                                  autoescalado=QueueAutoscaler(minimo=1, maximo=3, enfriamiento_segundos=60),
+                                  leer_cola=lambda: 100, intervalo_autoescalado=0.3)
+    assert supervisor.capacidad == 3
+    hilo = _en_hilo(supervisor)
+    assert _esperar(lambda: supervisor.vivos() == 3)
+    assert supervisor.procesos == 3
+
+    # Sin autoescalado que lo vuelva a subir, escalar retira a los sobrantes
+    supervisor.autoescalado = None
+    supervisor.escalar(1)
+    assert _esperar(lambda: supervisor.vivos() == 1 and not supervisor._retirados)
+    supervisor.detener()
+    hilo.join(15)
+    assert not hilo.is_alive()
+    assert supervisor.reinicios == 0
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_puertos_de_metricas,
+        test_arranque_escalonado_y_parada_coordinada,
+        test_reinicia_workers_caidos,
+        test_autoescalado_sube_hasta_el_maximo_y_escalar_baja
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Script de prueba para verificar la extracción de la tabla GridViewStylePV
+(estrategias lxml y js) y la búsqueda de cliente con nombres con tildes y
+espacios sobrantes
+"""
+
+import sys
+import logging
+
+from benchmarks.micro_tabla import CLIENTE_BUSCADO, generar_html_tabla
+from src.tabla_resultados import buscar_fila_por_nombre, extraer_tabla, extraer_tabla_html, normalizar_nombre
+
+# Configurar logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class DriverSimulado:
+    """Driver falso: page_source fijo y execute_script con celdas ya calculadas"""
+
+    def __init__(self, html, celdas=None):
+        self.page_source = html
+        self.celdas = celdas
+
+    def execute_script(self, script, *args):
+        return self.celdas
+
+
+def test_extraccion_lxml():
+    tabla = extraer_tabla_html(generar_html_tabla(50))
+    assert tabla.total_filas == 51
+    assert tabla.encabezados[3] == 'Nombre del Paciente'
+    assert len(tabla.filas) == 50
+    assert tabla.filas[-1]['Nombre del Paciente'] == 'MARÍA JOSÉ NÚÑEZ DE LA TORRE'
+    assert tabla.filas[-1]['Status'] == 'Activo'
+
+
+def test_tabla_inexistente():
+    assert extraer_tabla_html('<html><body><table class="otra"></table></body></html>') is None
+    assert extraer_tabla(DriverSimulado('', celdas=None), 'js') is None
+
+
+def test_estrategia_js_equivale_a_lxml():
+    celdas = [
+        [('TH', 'Póliza'), ('TH', ' Nombre del Paciente '), ('TH', 'Status')],
+        [('TD', '123'), ('TD', ' MARÍA\n JOSÉ '), ('TD', 'Activo')],
+        [('TH', 'fila sin td')]
+    ]
+    html = ('<table class="GridViewStylePV"><tr><th>Póliza</th><th> Nombre del Paciente </th><th>Status</th></tr>'
+            '<tr><td>123</td><td> MARÍA\n JOSÉ </td><td>Activo</td></tr><tr><th>fila sin td</th></tr></table>')
+    por_js = extraer_tabla(DriverSimulado(html, celdas), 'js')
+    por_lxml = extraer_tabla(DriverSimulado(html), 'lxml')
+    assert por_js.encabezados == por_lxml.encabezados
+    assert por_js.filas == por_lxml.filas == [{'Póliza': '123', 'Nombre del Paciente': 'MARÍA JOSÉ', 'Status': 'Activo'}]
+
+
+def test_busqueda_por_nombre_normalizado():
+    filas = extraer_tabla_html(generar_html_tabla(200)).filas
+    nombre = ' '.join(CLIENTE_BUSCADO.values())
+    assert normalizar_nombre(nombre) == 'MARÍA JOSÉ NÚÑEZ DE LA TORRE'
+    assert buscar_fila_por_nombre(filas, nombre) is filas[-1]
+    assert buscar_fila_por_nombre(filas, 'NADIE') is None
+
+
+if __name__ == "__main__":
+    pruebas = [
+        test_extraccion_lxml,
+        test_tabla_inexistente,
+        test_estrategia_js_equivale_a_lxml,
+        test_busqueda_por_nombre_normalizado
+    ]
+    fallidas = 0
+    for prueba in pruebas:
+        try:
+            prueba()
+            logger.info(f"✅ {prueba.__name__}")
+        except AssertionError as e:
+            fallidas += 1
+            logger.error(f"❌ {prueba.__name__}: {e}")
+    sys.exit(1 if fallidas else 0)